@@ -26,6 +26,12 @@ from llama_index.core import Settings  # noqa: E402
 from llama_index.embeddings.openai import OpenAIEmbedding  # noqa: E402
 from llama_index.llms.openai import OpenAI  # noqa: E402
 
+from app.utils.llm_governor import (  # noqa: E402
+    get_governed_async_http_client,
+    get_governed_http_client,
+)
+from app.utils.llm_resilience import SDK_MAX_RETRIES  # noqa: E402
+
 # 기본 설정값
 DEFAULT_LLM_MODEL = "gpt-4o-mini"
 DEFAULT_LLM_TEMPERATURE = 0.1
@@ -66,9 +72,21 @@ def init_llama_index_settings(
     )
     embedding = embed_model or os.getenv("LLAMA_INDEX_EMBED_MODEL", DEFAULT_EMBED_MODEL)
 
-    # LlamaIndex 전역 설정
-    Settings.llm = OpenAI(model=model, temperature=temperature)
-    Settings.embed_model = OpenAIEmbedding(model=embedding)
+    # LlamaIndex 전역 설정 (LLM/임베딩 호출은 모두 LLMGovernor를 거침)
+    # 재시도는 transport(ResilientTransport)에서 처리하므로 라이브러리 재시도는 끔
+    Settings.llm = OpenAI(
+        model=model,
+        temperature=temperature,
+        max_retries=SDK_MAX_RETRIES,
+        http_client=get_governed_http_client(),
+        async_http_client=get_governed_async_http_client(),
+    )
+    Settings.embed_model = OpenAIEmbedding(
+        model=embedding,
+        max_retries=SDK_MAX_RETRIES,
+        http_client=get_governed_http_client(),
+        async_http_client=get_governed_async_http_client(),
+    )
 
     _initialized = True
 
@@ -7,17 +7,20 @@ warnings.filterwarnings(
     "ignore", category=UserWarning, module="pydantic._internal._generate_schema"
 )
 
-import faiss  # noqa: E402
 import uvicorn  # noqa: E402
 from langchain.prompts import PromptTemplate  # noqa: E402
-from langchain_community.docstore.in_memory import InMemoryDocstore  # noqa: E402
-from langchain_community.vectorstores import FAISS  # noqa: E402
 from langchain_core.output_parsers import StrOutputParser  # noqa: E402
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings  # noqa: E402
-from openai import OpenAI  # noqa: E402
+from openai import AsyncOpenAI, OpenAI  # noqa: E402
 from uvicorn.config import LOGGING_CONFIG  # noqa: E402
 
 from app.config import setting  # noqa: E402
+from app.utils.llm_governor import (  # noqa: E402
+    get_governed_async_http_client,
+    get_governed_http_client,
+)
+from app.utils.llm_resilience import SDK_MAX_RETRIES  # noqa: E402
+from app.utils.vector_store import BoundedVectorStore  # noqa: E402
 
 log_config = uvicorn.config.LOGGING_CONFIG
 LOGGING_CONFIG["formatters"]["access"]["fmt"] = (
@@ -36,25 +39,49 @@ logging.basicConfig(
 
 # Global variables for lazy initialization
 client = None
+async_client = None
 llm = None
 chain = None
 embeddings = None
 vector_store = None
 
 
+def _create_llm() -> ChatOpenAI:
+    """ChatOpenAI routed through the shared LLM governor."""
+    return ChatOpenAI(
+        temperature=setting.temperature,
+        model_name=setting.model_name,
+        max_retries=SDK_MAX_RETRIES,
+        http_client=get_governed_http_client(),
+        http_async_client=get_governed_async_http_client(),
+    )
+
+
 def get_client():
     """Get or create OpenAI client."""
     global client
     if client is None:
-        client = OpenAI()
+        client = OpenAI(
+            max_retries=SDK_MAX_RETRIES, http_client=get_governed_http_client()
+        )
     return client
 
 
+def get_async_client():
+    """Get or create AsyncOpenAI client."""
+    global async_client
+    if async_client is None:
+        async_client = AsyncOpenAI(
+            max_retries=SDK_MAX_RETRIES, http_client=get_governed_async_http_client()
+        )
+    return async_client
+
+
 def get_llm():
     """Get or create ChatOpenAI instance."""
     global llm
     if llm is None:
-        llm = ChatOpenAI(temperature=setting.temperature, model_name=setting.model_name)
+        llm = _create_llm()
     return llm
 
 
@@ -72,32 +99,29 @@ def get_embeddings():
     """Get or create OpenAI embeddings."""
     global embeddings
     if embeddings is None:
-        embeddings = OpenAIEmbeddings(openai_api_key=setting.openai_api_key)
+        embeddings = OpenAIEmbeddings(
+            openai_api_key=setting.openai_api_key,
+            max_retries=SDK_MAX_RETRIES,
+            http_client=get_governed_http_client(),
+            http_async_client=get_governed_async_http_client(),
+        )
     return embeddings
 
 
-def get_vector_store():
-    """Get or create FAISS vector store."""
+def get_vector_store() -> BoundedVectorStore:
+    """Get or create the bounded, de-duplicated FAISS vector store."""
     global vector_store
     if vector_store is None:
-        emb = get_embeddings()
-        # Use a default dimension (1536 for text-embedding-ada-002)
-        # This avoids the initial API call
-        embedding_dim = 1536
-        index = faiss.IndexFlatL2(embedding_dim)
-
-        vector_store = FAISS(
-            embedding_function=emb,
-            index=index,
-            docstore=InMemoryDocstore(),
-            index_to_docstore_id={},
-        )
+        # The embedding dimension is taken from the first embedding call,
+        # so creating the store makes no API call
+        vector_store = BoundedVectorStore(get_embeddings())
     return vector_store
 
 
 # Initialize client and llm eagerly (they don't make API calls)
-client = OpenAI()
-llm = ChatOpenAI(temperature=setting.temperature, model_name=setting.model_name)
+client = get_client()
+async_client = get_async_client()
+llm = get_llm()
 
 template = "아래 질문에 대한 답변을 해주세요. \n{query}"
 prompt = PromptTemplate.from_template(template=template)
@@ -17,8 +17,10 @@ from app.models.customer import Customer  # noqa: E402
 # Pydantic Request/Response Models
 from app.models.document_analysis import (  # noqa: E402
     ChunkConfig,
+    CorpusSearchRequest,
     DocumentUploadRequest,
     IssueExtractionRequest,
+    QueryBatchRequest,
     QueryRequest,
     SummaryRequest,
 )
@@ -34,6 +36,8 @@ __all__ = [
     "ChunkConfig",
     "DocumentUploadRequest",
     "QueryRequest",
+    "QueryBatchRequest",
     "SummaryRequest",
     "IssueExtractionRequest",
+    "CorpusSearchRequest",
 ]
@@ -4,8 +4,22 @@ Document Analysis Request/Response Models
 문서 분석 API에서 사용하는 공통 Pydantic 모델
 """
 
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
+# 검색 모드 (vector: 임베딩 검색, hybrid: 임베딩 + n-gram BM25 RRF 결합)
+RetrievalMode = Literal["vector", "hybrid"]
+
+# 벡터 인덱스 유형 (auto: 노드 수 기준 자동 선택, flat: 전수 비교, ivf/hnsw: FAISS ANN)
+IndexType = Literal["auto", "flat", "ivf", "hnsw"]
+
+# 질의 대상 트리 레벨 (auto: 질문 유형으로 선택, summary: 요약 트리, leaf: Child 청크)
+TreeLevel = Literal["auto", "summary", "leaf"]
+
+# 보고서 요약 범위 (retrieval: 검색된 top_k 청크, full: 문서 전체 map-reduce)
+SummaryMode = Literal["retrieval", "full"]
+
 
 class ChunkConfig(BaseModel):
     """청크 설정"""
@@ -45,6 +59,14 @@ class DocumentUploadRequest(BaseModel):
         default_factory=ChunkConfig,
         description="청크 설정 (선택, 기본값 사용 가능)",
     )
+    index_type: IndexType = Field(
+        default="auto",
+        description="벡터 인덱스 유형 (auto: 노드 수 기준 자동 선택, flat, ivf, hnsw)",
+    )
+    summary_tree: bool = Field(
+        default=False,
+        description="개요 질문용 요약 트리 생성 여부 (업로드 시 군집별 LLM 요약 호출 발생)",
+    )
 
 
 class QueryRequest(BaseModel):
@@ -54,6 +76,17 @@ class QueryRequest(BaseModel):
     query: str = Field(description="질문")
     streaming: bool = Field(default=False, description="스트리밍 응답 여부")
     top_k: int = Field(default=5, description="검색할 청크 개수", ge=1, le=20)
+    retrieval_mode: RetrievalMode = Field(
+        default="vector",
+        description="검색 모드 (vector: 임베딩 검색, hybrid: 임베딩 + BM25 결합)",
+    )
+    tree_level: TreeLevel = Field(
+        default="auto",
+        description=(
+            "검색 대상 (auto: 개요 질문이면 요약 트리, summary: 요약 트리, "
+            "leaf: Child 청크). 요약 트리가 없는 문서는 항상 leaf"
+        ),
+    )
 
 
 class SummaryRequest(BaseModel):
@@ -63,6 +96,10 @@ class SummaryRequest(BaseModel):
     max_length: int = Field(
         default=200, description="요약 최대 길이 (자)", ge=50, le=500
     )
+    retrieval_mode: RetrievalMode = Field(
+        default="vector",
+        description="검색 모드 (vector: 임베딩 검색, hybrid: 임베딩 + BM25 결합)",
+    )
 
 
 class IssueExtractionRequest(BaseModel):
@@ -70,6 +107,10 @@ class IssueExtractionRequest(BaseModel):
 
     doc_id: str = Field(description="문서 ID")
     top_k: int = Field(default=8, description="검색할 청크 개수", ge=3, le=20)
+    retrieval_mode: RetrievalMode = Field(
+        default="vector",
+        description="검색 모드 (vector: 임베딩 검색, hybrid: 임베딩 + BM25 결합)",
+    )
 
 
 # ==================== Clause Analysis Models ====================
@@ -83,6 +124,10 @@ class ReasonAnalysisRequest(BaseModel):
         description="분석할 조치 또는 판단 (예: '소상공인 지원금 확대')"
     )
     top_k: int = Field(default=10, description="검색할 청크 개수", ge=3, le=20)
+    retrieval_mode: RetrievalMode = Field(
+        default="vector",
+        description="검색 모드 (vector: 임베딩 검색, hybrid: 임베딩 + BM25 결합)",
+    )
 
 
 class ExceptionClauseRequest(BaseModel):
@@ -91,6 +136,14 @@ class ExceptionClauseRequest(BaseModel):
     doc_id: str = Field(description="문서 ID")
     situation: str = Field(description="상황 설명 (예: '경영난으로 인한 폐업')")
     top_k: int = Field(default=10, description="검색할 청크 개수", ge=3, le=20)
+    exception_filter: bool = Field(
+        default=True,
+        description="예외 키워드가 태깅된 청크로 검색 범위 제한 여부",
+    )
+    retrieval_mode: RetrievalMode = Field(
+        default="vector",
+        description="검색 모드 (vector: 임베딩 검색, hybrid: 임베딩 + BM25 결합)",
+    )
 
 
 class ClauseSearchRequest(BaseModel):
@@ -99,6 +152,10 @@ class ClauseSearchRequest(BaseModel):
     doc_id: str = Field(description="문서 ID")
     clause_keyword: str = Field(description="조항 키워드 (예: '제1조', '부칙')")
     top_k: int = Field(default=5, description="검색할 청크 개수", ge=1, le=15)
+    retrieval_mode: RetrievalMode = Field(
+        default="vector",
+        description="검색 모드 (vector: 임베딩 검색, hybrid: 임베딩 + BM25 결합)",
+    )
 
 
 # ==================== Table Analysis Models ====================
@@ -113,6 +170,10 @@ class TableImportanceRequest(BaseModel):
     )
     top_n: int = Field(default=3, description="추출할 중요 기준 개수", ge=1, le=10)
     top_k: int = Field(default=15, description="검색할 청크 개수", ge=5, le=30)
+    retrieval_mode: RetrievalMode = Field(
+        default="vector",
+        description="검색 모드 (vector: 임베딩 검색, hybrid: 임베딩 + BM25 결합)",
+    )
 
 
 class TableComparisonRequest(BaseModel):
@@ -127,6 +188,10 @@ class TableComparisonRequest(BaseModel):
         description="표 관련 맥락 (예: '징계 기준표', '처분 사유별 기준')", default=""
     )
     top_k: int = Field(default=15, description="검색할 청크 개수", ge=5, le=30)
+    retrieval_mode: RetrievalMode = Field(
+        default="vector",
+        description="검색 모드 (vector: 임베딩 검색, hybrid: 임베딩 + BM25 결합)",
+    )
 
 
 # ==================== Report Generation Models ====================
@@ -139,7 +204,28 @@ class ReportSummaryRequest(BaseModel):
     max_length: int = Field(
         default=500, description="요약 최대 길이 (자)", ge=200, le=1000
     )
+    summary_mode: SummaryMode = Field(
+        default="retrieval",
+        description=(
+            "요약 범위 (retrieval: 검색된 top_k 청크 요약, "
+            "full: 문서 전체 구간을 병렬 요약 후 결합)"
+        ),
+    )
     top_k: int = Field(default=20, description="검색할 청크 개수", ge=10, le=40)
+    retrieval_mode: RetrievalMode = Field(
+        default="vector",
+        description="검색 모드 (vector: 임베딩 검색, hybrid: 임베딩 + BM25 결합)",
+    )
+    rerank: bool = Field(
+        default=False,
+        description="Cross-Encoder 재순위화로 LLM에 전달할 청크 축소",
+    )
+    rerank_top_n: int = Field(
+        default=5, description="재순위화 후 유지할 청크 개수", ge=1, le=20
+    )
+    rerank_token_budget: int | None = Field(
+        default=None, description="재순위화 후 유지할 청크의 누적 토큰 상한", ge=100
+    )
 
 
 class ChecklistRequest(BaseModel):
@@ -151,6 +237,20 @@ class ChecklistRequest(BaseModel):
         description="체크리스트 유형 (procedure: 절차, compliance: 준수사항, review: 검토사항)",
     )
     top_k: int = Field(default=20, description="검색할 청크 개수", ge=10, le=40)
+    retrieval_mode: RetrievalMode = Field(
+        default="vector",
+        description="검색 모드 (vector: 임베딩 검색, hybrid: 임베딩 + BM25 결합)",
+    )
+    rerank: bool = Field(
+        default=False,
+        description="Cross-Encoder 재순위화로 LLM에 전달할 청크 축소",
+    )
+    rerank_top_n: int = Field(
+        default=5, description="재순위화 후 유지할 청크 개수", ge=1, le=20
+    )
+    rerank_token_budget: int | None = Field(
+        default=None, description="재순위화 후 유지할 청크의 누적 토큰 상한", ge=100
+    )
 
 
 class AmbiguousTextRequest(BaseModel):
@@ -158,6 +258,20 @@ class AmbiguousTextRequest(BaseModel):
 
     doc_id: str = Field(description="문서 ID")
     top_k: int = Field(default=20, description="검색할 청크 개수", ge=10, le=40)
+    retrieval_mode: RetrievalMode = Field(
+        default="vector",
+        description="검색 모드 (vector: 임베딩 검색, hybrid: 임베딩 + BM25 결합)",
+    )
+    rerank: bool = Field(
+        default=False,
+        description="Cross-Encoder 재순위화로 LLM에 전달할 청크 축소",
+    )
+    rerank_top_n: int = Field(
+        default=5, description="재순위화 후 유지할 청크 개수", ge=1, le=20
+    )
+    rerank_token_budget: int | None = Field(
+        default=None, description="재순위화 후 유지할 청크의 누적 토큰 상한", ge=100
+    )
 
 
 class FAQGenerationRequest(BaseModel):
@@ -166,6 +280,20 @@ class FAQGenerationRequest(BaseModel):
     doc_id: str = Field(description="문서 ID")
     num_questions: int = Field(default=5, description="생성할 FAQ 개수", ge=3, le=10)
     top_k: int = Field(default=20, description="검색할 청크 개수", ge=10, le=40)
+    retrieval_mode: RetrievalMode = Field(
+        default="vector",
+        description="검색 모드 (vector: 임베딩 검색, hybrid: 임베딩 + BM25 결합)",
+    )
+    rerank: bool = Field(
+        default=False,
+        description="Cross-Encoder 재순위화로 LLM에 전달할 청크 축소",
+    )
+    rerank_top_n: int = Field(
+        default=5, description="재순위화 후 유지할 청크 개수", ge=1, le=20
+    )
+    rerank_token_budget: int | None = Field(
+        default=None, description="재순위화 후 유지할 청크의 누적 토큰 상한", ge=100
+    )
 
 
 class AdvancedQueryRequest(BaseModel):
@@ -179,3 +307,67 @@ class AdvancedQueryRequest(BaseModel):
         default=False, description="JSON 경로 추출 활성화"
     )
     top_k: int = Field(default=20, description="검색할 청크 개수", ge=10, le=40)
+    retrieval_mode: RetrievalMode = Field(
+        default="vector",
+        description="검색 모드 (vector: 임베딩 검색, hybrid: 임베딩 + BM25 결합)",
+    )
+    rerank: bool = Field(
+        default=False,
+        description="Cross-Encoder 재순위화로 LLM에 전달할 청크 축소",
+    )
+    rerank_top_n: int = Field(
+        default=5, description="재순위화 후 유지할 청크 개수", ge=1, le=20
+    )
+    rerank_token_budget: int | None = Field(
+        default=None, description="재순위화 후 유지할 청크의 누적 토큰 상한", ge=100
+    )
+    strategy_routing: bool = Field(
+        default=True,
+        description="질문 키워드로 필요한 검색 전략만 실행 (LLM 호출 없음, 단일 전략이면 통합 생략)",
+    )
+
+
+class DecomposeAnswerRequest(AdvancedQueryRequest):
+    """질문 분해 + 병렬 서브 질문 실행 스트리밍 요청"""
+
+    max_concurrency: int | None = Field(
+        default=None,
+        description="동시에 실행할 서브 질문 수 (미지정 시 DECOMPOSE_CONCURRENCY)",
+        ge=1,
+        le=8,
+    )
+
+
+class CorpusSearchRequest(BaseModel):
+    """코퍼스(전체 문서) 검색 요청"""
+
+    query: str = Field(description="검색 질문")
+    top_k: int = Field(default=10, description="반환할 청크 개수", ge=1, le=100)
+    max_documents: int = Field(
+        default=50,
+        description="문서 중심 벡터로 선별할 후보 문서 수 (정밀 검색 대상)",
+        ge=1,
+        le=500,
+    )
+    synthesize: bool = Field(default=False, description="문서별 답변 생성 여부")
+    synthesis_documents: int = Field(
+        default=3, description="답변을 생성할 상위 문서 수", ge=1, le=10
+    )
+
+
+class QueryBatchRequest(BaseModel):
+    """다중 질문 일괄 질의 요청 (한 문서)"""
+
+    doc_id: str = Field(description="문서 ID")
+    queries: list[str] = Field(description="질문 리스트", min_length=1, max_length=100)
+    top_k: int = Field(default=5, description="질문별 검색할 청크 개수", ge=1, le=20)
+    retrieval_mode: RetrievalMode = Field(
+        default="vector",
+        description="검색 모드 (vector: 임베딩 검색, hybrid: 임베딩 + BM25 결합)",
+    )
+    max_concurrency: int | None = Field(
+        default=None,
+        description="동시에 생성할 답변 수 (미지정 시 BATCH_QUERY_CONCURRENCY)",
+        ge=1,
+        le=16,
+    )
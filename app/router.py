@@ -11,6 +11,7 @@ from app.routers import (
     document_analysis,
     document_analysis_redis,
     document_clause_analysis,
+    document_corpus,
     document_report_generation,
     document_table_analysis,
     document_upload,
@@ -21,6 +22,10 @@ from app.routers import (
     rag,
     users,
 )
+from app.utils.chain_registry import CHAIN_PREWARM
+from app.utils.intent_router import INTENT_ROUTER_PREWARM, prewarm_intent_routers
+from app.utils.llm_cache import LLMCacheMiddleware, init_llm_cache
+from app.utils.llm_resilience import RequestDeadlineMiddleware
 
 
 @asynccontextmanager
@@ -32,6 +37,17 @@ async def lifespan(app: FastAPI):
     # Initialize LlamaIndex settings on startup
     init_llama_index_settings()
 
+    # LangChain 전역 LLM 캐시 (Redis, LLM_CACHE=off이면 사용 안 함)
+    init_llm_cache()
+
+    # LCEL 예제 체인을 미리 생성 (첫 요청의 체인 생성/검증 비용 제거)
+    if CHAIN_PREWARM:
+        lcel_examples.chains.prewarm()
+
+    # 조건부 체인 의도 라우터의 임베딩 모델 로드 + 예시 임베딩 계산
+    if INTENT_ROUTER_PREWARM:
+        prewarm_intent_routers()
+
     yield
     if sessionmanager._engine is not None:
         # Close the DB connection
@@ -50,6 +66,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# X-Request-Timeout 헤더(초)를 요청 데드라인으로 LLM 호출에 전파
+app.add_middleware(RequestDeadlineMiddleware)
+
+# LLM 캐시 라우트별 집계 / LLM_CACHE_EXCLUDE_PATHS 경로의 캐시 끄기
+app.add_middleware(LLMCacheMiddleware)
+
 app.include_router(customers.router)
 app.include_router(users.router)
 app.include_router(llm.router)
@@ -64,6 +86,7 @@ app.include_router(document_clause_analysis.router)
 app.include_router(document_table_analysis.router)
 app.include_router(document_report_generation.router)
 app.include_router(document_advanced_query.router)
+app.include_router(document_corpus.router)
 
 # app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -5,22 +5,28 @@ Advanced Query Analysis Router
 1. 질문 분해 (Query Decomposition)
 2. 다중 검색 (Multi-Retrieval): 표/본문/JSON 경로 분리
 3. 병렬 검색 및 결과 통합
+4. 질문 분해 → 병렬 서브 질문 → 통합 스트리밍 (NDJSON)
 
 Author: Claude Sonnet 4.5
 Created: 2026-01-16
 """
 
+import asyncio
 from datetime import datetime
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 
-from app.models.document_analysis import AdvancedQueryRequest
+from app.models.document_analysis import AdvancedQueryRequest, DecomposeAnswerRequest
 from app.utils import (
+    DECOMPOSE_CONCURRENCY,
     decompose_query_internal,
     error_response,
     integrate_all_results,
+    load_index_from_redis,
     multi_retrieval_internal,
     ping_redis,
+    stream_decompose_and_answer,
     success_response,
 )
 
@@ -95,6 +101,11 @@ async def multi_retrieval(request: AdvancedQueryRequest):
             use_text_search=request.use_text_search,
             use_json_extraction=request.use_json_extraction,
             top_k=request.top_k,
+            retrieval_mode=request.retrieval_mode,
+            rerank=request.rerank,
+            rerank_top_n=request.rerank_top_n,
+            rerank_token_budget=request.rerank_token_budget,
+            strategy_routing=request.strategy_routing,
         )
         return success_response(
             data=data,
@@ -133,20 +144,32 @@ async def advanced_query(request: AdvancedQueryRequest):
             query=request.query,
         )
 
-        # 2단계: 각 서브 질문에 대해 다중 검색
+        # 2단계: 각 서브 질문에 대해 다중 검색 (인덱스 1회 로드, 병렬 실행)
         sub_queries = decomposition_data.get("sub_queries", [])
-        sub_query_results = []
-
-        for sub_query in sub_queries:
-            sub_result = await multi_retrieval_internal(
-                doc_id=request.doc_id,
-                query=sub_query,
-                use_table_search=request.use_table_search,
-                use_text_search=request.use_text_search,
-                use_json_extraction=request.use_json_extraction,
-                top_k=request.top_k,
-            )
-            sub_query_results.append(sub_result)
+        index, metadata = await load_index_from_redis(request.doc_id)
+        semaphore = asyncio.Semaphore(DECOMPOSE_CONCURRENCY)
+
+        async def run_sub_query(sub_query: str) -> dict:
+            async with semaphore:
+                return await multi_retrieval_internal(
+                    doc_id=request.doc_id,
+                    query=sub_query,
+                    use_table_search=request.use_table_search,
+                    use_text_search=request.use_text_search,
+                    use_json_extraction=request.use_json_extraction,
+                    top_k=request.top_k,
+                    retrieval_mode=request.retrieval_mode,
+                    rerank=request.rerank,
+                    rerank_top_n=request.rerank_top_n,
+                    rerank_token_budget=request.rerank_token_budget,
+                    strategy_routing=request.strategy_routing,
+                    index=index,
+                    metadata=metadata,
+                )
+
+        sub_query_results = list(
+            await asyncio.gather(*(run_sub_query(q) for q in sub_queries))
+        )
 
         # 3단계: 최종 답변 통합
         final_answer = await integrate_all_results(
@@ -173,10 +196,60 @@ async def advanced_query(request: AdvancedQueryRequest):
             message="고급 쿼리 분석이 완료되었습니다.",
         )
 
+    except ValueError as e:
+        return error_response(str(e), 404)
     except Exception as e:
         return error_response(f"고급 쿼리 분석 실패: {str(e)}", 500)
 
 
+@router.post("/decompose-and-answer")
+async def decompose_and_answer(request: DecomposeAnswerRequest):
+    """
+    질문 분해 + 병렬 서브 질문 실행 (NDJSON 스트리밍)
+
+    /advanced-query와 같은 단계를 수행하되, 결과를 완료되는 즉시 한 줄씩 전송합니다.
+
+    1. 질문 분해와 동시에 원본 질문 검색을 미리 시작
+    2. 서브 질문을 max_concurrency개씩 병렬 실행 (인덱스는 1회만 로드)
+    3. 서브 답변은 완료 순서대로 전송 (각 줄의 index로 원래 순서 확인)
+    4. 마지막 서브 답변 도착 즉시 최종 통합 답변 전송
+
+    Stream events:
+        - decomposition: 분해된 서브 질문 목록
+        - sub_answer: 서브 질문별 통합 답변 (실패 시 error)
+        - final: 최종 답변 (서브 질문이 1개 이하면 미리 검색한 결과로 바로 답변)
+        - done: 서브 질문 수, 실패 수, 전체 실행 시간
+    """
+    try:
+        # 스트리밍 시작 전에 로드하여 문서 없음(404)을 응답 코드로 전달
+        index, metadata = await load_index_from_redis(request.doc_id)
+
+        return StreamingResponse(
+            stream_decompose_and_answer(
+                index,
+                metadata,
+                doc_id=request.doc_id,
+                query=request.query,
+                top_k=request.top_k,
+                retrieval_mode=request.retrieval_mode,
+                max_concurrency=request.max_concurrency,
+                use_table_search=request.use_table_search,
+                use_text_search=request.use_text_search,
+                use_json_extraction=request.use_json_extraction,
+                rerank=request.rerank,
+                rerank_top_n=request.rerank_top_n,
+                rerank_token_budget=request.rerank_token_budget,
+                strategy_routing=request.strategy_routing,
+            ),
+            media_type="application/x-ndjson",
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
 # ============================================================================
 # Health Check
 # ============================================================================
@@ -204,6 +277,7 @@ async def health_check():
                 "text_search",
                 "json_extraction",
                 "integrated_search",
+                "decompose_and_answer_streaming",
             ],
         },
         message="고급 쿼리 분석 API가 정상 작동 중입니다.",
@@ -17,11 +17,17 @@ from app.models import (
     SummaryRequest,
 )
 from app.utils import (
+    CONTEXT_BUDGETS,
+    build_query_engine,
+    build_summary_query_engine,
     compute_confidence_score,
     create_hierarchical_index,
     created_response,
     error_response,
+    get_context_stats,
+    get_synthesis_stats,
     load_pdf_from_path,
+    route_tree_level,
     stream_response,
     success_response,
 )
@@ -60,7 +66,11 @@ async def upload_pdf_from_docs(request: DocumentUploadRequest):
         documents = await load_pdf_from_path(pdf_path)
 
         # 계층적 인덱스 생성
-        index, total_nodes, child_nodes = await create_hierarchical_index(documents)
+        index, total_nodes, child_nodes = await create_hierarchical_index(
+            documents,
+            index_type=request.index_type,
+            summary_tree=request.summary_tree,
+        )
 
         # 인덱스 저장
         _index_storage[request.doc_id] = {
@@ -116,8 +126,12 @@ async def get_document_summary(request: SummaryRequest):
         storage = _index_storage[request.doc_id]
         index = storage["index"]
 
-        query_engine = index.as_query_engine(
-            similarity_top_k=5, response_mode="compact"
+        query_engine = build_query_engine(
+            index,
+            similarity_top_k=5,
+            response_mode="compact",
+            retrieval_mode=request.retrieval_mode,
+            context_budget=CONTEXT_BUDGETS["summary"],
         )
 
         query = f"""
@@ -136,6 +150,7 @@ async def get_document_summary(request: SummaryRequest):
                 "summary_length": len(str(response)),
                 "source_nodes_count": len(response.source_nodes),
                 "confidence_score": compute_confidence_score(response.source_nodes),
+                "context_packing": get_context_stats(query_engine),
             },
             message="문서의 목적과 핵심 내용을 요약했습니다.",
             execution_time_ms=(end_time - start_time).total_seconds() * 1000,
@@ -168,7 +183,13 @@ async def get_document_summary_streaming(request: SummaryRequest):
         storage = _index_storage[request.doc_id]
         index = storage["index"]
 
-        query_engine = index.as_query_engine(streaming=True, similarity_top_k=5)
+        query_engine = build_query_engine(
+            index,
+            similarity_top_k=5,
+            streaming=True,
+            retrieval_mode=request.retrieval_mode,
+            context_budget=CONTEXT_BUDGETS["summary"],
+        )
 
         query = f"""
         이 문서의 목적과 핵심 내용을 한 문단({request.max_length}자 이내)으로 요약해 주세요.
@@ -208,8 +229,12 @@ async def extract_issues(request: IssueExtractionRequest):
         storage = _index_storage[request.doc_id]
         index = storage["index"]
 
-        query_engine = index.as_query_engine(
-            similarity_top_k=request.top_k, response_mode="tree_summarize"
+        query_engine = build_query_engine(
+            index,
+            similarity_top_k=request.top_k,
+            response_mode="auto",
+            retrieval_mode=request.retrieval_mode,
+            context_budget=CONTEXT_BUDGETS["analysis"],
         )
 
         query = """
@@ -248,6 +273,8 @@ async def extract_issues(request: IssueExtractionRequest):
                 "source_nodes": source_nodes_info,
                 "total_source_nodes": len(response.source_nodes),
                 "confidence_score": compute_confidence_score(response.source_nodes),
+                "context_packing": get_context_stats(query_engine),
+                "synthesis": get_synthesis_stats(query_engine),
             },
             message="문서에서 주요 이슈를 추출했습니다.",
             execution_time_ms=(end_time - start_time).total_seconds() * 1000,
@@ -283,10 +310,23 @@ async def query_document(request: QueryRequest):
         storage = _index_storage[request.doc_id]
         index = storage["index"]
 
-        if request.streaming:
-            query_engine = index.as_query_engine(
-                streaming=True, similarity_top_k=request.top_k
+        # 개요 질문은 요약 트리, 구체적 질문은 Child 청크에서 검색
+        tree_level = route_tree_level(index, request.query, request.tree_level)
+
+        if tree_level == "summary":
+            query_engine = build_summary_query_engine(
+                index, streaming=request.streaming
             )
+        else:
+            query_engine = build_query_engine(
+                index,
+                similarity_top_k=request.top_k,
+                streaming=request.streaming,
+                retrieval_mode=request.retrieval_mode,
+                context_budget=CONTEXT_BUDGETS["query"],
+            )
+
+        if request.streaming:
             streaming_response = query_engine.query(request.query)
 
             return StreamingResponse(
@@ -294,7 +334,6 @@ async def query_document(request: QueryRequest):
                 media_type="text/event-stream",
             )
         else:
-            query_engine = index.as_query_engine(similarity_top_k=request.top_k)
             response = query_engine.query(request.query)
 
             end_time = datetime.now()
@@ -316,6 +355,8 @@ async def query_document(request: QueryRequest):
                         for node in response.source_nodes
                     ],
                     "confidence_score": compute_confidence_score(response.source_nodes),
+                    "context_packing": get_context_stats(query_engine),
+                    "tree_level": tree_level,
                 },
                 message="질의응답이 완료되었습니다.",
                 execution_time_ms=(end_time - start_time).total_seconds() * 1000,
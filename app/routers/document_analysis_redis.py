@@ -12,17 +12,25 @@ from fastapi.responses import StreamingResponse
 
 from app.models import (
     IssueExtractionRequest,
+    QueryBatchRequest,
     QueryRequest,
     SummaryRequest,
 )
 from app.utils import (
+    CONTEXT_BUDGETS,
+    build_query_engine,
+    build_summary_query_engine,
     check_document_exists,
     compute_confidence_score,
     delete_document_from_redis,
     error_response,
+    get_context_stats,
     get_redis_client,
+    get_synthesis_stats,
     list_all_documents,
     load_index_from_redis,
+    route_tree_level,
+    stream_batch_query,
     stream_response,
     success_response,
 )
@@ -46,15 +54,24 @@ async def get_document_summary(request: SummaryRequest):
         # Redis에서 인덱스 로드
         index, metadata = await load_index_from_redis(request.doc_id)
 
-        query_engine = index.as_query_engine(
-            similarity_top_k=5, response_mode="compact"
-        )
-
         query = f"""
         이 문서의 목적과 핵심 내용을 한 문단({request.max_length}자 이내)으로 요약해 주세요.
         정부의 정책 방향, 주요 지원 내용, 예산 규모 등을 포함해주세요.
         """
 
+        # 요약 트리가 있으면 상위 요약 노드로 답변 (Child 청크 검색 생략)
+        tree_level = route_tree_level(index, query, "summary")
+        if tree_level == "summary":
+            query_engine = build_summary_query_engine(index)
+        else:
+            query_engine = build_query_engine(
+                index,
+                similarity_top_k=5,
+                response_mode="compact",
+                retrieval_mode=request.retrieval_mode,
+                context_budget=CONTEXT_BUDGETS["summary"],
+            )
+
         response = query_engine.query(query)
 
         end_time = datetime.now()
@@ -67,6 +84,8 @@ async def get_document_summary(request: SummaryRequest):
                 "summary_length": len(str(response)),
                 "source_nodes_count": len(response.source_nodes),
                 "confidence_score": compute_confidence_score(response.source_nodes),
+                "context_packing": get_context_stats(query_engine),
+                "tree_level": tree_level,
             },
             message="문서의 목적과 핵심 내용을 요약했습니다.",
             execution_time_ms=(end_time - start_time).total_seconds() * 1000,
@@ -93,12 +112,21 @@ async def get_document_summary_streaming(request: SummaryRequest):
         # Redis에서 인덱스 로드
         index, metadata = await load_index_from_redis(request.doc_id)
 
-        query_engine = index.as_query_engine(streaming=True, similarity_top_k=5)
-
         query = f"""
         이 문서의 목적과 핵심 내용을 한 문단({request.max_length}자 이내)으로 요약해 주세요.
         """
 
+        if route_tree_level(index, query, "summary") == "summary":
+            query_engine = build_summary_query_engine(index, streaming=True)
+        else:
+            query_engine = build_query_engine(
+                index,
+                similarity_top_k=5,
+                streaming=True,
+                retrieval_mode=request.retrieval_mode,
+                context_budget=CONTEXT_BUDGETS["summary"],
+            )
+
         streaming_response = query_engine.query(query)
 
         return StreamingResponse(
@@ -121,8 +149,12 @@ async def extract_issues(request: IssueExtractionRequest):
         # Redis에서 인덱스 로드
         index, metadata = await load_index_from_redis(request.doc_id)
 
-        query_engine = index.as_query_engine(
-            similarity_top_k=request.top_k, response_mode="tree_summarize"
+        query_engine = build_query_engine(
+            index,
+            similarity_top_k=request.top_k,
+            response_mode="auto",
+            retrieval_mode=request.retrieval_mode,
+            context_budget=CONTEXT_BUDGETS["analysis"],
         )
 
         query = """
@@ -156,6 +188,8 @@ async def extract_issues(request: IssueExtractionRequest):
                 "source_nodes": source_nodes_info,
                 "total_source_nodes": len(response.source_nodes),
                 "confidence_score": compute_confidence_score(response.source_nodes),
+                "context_packing": get_context_stats(query_engine),
+                "synthesis": get_synthesis_stats(query_engine),
             },
             message="문서에서 주요 이슈를 추출했습니다.",
             execution_time_ms=(end_time - start_time).total_seconds() * 1000,
@@ -184,10 +218,23 @@ async def query_document(request: QueryRequest):
         # Redis에서 인덱스 로드
         index, metadata = await load_index_from_redis(request.doc_id)
 
-        if request.streaming:
-            query_engine = index.as_query_engine(
-                streaming=True, similarity_top_k=request.top_k
+        # 개요 질문은 요약 트리, 구체적 질문은 Child 청크에서 검색
+        tree_level = route_tree_level(index, request.query, request.tree_level)
+
+        if tree_level == "summary":
+            query_engine = build_summary_query_engine(
+                index, streaming=request.streaming
             )
+        else:
+            query_engine = build_query_engine(
+                index,
+                similarity_top_k=request.top_k,
+                streaming=request.streaming,
+                retrieval_mode=request.retrieval_mode,
+                context_budget=CONTEXT_BUDGETS["query"],
+            )
+
+        if request.streaming:
             streaming_response = query_engine.query(request.query)
 
             return StreamingResponse(
@@ -195,7 +242,6 @@ async def query_document(request: QueryRequest):
                 media_type="text/event-stream",
             )
         else:
-            query_engine = index.as_query_engine(similarity_top_k=request.top_k)
             response = query_engine.query(request.query)
 
             end_time = datetime.now()
@@ -215,6 +261,8 @@ async def query_document(request: QueryRequest):
                         for node in response.source_nodes
                     ],
                     "confidence_score": compute_confidence_score(response.source_nodes),
+                    "context_packing": get_context_stats(query_engine),
+                    "tree_level": tree_level,
                 },
                 message="질의응답이 완료되었습니다.",
                 execution_time_ms=(end_time - start_time).total_seconds() * 1000,
@@ -234,6 +282,36 @@ async def query_document(request: QueryRequest):
         )
 
 
+@router.post("/query-batch")
+async def query_document_batch(request: QueryBatchRequest):
+    """
+    다중 질문 일괄 질의응답 (Redis에서 로드, NDJSON 스트리밍)
+
+    인덱스 로드 1회, 질문 임베딩 배치 호출 1회, 유사도 행렬 검색 1회로 모든 질문을 검색하고
+    답변 생성은 max_concurrency개씩 병렬로 실행합니다.
+    결과는 완료된 순서대로 한 줄씩 반환되며, 각 줄의 index로 원래 질문 순서를 알 수 있습니다.
+    """
+    try:
+        # 스트리밍 시작 전에 로드하여 문서 없음(404)을 응답 코드로 전달
+        index, metadata = await load_index_from_redis(request.doc_id)
+
+        return StreamingResponse(
+            stream_batch_query(
+                index,
+                request.queries,
+                top_k=request.top_k,
+                retrieval_mode=request.retrieval_mode,
+                max_concurrency=request.max_concurrency,
+            ),
+            media_type="application/x-ndjson",
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
 @router.get("/list-documents")
 async def list_indexed_documents():
     """Redis에 저장된 모든 문서 목록 조회"""
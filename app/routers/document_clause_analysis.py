@@ -17,12 +17,17 @@ from app.models.document_analysis import (
     ReasonAnalysisRequest,
 )
 from app.utils import (
+    CONTEXT_BUDGETS,
+    build_query_engine,
     error_response,
+    get_context_stats,
+    get_synthesis_stats,
     load_index_from_redis,
     ping_redis,
     success_response,
 )
 from app.utils.document_analysis import (
+    build_exception_filters,
     compute_confidence_score,
     extract_source_references,
     format_citation,
@@ -69,8 +74,12 @@ async def analyze_decision_reason(request: ReasonAnalysisRequest):
         index, metadata = await load_index_from_redis(request.doc_id)
 
         # 쿼리 엔진 생성
-        query_engine = index.as_query_engine(
-            similarity_top_k=request.top_k, response_mode="tree_summarize"
+        query_engine = build_query_engine(
+            index,
+            similarity_top_k=request.top_k,
+            response_mode="auto",
+            retrieval_mode=request.retrieval_mode,
+            context_budget=CONTEXT_BUDGETS["analysis"],
         )
 
         # 사유 분석 프롬프트
@@ -119,6 +128,8 @@ async def analyze_decision_reason(request: ReasonAnalysisRequest):
                 "citations": citations,
                 "total_sources_found": len(response.source_nodes),
                 "confidence_score": compute_confidence_score(response.source_nodes),
+                "context_packing": get_context_stats(query_engine),
+                "synthesis": get_synthesis_stats(query_engine),
             },
             message="사유 및 근거 분석이 완료되었습니다.",
             execution_time_ms=(end_time - start_time).total_seconds() * 1000,
@@ -151,12 +162,16 @@ async def find_exception_clauses(request: ExceptionClauseRequest):
     "다만", "단서", "예외적으로", "제외", "이 경우", "특례", "불구하고" 등의
     키워드를 포함한 조항을 우선적으로 찾습니다.
 
+    업로드 시 예외 키워드가 태깅된 청크(has_exception_clause)가 있으면
+    검색 범위를 해당 청크로 제한합니다 (exception_filter=false로 해제 가능).
+
     Request:
     ```json
     {
         "doc_id": "policy_2024",
         "situation": "경영난으로 인한 폐업",
-        "top_k": 10
+        "top_k": 10,
+        "exception_filter": true
     }
     ```
 
@@ -172,9 +187,22 @@ async def find_exception_clauses(request: ExceptionClauseRequest):
         # Redis에서 인덱스 로드
         index, metadata = await load_index_from_redis(request.doc_id)
 
+        # 예외 키워드 태깅 노드가 있는 문서만 필터 적용 (이전 업로드 문서는 전체 검색)
+        exception_clause_nodes = metadata.get("exception_clause_nodes")
+        apply_exception_filter = request.exception_filter and bool(
+            exception_clause_nodes
+        )
+
+        filters = build_exception_filters() if apply_exception_filter else None
+
         # 쿼리 엔진 생성
-        query_engine = index.as_query_engine(
-            similarity_top_k=request.top_k, response_mode="tree_summarize"
+        query_engine = build_query_engine(
+            index,
+            similarity_top_k=request.top_k,
+            response_mode="auto",
+            retrieval_mode=request.retrieval_mode,
+            filters=filters,
+            context_budget=CONTEXT_BUDGETS["analysis"],
         )
 
         # 예외 키워드
@@ -227,12 +255,16 @@ async def find_exception_clauses(request: ExceptionClauseRequest):
                 "all_source_references": source_references,
                 "exception_clauses_found": len(highlighted_sources),
                 "confidence_score": compute_confidence_score(response.source_nodes),
+                "context_packing": get_context_stats(query_engine),
+                "synthesis": get_synthesis_stats(query_engine),
             },
             message="예외 조항 검색이 완료되었습니다.",
             execution_time_ms=(end_time - start_time).total_seconds() * 1000,
             metadata={
                 "analysis_type": "exception_clause_search",
                 "exception_keywords_searched": exception_keywords,
+                "exception_filter_applied": apply_exception_filter,
+                "exception_clause_nodes": exception_clause_nodes,
             },
         )
 
@@ -279,8 +311,12 @@ async def search_specific_clause(request: ClauseSearchRequest):
         index, metadata = await load_index_from_redis(request.doc_id)
 
         # 쿼리 엔진 생성
-        query_engine = index.as_query_engine(
-            similarity_top_k=request.top_k, response_mode="compact"
+        query_engine = build_query_engine(
+            index,
+            similarity_top_k=request.top_k,
+            response_mode="compact",
+            retrieval_mode=request.retrieval_mode,
+            context_budget=CONTEXT_BUDGETS["analysis"],
         )
 
         # 조항 검색 프롬프트
@@ -309,6 +345,7 @@ async def search_specific_clause(request: ClauseSearchRequest):
                 "source_references": source_references,
                 "total_matches": len(response.source_nodes),
                 "confidence_score": compute_confidence_score(response.source_nodes),
+                "context_packing": get_context_stats(query_engine),
             },
             message="조항 검색이 완료되었습니다.",
             execution_time_ms=(end_time - start_time).total_seconds() * 1000,
@@ -0,0 +1,143 @@
+"""
+코퍼스(전체 문서) 검색 API Router
+
+Redis에 저장된 모든 문서를 대상으로 한 번에 검색합니다.
+- 문서 중심(centroid) 벡터로 후보 문서/샤드 선별 후 노드 단위 정밀 검색
+- (doc_id, 노드) 순위 결과 + 선택적 문서별 답변 생성
+- 전역 인덱스는 문서 업로드/삭제 시 자동 갱신
+"""
+
+from datetime import datetime
+
+from fastapi import APIRouter
+from llama_index.core import Settings
+
+from app.models import CorpusSearchRequest
+from app.utils import (
+    error_response,
+    get_corpus_stats,
+    rebuild_corpus_index,
+    search_corpus,
+    success_response,
+    synthesize_per_document,
+)
+
+router = APIRouter(prefix="/document-corpus", tags=["Document Corpus Search"])
+
+
+# ============================================================================
+# API Endpoints
+# ============================================================================
+
+
+@router.post("/search")
+async def search_documents(request: CorpusSearchRequest):
+    """
+    전체 문서 검색
+
+    1단계: 문서 중심 벡터로 상위 max_documents개 문서 선택 (샤드 가지치기)
+    2단계: 후보 문서가 속한 샤드에서 노드 단위 정밀 검색
+    3단계 (선택): 상위 문서별 답변 생성 (병렬)
+
+    Returns:
+        - hits: (doc_id, node_id, score, text_preview) 순위 리스트
+        - documents: 문서별 최고 점수와 청크 수
+        - answers: 문서별 답변 (synthesize=true일 때)
+    """
+    try:
+        start_time = datetime.now()
+
+        query_embedding = await Settings.embed_model.aget_query_embedding(request.query)
+        hits, stats = await search_corpus(
+            query_embedding,
+            top_k=request.top_k,
+            max_documents=request.max_documents,
+        )
+
+        documents: dict[str, dict] = {}
+        for hit in hits:
+            summary = documents.setdefault(
+                hit.doc_id, {"doc_id": hit.doc_id, "best_score": hit.score, "hits": 0}
+            )
+            summary["hits"] += 1
+
+        answers = None
+        if request.synthesize and hits:
+            answers = await synthesize_per_document(
+                request.query, hits, max_documents=request.synthesis_documents
+            )
+
+        end_time = datetime.now()
+
+        return success_response(
+            data={
+                "query": request.query,
+                "hits": [
+                    {
+                        "doc_id": hit.doc_id,
+                        "node_id": hit.node_id,
+                        "score": round(hit.score, 4),
+                        "text_preview": (
+                            hit.text[:200] + "..." if len(hit.text) > 200 else hit.text
+                        ),
+                    }
+                    for hit in hits
+                ],
+                "documents": list(documents.values()),
+                "answers": answers,
+                "search_stats": stats,
+            },
+            message="전체 문서 검색이 완료되었습니다.",
+            execution_time_ms=(end_time - start_time).total_seconds() * 1000,
+        )
+
+    except Exception as e:
+        return error_response(
+            message="전체 문서 검색 중 오류가 발생했습니다.",
+            error=str(e),
+            status_code=500,
+        )
+
+
+@router.post("/rebuild")
+async def rebuild_index():
+    """
+    전역 인덱스 재구성
+
+    Redis의 모든 문서(doc:*)로 샤드를 병렬 재구성합니다.
+    코퍼스 인덱스 도입 이전에 업로드된 문서가 있거나 CORPUS_SHARD_COUNT를 바꾼 경우 사용합니다.
+    """
+    try:
+        start_time = datetime.now()
+        result = await rebuild_corpus_index()
+        end_time = datetime.now()
+
+        return success_response(
+            data=result,
+            message="전역 인덱스가 재구성되었습니다.",
+            execution_time_ms=(end_time - start_time).total_seconds() * 1000,
+        )
+
+    except Exception as e:
+        return error_response(
+            message="전역 인덱스 재구성 중 오류가 발생했습니다.",
+            error=str(e),
+            status_code=500,
+        )
+
+
+@router.get("/stats")
+async def corpus_stats():
+    """전역 인덱스 상태 (문서 수, 샤드별 문서 수)"""
+    try:
+        return success_response(
+            data=await get_corpus_stats(),
+            message="전역 인덱스 상태 조회 완료",
+        )
+
+    except Exception as e:
+        return error_response(
+            message="전역 인덱스 상태 조회 중 오류가 발생했습니다.",
+            error=str(e),
+            status_code=500,
+        )
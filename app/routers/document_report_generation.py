@@ -17,12 +17,16 @@ from app.models.document_analysis import (
     ReportSummaryRequest,
 )
 from app.utils import (
+    CONTEXT_BUDGETS,
+    ContextPacker,
+    CrossEncoderReranker,
     compute_confidence_score,
     error_response,
     generate_structured_query,
     load_index_from_redis,
     ping_redis,
     success_response,
+    summarize_document,
 )
 
 router = APIRouter(
@@ -31,6 +35,22 @@ router = APIRouter(
 )
 
 
+def make_reranker(request, rerank_query: str) -> CrossEncoderReranker | None:
+    """
+    요청 옵션에 따른 재순위화 후처리기 생성
+
+    보고서 프롬프트는 지시문이 길어 Cross-Encoder 입력으로 부적합하므로,
+    엔드포인트별 짧은 주제 질의(rerank_query)로 관련도를 평가합니다.
+    """
+    if not request.rerank:
+        return None
+    return CrossEncoderReranker(
+        top_n=request.rerank_top_n,
+        token_budget=request.rerank_token_budget,
+        rerank_query=rerank_query,
+    )
+
+
 # ============================================================================
 # API Endpoints
 # ============================================================================
@@ -42,6 +62,7 @@ async def generate_report_summary(request: ReportSummaryRequest):
     내부 보고용 요약 메모 생성
 
     문서 내용을 분석하여 상급자 보고용 요약문을 자동 생성합니다.
+    summary_mode="full"이면 검색 없이 문서 전체 구간을 병렬 요약한 뒤 결합합니다.
 
     Returns:
     - title: 보고서 제목
@@ -79,13 +100,28 @@ async def generate_report_summary(request: ReportSummaryRequest):
 각 섹션을 명확히 구분하여 작성해 주세요.
 """
 
-        # 쿼리 실행
-        response_text, source_nodes = await generate_structured_query(
-            index=index,
-            query=query,
-            response_mode="tree_summarize",  # 계층적 요약
-            top_k=request.top_k,
-        )
+        reranker = packer = full_summary = None
+        if request.summary_mode == "full":
+            # 문서 전체 구간 병렬 요약 후 결합 (구간 요약은 Redis 캐시 재사용)
+            response_text, full_summary = await summarize_document(
+                request.doc_id, index, query
+            )
+            source_nodes = []
+            synthesis = full_summary["reduce"]
+        else:
+            # 쿼리 실행
+            reranker = make_reranker(
+                request, "문서의 목적, 핵심 내용, 주요 변경사항, 실무 유의사항"
+            )
+            packer = ContextPacker(token_budget=CONTEXT_BUDGETS["report"])
+            response_text, source_nodes, synthesis = await generate_structured_query(
+                index=index,
+                query=query,
+                response_mode="auto",
+                top_k=request.top_k,
+                retrieval_mode=request.retrieval_mode,
+                node_postprocessors=[reranker, packer] if reranker else [packer],
+            )
 
         # 응답 파싱
         sections = parse_report_sections(response_text)
@@ -120,12 +156,22 @@ async def generate_report_summary(request: ReportSummaryRequest):
                 "recommendations": sections.get("recommendations", []),
                 "full_text": response_text,
                 "source_references": references,
-                "confidence_score": compute_confidence_score(source_nodes),
+                # 전체 요약은 검색 점수가 없으므로 None
+                "confidence_score": (
+                    compute_confidence_score(source_nodes)
+                    if full_summary is None
+                    else None
+                ),
                 "metadata": {
+                    "summary_mode": request.summary_mode,
                     "total_nodes_searched": len(source_nodes),
                     "file_name": metadata.get("file_name", "Unknown"),
                     "generated_at": datetime.now().isoformat(),
                     "max_length": request.max_length,
+                    "rerank": reranker.stats if reranker else None,
+                    "context_packing": packer.stats if packer else None,
+                    "synthesis": synthesis,
+                    "full_document": full_summary,
                 },
             },
             message="보고서 초안이 생성되었습니다.",
@@ -250,11 +296,17 @@ async def generate_checklist(request: ChecklistRequest):
         )
 
         # 쿼리 실행
-        response_text, source_nodes = await generate_structured_query(
+        reranker = make_reranker(
+            request, "업무 절차, 준수 의무, 제출 서류, 기한, 검토 사항"
+        )
+        packer = ContextPacker(token_budget=CONTEXT_BUDGETS["report"])
+        response_text, source_nodes, synthesis = await generate_structured_query(
             index=index,
             query=query,
-            response_mode="tree_summarize",  # 계층적 요약
+            response_mode="auto",
             top_k=request.top_k,
+            retrieval_mode=request.retrieval_mode,
+            node_postprocessors=[reranker, packer] if reranker else [packer],
         )
 
         # 응답 파싱
@@ -294,6 +346,9 @@ async def generate_checklist(request: ChecklistRequest):
                     "total_nodes_searched": len(source_nodes),
                     "file_name": metadata.get("file_name", "Unknown"),
                     "generated_at": datetime.now().isoformat(),
+                    "rerank": reranker.stats if reranker else None,
+                    "context_packing": packer.stats,
+                    "synthesis": synthesis,
                 },
             },
             message=f"체크리스트가 생성되었습니다 ({request.checklist_type} 유형).",
@@ -500,11 +555,17 @@ async def analyze_ambiguous_text(request: AmbiguousTextRequest):
 """
 
         # 쿼리 실행
-        response_text, source_nodes = await generate_structured_query(
+        reranker = make_reranker(
+            request, "해석이 모호한 표현, 재량 판단, 예외 조건, 불명확한 기준"
+        )
+        packer = ContextPacker(token_budget=CONTEXT_BUDGETS["report"])
+        response_text, source_nodes, synthesis = await generate_structured_query(
             index=index,
             query=query,
-            response_mode="tree_summarize",
+            response_mode="auto",
             top_k=request.top_k,
+            retrieval_mode=request.retrieval_mode,
+            node_postprocessors=[reranker, packer] if reranker else [packer],
         )
 
         # 응답 파싱
@@ -550,6 +611,9 @@ async def analyze_ambiguous_text(request: AmbiguousTextRequest):
                     "total_nodes_searched": len(source_nodes),
                     "file_name": metadata.get("file_name", "Unknown"),
                     "analyzed_at": datetime.now().isoformat(),
+                    "rerank": reranker.stats if reranker else None,
+                    "context_packing": packer.stats,
+                    "synthesis": synthesis,
                 },
             },
             message="모호한 표현 분석이 완료되었습니다.",
@@ -615,11 +679,17 @@ FAQ 작성 가이드:
 """
 
         # 쿼리 실행
-        response_text, source_nodes = await generate_structured_query(
+        reranker = make_reranker(
+            request, "자주 묻는 질문: 지원 대상, 신청 방법, 기준, 절차"
+        )
+        packer = ContextPacker(token_budget=CONTEXT_BUDGETS["report"])
+        response_text, source_nodes, synthesis = await generate_structured_query(
             index=index,
             query=query,
-            response_mode="tree_summarize",
+            response_mode="auto",
             top_k=request.top_k,
+            retrieval_mode=request.retrieval_mode,
+            node_postprocessors=[reranker, packer] if reranker else [packer],
         )
 
         # 응답 파싱
@@ -658,6 +728,9 @@ FAQ 작성 가이드:
                     "file_name": metadata.get("file_name", "Unknown"),
                     "generated_at": datetime.now().isoformat(),
                     "requested_questions": request.num_questions,
+                    "rerank": reranker.stats if reranker else None,
+                    "context_packing": packer.stats,
+                    "synthesis": synthesis,
                 },
             },
             message=f"FAQ {len(faq_data.get('items', []))}개가 생성되었습니다.",
@@ -15,8 +15,12 @@ from app.models.document_analysis import (
     TableImportanceRequest,
 )
 from app.utils import (
+    CONTEXT_BUDGETS,
+    build_query_engine,
     compute_confidence_score,
     error_response,
+    get_context_stats,
+    get_synthesis_stats,
     load_index_from_redis,
     ping_redis,
     success_response,
@@ -51,9 +55,12 @@ async def analyze_table_importance(request: TableImportanceRequest):
         index, metadata = await load_index_from_redis(request.doc_id)
 
         # 쿼리 엔진 생성 (표 중요도 분석에 최적화)
-        query_engine = index.as_query_engine(
+        query_engine = build_query_engine(
+            index,
             similarity_top_k=request.top_k,
-            response_mode="tree_summarize",  # 계층적 요약으로 표 전체 파악
+            response_mode="auto",  # 컨텍스트 크기에 따라 단일 호출/병렬 map-reduce
+            retrieval_mode=request.retrieval_mode,
+            context_budget=CONTEXT_BUDGETS["table"],
         )
 
         # 표 맥락 포함 쿼리 생성
@@ -114,6 +121,8 @@ async def analyze_table_importance(request: TableImportanceRequest):
                 "analysis_result": str(response),
                 "source_references": references,
                 "confidence_score": compute_confidence_score(source_nodes),
+                "context_packing": get_context_stats(query_engine),
+                "synthesis": get_synthesis_stats(query_engine),
                 "metadata": {
                     "total_nodes_searched": len(source_nodes),
                     "file_name": metadata.get("file_name", "Unknown"),
@@ -148,9 +157,12 @@ async def compare_table_criteria(request: TableComparisonRequest):
         index, metadata = await load_index_from_redis(request.doc_id)
 
         # 쿼리 엔진 생성 (표 비교에 최적화)
-        query_engine = index.as_query_engine(
+        query_engine = build_query_engine(
+            index,
             similarity_top_k=request.top_k,
-            response_mode="compact",  # 비교를 위한 효율적 모드
+            response_mode="auto",  # 컨텍스트 크기에 따라 단일 호출/병렬 map-reduce
+            retrieval_mode=request.retrieval_mode,
+            context_budget=CONTEXT_BUDGETS["table"],
         )
 
         # 표 맥락 포함 쿼리 생성
@@ -212,6 +224,8 @@ async def compare_table_criteria(request: TableComparisonRequest):
                 "comparison_result": str(response),
                 "source_references": references,
                 "confidence_score": compute_confidence_score(source_nodes),
+                "context_packing": get_context_stats(query_engine),
+                "synthesis": get_synthesis_stats(query_engine),
                 "metadata": {
                     "total_nodes_searched": len(source_nodes),
                     "file_name": metadata.get("file_name", "Unknown"),
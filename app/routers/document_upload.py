@@ -51,11 +51,16 @@ async def upload_document(request: DocumentUploadRequest):
             "child_chunk_size": 512,
             "parent_chunk_overlap": 200,
             "child_chunk_overlap": 50
-        }
+        },
+        "index_type": "auto",
+        "summary_tree": false
     }
     ```
 
     chunk_config는 선택 사항이며, 지정하지 않으면 위 기본값이 사용됩니다.
+    index_type이 auto이면 Child 노드 수가 ANN_NODE_THRESHOLD를 넘을 때
+    FAISS ANN 인덱스(HNSW/IVF)를 생성하고, 그 이하이면 flat(전수 비교)을 사용합니다.
+    summary_tree가 true이면 개요 질문용 요약 트리를 함께 생성합니다 (업로드 시간 증가).
     """
     # 청크 설정 추출
     chunk_config = request.chunk_config
@@ -69,6 +74,8 @@ async def upload_document(request: DocumentUploadRequest):
         child_chunk_size=chunk_config.child_chunk_size,
         parent_chunk_overlap=chunk_config.parent_chunk_overlap,
         child_chunk_overlap=chunk_config.child_chunk_overlap,
+        index_type=request.index_type,
+        summary_tree=request.summary_tree,
     )
 
     if not result.success:
@@ -2,9 +2,11 @@
 LCEL (LangChain Expression Language) Examples Router
 
 이 모듈은 LangChain의 선언적 문법(LCEL)과 FastAPI의 비동기 처리를 학습하기 위한 예제들을 제공합니다.
+
+각 엔드포인트의 체인은 ChainRegistry에 팩토리로 등록되어 최초 1회만 생성되고 이후 요청에서 재사용됩니다.
+(앱 시작 시 app.router lifespan에서 prewarm)
 """
 
-import asyncio
 from datetime import datetime
 
 from fastapi import APIRouter, HTTPException
@@ -23,10 +25,31 @@ from langchain_core.runnables import (
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
 
+from app.utils.chain_batch import stream_chain_batch
+from app.utils.chain_registry import ChainRegistry
+from app.utils.extraction_packing import packed_output_model, stream_packed_extraction
+from app.utils.intent_router import IntentRouter, get_intent_router_stats
+from app.utils.llm_cache import llm_cache_policy
+from app.utils.llm_governor import (
+    get_governed_async_http_client,
+    get_governed_http_client,
+)
+from app.utils.llm_resilience import SDK_MAX_RETRIES, retry_with_backoff
+from app.utils.structured_stream import stream_structured_output
+
 router = APIRouter(prefix="/lcel", tags=["LCEL Examples"])
 
-# OpenAI 모델 초기화
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
+# OpenAI 모델 초기화 (호출은 LLMGovernor를 거치고 재시도/헤지 요청은 transport에서 처리)
+llm = ChatOpenAI(
+    model="gpt-4o-mini",
+    temperature=0.7,
+    max_retries=SDK_MAX_RETRIES,
+    http_client=get_governed_http_client(),
+    http_async_client=get_governed_async_http_client(),
+)
+
+# 엔드포인트별 체인 캐시 (요청마다 프롬프트/파서/파이프라인을 다시 만들지 않음)
+chains = ChainRegistry()
 
 
 # ============================================================================
@@ -66,6 +89,14 @@ class ParallelRequest(BaseModel):
 # ============================================================================
 
 
+@chains.register("basic")
+def _basic_chain():
+    prompt = ChatPromptTemplate.from_template(
+        "You are a helpful assistant. Answer the following question: {query}"
+    )
+    return prompt | llm | StrOutputParser()
+
+
 @router.post("/basic-chain")
 async def basic_chain(request: SimpleQuery):
     """
@@ -76,11 +107,8 @@ async def basic_chain(request: SimpleQuery):
     - LLM: 언어 모델 실행
     - Parser: 응답을 문자열로 파싱
     """
-    # LCEL 체인 정의
-    prompt = ChatPromptTemplate.from_template(
-        "You are a helpful assistant. Answer the following question: {query}"
-    )
-    chain = prompt | llm | StrOutputParser()
+    # LCEL 체인 (레지스트리에서 재사용)
+    chain = chains.get("basic")
 
     # 비동기 실행
     start_time = datetime.now()
@@ -99,6 +127,12 @@ async def basic_chain(request: SimpleQuery):
 # ============================================================================
 
 
+@chains.register("streaming")
+def _streaming_chain():
+    prompt = ChatPromptTemplate.from_template("Answer this question in detail: {query}")
+    return prompt | llm | StrOutputParser()
+
+
 @router.post("/streaming-chain")
 async def streaming_chain(request: SimpleQuery):
     """
@@ -106,8 +140,7 @@ async def streaming_chain(request: SimpleQuery):
 
     실시간으로 토큰을 생성하며 클라이언트에 전송
     """
-    prompt = ChatPromptTemplate.from_template("Answer this question in detail: {query}")
-    chain = prompt | llm | StrOutputParser()
+    chain = chains.get("streaming")
 
     async def generate():
         async for chunk in chain.astream({"query": request.query}):
@@ -121,19 +154,14 @@ async def streaming_chain(request: SimpleQuery):
 # ============================================================================
 
 
-@router.post("/passthrough-chain")
-async def passthrough_chain(request: SimpleQuery):
-    """
-    RunnablePassthrough 예제
-
-    입력 데이터를 다음 단계로 그대로 전달하거나 일부만 수정
-    """
+@chains.register("passthrough")
+def _passthrough_chain():
     prompt = ChatPromptTemplate.from_template(
         "Original query: {original}\nProcessed query: {processed}"
     )
 
     # RunnablePassthrough를 사용하여 원본 유지하면서 처리된 버전도 추가
-    chain = (
+    return (
         {
             "original": RunnablePassthrough(),
             "processed": RunnableLambda(lambda x: x.upper()),
@@ -143,6 +171,16 @@ async def passthrough_chain(request: SimpleQuery):
         | StrOutputParser()
     )
 
+
+@router.post("/passthrough-chain")
+async def passthrough_chain(request: SimpleQuery):
+    """
+    RunnablePassthrough 예제
+
+    입력 데이터를 다음 단계로 그대로 전달하거나 일부만 수정
+    """
+    chain = chains.get("passthrough")
+
     result = await chain.ainvoke(request.query)
 
     return {
@@ -156,6 +194,22 @@ async def passthrough_chain(request: SimpleQuery):
 # ============================================================================
 
 
+@chains.register("multi_step_points")
+def _multi_step_points_chain():
+    points_prompt = ChatPromptTemplate.from_template(
+        "List {num_points} key points about {topic}. Return as JSON array with 'points' key."
+    )
+    return points_prompt | llm | JsonOutputParser()
+
+
+@chains.register("multi_step_explain")
+def _multi_step_explain_chain():
+    explain_prompt = ChatPromptTemplate.from_template(
+        "Explain this point in 2-3 sentences: {point}"
+    )
+    return explain_prompt | llm | StrOutputParser()
+
+
 @router.post("/multi-step-chain")
 async def multi_step_chain(request: MultiStepRequest):
     """
@@ -165,21 +219,15 @@ async def multi_step_chain(request: MultiStepRequest):
     2단계: 각 포인트를 상세히 설명
     """
     # Step 1: 핵심 포인트 생성
-    points_prompt = ChatPromptTemplate.from_template(
-        "List {num_points} key points about {topic}. Return as JSON array with 'points' key."
-    )
-    points_chain = points_prompt | llm | JsonOutputParser()
+    points_chain = chains.get("multi_step_points")
 
     # Step 2: 각 포인트 설명
     async def explain_points(points_data: dict):
         points = points_data.get("points", [])
         explanations = []
+        explain_chain = chains.get("multi_step_explain")
 
         for point in points:
-            explain_prompt = ChatPromptTemplate.from_template(
-                "Explain this point in 2-3 sentences: {point}"
-            )
-            explain_chain = explain_prompt | llm | StrOutputParser()
             explanation = await explain_chain.ainvoke({"point": point})
             explanations.append({"point": point, "explanation": explanation})
 
@@ -206,13 +254,8 @@ async def multi_step_chain(request: MultiStepRequest):
 # ============================================================================
 
 
-@router.post("/parallel-chain")
-async def parallel_chain(request: ParallelRequest):
-    """
-    RunnableParallel을 사용한 병렬 실행 예제
-
-    여러 작업을 동시에 실행하여 처리 시간 단축
-    """
+@chains.register("parallel")
+def _parallel_chain():
     # 각각 다른 작업을 병렬로 수행
     sentiment_prompt = ChatPromptTemplate.from_template(
         "Analyze the sentiment of this text (positive/negative/neutral): {text}"
@@ -225,7 +268,7 @@ async def parallel_chain(request: ParallelRequest):
     )
 
     # 병렬 체인 구성
-    parallel_chain = RunnableParallel(
+    return RunnableParallel(
         {
             "sentiment": sentiment_prompt | llm | StrOutputParser(),
             "summary": summary_prompt | llm | StrOutputParser(),
@@ -233,6 +276,16 @@ async def parallel_chain(request: ParallelRequest):
         }
     )
 
+
+@router.post("/parallel-chain")
+async def parallel_chain(request: ParallelRequest):
+    """
+    RunnableParallel을 사용한 병렬 실행 예제
+
+    여러 작업을 동시에 실행하여 처리 시간 단축
+    """
+    parallel_chain = chains.get("parallel")
+
     # 비동기 병렬 실행
     start_time = datetime.now()
     results = await parallel_chain.ainvoke({"text": request.text})
@@ -250,47 +303,55 @@ async def parallel_chain(request: ParallelRequest):
 # ============================================================================
 
 
-@router.post("/translation-chain")
-async def translation_chain(request: TranslationRequest):
-    """
-    번역 체인 예제 - 커스텀 로직 포함
+# 전처리: 텍스트 정제
+def _translation_preprocess(data: dict) -> dict:
+    text = data["text"].strip()
+    return {**data, "text": text, "char_count": len(text)}
 
-    RunnableLambda를 사용하여 커스텀 전처리/후처리 추가
-    """
 
-    # 전처리: 텍스트 정제
-    def preprocess(data: dict) -> dict:
-        text = data["text"].strip()
-        return {**data, "text": text, "char_count": len(text)}
+# 후처리: 메타데이터 추가
+def _translation_postprocess(result: str) -> dict:
+    return {
+        "translation": result,
+        "translated_at": datetime.now().isoformat(),
+        "char_count": len(result),
+    }
 
-    # 후처리: 메타데이터 추가
-    def postprocess(result: str) -> dict:
-        return {
-            "translation": result,
-            "translated_at": datetime.now().isoformat(),
-            "char_count": len(result),
-        }
 
+@chains.register("translation")
+def _translation_chain():
     prompt = ChatPromptTemplate.from_template(
         "Translate the following {source_lang} text to {target_lang}:\n\n{text}"
     )
 
     # 전체 체인
-    chain = (
-        RunnableLambda(preprocess)
+    return (
+        RunnableLambda(_translation_preprocess)
         | prompt
         | llm
         | StrOutputParser()
-        | RunnableLambda(postprocess)
+        | RunnableLambda(_translation_postprocess)
     )
 
-    result = await chain.ainvoke(
-        {
-            "text": request.text,
-            "source_lang": request.source_lang,
-            "target_lang": request.target_lang,
-        }
-    )
+
+@router.post("/translation-chain")
+async def translation_chain(request: TranslationRequest):
+    """
+    번역 체인 예제 - 커스텀 로직 포함
+
+    RunnableLambda를 사용하여 커스텀 전처리/후처리 추가
+    같은 원문(정형 문구 등)의 반복 번역은 temperature와 무관하게 LLM 캐시에서 응답합니다.
+    """
+    chain = chains.get("translation")
+
+    with llm_cache_policy("on"):
+        result = await chain.ainvoke(
+            {
+                "text": request.text,
+                "source_lang": request.source_lang,
+                "target_lang": request.target_lang,
+            }
+        )
 
     return {
         "result": result,
@@ -304,34 +365,85 @@ async def translation_chain(request: TranslationRequest):
 # ============================================================================
 
 
+@chains.register("conditional_route_llm")
+def _conditional_route_llm_chain():
+    # 로컬 라우터 확신도가 낮을 때만 사용 (temperature=0이므로 LLM 캐시 대상)
+    prompt = ChatPromptTemplate.from_template(
+        "Does this question need a brief answer or a detailed answer with examples?\n"
+        "Reply with exactly one word: brief or detailed.\n\nQuestion: {query}"
+    )
+    return prompt | llm.bind(temperature=0) | StrOutputParser()
+
+
+async def _route_answer_depth_with_llm(query: str) -> str:
+    return await chains.get("conditional_route_llm").ainvoke({"query": query})
+
+
+# 답변 깊이 라우터: 예시 문장과의 임베딩 유사도로 brief/detailed 결정 (CPU, 수 ms)
+answer_depth_router = IntentRouter(
+    "conditional_chain",
+    {
+        "brief": [
+            "What is the capital of France?",
+            "Who wrote Hamlet?",
+            "Convert 10 km to miles",
+            "Define photosynthesis in one sentence.",
+            "What does HTTP status 404 mean?",
+            "파이썬이 뭐야?",
+            "서울의 시간대는?",
+            "REST가 뭔지 짧게 알려줘",
+        ],
+        "detailed": [
+            "Explain how transformers work, with examples.",
+            "Compare SQL and NoSQL databases in depth, including trade-offs.",
+            "Walk me through designing a rate limiter step by step.",
+            "What are the pros and cons of microservices? Give examples.",
+            "Why does Python have a GIL and how does it affect performance?",
+            "비동기 프로그래밍을 예제와 함께 자세히 설명해줘",
+            "쿠버네티스 배포 전략을 단계별로 설명해줘",
+            "대규모 FastAPI 프로젝트 구조를 이유와 함께 설명해줘",
+        ],
+    },
+    fallback=_route_answer_depth_with_llm,
+    # 로컬 모델을 쓸 수 없으면 기존 길이 기준 (LLM 호출 없음)
+    heuristic=lambda query: "brief" if len(query) < 50 else "detailed",
+)
+
+
+@chains.register("conditional_brief")
+def _conditional_brief_chain():
+    prompt = ChatPromptTemplate.from_template("Give a brief answer to: {query}")
+    return prompt | llm | StrOutputParser()
+
+
+@chains.register("conditional_detailed")
+def _conditional_detailed_chain():
+    prompt = ChatPromptTemplate.from_template(
+        "Provide a detailed answer with examples to: {query}"
+    )
+    return prompt | llm | StrOutputParser()
+
+
 @router.post("/conditional-chain")
 async def conditional_chain(request: SimpleQuery):
     """
     조건부 체인 예제
 
     입력에 따라 다른 체인 실행
+    (분기는 로컬 임베딩 라우터가 결정하고, 확신도가 낮을 때만 LLM으로 분류,
+    로컬 모델을 쓸 수 없으면 질문 길이로 결정)
     """
-
-    # 입력 길이에 따라 다른 프롬프트 사용
-    def choose_prompt(query: str) -> ChatPromptTemplate:
-        if len(query) < 50:
-            return ChatPromptTemplate.from_template("Give a brief answer to: {query}")
-        else:
-            return ChatPromptTemplate.from_template(
-                "Provide a detailed answer with examples to: {query}"
-            )
-
-    # 조건부 실행
-    prompt = choose_prompt(request.query)
-    chain = prompt | llm | StrOutputParser()
+    routing = await answer_depth_router.aroute(request.query)
+    chain = chains.get(f"conditional_{routing['label']}")
 
     result = await chain.ainvoke({"query": request.query})
 
     return {
         "result": result,
         "query_length": len(request.query),
-        "prompt_type": "brief" if len(request.query) < 50 else "detailed",
-        "explanation": "Different prompts based on query length",
+        "prompt_type": routing["label"],
+        "routing": routing,
+        "explanation": "Different prompts based on the routed answer depth",
     }
 
 
@@ -340,36 +452,52 @@ async def conditional_chain(request: SimpleQuery):
 # ============================================================================
 
 
-class BatchRequest(BaseModel):
+class BatchOptions(BaseModel):
+    """배치 실행 옵션 (미지정 시 CHAIN_BATCH_* 환경 변수 기본값)"""
+
+    max_concurrency: int | None = Field(
+        default=None, ge=1, le=64, description="동시 LLM 호출 수 상한"
+    )
+    timeout_s: float | None = Field(
+        default=None, gt=0, le=600, description="항목별 시도 1회 타임아웃 (초)"
+    )
+    max_retries: int | None = Field(
+        default=None, ge=0, le=5, description="항목별 재시도 횟수"
+    )
+
+
+class BatchRequest(BatchOptions):
     queries: list[str]
 
 
+@chains.register("batch")
+def _batch_chain():
+    prompt = ChatPromptTemplate.from_template("Answer briefly: {query}")
+    return prompt | llm | StrOutputParser()
+
+
 @router.post("/batch-chain")
 async def batch_chain(request: BatchRequest):
     """
-    배치 처리 예제
+    배치 처리 예제 (NDJSON 스트리밍)
 
-    여러 입력을 한 번에 처리 (비동기 병렬)
+    여러 입력을 동시 실행 수를 제한하여 병렬 처리하고, 완료되는 순서대로 한 줄씩 반환
+    - 각 줄: {"index", "input": {"query"}, "result" 또는 "error", "attempts", "execution_time_ms"}
+    - 마지막 줄: {"done": true, "succeeded", "failed", "failed_indices", "time_to_first_result_ms", ...}
     """
-    prompt = ChatPromptTemplate.from_template("Answer briefly: {query}")
-    chain = prompt | llm | StrOutputParser()
-
-    start_time = datetime.now()
-
-    # abatch를 사용한 병렬 배치 처리
+    chain = chains.get("batch")
     inputs = [{"query": q} for q in request.queries]
-    results = await chain.abatch(inputs)
 
-    end_time = datetime.now()
-
-    return {
-        "results": [
-            {"query": q, "answer": r} for q, r in zip(request.queries, results, strict=True)
-        ],
-        "total_queries": len(request.queries),
-        "execution_time_ms": (end_time - start_time).total_seconds() * 1000,
-        "explanation": "All queries processed in parallel using abatch()",
-    }
+    return StreamingResponse(
+        stream_chain_batch(
+            chain,
+            inputs,
+            max_concurrency=request.max_concurrency,
+            timeout=request.timeout_s,
+            max_retries=request.max_retries,
+        ),
+        media_type="application/x-ndjson",
+    )
 
 
 # ============================================================================
@@ -377,42 +505,41 @@ async def batch_chain(request: BatchRequest):
 # ============================================================================
 
 
+@chains.register("retry")
+def _retry_chain():
+    prompt = ChatPromptTemplate.from_template("Answer this question: {query}")
+    return prompt | llm | StrOutputParser()
+
+
 @router.post("/retry-chain")
 async def retry_chain(request: SimpleQuery):
     """
     재시도 로직이 있는 체인
 
-    실패 시 자동으로 재시도
+    실패 시 지수 백오프 + jitter로 재시도하며, X-Request-Timeout 헤더로 받은 데드라인을 넘기지 않습니다.
+    (HTTP 수준 재시도와 p95 기반 헤지 요청은 transport에서 별도로 처리)
     """
-    prompt = ChatPromptTemplate.from_template("Answer this question: {query}")
-    chain = prompt | llm | StrOutputParser()
-
-    max_retries = 3
-    attempt = 0
-    last_error = None
-
-    while attempt < max_retries:
-        try:
-            start_time = datetime.now()
-            result = await chain.ainvoke({"query": request.query})
-            end_time = datetime.now()
-
-            return {
-                "result": result,
-                "attempts": attempt + 1,
-                "execution_time_ms": (end_time - start_time).total_seconds() * 1000,
-                "explanation": "Successfully completed with retry logic",
-            }
-        except Exception as e:
-            last_error = str(e)
-            attempt += 1
-            if attempt < max_retries:
-                await asyncio.sleep(1)  # 재시도 전 대기
+    chain = chains.get("retry")
 
-    raise HTTPException(
-        status_code=500,
-        detail=f"Failed after {max_retries} attempts. Last error: {last_error}",
-    )
+    max_retries = 2
+    start_time = datetime.now()
+    try:
+        result, attempts = await retry_with_backoff(
+            lambda: chain.ainvoke({"query": request.query}), max_retries=max_retries
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed after {getattr(e, 'attempts', 1)} attempts. Last error: {e}",
+        ) from e
+    end_time = datetime.now()
+
+    return {
+        "result": result,
+        "attempts": attempts,
+        "execution_time_ms": (end_time - start_time).total_seconds() * 1000,
+        "explanation": "Successfully completed with retry logic",
+    }
 
 
 # ============================================================================
@@ -425,6 +552,46 @@ class ComplexRequest(BaseModel):
     format: str = "markdown"  # markdown, json, plain
 
 
+@chains.register("complex_analyze")
+def _complex_analyze_chain():
+    analyze_prompt = ChatPromptTemplate.from_template(
+        "Analyze this topic and suggest 3 subtopics: {topic}"
+    )
+    return analyze_prompt | llm | StrOutputParser()
+
+
+@chains.register("complex_content")
+def _complex_content_chain():
+    content_prompt = ChatPromptTemplate.from_template(
+        "Based on this analysis:\n{analysis}\n\nWrite detailed content about: {topic}"
+    )
+    return content_prompt | llm | StrOutputParser()
+
+
+@chains.register("complex_format_json")
+def _complex_format_json_chain():
+    format_prompt = ChatPromptTemplate.from_template(
+        "Convert this content to JSON format:\n{content}"
+    )
+    return format_prompt | llm | StrOutputParser()
+
+
+@chains.register("complex_format_markdown")
+def _complex_format_markdown_chain():
+    format_prompt = ChatPromptTemplate.from_template(
+        "Format this content as markdown:\n{content}"
+    )
+    return format_prompt | llm | StrOutputParser()
+
+
+@chains.register("complex_validate")
+def _complex_validate_chain():
+    validate_prompt = ChatPromptTemplate.from_template(
+        "Rate the quality of this content (1-10) and provide brief feedback:\n{content}"
+    )
+    return validate_prompt | llm | StrOutputParser()
+
+
 @router.post("/complex-chain")
 async def complex_chain(request: ComplexRequest):
     """
@@ -436,41 +603,24 @@ async def complex_chain(request: ComplexRequest):
     4. 품질 검증
     """
     # Step 1: 주제 분석
-    analyze_prompt = ChatPromptTemplate.from_template(
-        "Analyze this topic and suggest 3 subtopics: {topic}"
-    )
-    analyze_chain = analyze_prompt | llm | StrOutputParser()
+    analyze_chain = chains.get("complex_analyze")
 
     # Step 2: 콘텐츠 생성
     async def generate_content(analysis: str, topic: str) -> str:
-        content_prompt = ChatPromptTemplate.from_template(
-            "Based on this analysis:\n{analysis}\n\nWrite detailed content about: {topic}"
-        )
-        content_chain = content_prompt | llm | StrOutputParser()
+        content_chain = chains.get("complex_content")
         return await content_chain.ainvoke({"analysis": analysis, "topic": topic})
 
     # Step 3: 포맷 변환
     async def format_content(content: str, format_type: str) -> str:
-        if format_type == "json":
-            format_prompt = ChatPromptTemplate.from_template(
-                "Convert this content to JSON format:\n{content}"
-            )
-        elif format_type == "markdown":
-            format_prompt = ChatPromptTemplate.from_template(
-                "Format this content as markdown:\n{content}"
-            )
-        else:
+        if format_type not in ("json", "markdown"):
             return content
 
-        format_chain = format_prompt | llm | StrOutputParser()
+        format_chain = chains.get(f"complex_format_{format_type}")
         return await format_chain.ainvoke({"content": content})
 
     # Step 4: 품질 검증
     async def validate_quality(content: str) -> dict:
-        validate_prompt = ChatPromptTemplate.from_template(
-            "Rate the quality of this content (1-10) and provide brief feedback:\n{content}"
-        )
-        validate_chain = validate_prompt | llm | StrOutputParser()
+        validate_chain = chains.get("complex_validate")
         feedback = await validate_chain.ainvoke({"content": content})
         return {"content": content, "quality_feedback": feedback}
 
@@ -567,35 +717,63 @@ class CodeAnalysisRequest(BaseModel):
 # ============================================================================
 
 
-@router.post("/pydantic-person", response_model=Person)
-async def extract_person_info(request: PersonExtractionRequest):
-    """
-    Pydantic 모델을 사용한 구조화된 데이터 추출 (기본 예제)
+def _json_stream_tail():
+    """부분 스트리밍용 체인 끝부분 (JSON 모드 LLM → 문자열 토큰)"""
+    return llm.bind(response_format={"type": "json_object"}) | StrOutputParser()
 
-    텍스트에서 사람 정보를 추출하여 Pydantic 모델로 반환
-    """
-    # Pydantic 파서 생성
-    parser = PydanticOutputParser(pydantic_object=Person)
 
-    # 포맷 지시사항을 포함한 프롬프트
-    prompt = ChatPromptTemplate.from_template(
+def _structured_stream_response(
+    chain_name: str, inputs, model: type[BaseModel], finalize=None
+) -> StreamingResponse:
+    """JSON 토큰 스트림을 필드 단위 SSE(partial → result)로 반환"""
+    return StreamingResponse(
+        stream_structured_output(
+            chains.get(chain_name).astream(inputs), model, finalize=finalize
+        ),
+        media_type="text/event-stream",
+    )
+
+
+def _person_prompt():
+    # 포맷 지시사항을 포함한 프롬프트 (스키마 기반 지시사항은 생성 시 1회만 계산)
+    parser = PydanticOutputParser(pydantic_object=Person)
+    return ChatPromptTemplate.from_template(
         "Extract person information from the following text.\n"
         "If any information is not available, use null for that field.\n"
         "Make reasonable inferences when possible (e.g., estimate age from context).\n"
         "{format_instructions}\n"
         "Text: {text}\n"
-    )
+    ).partial(format_instructions=parser.get_format_instructions())
+
+
+@chains.register("pydantic_person")
+def _pydantic_person_chain():
+    # Pydantic 파서 생성
+    parser = PydanticOutputParser(pydantic_object=Person)
 
     # 체인 구성
-    chain = (
-        {
-            "text": RunnablePassthrough(),
-            "format_instructions": lambda _: parser.get_format_instructions(),
-        }
-        | prompt
-        | llm
-        | parser
-    )
+    return {"text": RunnablePassthrough()} | _person_prompt() | llm | parser
+
+
+@chains.register("pydantic_person_stream")
+def _pydantic_person_stream_chain():
+    return {"text": RunnablePassthrough()} | _person_prompt() | _json_stream_tail()
+
+
+@router.post("/pydantic-person", response_model=Person)
+async def extract_person_info(request: PersonExtractionRequest, stream: bool = False):
+    """
+    Pydantic 모델을 사용한 구조화된 데이터 추출 (기본 예제)
+
+    텍스트에서 사람 정보를 추출하여 Pydantic 모델로 반환
+    (?stream=true: 필드가 완성될 때마다 SSE partial 이벤트, 마지막에 전체 검증 결과)
+    """
+    if stream:
+        return _structured_stream_response(
+            "pydantic_person_stream", request.text, Person
+        )
+
+    chain = chains.get("pydantic_person")
 
     # 실행
     datetime.now()
@@ -611,32 +789,51 @@ async def extract_person_info(request: PersonExtractionRequest):
 # ============================================================================
 
 
-@router.post("/pydantic-movie-review", response_model=MovieReview)
-async def generate_movie_review(request: MovieReviewRequest):
-    """
-    Pydantic 모델을 사용한 복잡한 구조화된 데이터 생성
-
-    영화 설명을 바탕으로 구조화된 리뷰 생성
-    """
+def _movie_review_prompt():
     parser = PydanticOutputParser(pydantic_object=MovieReview)
-
-    prompt = ChatPromptTemplate.from_template(
+    return ChatPromptTemplate.from_template(
         "Generate a movie review based on the following description.\n"
         "Provide realistic ratings, pros, cons, and a recommendation.\n"
         "{format_instructions}\n"
         "Movie: {movie_description}\n"
-    )
+    ).partial(format_instructions=parser.get_format_instructions())
 
-    chain = (
-        {
-            "movie_description": RunnablePassthrough(),
-            "format_instructions": lambda _: parser.get_format_instructions(),
-        }
-        | prompt
+
+@chains.register("pydantic_movie_review")
+def _pydantic_movie_review_chain():
+    parser = PydanticOutputParser(pydantic_object=MovieReview)
+    return (
+        {"movie_description": RunnablePassthrough()}
+        | _movie_review_prompt()
         | llm
         | parser
     )
 
+
+@chains.register("pydantic_movie_review_stream")
+def _pydantic_movie_review_stream_chain():
+    return (
+        {"movie_description": RunnablePassthrough()}
+        | _movie_review_prompt()
+        | _json_stream_tail()
+    )
+
+
+@router.post("/pydantic-movie-review", response_model=MovieReview)
+async def generate_movie_review(request: MovieReviewRequest, stream: bool = False):
+    """
+    Pydantic 모델을 사용한 복잡한 구조화된 데이터 생성
+
+    영화 설명을 바탕으로 구조화된 리뷰 생성
+    (?stream=true: 필드가 완성될 때마다 SSE partial 이벤트, 마지막에 전체 검증 결과)
+    """
+    if stream:
+        return _structured_stream_response(
+            "pydantic_movie_review_stream", request.movie_description, MovieReview
+        )
+
+    chain = chains.get("pydantic_movie_review")
+
     result = await chain.ainvoke(request.movie_description)
     return result
 
@@ -646,13 +843,8 @@ async def generate_movie_review(request: MovieReviewRequest):
 # ============================================================================
 
 
-@router.post("/pydantic-structured-product")
-async def analyze_product_structured(request: ProductAnalysisRequest):
-    """
-    OpenAI의 structured output 기능을 사용한 Pydantic 모델 생성
-
-    with_structured_output()을 사용하여 더 안정적인 구조화 출력
-    """
+@chains.register("pydantic_structured_product")
+def _pydantic_structured_product_chain():
     # structured output을 사용하는 LLM
     structured_llm = llm.with_structured_output(ProductAnalysis)
 
@@ -661,7 +853,39 @@ async def analyze_product_structured(request: ProductAnalysisRequest):
         "{product_description}"
     )
 
-    chain = prompt | structured_llm
+    return prompt | structured_llm
+
+
+@chains.register("pydantic_structured_product_stream")
+def _pydantic_structured_product_stream_chain():
+    # 함수 호출 대신 JSON 모드 + 포맷 지시사항 (토큰 단위로 필드를 읽기 위해)
+    parser = PydanticOutputParser(pydantic_object=ProductAnalysis)
+    prompt = ChatPromptTemplate.from_template(
+        "Analyze the following product and provide detailed information:\n"
+        "{product_description}\n"
+        "{format_instructions}"
+    ).partial(format_instructions=parser.get_format_instructions())
+    return prompt | _json_stream_tail()
+
+
+@router.post("/pydantic-structured-product")
+async def analyze_product_structured(
+    request: ProductAnalysisRequest, stream: bool = False
+):
+    """
+    OpenAI의 structured output 기능을 사용한 Pydantic 모델 생성
+
+    with_structured_output()을 사용하여 더 안정적인 구조화 출력
+    (?stream=true: JSON 모드로 생성하며 필드가 완성될 때마다 SSE partial 이벤트)
+    """
+    if stream:
+        return _structured_stream_response(
+            "pydantic_structured_product_stream",
+            {"product_description": request.product_description},
+            ProductAnalysis,
+        )
+
+    chain = chains.get("pydantic_structured_product")
 
     start_time = datetime.now()
     result = await chain.ainvoke({"product_description": request.product_description})
@@ -680,13 +904,8 @@ async def analyze_product_structured(request: ProductAnalysisRequest):
 # ============================================================================
 
 
-@router.post("/pydantic-parallel")
-async def parallel_structured_analysis(request: ProductAnalysisRequest):
-    """
-    여러 Pydantic 모델을 병렬로 생성
-
-    동일한 입력에 대해 다른 구조의 분석을 동시에 수행
-    """
+@chains.register("pydantic_parallel")
+def _pydantic_parallel_chain():
     # 제품 분석
     product_llm = llm.with_structured_output(ProductAnalysis)
     product_prompt = ChatPromptTemplate.from_template("Analyze this product: {text}")
@@ -699,22 +918,24 @@ async def parallel_structured_analysis(request: ProductAnalysisRequest):
         "If no person is mentioned, make up a fictional product manager.\n"
         "{format_instructions}\n"
         "Text: {text}\n"
-    )
-    person_chain = (
-        {
-            "text": RunnablePassthrough(),
-            "format_instructions": lambda _: person_parser.get_format_instructions(),
-        }
-        | person_prompt
-        | llm
-        | person_parser
-    )
+    ).partial(format_instructions=person_parser.get_format_instructions())
+    person_chain = person_prompt | llm | person_parser
 
     # 병렬 실행
-    parallel_chain = RunnableParallel(
+    return RunnableParallel(
         {"product_analysis": product_chain, "person_info": person_chain}
     )
 
+
+@router.post("/pydantic-parallel")
+async def parallel_structured_analysis(request: ProductAnalysisRequest):
+    """
+    여러 Pydantic 모델을 병렬로 생성
+
+    동일한 입력에 대해 다른 구조의 분석을 동시에 수행
+    """
+    parallel_chain = chains.get("pydantic_parallel")
+
     start_time = datetime.now()
     result = await parallel_chain.ainvoke({"text": request.product_description})
     end_time = datetime.now()
@@ -743,13 +964,8 @@ class TeamAnalysisRequest(BaseModel):
     team_description: str = Field(description="팀 설명")
 
 
-@router.post("/pydantic-list")
-async def extract_team_members(request: TeamAnalysisRequest):
-    """
-    Pydantic 모델 리스트 생성
-
-    텍스트에서 여러 사람의 정보를 추출하여 리스트로 반환
-    """
+@chains.register("pydantic_list")
+def _pydantic_list_chain():
     structured_llm = llm.with_structured_output(PersonList)
 
     prompt = ChatPromptTemplate.from_template(
@@ -757,7 +973,17 @@ async def extract_team_members(request: TeamAnalysisRequest):
         "Team: {team_description}"
     )
 
-    chain = prompt | structured_llm
+    return prompt | structured_llm
+
+
+@router.post("/pydantic-list")
+async def extract_team_members(request: TeamAnalysisRequest):
+    """
+    Pydantic 모델 리스트 생성
+
+    텍스트에서 여러 사람의 정보를 추출하여 리스트로 반환
+    """
+    chain = chains.get("pydantic_list")
 
     start_time = datetime.now()
     result = await chain.ainvoke({"team_description": request.team_description})
@@ -775,13 +1001,21 @@ async def extract_team_members(request: TeamAnalysisRequest):
 # ============================================================================
 
 
-@router.post("/pydantic-with-postprocessing")
-async def code_analysis_with_postprocessing(request: CodeAnalysisRequest):
-    """
-    Pydantic 구조화 출력 + 후처리
+# 후처리 함수
+def _enrich_code_analysis(analysis: CodeAnalysis) -> dict:
+    """분석 결과에 추가 정보 부여"""
+    return {
+        "analysis": analysis.dict(),
+        "risk_level": "high" if len(analysis.security_issues) > 2 else "low",
+        "development_time_estimate": f"{analysis.estimated_lines // 10} hours",
+        "requires_review": analysis.complexity == "high"
+        or len(analysis.security_issues) > 0,
+        "timestamp": datetime.now().isoformat(),
+    }
 
-    구조화된 출력을 생성한 후 추가 처리 수행
-    """
+
+@chains.register("pydantic_with_postprocessing")
+def _pydantic_with_postprocessing_chain():
     structured_llm = llm.with_structured_output(CodeAnalysis)
 
     prompt = ChatPromptTemplate.from_template(
@@ -789,20 +1023,40 @@ async def code_analysis_with_postprocessing(request: CodeAnalysisRequest):
         "{code_description}"
     )
 
-    # 후처리 함수
-    def enrich_analysis(analysis: CodeAnalysis) -> dict:
-        """분석 결과에 추가 정보 부여"""
-        return {
-            "analysis": analysis.dict(),
-            "risk_level": "high" if len(analysis.security_issues) > 2 else "low",
-            "development_time_estimate": f"{analysis.estimated_lines // 10} hours",
-            "requires_review": analysis.complexity == "high"
-            or len(analysis.security_issues) > 0,
-            "timestamp": datetime.now().isoformat(),
-        }
-
     # 체인 구성
-    chain = prompt | structured_llm | RunnableLambda(enrich_analysis)
+    return prompt | structured_llm | RunnableLambda(_enrich_code_analysis)
+
+
+@chains.register("pydantic_with_postprocessing_stream")
+def _pydantic_with_postprocessing_stream_chain():
+    parser = PydanticOutputParser(pydantic_object=CodeAnalysis)
+    prompt = ChatPromptTemplate.from_template(
+        "Analyze the following code requirements and provide detailed analysis:\n"
+        "{code_description}\n"
+        "{format_instructions}"
+    ).partial(format_instructions=parser.get_format_instructions())
+    return prompt | _json_stream_tail()
+
+
+@router.post("/pydantic-with-postprocessing")
+async def code_analysis_with_postprocessing(
+    request: CodeAnalysisRequest, stream: bool = False
+):
+    """
+    Pydantic 구조화 출력 + 후처리
+
+    구조화된 출력을 생성한 후 추가 처리 수행
+    (?stream=true: 필드별 SSE partial 이벤트 후, 최종 검증 결과에 후처리를 적용한 result 이벤트)
+    """
+    if stream:
+        return _structured_stream_response(
+            "pydantic_with_postprocessing_stream",
+            {"code_description": request.code_description},
+            CodeAnalysis,
+            finalize=_enrich_code_analysis,
+        )
+
+    chain = chains.get("pydantic_with_postprocessing")
 
     start_time = datetime.now()
     result = await chain.ainvoke({"code_description": request.code_description})
@@ -819,37 +1073,82 @@ async def code_analysis_with_postprocessing(request: CodeAnalysisRequest):
 # ============================================================================
 
 
-class BatchPersonExtractionRequest(BaseModel):
+class BatchPersonExtractionRequest(BatchOptions):
     texts: list[str] = Field(description="사람 정보가 포함된 텍스트 목록")
+    packing: bool = Field(
+        default=False, description="짧은 텍스트 여러 개를 한 번의 LLM 호출로 묶어 추출"
+    )
+    pack_token_budget: int | None = Field(
+        default=None, ge=100, le=32000, description="패킹 그룹당 입력 토큰 예산"
+    )
+    pack_max_items: int | None = Field(
+        default=None, ge=2, le=100, description="패킹 그룹당 최대 텍스트 수"
+    )
 
 
-@router.post("/pydantic-batch")
-async def batch_person_extraction(request: BatchPersonExtractionRequest):
-    """
-    Pydantic 구조화 출력 배치 처리
-
-    여러 텍스트에서 동시에 사람 정보를 구조화하여 추출
-    """
+@chains.register("pydantic_batch")
+def _pydantic_batch_chain():
     structured_llm = llm.with_structured_output(Person)
 
     prompt = ChatPromptTemplate.from_template("Extract person information from: {text}")
 
-    chain = prompt | structured_llm
+    return prompt | structured_llm
 
-    start_time = datetime.now()
 
-    # 배치 처리
-    inputs = [{"text": text} for text in request.texts]
-    results = await chain.abatch(inputs)
+@chains.register("pydantic_batch_packed")
+def _pydantic_batch_packed_chain():
+    structured_llm = llm.with_structured_output(packed_output_model(Person))
 
-    end_time = datetime.now()
+    prompt = ChatPromptTemplate.from_template(
+        "Extract person information from each of the {count} numbered texts below.\n"
+        "Return exactly one item per text and set item_number to the text's number.\n"
+        "If any information is not available, use null for that field.\n\n"
+        "{texts}"
+    )
 
-    return {
-        "results": [person.dict() for person in results],
-        "total_processed": len(results),
-        "execution_time_ms": (end_time - start_time).total_seconds() * 1000,
-        "explanation": "Batch processing with Pydantic structured output",
-    }
+    return prompt | structured_llm
+
+
+@router.post("/pydantic-batch")
+async def batch_person_extraction(request: BatchPersonExtractionRequest):
+    """
+    Pydantic 구조화 출력 배치 처리 (NDJSON 스트리밍)
+
+    여러 텍스트에서 사람 정보를 구조화하여 추출하고, 완료되는 순서대로 한 줄씩 반환
+    (result는 Person 필드, 실패한 항목은 error로 보고하고 나머지는 계속 처리)
+
+    packing=true이면 짧은 텍스트 여러 개를 토큰 예산 단위로 묶어 한 번의 호출로 추출하고,
+    누락/검증 실패 항목만 텍스트별 호출로 대체합니다 (마지막 줄에 llm_calls, calls_saved).
+    """
+    chain = chains.get("pydantic_batch")
+    if request.packing:
+        return StreamingResponse(
+            stream_packed_extraction(
+                chains.get("pydantic_batch_packed"),
+                chain,
+                request.texts,
+                Person,
+                token_budget=request.pack_token_budget,
+                max_items=request.pack_max_items,
+                max_concurrency=request.max_concurrency,
+                timeout=request.timeout_s,
+                max_retries=request.max_retries,
+            ),
+            media_type="application/x-ndjson",
+        )
+
+    inputs = [{"text": text} for text in request.texts]
+
+    return StreamingResponse(
+        stream_chain_batch(
+            chain,
+            inputs,
+            max_concurrency=request.max_concurrency,
+            timeout=request.timeout_s,
+            max_retries=request.max_retries,
+        ),
+        media_type="application/x-ndjson",
+    )
 
 
 # ============================================================================
@@ -876,7 +1175,68 @@ class DetailedAnalysis(BaseModel):
 
 class ConditionalAnalysisRequest(BaseModel):
     text: str = Field(description="분석할 텍스트")
-    detailed: bool = Field(default=False, description="상세 분석 여부")
+    detailed: bool | None = Field(
+        default=None, description="상세 분석 여부 (미지정 시 텍스트로 자동 결정)"
+    )
+
+
+@chains.register("pydantic_conditional_route_llm")
+def _pydantic_conditional_route_llm_chain():
+    # 로컬 라우터 확신도가 낮을 때만 사용 (temperature=0이므로 LLM 캐시 대상)
+    prompt = ChatPromptTemplate.from_template(
+        "Does this text call for a brief analysis or a detailed analysis "
+        "(subcategories, key points, recommendations)?\n"
+        "Reply with exactly one word: simple or detailed.\n\nText: {text}"
+    )
+    return prompt | llm.bind(temperature=0) | StrOutputParser()
+
+
+async def _route_analysis_depth_with_llm(text: str) -> str:
+    return await chains.get("pydantic_conditional_route_llm").ainvoke({"text": text})
+
+
+# 분석 깊이 라우터: 짧은 공지/단일 사실은 simple, 여러 쟁점이 있는 글은 detailed
+analysis_depth_router = IntentRouter(
+    "pydantic_conditional",
+    {
+        "simple": [
+            "The meeting starts at 3 pm tomorrow.",
+            "The package arrived on time and in good condition.",
+            "Our office will be closed on Monday for the holiday.",
+            "The new version fixes a login bug.",
+            "회의는 내일 오후 3시에 시작합니다.",
+            "배송이 빠르고 포장도 깔끔했어요.",
+            "다음 주 월요일은 휴무입니다.",
+        ],
+        "detailed": [
+            "Quarterly revenue grew 12%, but churn rose in two regions, support costs "
+            "doubled, and the board is weighing a price increase against expansion.",
+            "The proposal migrates the monolith to services, changes the deployment "
+            "pipeline, and requires new on-call rotations and budget approval.",
+            "Customers report slow checkout, duplicate charges, and confusing refund "
+            "rules; the team must prioritise fixes and update the policy.",
+            "신규 정책은 재택근무 기준, 평가 방식, 보안 요건을 함께 바꾸며 "
+            "부서별 예외와 시행 일정에 대한 의견이 엇갈리고 있습니다.",
+            "이번 장애는 캐시 만료, 재시도 폭주, 데이터베이스 연결 고갈이 겹쳐 "
+            "발생했고 재발 방지책과 모니터링 개선이 필요합니다.",
+        ],
+    },
+    fallback=_route_analysis_depth_with_llm,
+    # 로컬 모델을 쓸 수 없으면 기존 기본값 (detailed=False, LLM 호출 없음)
+    heuristic=lambda text: "simple",
+)
+
+
+@chains.register("pydantic_conditional_simple")
+def _pydantic_conditional_simple_chain():
+    prompt = ChatPromptTemplate.from_template("Provide a brief analysis of: {text}")
+    return prompt | llm.with_structured_output(SimpleAnalysis)
+
+
+@chains.register("pydantic_conditional_detailed")
+def _pydantic_conditional_detailed_chain():
+    prompt = ChatPromptTemplate.from_template("Provide a detailed analysis of: {text}")
+    return prompt | llm.with_structured_output(DetailedAnalysis)
 
 
 @router.post("/pydantic-conditional")
@@ -885,27 +1245,51 @@ async def conditional_structured_output(request: ConditionalAnalysisRequest):
     조건에 따라 다른 Pydantic 모델 사용
 
     입력에 따라 간단한 분석 또는 상세 분석 수행
+    (detailed 미지정 시 로컬 임베딩 라우터가 결정하고, 확신도가 낮을 때만 LLM으로 분류,
+    로컬 모델을 쓸 수 없으면 간단한 분석)
     """
-    # 조건에 따라 다른 모델 선택
-    model = DetailedAnalysis if request.detailed else SimpleAnalysis
-    structured_llm = llm.with_structured_output(model)
-
-    prompt_text = (
-        "Provide a detailed analysis of: {text}"
-        if request.detailed
-        else "Provide a brief analysis of: {text}"
-    )
-
-    prompt = ChatPromptTemplate.from_template(prompt_text)
-    chain = prompt | structured_llm
-
     start_time = datetime.now()
+    routing = None
+    if request.detailed is None:
+        routing = await analysis_depth_router.aroute(request.text)
+        detailed = routing["label"] == "detailed"
+    else:
+        detailed = request.detailed
+
+    # 조건에 따라 다른 모델의 체인 선택
+    chain = chains.get(
+        "pydantic_conditional_detailed" if detailed else "pydantic_conditional_simple"
+    )
     result = await chain.ainvoke({"text": request.text})
     end_time = datetime.now()
 
     return {
         "result": result.dict(),
-        "model_used": "DetailedAnalysis" if request.detailed else "SimpleAnalysis",
+        "model_used": "DetailedAnalysis" if detailed else "SimpleAnalysis",
+        "routing": routing,
         "execution_time_ms": (end_time - start_time).total_seconds() * 1000,
         "explanation": "Different Pydantic models based on condition",
     }
+
+
+# ============================================================================
+# Chain Registry 상태
+# ============================================================================
+
+
+@router.get("/chains")
+async def chain_registry_stats():
+    """
+    등록된 LCEL 체인 목록과 생성 여부, 생성 시간(ms), 조회 횟수
+    """
+    return chains.stats
+
+
+@router.get("/routing")
+async def intent_router_stats():
+    """
+    조건부 체인 로컬 의도 라우터 통계
+
+    라우터별 결정 수, LLM 대체 횟수와 비율(fallback_rate), 결정 시간(평균/p95 ms), 레이블별 결정 수
+    """
+    return get_intent_router_stats()
@@ -1,11 +1,27 @@
-from datetime import datetime
+from typing import Annotated
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from fastapi.responses import StreamingResponse
+from langchain_core.callbacks import get_usage_metadata_callback
 from pydantic import BaseModel
 
-from app.main import chain, client, llm
-from app.utils import error_response, success_response
+from app.main import async_client, chain, llm
+from app.utils import (
+    error_response,
+    get_coalescing_stats,
+    get_http_pool_stats,
+    get_llm_cache_stats,
+    get_llm_governor,
+    get_llm_usage_stats,
+    get_resilience_stats,
+    success_response,
+    track_llm_call,
+    usage_from_langchain,
+    usage_from_openai,
+)
+
+# OpenAI SDK 직접 호출 엔드포인트의 모델
+CHAT_MODEL = "gpt-4o-mini"
 
 
 class Query(BaseModel):
@@ -17,18 +33,31 @@ class Query(BaseModel):
 router = APIRouter(prefix="/llm", tags=["llm"])
 
 
+async def _run_chain(endpoint: str, query: str):
+    """LangChain 체인 비동기 실행 + 사용량 기록 (StrOutputParser 이전의 usage를 콜백으로 수집)"""
+    call = track_llm_call(endpoint)
+    try:
+        with get_usage_metadata_callback() as callback:
+            response = await chain.ainvoke({"query": query})
+    except Exception:
+        call.fail()
+        raise
+    model = next(iter(callback.usage_metadata), None)
+    usage = call.finish(model, *usage_from_langchain(callback.usage_metadata))
+    return response, usage
+
+
 @router.get("/sync/chat")
-def sync_chat(query: str):
-    """동기 채팅 (LangChain)"""
+async def sync_chat(query: str):
+    """채팅 (LangChain, 기존 경로 유지 - 이벤트 루프에서 비동기 실행)"""
     try:
-        start_time = datetime.now()
-        response = chain.invoke({"query": query})
-        end_time = datetime.now()
+        response, usage = await _run_chain("chat", query)
 
         return success_response(
             data={"response": response},
             message="채팅 응답이 생성되었습니다.",
-            execution_time_ms=(end_time - start_time).total_seconds() * 1000,
+            execution_time_ms=usage["latency_ms"],
+            metadata={"usage": usage},
         )
     except Exception as e:
         return error_response(
@@ -39,17 +68,16 @@ def sync_chat(query: str):
 
 
 @router.get("/async/chat")
-async def async_chat(query: Query):
+async def async_chat(query: Annotated[Query, Depends()]):
     """비동기 채팅 (LangChain)"""
     try:
-        start_time = datetime.now()
-        response = await chain.ainvoke({"query": query.prompt})
-        end_time = datetime.now()
+        response, usage = await _run_chain("chat", query.prompt)
 
         return success_response(
             data={"response": response},
             message="채팅 응답이 생성되었습니다.",
-            execution_time_ms=(end_time - start_time).total_seconds() * 1000,
+            execution_time_ms=usage["latency_ms"],
+            metadata={"usage": usage},
         )
     except Exception as e:
         return error_response(
@@ -61,48 +89,64 @@ async def async_chat(query: Query):
 
 @router.get("/async/chat-stream")
 async def async_chat_stream(query: str):
-    """스트리밍 채팅 (OpenAI)"""
-
-    def event_generator():
-        with client.chat.completions.stream(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": query}],
-        ) as stream:
-            for event in stream:
-                if event.type == "content.delta":
-                    yield event.delta
-            yield "[END]"
+    """
+    스트리밍 채팅 (AsyncOpenAI)
+
+    토큰이 생성되는 대로 전송하고 "[END]"로 종료합니다.
+    스트림 마지막 청크의 usage(stream_options.include_usage)는 GET /llm/usage 집계에 기록됩니다.
+    """
+
+    async def event_generator():
+        call = track_llm_call("chat-stream")
+        model, usage = CHAT_MODEL, None
+        try:
+            stream = await async_client.chat.completions.create(
+                model=CHAT_MODEL,
+                messages=[{"role": "user", "content": query}],
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            async for chunk in stream:
+                model = chunk.model or model
+                if chunk.usage is not None:
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except BaseException:
+            call.fail(model)
+            raise
+        call.finish(model, *usage_from_openai(usage))
+        yield "[END]"
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
 
 @router.get("/async/generate-text")
 async def async_generate_text(query: str):
-    """텍스트 생성 (OpenAI)"""
+    """텍스트 생성 (AsyncOpenAI)"""
+    call = track_llm_call("generate-text")
     try:
-        start_time = datetime.now()
-
-        response = await client.chat.completions.create(
-            model="gpt-4o-mini",
+        response = await async_client.chat.completions.create(
+            model=CHAT_MODEL,
             messages=[{"role": "user", "content": query}],
         )
-
-        end_time = datetime.now()
+        usage = call.finish(response.model, *usage_from_openai(response.usage))
 
         return success_response(
             data={
                 "text": response.choices[0].message.content,
                 "model": response.model,
                 "usage": {
-                    "prompt_tokens": response.usage.prompt_tokens,
-                    "completion_tokens": response.usage.completion_tokens,
-                    "total_tokens": response.usage.total_tokens,
+                    key: usage[key]
+                    for key in ("prompt_tokens", "completion_tokens", "total_tokens")
                 },
             },
             message="텍스트가 생성되었습니다.",
-            execution_time_ms=(end_time - start_time).total_seconds() * 1000,
+            execution_time_ms=usage["latency_ms"],
+            metadata={"usage": usage},
         )
     except Exception as e:
+        call.fail(CHAT_MODEL)
         return error_response(
             message="텍스트 생성 중 오류가 발생했습니다.",
             error=str(e),
@@ -112,20 +156,93 @@ async def async_generate_text(query: str):
 
 @router.get("/complete")
 async def complete_text(prompt: str):
-    """텍스트 완성 (LangChain LLM)"""
+    """텍스트 완성 (LangChain ChatOpenAI, 비동기)"""
+    call = track_llm_call("complete")
     try:
-        start_time = datetime.now()
-        response = llm(prompt)
-        end_time = datetime.now()
+        message = await llm.ainvoke(prompt)
+        model = message.response_metadata.get("model_name")
+        usage = call.finish(model, *usage_from_langchain(message.usage_metadata))
 
         return success_response(
-            data={"completion": response},
+            data={"completion": message.content},
             message="텍스트 완성이 완료되었습니다.",
-            execution_time_ms=(end_time - start_time).total_seconds() * 1000,
+            execution_time_ms=usage["latency_ms"],
+            metadata={"usage": usage},
         )
     except Exception as e:
+        call.fail()
         return error_response(
             message="텍스트 완성 중 오류가 발생했습니다.",
             error=str(e),
             status_code=500,
         )
+
+
+@router.get("/usage")
+async def usage_stats():
+    """
+    LLM 사용량 집계 (프로세스별)
+
+    /llm 엔드포인트의 누적 호출 수, 실패 수, prompt/completion 토큰 수,
+    평균/최대 지연 시간을 엔드포인트별/모델별로 반환합니다.
+    """
+    return success_response(
+        data=get_llm_usage_stats(),
+        message="LLM 사용량 조회 완료",
+    )
+
+
+@router.get("/governor")
+async def governor_stats():
+    """
+    LLM Governor 상태 (프로세스별)
+
+    동시 호출 수, 슬롯 대기 수, RPM/TPM 버킷 대기 횟수, 우선순위별 대기 시간과
+    동일 요청 병합(coalescing) 횟수를 반환합니다.
+    """
+    return success_response(
+        data={**get_llm_governor().stats, "coalescing": get_coalescing_stats()},
+        message="LLM Governor 상태 조회 완료",
+    )
+
+
+@router.get("/http-pool")
+async def http_pool_stats():
+    """
+    공유 HTTP 연결 풀 상태 (프로세스별)
+
+    OpenAI/LangChain/LlamaIndex 클라이언트가 함께 쓰는 연결 풀의 요청 수, 새 연결/TLS 핸드셰이크 수,
+    연결 재사용률(reuse_ratio)과 HTTP/2 사용 여부를 반환합니다.
+    """
+    return success_response(
+        data=get_http_pool_stats(),
+        message="HTTP 연결 풀 상태 조회 완료",
+    )
+
+
+@router.get("/resilience")
+async def resilience_stats():
+    """
+    LLM 호출 복원력 통계 (프로세스별)
+
+    OpenAI API 경로별 재시도 수, 헤지 요청 수와 헤지 승리율(hedge_win_rate),
+    데드라인 초과 수, 응답 헤더까지의 p50/p95/p99 지연과 현재 헤지 대기 시간을 반환합니다.
+    """
+    return success_response(
+        data=get_resilience_stats(),
+        message="LLM 복원력 통계 조회 완료",
+    )
+
+
+@router.get("/cache")
+async def cache_stats():
+    """
+    LangChain LLM 캐시 통계 (프로세스별)
+
+    캐시 모드, 적중(exact/semantic)/미스/건너뜀 수, 적중률과 라우트별 집계를 반환합니다.
+    기본 정책은 temperature=0 호출만 캐시합니다.
+    """
+    return success_response(
+        data=get_llm_cache_stats(),
+        message="LLM 캐시 통계 조회 완료",
+    )
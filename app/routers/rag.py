@@ -5,7 +5,6 @@ import bs4
 from fastapi import APIRouter
 from langchain_community.document_loaders import WebBaseLoader
 from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
 from langchain_core.documents import Document
 from langchain_text_splitters import (
     HTMLHeaderTextSplitter,
@@ -15,7 +14,12 @@ from pydantic import BaseModel
 from typing_extensions import TypedDict
 
 from app.main import get_vector_store
-from app.utils import error_response, success_response
+from app.utils import (
+    error_response,
+    get_url_store_stats,
+    load_url_store,
+    success_response,
+)
 
 
 class URLInput(BaseModel):
@@ -25,6 +29,7 @@ class URLInput(BaseModel):
 router = APIRouter(prefix="/rag", tags=["rag"])
 
 # Lazy-loaded embeddings model
+EMBEDDING_MODEL_NAME = "jhgan/ko-sroberta-nli"
 _embeddings_model = None
 
 
@@ -33,55 +38,83 @@ def get_embeddings_model():
     global _embeddings_model
     if _embeddings_model is None:
         _embeddings_model = HuggingFaceEmbeddings(
-            model_name="jhgan/ko-sroberta-nli",
+            model_name=EMBEDDING_MODEL_NAME,
             model_kwargs={"device": "cpu"},
             encode_kwargs={"normalize_embeddings": True},
         )
     return _embeddings_model
 
 
-@router.post("/load")
-async def process_url(url_input: URLInput):
-    """URL에서 문서 로드 및 벡터 스토어 생성"""
-    try:
-        start_time = datetime.now()
+# /rag/load 분할/임베딩 설정 (바뀌면 저장된 스토어를 다시 생성)
+LOAD_HEADERS_TO_SPLIT_ON = [
+    ("h1", "Header 1"),
+    ("h2", "Header 2"),
+    ("h3", "Header 3"),
+]
+LOAD_CHUNK_SIZE = 500
+LOAD_CHUNK_OVERLAP = 30
+LOAD_STORE_CONFIG = {
+    "embedding_model": EMBEDDING_MODEL_NAME,
+    "headers": LOAD_HEADERS_TO_SPLIT_ON,
+    "chunk_size": LOAD_CHUNK_SIZE,
+    "chunk_overlap": LOAD_CHUNK_OVERLAP,
+}
 
-        loader = WebBaseLoader(url_input.url)
-        docs = loader.load()
 
-        headers_to_split_on = [
-            ("h1", "Header 1"),
-            ("h2", "Header 2"),
-            ("h3", "Header 3"),
-        ]
-        html_splitter = HTMLHeaderTextSplitter(headers_to_split_on)
-        html_header_splits = html_splitter.split_text_from_url(docs[0])
-        html_splitter.split_text(docs[0])
+def split_html(html: str) -> list[Document]:
+    """HTML 헤더 단위 분할 후 길이 기준 재분할"""
+    html_splitter = HTMLHeaderTextSplitter(LOAD_HEADERS_TO_SPLIT_ON)
+    html_header_splits = html_splitter.split_text(html)
 
-        for element in html_header_splits[:2]:
-            print("html_header_splits ::::::::::::::::::::::::::: ", element)
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=LOAD_CHUNK_SIZE, chunk_overlap=LOAD_CHUNK_OVERLAP
+    )
+    return text_splitter.split_documents(html_header_splits)
 
-        chunk_size = 500
-        chunk_overlap = 30
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size, chunk_overlap=chunk_overlap
+
+@router.post("/load")
+async def process_url(url_input: URLInput, refresh: bool = False):
+    """
+    URL에서 문서 로드 및 벡터 스토어 생성
+
+    생성된 스토어는 URL별로 디스크에 저장되며, 같은 URL을 다시 요청하면 조건부 요청으로
+    변경 여부를 확인해 바뀌지 않았으면 재임베딩 없이 저장된 스토어를 사용합니다.
+
+    Args:
+        url_input: 문서 URL
+        refresh: True이면 변경 여부와 관계없이 다시 생성
+    """
+    try:
+        start_time = datetime.now()
+
+        result = await load_url_store(
+            url_input.url,
+            get_embeddings_model(),
+            split_html,
+            config=LOAD_STORE_CONFIG,
+            refresh=refresh,
         )
-        splits = text_splitter.split_documents(html_header_splits)
 
         end_time = datetime.now()
 
-        if len(splits) > 0:
-            embeddings = get_embeddings_model()
-            vectorstore = FAISS.from_documents(documents=splits, embedding=embeddings)
-
+        if result.vectorstore is not None:
             return success_response(
                 data={
                     "url": url_input.url,
-                    "document_count": len(splits),
-                    "vectorstore_size": vectorstore.index.ntotal,
+                    "document_count": result.document_count,
+                    "vectorstore_size": result.vectorstore.index.ntotal,
+                    "store_status": result.status,
+                    "content_hash": result.manifest["content_hash"],
                 },
-                message="URL이 성공적으로 처리되었습니다.",
+                message="URL이 성공적으로 처리되었습니다."
+                if result.status == "built"
+                else "변경되지 않은 URL - 저장된 벡터 스토어를 사용합니다.",
                 execution_time_ms=(end_time - start_time).total_seconds() * 1000,
+                metadata={
+                    "fetch_ms": round(result.fetch_ms, 2),
+                    "embedding_ms": round(result.embedding_ms, 2),
+                    "fetched_at": result.manifest["fetched_at"],
+                },
             )
         else:
             return error_response(
@@ -100,6 +133,24 @@ async def process_url(url_input: URLInput):
         )
 
 
+@router.get("/stores")
+async def url_store_stats():
+    """/rag/load로 저장된 URL별 벡터 스토어 목록과 재사용 통계"""
+    return success_response(
+        data=get_url_store_stats(),
+        message="URL 벡터 스토어 통계를 조회했습니다.",
+    )
+
+
+@router.get("/vector-store")
+async def vector_store_stats():
+    """/rag/web-retrieve 전역 벡터 스토어 크기, 중복/삭제 수, 검색 지연"""
+    return success_response(
+        data=get_vector_store().stats,
+        message="벡터 스토어 통계를 조회했습니다.",
+    )
+
+
 class State(TypedDict):
     question: str
     context: list[Document]
@@ -127,10 +178,11 @@ async def web_retrieve(url_input: URLInput):
         )
         all_splits = text_splitter.split_documents(docs)
 
+        # 같은 URL을 다시 넣으면 바뀐 청크만 교체 (중복 내용은 임베딩하지 않음)
         vs = get_vector_store()
-        _ = vs.add_documents(documents=all_splits)
+        store_update = await vs.aadd_documents(all_splits, source=url_input.url)
 
-        retrieved_docs = vs.similarity_search("Class")
+        retrieved_docs = await vs.asimilarity_search("Class")
 
         end_time = datetime.now()
 
@@ -152,6 +204,7 @@ async def web_retrieve(url_input: URLInput):
             metadata={
                 "total_splits": len(all_splits),
                 "retrieved_count": len(retrieved_docs),
+                "vector_store": store_update,
             },
         )
 
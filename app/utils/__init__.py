@@ -5,6 +5,7 @@ Utils package
 """
 
 from app.utils.advanced_query import (
+    DECOMPOSE_CONCURRENCY,
     decompose_query_internal,
     extract_json_paths,
     integrate_all_results,
@@ -13,6 +14,18 @@ from app.utils.advanced_query import (
     parse_decomposed_queries,
     search_tables,
     search_text,
+    stream_decompose_and_answer,
+)
+from app.utils.ann_index import ANN_INDEX_TYPES, ANNIndex, resolve_index_type
+from app.utils.batch_query import stream_batch_query
+from app.utils.chain_batch import CHAIN_BATCH_CONCURRENCY, stream_chain_batch
+from app.utils.chain_registry import ChainRegistry, validate_chain
+from app.utils.context_packer import CONTEXT_BUDGETS, ContextPacker
+from app.utils.corpus_index import (
+    get_corpus_stats,
+    rebuild_corpus_index,
+    search_corpus,
+    synthesize_per_document,
 )
 from app.utils.document_analysis import (
     compute_confidence_score,
@@ -21,12 +34,65 @@ from app.utils.document_analysis import (
     load_pdf_from_path,
     stream_response,
 )
+from app.utils.document_summary import (
+    collect_parent_sections,
+    delete_document_summaries,
+    summarize_document,
+)
 from app.utils.document_upload import (
     CHUNK_CONFIGS,
     DocumentUploadResult,
     get_chunk_config,
     upload_and_index_document,
 )
+from app.utils.extraction_packing import (
+    pack_texts,
+    packed_output_model,
+    stream_packed_extraction,
+)
+from app.utils.http_clients import (
+    get_http_pool_stats,
+    get_pooled_async_transport,
+    get_pooled_transport,
+)
+from app.utils.intent_router import (
+    IntentRouter,
+    get_intent_router_stats,
+    prewarm_intent_routers,
+)
+from app.utils.lexical_index import LexicalIndex
+from app.utils.llm_cache import (
+    LLMCacheMiddleware,
+    RedisLLMCache,
+    get_llm_cache_stats,
+    init_llm_cache,
+    llm_cache_policy,
+)
+from app.utils.llm_coalescing import CoalescingAsyncTransport, get_coalescing_stats
+from app.utils.llm_governor import (
+    PRIORITY_CLASSES,
+    LLMGovernor,
+    get_governed_async_http_client,
+    get_governed_http_client,
+    get_llm_governor,
+    llm_priority,
+)
+from app.utils.llm_resilience import (
+    DeadlineExceeded,
+    RequestDeadlineMiddleware,
+    ResilientAsyncTransport,
+    ResilientTransport,
+    get_resilience_stats,
+    request_deadline,
+    retry_with_backoff,
+)
+from app.utils.llm_usage import (
+    get_llm_usage_stats,
+    track_llm_call,
+    usage_from_langchain,
+    usage_from_openai,
+)
+from app.utils.query_router import SEARCH_STRATEGIES, route_search_strategies
 from app.utils.redis_client import (
     close_redis_client,
     get_redis_client,
@@ -39,13 +105,35 @@ from app.utils.redis_index import (
     load_index_from_redis,
     save_index_to_redis,
 )
+from app.utils.reranker import CrossEncoderReranker, select_nodes
 from app.utils.response_wrapper import (
     ResponseData,
     api_response,
     created_response,
     error_response,
+    ndjson_line,
+    sse_event,
     success_response,
 )
+from app.utils.retrieval import (
+    RETRIEVAL_MODES,
+    attach_ann_index,
+    batch_retrieve,
+    build_query_engine,
+    build_retriever,
+    get_context_stats,
+    get_index_type,
+)
+from app.utils.summary_tree import (
+    build_summary_query_engine,
+    build_summary_tree,
+    is_overview_query,
+    route_tree_level,
+)
+from app.utils.synthesis import AdaptiveSynthesizer, get_synthesis_stats
+from app.utils.tokens import count_tokens
+from app.utils.url_store import URLStoreResult, get_url_store_stats, load_url_store
+from app.utils.vector_store import BoundedVectorStore
 
 __all__ = [
     # Document Analysis Utils
@@ -60,6 +148,8 @@ __all__ = [
     "created_response",
     "error_response",
     "ResponseData",
+    "ndjson_line",
+    "sse_event",
     # Redis Client
     "get_redis_client",
     "close_redis_client",
@@ -79,9 +169,106 @@ __all__ = [
     "integrate_all_results",
     "decompose_query_internal",
     "multi_retrieval_internal",
+    "stream_decompose_and_answer",
+    "DECOMPOSE_CONCURRENCY",
+    # LCEL Chain Registry
+    "ChainRegistry",
+    "validate_chain",
+    # LCEL Chain Batch
+    "stream_chain_batch",
+    "CHAIN_BATCH_CONCURRENCY",
+    # Structured Extraction Packing
+    "stream_packed_extraction",
+    "packed_output_model",
+    "pack_texts",
+    # Shared HTTP Pool
+    "get_pooled_transport",
+    "get_pooled_async_transport",
+    "get_http_pool_stats",
+    # LLM Governor
+    "LLMGovernor",
+    "get_llm_governor",
+    "llm_priority",
+    "get_governed_http_client",
+    "get_governed_async_http_client",
+    "PRIORITY_CLASSES",
+    # LLM Request Coalescing
+    "CoalescingAsyncTransport",
+    "get_coalescing_stats",
+    # LLM Response Cache
+    "RedisLLMCache",
+    "init_llm_cache",
+    "llm_cache_policy",
+    "get_llm_cache_stats",
+    "LLMCacheMiddleware",
+    # LLM Resilience
+    "request_deadline",
+    "retry_with_backoff",
+    "get_resilience_stats",
+    "DeadlineExceeded",
+    "RequestDeadlineMiddleware",
+    "ResilientTransport",
+    "ResilientAsyncTransport",
+    # LLM Usage Accounting
+    "track_llm_call",
+    "get_llm_usage_stats",
+    "usage_from_openai",
+    "usage_from_langchain",
+    # Intent Router
+    "IntentRouter",
+    "get_intent_router_stats",
+    "prewarm_intent_routers",
+    # Query Strategy Router
+    "route_search_strategies",
+    "SEARCH_STRATEGIES",
     # Document Upload
     "upload_and_index_document",
     "get_chunk_config",
     "DocumentUploadResult",
     "CHUNK_CONFIGS",
+    # Retrieval
+    "build_retriever",
+    "build_query_engine",
+    "batch_retrieve",
+    "RETRIEVAL_MODES",
+    "LexicalIndex",
+    # ANN Index
+    "ANNIndex",
+    "ANN_INDEX_TYPES",
+    "resolve_index_type",
+    "attach_ann_index",
+    "get_index_type",
+    # Corpus Index
+    "search_corpus",
+    "synthesize_per_document",
+    "rebuild_corpus_index",
+    "get_corpus_stats",
+    # Reranking
+    "CrossEncoderReranker",
+    "select_nodes",
+    # Context Packing
+    "ContextPacker",
+    "CONTEXT_BUDGETS",
+    "get_context_stats",
+    "count_tokens",
+    # Response Synthesis
+    "AdaptiveSynthesizer",
+    "get_synthesis_stats",
+    # Whole-Document Summary
+    "summarize_document",
+    "collect_parent_sections",
+    "delete_document_summaries",
+    # Summary Tree
+    "build_summary_tree",
+    "build_summary_query_engine",
+    "route_tree_level",
+    "is_overview_query",
+    # Batch Query
+    "stream_batch_query",
+    # RAG URL Stores
+    "load_url_store",
+    "get_url_store_stats",
+    "URLStoreResult",
+    # RAG Web Vector Store
+    "BoundedVectorStore",
 ]
@@ -5,13 +5,18 @@ Advanced Query Helper Functions
 - 질문 분해 (Query Decomposition)
 - 다중 검색 (Multi-Retrieval)
 - 결과 통합 (Result Integration)
+- 질문 분해 → 병렬 서브 질문 → 통합 스트리밍 파이프라인
 
 Author: Claude Sonnet 4.5
 Created: 2026-01-16
 """
 
 import asyncio
+import logging
+import os
+import time
 import warnings
+from collections.abc import AsyncIterator
 from datetime import datetime
 from typing import Any
 
@@ -25,8 +30,28 @@ warnings.filterwarnings(
 
 from llama_index.core import Settings, VectorStoreIndex  # noqa: E402
 
+from app.utils.chain_batch import error_fields  # noqa: E402
+from app.utils.context_packer import CONTEXT_BUDGETS, ContextPacker  # noqa: E402
 from app.utils.document_analysis import compute_confidence_score  # noqa: E402
+from app.utils.query_router import route_search_strategies  # noqa: E402
 from app.utils.redis_index import load_index_from_redis  # noqa: E402
+from app.utils.reranker import CrossEncoderReranker  # noqa: E402
+from app.utils.response_wrapper import ndjson_line  # noqa: E402
+from app.utils.retrieval import (  # noqa: E402
+    build_query_engine,
+    build_retriever,
+    get_context_stats,
+)
+from app.utils.synthesis import AdaptiveSynthesizer, get_synthesis_stats  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+# 동시에 실행할 서브 질문 수 기본값
+DECOMPOSE_CONCURRENCY = int(os.getenv("DECOMPOSE_CONCURRENCY", "4"))
+
+# 최종 통합에 포함할 원본 질문 검색 발췌 수 / 발췌 길이 (자)
+_EVIDENCE_NODES = 3
+_EVIDENCE_CHARS = 500
 
 # ============================================================================
 # 파싱 함수
@@ -80,7 +105,11 @@ def parse_decomposed_queries(response_text: str) -> dict[str, Any]:
 
 
 async def search_tables(
-    index: VectorStoreIndex, query: str, top_k: int
+    index: VectorStoreIndex,
+    query: str,
+    top_k: int,
+    retrieval_mode: str = "vector",
+    reranker: CrossEncoderReranker | None = None,
 ) -> dict[str, Any]:
     """
     표 검색
@@ -96,10 +125,15 @@ async def search_tables(
 일반 본문이나 설명문은 제외하고, 구조화된 표 데이터만 참고해 주세요.
 """
 
-    query_engine = index.as_query_engine(
-        similarity_top_k=top_k, response_mode="tree_summarize"
+    query_engine = build_query_engine(
+        index,
+        similarity_top_k=top_k,
+        response_mode="auto",
+        retrieval_mode=retrieval_mode,
+        node_postprocessors=[reranker] if reranker else None,
+        context_budget=CONTEXT_BUDGETS["query"],
     )
-    response = query_engine.query(table_query)
+    response = await query_engine.aquery(table_query)
 
     return {
         "search_type": "table",
@@ -118,11 +152,18 @@ async def search_tables(
             }
             for node in getattr(response, "source_nodes", [])[:3]
         ],
+        "rerank": reranker.stats if reranker else None,
+        "context_packing": get_context_stats(query_engine),
+        "synthesis": get_synthesis_stats(query_engine),
     }
 
 
 async def search_text(
-    index: VectorStoreIndex, query: str, top_k: int
+    index: VectorStoreIndex,
+    query: str,
+    top_k: int,
+    retrieval_mode: str = "vector",
+    reranker: CrossEncoderReranker | None = None,
 ) -> dict[str, Any]:
     """
     본문 검색
@@ -138,10 +179,15 @@ async def search_text(
 표나 기준표는 제외해 주세요.
 """
 
-    query_engine = index.as_query_engine(
-        similarity_top_k=top_k, response_mode="tree_summarize"
+    query_engine = build_query_engine(
+        index,
+        similarity_top_k=top_k,
+        response_mode="auto",
+        retrieval_mode=retrieval_mode,
+        node_postprocessors=[reranker] if reranker else None,
+        context_budget=CONTEXT_BUDGETS["query"],
     )
-    response = query_engine.query(text_query)
+    response = await query_engine.aquery(text_query)
 
     return {
         "search_type": "text",
@@ -160,11 +206,18 @@ async def search_text(
             }
             for node in getattr(response, "source_nodes", [])[:3]
         ],
+        "rerank": reranker.stats if reranker else None,
+        "context_packing": get_context_stats(query_engine),
+        "synthesis": get_synthesis_stats(query_engine),
     }
 
 
 async def extract_json_paths(
-    index: VectorStoreIndex, query: str, top_k: int
+    index: VectorStoreIndex,
+    query: str,
+    top_k: int,
+    retrieval_mode: str = "vector",
+    reranker: CrossEncoderReranker | None = None,
 ) -> dict[str, Any]:
     """
     JSON 경로 추출
@@ -191,10 +244,15 @@ async def extract_json_paths(
 }}
 """
 
-    query_engine = index.as_query_engine(
-        similarity_top_k=top_k, response_mode="tree_summarize"
+    query_engine = build_query_engine(
+        index,
+        similarity_top_k=top_k,
+        response_mode="auto",
+        retrieval_mode=retrieval_mode,
+        node_postprocessors=[reranker] if reranker else None,
+        context_budget=CONTEXT_BUDGETS["query"],
     )
-    response = query_engine.query(json_query)
+    response = await query_engine.aquery(json_query)
 
     return {
         "search_type": "json",
@@ -213,6 +271,9 @@ async def extract_json_paths(
             }
             for node in getattr(response, "source_nodes", [])[:3]
         ],
+        "rerank": reranker.stats if reranker else None,
+        "context_packing": get_context_stats(query_engine),
+        "synthesis": get_synthesis_stats(query_engine),
     }
 
 
@@ -278,6 +339,7 @@ async def integrate_all_results(
     original_query: str,
     sub_queries: list[str],
     sub_query_results: list[dict[str, Any]],
+    evidence: list[str] | None = None,
 ) -> str:
     """
     모든 서브 질문 결과를 최종 답변으로 통합
@@ -286,6 +348,7 @@ async def integrate_all_results(
         original_query: 원본 질문
         sub_queries: 분해된 서브 질문 리스트
         sub_query_results: 각 서브 질문의 검색 결과
+        evidence: 원본 질문으로 직접 검색한 발췌문 (선택)
 
     Returns:
         최종 통합 답변
@@ -307,6 +370,10 @@ async def integrate_all_results(
 
 """
 
+    if evidence:
+        integration_prompt += "[원본 질문 관련 발췌]\n"
+        integration_prompt += "\n---\n".join(evidence) + "\n\n"
+
     integration_prompt += """
 위 서브 질문들의 답변을 종합하여 원본 질문에 대한 최종 답변을 작성해 주세요:
 1. 모든 서브 답변을 논리적으로 연결
@@ -391,11 +458,21 @@ async def multi_retrieval_internal(
     use_text_search: bool = True,
     use_json_extraction: bool = False,
     top_k: int = 5,
+    retrieval_mode: str = "vector",
+    rerank: bool = False,
+    rerank_top_n: int = 5,
+    rerank_token_budget: int | None = None,
+    index: VectorStoreIndex | None = None,
+    metadata: dict[str, Any] | None = None,
+    strategy_routing: bool = True,
 ) -> dict[str, Any]:
     """
     다중 검색 내부 로직
 
     표/본문/JSON 경로를 분리하여 병렬 검색하고 결과를 통합합니다.
+    여러 서브 질문을 처리할 때는 index/metadata를 넘겨 인덱스 로드를 한 번만 수행합니다.
+    strategy_routing이 켜져 있으면 질문 키워드로 필요한 전략만 실행하고,
+    전략이 하나만 선택되면 통합 LLM 호출 없이 해당 답변을 그대로 사용합니다.
 
     Args:
         doc_id: 문서 ID
@@ -404,28 +481,65 @@ async def multi_retrieval_internal(
         use_text_search: 본문 검색 사용 여부
         use_json_extraction: JSON 추출 사용 여부
         top_k: 검색 결과 수
+        retrieval_mode: 검색 모드 ("vector" 또는 "hybrid")
+        rerank: Cross-Encoder 재순위화 사용 여부
+        rerank_top_n: 재순위화 후 유지할 청크 개수
+        rerank_token_budget: 재순위화 후 유지할 청크의 누적 토큰 상한
+        index: 미리 로드한 인덱스 (None이면 Redis에서 로드)
+        metadata: 미리 로드한 문서 메타데이터
+        strategy_routing: 질문 키워드 기반 전략 선택 사용 여부
 
     Returns:
         다중 검색 결과 딕셔너리
+        - strategy_routing: 라우팅 결정 (strategy_routing=False이면 None)
     """
     # Redis에서 인덱스 로드
-    index, metadata = await load_index_from_redis(doc_id)
+    if index is None:
+        index, metadata = await load_index_from_redis(doc_id)
+    metadata = metadata or {}
+
+    # 질문 키워드로 실행할 전략 선택 (LLM 호출 없음)
+    routing = None
+    if strategy_routing:
+        routing = route_search_strategies(
+            query,
+            use_table_search=use_table_search,
+            use_text_search=use_text_search,
+            use_json_extraction=use_json_extraction,
+        )
+        use_table_search = "table" in routing["strategies"]
+        use_text_search = "text" in routing["strategies"]
+        use_json_extraction = "json" in routing["strategies"]
+
+    def make_reranker() -> CrossEncoderReranker | None:
+        # 검색별 통계를 따로 기록하도록 검색마다 새로 생성
+        if not rerank:
+            return None
+        return CrossEncoderReranker(
+            top_n=rerank_top_n,
+            token_budget=rerank_token_budget,
+            rerank_query=query,
+        )
 
     # 병렬 검색 태스크 생성
     tasks = []
 
     if use_table_search:
-        tasks.append(search_tables(index, query, top_k))
+        tasks.append(
+            search_tables(index, query, top_k, retrieval_mode, make_reranker())
+        )
     else:
         tasks.append(asyncio.sleep(0))  # Dummy task
 
     if use_text_search:
-        tasks.append(search_text(index, query, top_k))
+        tasks.append(search_text(index, query, top_k, retrieval_mode, make_reranker()))
     else:
         tasks.append(asyncio.sleep(0))  # Dummy task
 
     if use_json_extraction:
-        tasks.append(extract_json_paths(index, query, top_k))
+        tasks.append(
+            extract_json_paths(index, query, top_k, retrieval_mode, make_reranker())
+        )
     else:
         tasks.append(asyncio.sleep(0))  # Dummy task
 
@@ -437,13 +551,17 @@ async def multi_retrieval_internal(
     text_results = results[1] if use_text_search else None
     json_results = results[2] if use_json_extraction else None
 
-    # 결과 통합
-    integrated_answer = await integrate_results(
-        query=query,
-        table_results=table_results,
-        text_results=text_results,
-        json_results=json_results,
-    )
+    # 결과 통합 (라우팅으로 전략이 하나만 선택되면 통합 생략)
+    if routing is not None and not routing["integrate"]:
+        single = table_results or text_results or json_results
+        integrated_answer = single["answer"] if single else ""
+    else:
+        integrated_answer = await integrate_results(
+            query=query,
+            table_results=table_results,
+            text_results=text_results,
+            json_results=json_results,
+        )
 
     return {
         "doc_id": doc_id,
@@ -453,6 +571,7 @@ async def multi_retrieval_internal(
             "text_search": use_text_search,
             "json_extraction": use_json_extraction,
         },
+        "strategy_routing": routing,
         "table_results": table_results,
         "text_results": text_results,
         "json_results": json_results,
@@ -462,3 +581,184 @@ async def multi_retrieval_internal(
             "searched_at": datetime.now().isoformat(),
         },
     }
+
+
+# ============================================================================
+# 스트리밍 파이프라인 (질문 분해 → 병렬 서브 질문 → 통합)
+# ============================================================================
+
+
+async def stream_decompose_and_answer(
+    index: VectorStoreIndex,
+    metadata: dict[str, Any],
+    doc_id: str,
+    query: str,
+    top_k: int = 20,
+    retrieval_mode: str = "vector",
+    max_concurrency: int | None = None,
+    **search_options: Any,
+) -> AsyncIterator[str]:
+    """
+    질문 분해 후 서브 질문을 병렬 실행하고 진행 상황을 NDJSON으로 스트리밍
+
+    1. 질문 분해와 동시에 원본 질문 검색을 미리 시작 (speculative retrieval)
+    2. 서브 질문은 max_concurrency개씩 병렬 실행, 완료 순서대로 전송
+    3. 마지막 서브 답변이 도착하면 원본 질문 검색 발췌와 함께 최종 통합
+
+    서브 질문이 1개 이하로 분해되면 미리 검색한 노드로 바로 답변합니다.
+
+    Args:
+        index: 로드된 VectorStoreIndex
+        metadata: 문서 메타데이터
+        doc_id: 문서 ID
+        query: 원본 질문
+        top_k: 검색할 청크 개수
+        retrieval_mode: 검색 모드 ("vector" 또는 "hybrid")
+        max_concurrency: 동시 실행 서브 질문 수 (None이면 DECOMPOSE_CONCURRENCY)
+        **search_options: multi_retrieval_internal 검색 옵션
+            (use_table_search, use_text_search, use_json_extraction, rerank 등)
+
+    Yields:
+        NDJSON 문자열
+        - {"event": "decomposition", "sub_queries", "reasoning"}
+        - {"event": "sub_answer", "index", "sub_query", "integrated_answer", ...}
+          (실패 시 {"event": "sub_answer", "index", "sub_query", "error"})
+        - {"event": "final", "final_answer", "strategy"}
+        - {"event": "error", "error", "error_type"} (분해/통합 등 파이프라인 실패 시, done 직전)
+        - {"event": "done", "num_sub_queries", "failed", "execution_time_ms"}
+    """
+    start = time.perf_counter()
+
+    # 1) 질문 분해와 원본 질문 검색 동시 시작
+    retriever = build_retriever(
+        index, similarity_top_k=top_k, retrieval_mode=retrieval_mode
+    )
+    speculative = asyncio.create_task(retriever.aretrieve(query))
+    tasks: list[asyncio.Task] = []
+    sub_queries: list[str] = []
+    failed = 0
+
+    try:
+        decomposition = await decompose_query_internal(doc_id, query)
+        sub_queries = decomposition["sub_queries"]
+        yield ndjson_line(
+            {
+                "event": "decomposition",
+                "sub_queries": sub_queries,
+                "reasoning": decomposition["reasoning"],
+            }
+        )
+
+        # 분해되지 않은 질문은 미리 검색한 노드로 바로 답변
+        if len(sub_queries) <= 1:
+            nodes = await speculative
+            packer = ContextPacker(token_budget=CONTEXT_BUDGETS["query"])
+            response = await AdaptiveSynthesizer().asynthesize(
+                query, nodes=packer.postprocess_nodes(nodes)
+            )
+            yield ndjson_line(
+                {
+                    "event": "final",
+                    "final_answer": str(response),
+                    "strategy": "direct",
+                }
+            )
+            yield ndjson_line(
+                {
+                    "event": "done",
+                    "num_sub_queries": len(sub_queries),
+                    "failed": 0,
+                    "execution_time_ms": (time.perf_counter() - start) * 1000,
+                }
+            )
+            return
+
+        # 2) 서브 질문 병렬 실행 (인덱스는 한 번만 로드하여 공유)
+        semaphore = asyncio.Semaphore(max_concurrency or DECOMPOSE_CONCURRENCY)
+
+        async def answer(position: int) -> dict[str, Any]:
+            sub_query = sub_queries[position]
+            async with semaphore:
+                sub_start = time.perf_counter()
+                try:
+                    result = await multi_retrieval_internal(
+                        doc_id=doc_id,
+                        query=sub_query,
+                        top_k=top_k,
+                        retrieval_mode=retrieval_mode,
+                        index=index,
+                        metadata=metadata,
+                        **search_options,
+                    )
+                except Exception as e:
+                    return {"index": position, "sub_query": sub_query, "error": str(e)}
+
+            return {
+                "index": position,
+                "sub_query": sub_query,
+                "integrated_answer": result["integrated_answer"],
+                "table_results": result["table_results"],
+                "text_results": result["text_results"],
+                "json_results": result["json_results"],
+                "execution_time_ms": (time.perf_counter() - sub_start) * 1000,
+            }
+
+        tasks = [
+            asyncio.create_task(answer(position))
+            for position in range(len(sub_queries))
+        ]
+
+        results: list[dict[str, Any]] = [{} for _ in sub_queries]
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            results[result["index"]] = result
+            failed += "error" in result
+            yield ndjson_line({"event": "sub_answer", **result})
+
+        # 3) 마지막 서브 답변 도착 즉시 최종 통합 (원본 질문 검색 발췌 포함)
+        try:
+            evidence = [
+                node.node.get_content()[:_EVIDENCE_CHARS]
+                for node in (await speculative)[:_EVIDENCE_NODES]
+            ]
+        except Exception as e:
+            # 발췌는 보조 근거이므로 검색 실패 시 서브 답변만으로 통합
+            logger.warning(f"Speculative retrieval failed, integrating without it: {e}")
+            evidence = []
+        final_answer = await integrate_all_results(
+            original_query=query,
+            sub_queries=sub_queries,
+            sub_query_results=results,
+            evidence=evidence,
+        )
+        yield ndjson_line(
+            {
+                "event": "final",
+                "final_answer": final_answer,
+                "strategy": "decomposed",
+            }
+        )
+        yield ndjson_line(
+            {
+                "event": "done",
+                "num_sub_queries": len(sub_queries),
+                "failed": failed,
+                "execution_time_ms": (time.perf_counter() - start) * 1000,
+            }
+        )
+    except Exception as e:
+        # 응답 헤더가 이미 전송되었으므로 오류 줄과 done 줄로 스트림 종료
+        yield ndjson_line({"event": "error", **error_fields(e)})
+        yield ndjson_line(
+            {
+                "event": "done",
+                "num_sub_queries": len(sub_queries),
+                "failed": failed,
+                "execution_time_ms": (time.perf_counter() - start) * 1000,
+            }
+        )
+    finally:
+        # 클라이언트 연결이 끊긴 경우 남은 작업 취소
+        speculative.cancel()
+        for task in tasks:
+            task.cancel()
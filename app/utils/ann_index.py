@@ -0,0 +1,243 @@
+"""
+FAISS 기반 근사 최근접 이웃(ANN) 인덱스
+
+Child 노드가 많은 문서(통합 규정집 등 수만 개 노드)에서 벡터 검색을 가속합니다.
+- flat: 기존 방식 (인메모리 전수 비교, FAISS 인덱스 없음)
+- ivf: IndexIVFFlat (클러스터 단위 탐색, nprobe로 정확도/속도 조절)
+- hnsw: IndexHNSWFlat (그래프 탐색, efSearch로 정확도/속도 조절)
+- auto: 노드 수가 ANN_NODE_THRESHOLD 이하이면 flat, 초과하면 ANN_AUTO_INDEX_TYPE
+
+임베딩은 L2 정규화 후 내적(inner product)으로 검색하므로 점수는 코사인 유사도와 같습니다.
+직렬화된 인덱스는 Redis 해시(ann 필드) 또는 로컬 디스크(ANN_INDEX_DIR)에 저장되며,
+로드 시 재학습/재구성 없이 그대로 복원됩니다.
+
+Usage:
+    from app.utils.ann_index import ANNIndex, resolve_index_type
+
+    index_type = resolve_index_type("auto", node_count=len(node_ids))
+    ann_index = ANNIndex.build(node_ids, embeddings, index_type="hnsw")
+    hits = ann_index.search(query_embedding, top_k=10)  # [(node_id, score), ...]
+"""
+
+import json
+import math
+import os
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+# 지원하는 인덱스 유형
+ANN_INDEX_TYPES = ("auto", "flat", "ivf", "hnsw")
+
+# auto 모드에서 ANN 인덱스를 생성하는 Child 노드 수 기준
+ANN_NODE_THRESHOLD = int(os.getenv("ANN_NODE_THRESHOLD", "5000"))
+
+# auto 모드에서 기준을 넘었을 때 사용할 인덱스 유형 (ivf 또는 hnsw)
+ANN_AUTO_INDEX_TYPE = os.getenv("ANN_AUTO_INDEX_TYPE", "hnsw")
+
+# 직렬화 인덱스 저장 위치 (redis: 문서 해시의 ann 필드, disk: ANN_INDEX_DIR 파일)
+ANN_STORAGE = os.getenv("ANN_STORAGE", "redis")
+ANN_INDEX_DIR = os.getenv("ANN_INDEX_DIR", "data/ann_indexes")
+
+# 검색 파라미터 (로드 시마다 적용되므로 재구성 없이 조정 가능)
+IVF_NPROBE = int(os.getenv("ANN_IVF_NPROBE", "16"))
+HNSW_M = int(os.getenv("ANN_HNSW_M", "32"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("ANN_HNSW_EF_CONSTRUCTION", "200"))
+HNSW_EF_SEARCH = int(os.getenv("ANN_HNSW_EF_SEARCH", "128"))
+
+# IVF 학습에 필요한 클러스터당 최소 학습 벡터 수 (FAISS 권장값)
+_IVF_MIN_POINTS_PER_CENTROID = 39
+
+
+def resolve_index_type(requested: str, node_count: int) -> str:
+    """
+    요청된 인덱스 유형을 실제 생성할 유형으로 변환
+
+    Args:
+        requested: 요청 유형 ("auto", "flat", "ivf", "hnsw")
+        node_count: 인덱싱할 노드 수
+
+    Returns:
+        "flat", "ivf", "hnsw" 중 하나
+
+    Raises:
+        ValueError: 지원하지 않는 유형일 때
+
+    Examples:
+        >>> resolve_index_type("auto", 1200)
+        'flat'
+        >>> resolve_index_type("auto", 52000)
+        'hnsw'
+    """
+    if requested not in ANN_INDEX_TYPES:
+        raise ValueError(f"지원하지 않는 인덱스 유형입니다: {requested}")
+
+    if requested == "auto":
+        return ANN_AUTO_INDEX_TYPE if node_count > ANN_NODE_THRESHOLD else "flat"
+
+    # IVF는 클러스터를 학습할 만큼 벡터가 있어야 의미가 있음
+    if requested == "ivf" and node_count < _IVF_MIN_POINTS_PER_CENTROID:
+        return "flat"
+
+    return requested
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def _ivf_nlist(node_count: int) -> int:
+    """노드 수에 맞는 IVF 클러스터 수 (약 4·√N, 학습 가능한 범위로 제한)"""
+    nlist = int(4 * math.sqrt(node_count))
+    return max(1, min(nlist, node_count // _IVF_MIN_POINTS_PER_CENTROID))
+
+
+class ANNIndex:
+    """FAISS 인덱스 + node_id 매핑"""
+
+    def __init__(self, index_type: str, faiss_index: faiss.Index, node_ids: list[str]):
+        self.index_type = index_type
+        self.faiss_index = faiss_index
+        self.node_ids = node_ids
+        self._apply_search_params()
+
+    def _apply_search_params(self) -> None:
+        if self.index_type == "ivf":
+            faiss.extract_index_ivf(self.faiss_index).nprobe = IVF_NPROBE
+        elif self.index_type == "hnsw":
+            self.faiss_index.hnsw.efSearch = HNSW_EF_SEARCH
+
+    @classmethod
+    def build(
+        cls,
+        node_ids: list[str],
+        embeddings: list[list[float]] | np.ndarray,
+        index_type: str = "hnsw",
+    ) -> "ANNIndex":
+        """
+        임베딩으로부터 FAISS 인덱스 생성
+
+        Args:
+            node_ids: 노드 ID 리스트 (embeddings와 같은 순서)
+            embeddings: 임베딩 행렬 (N x D)
+            index_type: "ivf" 또는 "hnsw"
+
+        Returns:
+            ANNIndex 인스턴스
+        """
+        vectors = _normalize(np.asarray(embeddings, dtype="float32"))
+        dim = vectors.shape[1]
+
+        if index_type == "ivf":
+            quantizer = faiss.IndexFlatIP(dim)
+            faiss_index = faiss.IndexIVFFlat(
+                quantizer, dim, _ivf_nlist(len(vectors)), faiss.METRIC_INNER_PRODUCT
+            )
+            faiss_index.train(vectors)
+        elif index_type == "hnsw":
+            faiss_index = faiss.IndexHNSWFlat(dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            faiss_index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        else:
+            raise ValueError(f"ANN 인덱스를 생성할 수 없는 유형입니다: {index_type}")
+
+        faiss_index.add(vectors)
+        return cls(index_type, faiss_index, list(node_ids))
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    def search(
+        self, query_embedding: list[float], top_k: int = 10
+    ) -> list[tuple[str, float]]:
+        """
+        근사 최근접 이웃 검색
+
+        Args:
+            query_embedding: 질의 임베딩
+            top_k: 반환할 최대 노드 수
+
+        Returns:
+            (node_id, 코사인 유사도) 리스트 (유사도 내림차순)
+        """
+        return self.search_batch([query_embedding], top_k)[0]
+
+    def search_batch(
+        self, query_embeddings: list[list[float]] | np.ndarray, top_k: int = 10
+    ) -> list[list[tuple[str, float]]]:
+        """
+        여러 질의를 한 번의 FAISS 호출로 검색
+
+        Returns:
+            질의별 (node_id, 코사인 유사도) 리스트
+        """
+        queries = _normalize(np.asarray(query_embeddings, dtype="float32"))
+        scores, positions = self.faiss_index.search(queries, min(top_k, len(self)))
+
+        return [
+            [
+                (self.node_ids[position], float(score))
+                for score, position in zip(row_scores, row_positions, strict=True)
+                if position >= 0
+            ]
+            for row_scores, row_positions in zip(scores, positions, strict=True)
+        ]
+
+    def to_bytes(self) -> bytes:
+        """
+        저장용 직렬화
+
+        [헤더 길이(4바이트)][헤더 JSON (유형, node_ids)][faiss.serialize_index 결과]
+        """
+        header = json.dumps(
+            {"type": self.index_type, "ids": self.node_ids}, separators=(",", ":")
+        ).encode("utf-8")
+        index_bytes = faiss.serialize_index(self.faiss_index).tobytes()
+        return len(header).to_bytes(4, "big") + header + index_bytes
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ANNIndex":
+        """to_bytes()로 직렬화된 데이터로부터 인덱스 복원 (재학습 없음)"""
+        header_length = int.from_bytes(data[:4], "big")
+        header = json.loads(data[4 : 4 + header_length].decode("utf-8"))
+        faiss_index = faiss.deserialize_index(
+            np.frombuffer(data[4 + header_length :], dtype="uint8")
+        )
+        return cls(header["type"], faiss_index, header["ids"])
+
+
+# ============================================================================
+# 디스크 저장
+# ============================================================================
+
+
+def get_ann_index_path(doc_id: str) -> Path:
+    """문서별 ANN 인덱스 파일 경로"""
+    return Path(ANN_INDEX_DIR) / f"{doc_id}.ann"
+
+
+def save_ann_index_file(doc_id: str, ann_index: ANNIndex) -> str:
+    """
+    ANN 인덱스를 로컬 디스크에 저장
+
+    Returns:
+        저장된 파일 경로
+    """
+    path = get_ann_index_path(doc_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # 쓰기 도중 읽히지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_bytes(ann_index.to_bytes())
+    tmp_path.replace(path)
+    return str(path)
+
+
+def load_ann_index_file(path: str) -> ANNIndex | None:
+    """로컬 디스크에서 ANN 인덱스 로드 (파일이 없으면 None)"""
+    file_path = Path(path)
+    if not file_path.exists():
+        return None
+    return ANNIndex.from_bytes(file_path.read_bytes())
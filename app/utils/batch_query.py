@@ -0,0 +1,152 @@
+"""
+한 문서에 대한 다중 질문 일괄 처리
+
+같은 문서에 질문을 여러 개 보낼 때 질문마다 인덱스 로드/임베딩/검색을 반복하지 않도록
+- 질문 임베딩을 한 번의 배치 호출로 계산하고
+- 질문 x 노드 유사도 행렬 한 번으로 모든 질문을 검색한 뒤
+- 답변 생성만 동시 실행 수를 제한하여 병렬로 수행합니다.
+
+결과는 완료되는 순서대로 NDJSON 한 줄씩 반환됩니다 (각 줄에 원래 질문 순서 index 포함).
+
+Usage:
+    from app.utils.batch_query import stream_batch_query
+
+    index, _ = await load_index_from_redis(doc_id)
+    async for line in stream_batch_query(index, ["질문1", "질문2"], top_k=5):
+        print(line)
+"""
+
+import asyncio
+import os
+import time
+import warnings
+from collections.abc import AsyncIterator
+
+# LlamaIndex 내부의 Pydantic validate_default 경고 억제
+warnings.filterwarnings(
+    "ignore",
+    category=UserWarning,
+    message=".*validate_default.*",
+    module="pydantic._internal._generate_schema",
+)
+
+from llama_index.core import VectorStoreIndex, get_response_synthesizer  # noqa: E402
+from llama_index.core.schema import NodeWithScore  # noqa: E402
+
+from app.utils.context_packer import CONTEXT_BUDGETS, ContextPacker  # noqa: E402
+from app.utils.document_analysis import compute_confidence_score  # noqa: E402
+from app.utils.response_wrapper import ndjson_line  # noqa: E402
+from app.utils.retrieval import batch_retrieve  # noqa: E402
+
+# 동시에 실행할 답변 생성(LLM 호출) 수 기본값
+BATCH_QUERY_CONCURRENCY = int(os.getenv("BATCH_QUERY_CONCURRENCY", "4"))
+
+
+async def stream_batch_query(
+    index: VectorStoreIndex,
+    queries: list[str],
+    top_k: int = 5,
+    retrieval_mode: str = "vector",
+    response_mode: str = "compact",
+    max_concurrency: int | None = None,
+) -> AsyncIterator[str]:
+    """
+    여러 질문을 한 번에 검색하고 답변을 완료 순서대로 스트리밍
+
+    Args:
+        index: 로드된 VectorStoreIndex
+        queries: 질문 리스트
+        top_k: 질문별 검색할 청크 개수
+        retrieval_mode: 검색 모드 ("vector" 또는 "hybrid")
+        response_mode: 답변 생성 모드
+        max_concurrency: 동시에 실행할 답변 생성 수 (None이면 BATCH_QUERY_CONCURRENCY)
+
+    Yields:
+        NDJSON 문자열
+        - 질문별: {"index", "query", "response", "source_nodes", "confidence_score",
+          "context_packing", "execution_time_ms"}
+        - 실패 시: {"index", "query", "error"}
+        - 마지막 줄: {"done": true, "total", "failed", "execution_time_ms"}
+          (임베딩/검색 단계 실패 시 "error" 포함, 질문별 줄 없음)
+    """
+    start = time.perf_counter()
+
+    # 1) 임베딩 배치 호출 1회 + 2) 유사도 행렬 검색 1회
+    try:
+        query_embeddings = await index._embed_model.aget_text_embedding_batch(queries)
+        retrieved = await asyncio.to_thread(
+            batch_retrieve,
+            index,
+            queries,
+            query_embeddings,
+            top_k,
+            retrieval_mode,
+        )
+    except Exception as e:
+        # 응답 헤더가 이미 전송되었으므로 오류를 마지막 줄로 알림
+        yield ndjson_line(
+            {
+                "done": True,
+                "error": str(e),
+                "total": len(queries),
+                "failed": len(queries),
+                "execution_time_ms": (time.perf_counter() - start) * 1000,
+            }
+        )
+        return
+
+    # 3) 답변 생성은 질문별로 병렬 (동시 실행 수 제한)
+    synthesizer = get_response_synthesizer(response_mode=response_mode)
+    semaphore = asyncio.Semaphore(max_concurrency or BATCH_QUERY_CONCURRENCY)
+
+    async def answer(position: int, nodes: list[NodeWithScore]) -> dict:
+        query = queries[position]
+        async with semaphore:
+            query_start = time.perf_counter()
+            packer = ContextPacker(token_budget=CONTEXT_BUDGETS["query"])
+            try:
+                packed = packer.postprocess_nodes(nodes)
+                response = await synthesizer.asynthesize(query, nodes=packed)
+            except Exception as e:
+                return {"index": position, "query": query, "error": str(e)}
+
+        return {
+            "index": position,
+            "query": query,
+            "response": str(response),
+            "source_nodes": [
+                {
+                    "score": node.score,
+                    "text_preview": node.node.get_content()[:200],
+                }
+                for node in nodes
+            ],
+            "confidence_score": compute_confidence_score(nodes),
+            "context_packing": packer.stats,
+            "execution_time_ms": (time.perf_counter() - query_start) * 1000,
+        }
+
+    tasks = [
+        asyncio.create_task(answer(position, nodes))
+        for position, nodes in enumerate(retrieved)
+    ]
+
+    failed = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            failed += "error" in result
+            yield ndjson_line(result)
+    finally:
+        # 클라이언트 연결이 끊긴 경우 남은 답변 생성 취소
+        for task in tasks:
+            task.cancel()
+
+    yield ndjson_line(
+        {
+            "done": True,
+            "total": len(queries),
+            "failed": failed,
+            "execution_time_ms": (time.perf_counter() - start) * 1000,
+        }
+    )
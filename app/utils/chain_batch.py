@@ -0,0 +1,173 @@
+"""
+LCEL 체인 배치 실행 (동시 실행 수 제한 + NDJSON 스트리밍)
+
+chain.abatch(inputs)는 입력 수만큼 LLM 호출을 한꺼번에 보내고 모두 끝날 때까지 아무것도 반환하지 않습니다.
+이 모듈은 배치를 다음과 같이 실행합니다.
+- 동시 실행 수 상한 (max_concurrency)
+- 항목별 타임아웃과 재시도 (지수 백오프 + jitter, 요청 데드라인 준수)
+- 완료되는 순서대로 NDJSON 한 줄씩 반환 (각 줄에 원래 입력 순서 index 포함)
+- 실패한 항목은 error로 보고하고 나머지는 계속 처리 (마지막 줄에 실패 index 목록)
+
+Runnable.abatch_as_completed와 같은 완료 순서 스트리밍이지만, 클라이언트 연결이 끊기면
+대기/실행 중인 항목을 취소할 수 있도록 태스크를 직접 관리합니다.
+
+Usage:
+    from app.utils.chain_batch import stream_chain_batch
+
+    inputs = [{"query": q} for q in queries]
+    return StreamingResponse(
+        stream_chain_batch(chain, inputs, max_concurrency=8),
+        media_type="application/x-ndjson",
+    )
+"""
+
+import asyncio
+import os
+import time
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+from langchain_core.runnables import Runnable
+from pydantic import BaseModel
+
+from app.utils.llm_resilience import retry_with_backoff
+from app.utils.response_wrapper import ndjson_line
+
+# 동시에 실행할 체인 호출 수 기본값
+CHAIN_BATCH_CONCURRENCY = int(os.getenv("CHAIN_BATCH_CONCURRENCY", "8"))
+
+# 항목별 타임아웃 (초) / 재시도 횟수 / 첫 재시도 최대 대기 시간 (초, 시도마다 2배, jitter 적용)
+CHAIN_BATCH_TIMEOUT = float(os.getenv("CHAIN_BATCH_TIMEOUT", "60"))
+CHAIN_BATCH_RETRIES = int(os.getenv("CHAIN_BATCH_RETRIES", "2"))
+CHAIN_BATCH_RETRY_BACKOFF = float(os.getenv("CHAIN_BATCH_RETRY_BACKOFF", "0.5"))
+
+
+def _default_serialize(result: Any) -> Any:
+    if isinstance(result, BaseModel):
+        return result.model_dump()
+    return result
+
+
+async def invoke_with_retry(
+    chain: Runnable,
+    item: Any,
+    timeout: float | None = None,
+    max_retries: int | None = None,
+) -> tuple[Any, int]:
+    """
+    체인 1회 실행 (시도별 타임아웃 + 지수 백오프/jitter 재시도, 요청 데드라인 준수)
+
+    Args:
+        chain: 실행할 LCEL 체인
+        item: 체인 입력
+        timeout: 시도 1회당 타임아웃 초 (None이면 CHAIN_BATCH_TIMEOUT)
+        max_retries: 실패/타임아웃 시 재시도 횟수 (None이면 CHAIN_BATCH_RETRIES)
+
+    Returns:
+        (결과, 시도 횟수)
+
+    Raises:
+        Exception: 모든 시도가 실패하면 마지막 시도의 예외 (attempts 속성: 실제 시도 횟수)
+    """
+    return await retry_with_backoff(
+        lambda: chain.ainvoke(item),
+        max_retries=CHAIN_BATCH_RETRIES if max_retries is None else max_retries,
+        timeout=timeout or CHAIN_BATCH_TIMEOUT,
+        base_delay=CHAIN_BATCH_RETRY_BACKOFF,
+    )
+
+
+def error_fields(error: Exception) -> dict[str, str]:
+    """NDJSON 실패 줄의 error/error_type (TimeoutError는 메시지가 비어 있으므로 타입명으로 보고)"""
+    return {
+        "error": str(error) or type(error).__name__,
+        "error_type": type(error).__name__,
+    }
+
+
+async def stream_chain_batch(
+    chain: Runnable,
+    inputs: list[Any],
+    max_concurrency: int | None = None,
+    timeout: float | None = None,
+    max_retries: int | None = None,
+    serialize: Callable[[Any], Any] = _default_serialize,
+) -> AsyncIterator[str]:
+    """
+    체인을 입력별로 실행하고 결과를 완료 순서대로 스트리밍
+
+    Args:
+        chain: 실행할 LCEL 체인
+        inputs: 체인 입력 리스트
+        max_concurrency: 동시 실행 수 (None이면 CHAIN_BATCH_CONCURRENCY)
+        timeout: 시도 1회당 타임아웃 초 (None이면 CHAIN_BATCH_TIMEOUT)
+        max_retries: 실패/타임아웃 시 재시도 횟수 (None이면 CHAIN_BATCH_RETRIES)
+        serialize: 결과 직렬화 함수 (기본: Pydantic 모델은 model_dump)
+
+    Yields:
+        NDJSON 문자열
+        - 항목별: {"index", "input", "result", "attempts", "execution_time_ms"}
+        - 실패 시: {"index", "input", "error", "error_type", "attempts", "execution_time_ms"}
+        - 마지막 줄: {"done": true, "total", "succeeded", "failed", "failed_indices",
+          "time_to_first_result_ms", "peak_concurrency", "max_concurrency", "execution_time_ms"}
+    """
+    start = time.perf_counter()
+    concurrency = max_concurrency or CHAIN_BATCH_CONCURRENCY
+    retries = CHAIN_BATCH_RETRIES if max_retries is None else max_retries
+
+    semaphore = asyncio.Semaphore(concurrency)
+    in_flight = 0
+    peak_concurrency = 0
+
+    async def run(position: int, item: Any) -> dict[str, Any]:
+        nonlocal in_flight, peak_concurrency
+        line: dict[str, Any] = {"index": position, "input": item}
+        async with semaphore:
+            in_flight += 1
+            peak_concurrency = max(peak_concurrency, in_flight)
+            item_start = time.perf_counter()
+            try:
+                result, line["attempts"] = await invoke_with_retry(
+                    chain, item, timeout, retries
+                )
+                line["result"] = serialize(result)
+            except Exception as e:
+                line["attempts"] = getattr(e, "attempts", 1)
+                line.update(error_fields(e))
+            finally:
+                in_flight -= 1
+        line["execution_time_ms"] = (time.perf_counter() - item_start) * 1000
+        return line
+
+    tasks = [
+        asyncio.create_task(run(position, item)) for position, item in enumerate(inputs)
+    ]
+
+    failed_indices: list[int] = []
+    first_result_ms = None
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            if first_result_ms is None:
+                first_result_ms = (time.perf_counter() - start) * 1000
+            if "error" in result:
+                failed_indices.append(result["index"])
+            yield ndjson_line(result)
+    finally:
+        # 클라이언트 연결이 끊긴 경우 대기/실행 중인 항목 취소
+        for task in tasks:
+            task.cancel()
+
+    yield ndjson_line(
+        {
+            "done": True,
+            "total": len(inputs),
+            "succeeded": len(inputs) - len(failed_indices),
+            "failed": len(failed_indices),
+            "failed_indices": sorted(failed_indices),
+            "time_to_first_result_ms": first_result_ms,
+            "peak_concurrency": peak_concurrency,
+            "max_concurrency": concurrency,
+            "execution_time_ms": (time.perf_counter() - start) * 1000,
+        }
+    )
@@ -0,0 +1,150 @@
+"""
+LCEL 체인 레지스트리
+
+요청마다 ChatPromptTemplate, 출력 파서, `prompt | llm | parser` 파이프라인을 다시 만들지 않도록
+체인을 이름별로 한 번만 생성하고 재사용합니다.
+- 팩토리 등록 후 첫 사용 시 생성 (또는 앱 시작 시 prewarm으로 일괄 생성)
+- 생성 직후 입력/출력 스키마를 계산하여 잘못 구성된 체인을 요청 전에 발견
+- 체인별 생성 시간, 조회 횟수 집계
+
+체인은 호출 간 상태를 갖지 않으므로 동시 요청에서 같은 객체를 공유해도 안전합니다.
+
+Usage:
+    from app.utils.chain_registry import ChainRegistry
+
+    chains = ChainRegistry()
+
+    @chains.register("basic")
+    def _basic_chain():
+        return ChatPromptTemplate.from_template("Answer: {query}") | llm | StrOutputParser()
+
+    result = await chains.get("basic").ainvoke({"query": "LCEL이란?"})
+"""
+
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from langchain_core.runnables import Runnable
+
+logger = logging.getLogger(__name__)
+
+# 앱 시작(lifespan) 시 등록된 체인을 모두 미리 생성할지 여부
+CHAIN_PREWARM = os.getenv("CHAIN_PREWARM", "true").lower() == "true"
+
+ChainFactory = Callable[[], Runnable]
+
+
+def validate_chain(name: str, chain: Any) -> Runnable:
+    """
+    체인 구성 검증
+
+    Runnable 여부를 확인하고 입력/출력 스키마를 계산합니다.
+    프롬프트 변수 누락, 잘못된 파이프 연결 등은 여기서 예외로 드러납니다.
+
+    Raises:
+        TypeError: Runnable이 아닌 경우
+    """
+    if not isinstance(chain, Runnable):
+        raise TypeError(f"Chain '{name}' factory must return a Runnable")
+    chain.get_input_jsonschema()
+    chain.get_output_jsonschema()
+    return chain
+
+
+class ChainRegistry:
+    """이름 → 컴파일된 LCEL 체인 캐시 (스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._factories: dict[str, ChainFactory] = {}
+        self._chains: dict[str, Runnable] = {}
+        self._build_ms: dict[str, float] = {}
+        self._hits: dict[str, int] = {}
+
+    def register(self, name: str) -> Callable[[ChainFactory], ChainFactory]:
+        """체인 팩토리 등록 데코레이터 (이름 중복 시 ValueError)"""
+
+        def decorator(factory: ChainFactory) -> ChainFactory:
+            if name in self._factories:
+                raise ValueError(f"Chain '{name}' is already registered")
+            self._factories[name] = factory
+            return factory
+
+        return decorator
+
+    def get(self, name: str) -> Runnable:
+        """
+        등록된 체인 조회 (처음 조회 시 생성 및 검증)
+
+        Raises:
+            KeyError: 등록되지 않은 이름
+        """
+        chain = self._chains.get(name)
+        if chain is None:
+            with self._lock:
+                chain = self._chains.get(name)
+                if chain is None:
+                    chain = self._build(name)
+        self._hits[name] = self._hits.get(name, 0) + 1
+        return chain
+
+    def create(self, name: str) -> Runnable:
+        """캐시를 거치지 않고 체인을 새로 생성 (비교/디버깅용)"""
+        return self._factories[name]()
+
+    def _build(self, name: str) -> Runnable:
+        factory = self._factories[name]
+        started = time.perf_counter()
+        chain = validate_chain(name, factory())
+        self._build_ms[name] = (time.perf_counter() - started) * 1000
+        self._chains[name] = chain
+        return chain
+
+    def prewarm(self) -> dict[str, float]:
+        """
+        등록된 체인을 모두 생성 및 검증
+
+        Returns:
+            체인 이름 → 생성 시간 (ms)
+        """
+        with self._lock:
+            for name in self._factories:
+                if name not in self._chains:
+                    self._build(name)
+            build_ms = dict(self._build_ms)
+        logger.info(
+            f"Prewarmed {len(build_ms)} chains in {sum(build_ms.values()):.1f}ms"
+        )
+        return build_ms
+
+    def clear(self) -> None:
+        """생성된 체인 폐기 (팩토리 등록은 유지, 다음 조회 시 재생성)"""
+        with self._lock:
+            self._chains.clear()
+            self._build_ms.clear()
+            self._hits.clear()
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._factories)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            "registered": len(self._factories),
+            "built": len(self._chains),
+            "chains": {
+                name: {
+                    "built": name in self._chains,
+                    "build_ms": round(self._build_ms[name], 3)
+                    if name in self._build_ms
+                    else None,
+                    "hits": self._hits.get(name, 0),
+                }
+                for name in self._factories
+            },
+        }
@@ -0,0 +1,236 @@
+"""
+토큰 예산 기반 컨텍스트 패킹
+
+검색된 Child 청크를 LLM에 넘기기 전에 정리합니다.
+Child 청크는 child_chunk_overlap만큼 겹치므로 인접 청크가 함께 검색되면 같은 문장이 여러 번 전달됩니다.
+
+1. 같은 Parent의 인접 청크(chunk_index 연속)를 겹치는 부분을 한 번만 남기고 병합
+2. 완전 중복/유사 중복(문자 n-gram Jaccard) 청크 제거
+3. 검색 점수 순으로 토큰 예산만큼 선택 (예산 경계의 청크는 잘라서 포함)
+4. 선택된 청크를 문서 내 위치 순으로 정렬
+
+Usage:
+    from app.utils.context_packer import CONTEXT_BUDGETS
+    from app.utils.retrieval import build_query_engine, get_context_stats
+
+    query_engine = build_query_engine(
+        index, similarity_top_k=10, context_budget=CONTEXT_BUDGETS["query"]
+    )
+    response = query_engine.query("징계 감경 기준은?")
+    print(get_context_stats(query_engine))  # {"tokens_before": 4210, "tokens_after": 2980, ...}
+"""
+
+import math
+import os
+import warnings
+from typing import Any
+
+# LlamaIndex 내부의 Pydantic validate_default 경고 억제
+warnings.filterwarnings(
+    "ignore",
+    category=UserWarning,
+    message=".*validate_default.*",
+    module="pydantic._internal._generate_schema",
+)
+
+from llama_index.core.bridge.pydantic import Field, PrivateAttr  # noqa: E402
+from llama_index.core.postprocessor.types import BaseNodePostprocessor  # noqa: E402
+from llama_index.core.schema import MetadataMode, NodeWithScore, QueryBundle  # noqa: E402
+
+from app.utils.lexical_index import char_ngrams  # noqa: E402
+from app.utils.tokens import count_tokens, truncate_to_tokens  # noqa: E402
+
+# 엔드포인트 유형별 컨텍스트 토큰 예산 (CONTEXT_BUDGET_<유형> 환경 변수로 조정)
+_DEFAULT_CONTEXT_BUDGETS = {
+    "summary": 3000,
+    "query": 3000,
+    "analysis": 6000,
+    "table": 6000,
+    "report": 8000,
+}
+CONTEXT_BUDGETS = {
+    name: int(os.getenv(f"CONTEXT_BUDGET_{name.upper()}", str(default)))
+    for name, default in _DEFAULT_CONTEXT_BUDGETS.items()
+}
+
+# 유사 중복으로 판단하는 문자 trigram Jaccard 유사도
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("CONTEXT_NEAR_DUPLICATE_THRESHOLD", "0.9"))
+
+# 인접 청크 병합 시 겹침으로 인정하는 최소 문자 수
+_MIN_OVERLAP_CHARS = 10
+
+
+def _position(node: NodeWithScore) -> tuple[int, int] | None:
+    metadata = node.node.metadata
+    if "parent_index" not in metadata or "chunk_index" not in metadata:
+        return None
+    return int(metadata["parent_index"]), int(metadata["chunk_index"])
+
+
+def merge_overlapping_text(first: str, second: str) -> str:
+    """
+    두 인접 청크를 겹치는 부분을 한 번만 남기고 연결
+
+    first의 접미사와 second의 접두사가 같은 가장 긴 구간을 겹침으로 봅니다.
+
+    Examples:
+        >>> merge_overlapping_text("가나다라마바", "마바사아")
+        '가나다라마바사아'
+    """
+    for size in range(min(len(first), len(second)), _MIN_OVERLAP_CHARS - 1, -1):
+        if first.endswith(second[:size]):
+            return first + second[size:]
+    return first + "\n" + second
+
+
+def _jaccard(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class ContextPacker(BaseNodePostprocessor):
+    """
+    인접 청크 병합 + 중복 제거 + 토큰 예산 절단 노드 후처리기
+
+    쿼리 엔진마다 새로 생성하여 사용하며, 마지막 실행 통계는 stats로 확인합니다.
+    """
+
+    token_budget: int = Field(default=CONTEXT_BUDGETS["query"], description="토큰 예산")
+    near_duplicate_threshold: float = Field(
+        default=NEAR_DUPLICATE_THRESHOLD, description="유사 중복 Jaccard 기준"
+    )
+
+    _stats: dict[str, Any] | None = PrivateAttr(default=None)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "ContextPacker"
+
+    @property
+    def stats(self) -> dict[str, Any] | None:
+        """마지막 패킹 통계 (실행 전이면 None)"""
+        return self._stats
+
+    def _merge_adjacent(self, nodes: list[NodeWithScore]) -> list[NodeWithScore]:
+        """같은 Parent의 연속 청크 병합 (위치 정보가 없는 노드는 그대로 유지)"""
+        positioned = sorted(
+            (node for node in nodes if _position(node) is not None), key=_position
+        )
+        merged: list[NodeWithScore] = []
+        last_position: tuple[int, int] | None = None
+
+        for node in positioned:
+            position = _position(node)
+            if (
+                last_position is not None
+                and position[0] == last_position[0]
+                and (position[1] - last_position[1] in (0, 1))
+            ):
+                previous = merged[-1]
+                if position != last_position:
+                    previous.node.set_content(
+                        merge_overlapping_text(
+                            previous.node.get_content(), node.node.get_content()
+                        )
+                    )
+                previous.score = max(previous.score or 0.0, node.score or 0.0)
+            else:
+                merged.append(node)
+            last_position = position
+
+        return merged + [node for node in nodes if _position(node) is None]
+
+    def _remove_duplicates(self, nodes: list[NodeWithScore]) -> list[NodeWithScore]:
+        """완전 중복 및 유사 중복 제거 (점수가 높은 쪽 유지)"""
+        kept: list[NodeWithScore] = []
+        kept_texts: set[str] = set()
+        kept_shingles: list[set[str]] = []
+
+        for node in sorted(nodes, key=lambda n: n.score or 0.0, reverse=True):
+            text = " ".join(node.node.get_content().split())
+            if text in kept_texts:
+                continue
+            shingles = set(char_ngrams(text, 3))
+            if any(
+                _jaccard(shingles, other) >= self.near_duplicate_threshold
+                for other in kept_shingles
+            ):
+                continue
+            kept.append(node)
+            kept_texts.add(text)
+            kept_shingles.append(shingles)
+
+        return kept
+
+    def _truncate(self, node: NodeWithScore, max_tokens: int) -> int:
+        """메타데이터를 포함한 LLM 입력 토큰이 max_tokens 이하가 되도록 본문 절단"""
+        text = node.node.get_content()
+        overhead = count_tokens(
+            node.node.get_content(metadata_mode=MetadataMode.LLM)
+        ) - count_tokens(text)
+        limit = max_tokens - overhead
+        while limit > 0:
+            node.node.set_content(truncate_to_tokens(text, limit))
+            tokens = count_tokens(node.node.get_content(metadata_mode=MetadataMode.LLM))
+            if tokens <= max_tokens:
+                return tokens
+            limit -= tokens - max_tokens
+        return 0
+
+    def _postprocess_nodes(
+        self,
+        nodes: list[NodeWithScore],
+        query_bundle: QueryBundle | None = None,
+    ) -> list[NodeWithScore]:
+        if not nodes:
+            return nodes
+
+        # 원본 노드(docstore 공유)를 변경하지 않도록 복사
+        nodes = [
+            NodeWithScore(node=node.node.model_copy(), score=node.score)
+            for node in nodes
+        ]
+        tokens_before = sum(
+            count_tokens(node.node.get_content(metadata_mode=MetadataMode.LLM))
+            for node in nodes
+        )
+
+        merged = self._merge_adjacent(nodes)
+        candidates = self._remove_duplicates(merged)
+
+        # 점수 순으로 예산만큼 선택 (경계 청크는 남은 예산만큼 잘라서 포함)
+        selected: list[NodeWithScore] = []
+        used_tokens = 0
+        truncated = False
+        for node in candidates:
+            node_tokens = count_tokens(
+                node.node.get_content(metadata_mode=MetadataMode.LLM)
+            )
+            remaining = self.token_budget - used_tokens
+            if node_tokens > remaining:
+                packed_tokens = self._truncate(node, remaining)
+                if packed_tokens:
+                    selected.append(node)
+                    used_tokens += packed_tokens
+                truncated = True
+                break
+            selected.append(node)
+            used_tokens += node_tokens
+
+        # 문서 내 위치 순 정렬 (위치 정보가 없으면 검색 점수 순으로 뒤에 배치)
+        selected.sort(
+            key=lambda node: _position(node) or (math.inf, -(node.score or 0.0))
+        )
+
+        self._stats = {
+            "token_budget": self.token_budget,
+            "nodes_before": len(nodes),
+            "nodes_after": len(selected),
+            "merged_chunks": len(nodes) - len(merged),
+            "duplicates_removed": len(merged) - len(candidates),
+            "tokens_before": tokens_before,
+            "tokens_after": used_tokens,
+            "truncated": truncated,
+        }
+        return selected
@@ -0,0 +1,480 @@
+"""
+문서 전체(코퍼스) 검색용 전역 샤드 벡터 인덱스
+
+Redis에 저장된 모든 문서의 Child 노드 임베딩을 샤드로 나누어 보관하고,
+문서 단위 중심(centroid) 벡터로 후보 문서/샤드를 먼저 고른 뒤 정밀 검색합니다.
+
+Redis 구조:
+- corpus:shard:{i}   (hash) doc_id -> 문서 벡터 묶음 (node_id, 텍스트, float16 행렬)
+- corpus:centroids   (hash) doc_id -> 샤드 payload 체크섬(4바이트) + 문서 중심 벡터 (float32)
+- corpus:version     (string) 인덱스 변경 시 증가 (프로세스 캐시 무효화용)
+
+save_index_to_redis / delete_document_from_redis에서 증분 갱신되며,
+rebuild_corpus_index()로 기존 문서 전체를 샤드별 병렬로 재구성할 수 있습니다.
+
+Usage:
+    from app.utils.corpus_index import search_corpus, synthesize_per_document
+
+    hits, stats = await search_corpus(query_embedding, top_k=10, max_documents=20)
+    answers = await synthesize_per_document(query, hits, max_documents=3)
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import os
+import warnings
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+# LlamaIndex 내부의 Pydantic validate_default 경고 억제
+warnings.filterwarnings(
+    "ignore",
+    category=UserWarning,
+    message=".*validate_default.*",
+    module="pydantic._internal._generate_schema",
+)
+
+from llama_index.core import get_response_synthesizer  # noqa: E402
+from llama_index.core.schema import NodeWithScore, TextNode  # noqa: E402
+
+from app.utils.redis_client import get_redis_client  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+# 샤드 수 (변경 시 rebuild_corpus_index() 필요)
+CORPUS_SHARD_COUNT = int(os.getenv("CORPUS_SHARD_COUNT", "16"))
+
+# 정밀 검색할 최대 후보 문서 수 기본값 (centroid 유사도 상위)
+CORPUS_CANDIDATE_DOCUMENTS = int(os.getenv("CORPUS_CANDIDATE_DOCUMENTS", "50"))
+
+# 재구성 시 동시에 처리할 샤드 수
+CORPUS_REBUILD_CONCURRENCY = int(os.getenv("CORPUS_REBUILD_CONCURRENCY", "4"))
+
+# 프로세스 메모리에 캐시할 최대 문서 수 (역직렬화된 노드 행렬)
+CORPUS_CACHE_DOCUMENTS = int(os.getenv("CORPUS_CACHE_DOCUMENTS", "500"))
+
+CENTROIDS_KEY = "corpus:centroids"
+VERSION_KEY = "corpus:version"
+
+
+def get_shard_key(shard_id: int) -> str:
+    return f"corpus:shard:{shard_id}"
+
+
+def get_shard_id(doc_id: str) -> int:
+    """doc_id로 샤드 번호 결정 (프로세스/서버와 무관하게 일정)"""
+    return zlib.crc32(doc_id.encode("utf-8")) % CORPUS_SHARD_COUNT
+
+
+@dataclass
+class CorpusHit:
+    """코퍼스 검색 결과 (문서 ID + 노드)"""
+
+    doc_id: str
+    node_id: str
+    text: str
+    score: float
+
+
+# ============================================================================
+# 직렬화
+# ============================================================================
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def pack_document_vectors(
+    node_ids: list[str], texts: list[str], embeddings: list[list[float]]
+) -> tuple[bytes, bytes]:
+    """
+    문서의 노드 벡터 묶음과 중심 벡터 직렬화
+
+    벡터는 정규화 후 float16으로 저장하여 Redis 메모리를 절반으로 줄입니다.
+
+    Returns:
+        (샤드 저장용 bytes, centroid 저장용 bytes)
+
+    centroid 값 앞 4바이트에는 샤드 payload의 CRC32를 기록하여
+    검색 시 변경된 문서만 다시 가져오도록 합니다.
+    """
+    matrix = _normalize_rows(np.asarray(embeddings, dtype="float32"))
+    centroid = matrix.mean(axis=0)
+    centroid /= np.linalg.norm(centroid) or 1.0
+
+    header = zlib.compress(
+        json.dumps(
+            {"ids": node_ids, "texts": texts, "dim": matrix.shape[1]},
+            ensure_ascii=False,
+        ).encode("utf-8")
+    )
+    payload = (
+        len(header).to_bytes(4, "big") + header + matrix.astype("float16").tobytes()
+    )
+    checksum = zlib.crc32(payload).to_bytes(4, "big")
+    return payload, checksum + centroid.astype("float32").tobytes()
+
+
+def unpack_document_vectors(data: bytes) -> tuple[list[str], list[str], np.ndarray]:
+    """pack_document_vectors()로 직렬화된 데이터 복원"""
+    header_length = int.from_bytes(data[:4], "big")
+    header = json.loads(zlib.decompress(data[4 : 4 + header_length]).decode("utf-8"))
+    matrix = np.frombuffer(data[4 + header_length :], dtype="float16").reshape(
+        len(header["ids"]), header["dim"]
+    )
+    return header["ids"], header["texts"], matrix.astype("float32")
+
+
+def _nodes_to_payload(
+    nodes_data: list[dict[str, Any]],
+) -> tuple[bytes, bytes] | None:
+    """직렬화된 노드 리스트(doc:{doc_id}의 nodes 필드)를 코퍼스 저장 형식으로 변환"""
+    rows = [node for node in nodes_data if node.get("embedding")]
+    if not rows:
+        return None
+    return pack_document_vectors(
+        [node["id_"] for node in rows],
+        [node.get("text", "") for node in rows],
+        [node["embedding"] for node in rows],
+    )
+
+
+# ============================================================================
+# 증분 갱신
+# ============================================================================
+
+
+async def upsert_corpus_document(doc_id: str, nodes_data: list[dict[str, Any]]) -> bool:
+    """
+    문서를 코퍼스 인덱스에 추가/갱신
+
+    Args:
+        doc_id: 문서 ID
+        nodes_data: 직렬화된 노드 리스트 (id_, text, embedding 포함)
+
+    Returns:
+        인덱싱 여부 (임베딩이 없으면 False)
+    """
+    packed = await asyncio.to_thread(_nodes_to_payload, nodes_data)
+    if packed is None:
+        return False
+
+    payload, centroid = packed
+    client = await get_redis_client()
+    async with client.pipeline(transaction=True) as pipe:
+        pipe.hset(get_shard_key(get_shard_id(doc_id)), doc_id, payload)
+        pipe.hset(CENTROIDS_KEY, doc_id, centroid)
+        pipe.incr(VERSION_KEY)
+        await pipe.execute()
+    return True
+
+
+async def remove_corpus_document(doc_id: str) -> None:
+    """코퍼스 인덱스에서 문서 제거"""
+    client = await get_redis_client()
+    async with client.pipeline(transaction=True) as pipe:
+        pipe.hdel(get_shard_key(get_shard_id(doc_id)), doc_id)
+        pipe.hdel(CENTROIDS_KEY, doc_id)
+        pipe.incr(VERSION_KEY)
+        await pipe.execute()
+
+
+async def rebuild_corpus_index() -> dict[str, Any]:
+    """
+    Redis의 모든 문서로 코퍼스 인덱스 재구성
+
+    문서를 샤드별로 묶어 샤드 단위로 병렬 처리합니다.
+    코퍼스 인덱스 도입 이전에 업로드된 문서나 샤드 수 변경 시 사용합니다.
+
+    Returns:
+        재구성 통계 (문서 수, 샤드별 문서 수)
+    """
+    client = await get_redis_client()
+
+    doc_ids_by_shard: dict[int, list[str]] = {}
+    async for key in client.scan_iter(match="doc:*", count=500):
+        doc_id = key.decode("utf-8").removeprefix("doc:")
+        doc_ids_by_shard.setdefault(get_shard_id(doc_id), []).append(doc_id)
+
+    semaphore = asyncio.Semaphore(CORPUS_REBUILD_CONCURRENCY)
+
+    async def build_shard(shard_id: int, doc_ids: list[str]) -> int:
+        async with semaphore:
+            shard_mapping: dict[str, bytes] = {}
+            centroid_mapping: dict[str, bytes] = {}
+            for doc_id in doc_ids:
+                nodes_bytes = await client.hget(f"doc:{doc_id}", "nodes")  # type: ignore
+                if not nodes_bytes:
+                    continue
+                packed = await asyncio.to_thread(
+                    lambda data=nodes_bytes: _nodes_to_payload(json.loads(data))
+                )
+                if packed is not None:
+                    shard_mapping[doc_id], centroid_mapping[doc_id] = packed
+
+            if shard_mapping:
+                async with client.pipeline(transaction=True) as pipe:
+                    pipe.hset(get_shard_key(shard_id), mapping=shard_mapping)
+                    pipe.hset(CENTROIDS_KEY, mapping=centroid_mapping)
+                    await pipe.execute()
+            return len(shard_mapping)
+
+    # 삭제된 문서의 centroid가 남지 않도록 초기화 후 재구성
+    await client.delete(CENTROIDS_KEY)
+    await client.delete(*[get_shard_key(i) for i in range(CORPUS_SHARD_COUNT)])
+
+    counts = await asyncio.gather(
+        *(
+            build_shard(shard_id, doc_ids)
+            for shard_id, doc_ids in doc_ids_by_shard.items()
+        )
+    )
+    await client.incr(VERSION_KEY)
+
+    return {
+        "documents": sum(counts),
+        "shard_count": CORPUS_SHARD_COUNT,
+        "documents_per_shard": dict(zip(doc_ids_by_shard, counts, strict=True)),
+    }
+
+
+# ============================================================================
+# 검색
+# ============================================================================
+
+
+class _CorpusCache:
+    """
+    centroid 행렬과 샤드 데이터의 프로세스 캐시
+
+    corpus:version이 바뀌면 centroid를 다시 읽고, 샤드 데이터는 체크섬이
+    그대로인 문서는 Redis에서 다시 가져오지 않습니다 (LRU, 최대 CORPUS_CACHE_DOCUMENTS).
+    """
+
+    def __init__(self) -> None:
+        self.version: bytes | None = None
+        self.doc_ids: list[str] = []
+        self.checksums: dict[str, bytes] = {}
+        self.centroids: np.ndarray = np.zeros((0, 0), dtype="float32")
+        self.documents: OrderedDict[
+            str, tuple[bytes, list[str], list[str], np.ndarray]
+        ] = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    async def refresh(self) -> None:
+        client = await get_redis_client()
+        version = await client.get(VERSION_KEY)
+        if version == self.version and self.version is not None:
+            return
+
+        async with self._lock:
+            if version == self.version and self.version is not None:
+                return
+            raw = await client.hgetall(CENTROIDS_KEY)  # type: ignore
+            doc_ids = [doc_id.decode("utf-8") for doc_id in raw]
+            self.checksums = {
+                doc_id: value[:4]
+                for doc_id, value in zip(doc_ids, raw.values(), strict=True)
+            }
+            self.centroids = (
+                np.vstack(
+                    [
+                        np.frombuffer(value[4:], dtype="float32")
+                        for value in raw.values()
+                    ]
+                )
+                if raw
+                else np.zeros((0, 0), dtype="float32")
+            )
+            self.doc_ids, self.version = doc_ids, version
+
+    async def get_documents(
+        self, doc_ids: list[str]
+    ) -> dict[str, tuple[list[str], list[str], np.ndarray]]:
+        """
+        문서별 (node_ids, texts, 행렬) 조회
+
+        캐시에 없거나 체크섬이 바뀐 문서만 샤드별로 병렬 HMGET 합니다.
+        """
+        client = await get_redis_client()
+
+        missing_by_shard: dict[int, list[str]] = {}
+        for doc_id in doc_ids:
+            cached = self.documents.get(doc_id)
+            if cached is None or cached[0] != self.checksums.get(doc_id):
+                missing_by_shard.setdefault(get_shard_id(doc_id), []).append(doc_id)
+
+        async def fetch(shard_id: int, shard_doc_ids: list[str]):
+            values = await client.hmget(get_shard_key(shard_id), shard_doc_ids)  # type: ignore
+            return list(zip(shard_doc_ids, values, strict=True))
+
+        for pairs in await asyncio.gather(
+            *(fetch(shard_id, ids) for shard_id, ids in missing_by_shard.items())
+        ):
+            for doc_id, payload in pairs:
+                if payload is None:
+                    continue
+                self.documents[doc_id] = (
+                    zlib.crc32(payload).to_bytes(4, "big"),
+                    *unpack_document_vectors(payload),
+                )
+
+        results: dict[str, tuple[list[str], list[str], np.ndarray]] = {}
+        for doc_id in doc_ids:
+            cached = self.documents.get(doc_id)
+            if cached is not None:
+                self.documents.move_to_end(doc_id)
+                results[doc_id] = cached[1:]
+
+        while len(self.documents) > max(CORPUS_CACHE_DOCUMENTS, len(doc_ids)):
+            self.documents.popitem(last=False)
+
+        return results
+
+
+_corpus_cache = _CorpusCache()
+
+
+def _search_documents(
+    query: np.ndarray,
+    documents: dict[str, tuple[list[str], list[str], np.ndarray]],
+    top_k: int,
+) -> list[CorpusHit]:
+    """후보 문서들의 노드 행렬과 질의 벡터 내적으로 전역 top_k 선택"""
+    candidates: list[tuple[float, str, int]] = []
+    for doc_id, (_, _, matrix) in documents.items():
+        scores = matrix @ query
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        candidates.extend((float(scores[i]), doc_id, int(i)) for i in top)
+
+    hits = []
+    for score, doc_id, position in heapq.nlargest(top_k, candidates):
+        node_ids, texts, _ = documents[doc_id]
+        hits.append(CorpusHit(doc_id, node_ids[position], texts[position], score))
+    return hits
+
+
+async def search_corpus(
+    query_embedding: list[float],
+    top_k: int = 10,
+    max_documents: int = CORPUS_CANDIDATE_DOCUMENTS,
+) -> tuple[list[CorpusHit], dict[str, Any]]:
+    """
+    코퍼스 전체 검색
+
+    1) 문서 중심 벡터와 질의 유사도로 상위 max_documents개 문서 선택
+    2) 후보 문서가 속한 샤드에서만 노드 벡터를 가져와 정밀 검색
+
+    Args:
+        query_embedding: 질의 임베딩
+        top_k: 반환할 노드 수
+        max_documents: 정밀 검색할 후보 문서 수
+
+    Returns:
+        tuple: (CorpusHit 리스트 (점수 내림차순), 검색 통계)
+    """
+    await _corpus_cache.refresh()
+
+    stats: dict[str, Any] = {
+        "indexed_documents": len(_corpus_cache.doc_ids),
+        "candidate_documents": 0,
+        "searched_shards": 0,
+    }
+    if not _corpus_cache.doc_ids:
+        return [], stats
+
+    query = np.asarray(query_embedding, dtype="float32")
+    query /= np.linalg.norm(query) or 1.0
+
+    # 1단계: centroid로 후보 문서 선택 (샤드 가지치기)
+    centroid_scores = _corpus_cache.centroids @ query
+    num_candidates = min(max_documents, len(centroid_scores))
+    candidate_rows = np.argpartition(-centroid_scores, num_candidates - 1)[
+        :num_candidates
+    ]
+    candidate_doc_ids = [_corpus_cache.doc_ids[row] for row in candidate_rows]
+
+    # 2단계: 후보 문서 노드 정밀 검색 (샤드별 병렬 후 병합)
+    documents = await _corpus_cache.get_documents(candidate_doc_ids)
+
+    documents_by_shard: dict[int, dict] = {}
+    for doc_id, document in documents.items():
+        documents_by_shard.setdefault(get_shard_id(doc_id), {})[doc_id] = document
+
+    shard_hits = await asyncio.gather(
+        *(
+            asyncio.to_thread(_search_documents, query, shard_documents, top_k)
+            for shard_documents in documents_by_shard.values()
+        )
+    )
+    hits = heapq.nlargest(
+        top_k, (hit for hits in shard_hits for hit in hits), key=lambda h: h.score
+    )
+
+    stats["candidate_documents"] = len(documents)
+    stats["searched_shards"] = len(documents_by_shard)
+    return hits, stats
+
+
+async def get_corpus_stats() -> dict[str, Any]:
+    """코퍼스 인덱스 상태 (문서 수, 샤드별 문서 수)"""
+    client = await get_redis_client()
+    shard_sizes = await asyncio.gather(
+        *(client.hlen(get_shard_key(i)) for i in range(CORPUS_SHARD_COUNT))  # type: ignore
+    )
+    return {
+        "indexed_documents": await client.hlen(CENTROIDS_KEY),  # type: ignore
+        "shard_count": CORPUS_SHARD_COUNT,
+        "documents_per_shard": dict(enumerate(shard_sizes)),
+    }
+
+
+async def synthesize_per_document(
+    query: str,
+    hits: list[CorpusHit],
+    max_documents: int = 3,
+    response_mode: str = "compact",
+) -> dict[str, str]:
+    """
+    검색 결과를 문서별로 묶어 문서마다 답변 생성 (문서 간 병렬)
+
+    Args:
+        query: 질문
+        hits: search_corpus() 결과 (점수 내림차순)
+        max_documents: 답변을 생성할 상위 문서 수
+        response_mode: 응답 모드 (compact, tree_summarize 등)
+
+    Returns:
+        {doc_id: 답변} 딕셔너리 (최고 점수 문서 순)
+    """
+    hits_by_doc: dict[str, list[CorpusHit]] = {}
+    for hit in hits:
+        if hit.doc_id in hits_by_doc or len(hits_by_doc) < max_documents:
+            hits_by_doc.setdefault(hit.doc_id, []).append(hit)
+
+    synthesizer = get_response_synthesizer(response_mode=response_mode)  # type: ignore[arg-type]
+
+    async def synthesize(doc_hits: list[CorpusHit]) -> str:
+        nodes = [
+            NodeWithScore(
+                node=TextNode(id_=hit.node_id, text=hit.text), score=hit.score
+            )
+            for hit in doc_hits
+        ]
+        response = await synthesizer.asynthesize(query, nodes=nodes)
+        return str(response)
+
+    answers = await asyncio.gather(
+        *(synthesize(doc_hits) for doc_hits in hits_by_doc.values())
+    )
+    return dict(zip(hits_by_doc, answers, strict=True))
@@ -8,6 +8,7 @@ import json
 import os
 import warnings
 from collections.abc import AsyncIterator
+from functools import lru_cache
 from pathlib import Path
 
 # LlamaIndex 내부의 Pydantic validate_default 경고 억제
@@ -25,8 +26,25 @@ from llama_index.core.schema import (  # noqa: E402
     RelatedNodeInfo,
     TextNode,
 )
+from llama_index.core.vector_stores import (  # noqa: E402
+    ExactMatchFilter,
+    MetadataFilters,
+)
 from llama_index.readers.file import PyMuPDFReader  # noqa: E402
 
+from app.utils.keyword_index import KeywordAutomaton  # noqa: E402
+from app.utils.lexical_index import LexicalIndex  # noqa: E402
+from app.utils.retrieval import (  # noqa: E402
+    attach_ann_index,
+    build_query_engine,
+    set_index_component,
+)
+from app.utils.summary_tree import build_summary_tree  # noqa: E402
+from app.utils.synthesis import get_synthesis_stats  # noqa: E402
+
+# 인덱싱 단계에서 태깅되는 예외 조항 메타데이터 키 (임베딩/LLM 입력에서는 제외)
+EXCEPTION_METADATA_KEYS = ["has_exception_clause", "exception_keywords"]
+
 
 async def load_pdf_from_path(pdf_path: str) -> list[Document]:
     """
@@ -55,6 +73,8 @@ async def create_hierarchical_index(
     child_chunk_size: int = 512,
     parent_chunk_overlap: int = 100,
     child_chunk_overlap: int = 50,
+    index_type: str = "auto",
+    summary_tree: bool = False,
 ) -> tuple[VectorStoreIndex, int, int]:
     """
     계층적 인덱스 생성
@@ -68,6 +88,8 @@ async def create_hierarchical_index(
         child_chunk_size: Child 청크 크기 (기본값: 512)
         parent_chunk_overlap: Parent 청크 오버랩 (기본값: 100)
         child_chunk_overlap: Child 청크 오버랩 (기본값: 50)
+        index_type: 벡터 인덱스 유형 (auto, flat, ivf, hnsw)
+        summary_tree: 개요 질문용 요약 트리(RAPTOR) 생성 여부 (군집별 LLM 요약 호출 발생)
 
     Returns:
         tuple: (VectorStoreIndex, 전체 노드 수, Child 노드 수)
@@ -127,9 +149,24 @@ async def create_hierarchical_index(
     # Child 노드만으로 인덱스 생성
     child_nodes_only = [n for n in all_nodes if n.metadata.get("node_type") == "child"]
 
+    # 예외 조항 키워드 태깅 (검색 시 메타데이터 필터로 사용)
+    tag_exception_clauses(child_nodes_only)
+
     # 벡터 인덱스 생성
     index = VectorStoreIndex(child_nodes_only)
 
+    # 어휘(n-gram BM25) 인덱스 생성 - hybrid 검색 모드에서 사용
+    set_index_component(index, "lexical", LexicalIndex.build(child_nodes_only))
+
+    # 노드 수가 많은 문서는 FAISS ANN 인덱스 연결 (flat이면 기존 전수 비교 검색)
+    attach_ann_index(index, index_type)
+
+    # 개요 질문용 요약 트리 (선택) - Child 인덱스 옆에 별도 인덱스로 연결
+    if summary_tree:
+        tree_index = await build_summary_tree(index)
+        if tree_index is not None:
+            set_index_component(index, "summary_tree", tree_index)
+
     return index, len(all_nodes), len(child_nodes_only)
 
 
@@ -271,6 +308,66 @@ def get_exception_keywords() -> list[str]:
     return ["다만", "단서", "예외", "제외", "이 경우", "특례", "불구하고"]
 
 
+@lru_cache(maxsize=1)
+def get_exception_automaton() -> KeywordAutomaton:
+    """
+    기본 예외 키워드로 구성된 Aho–Corasick 오토마톤 반환 (캐시)
+
+    Returns:
+        KeywordAutomaton 인스턴스
+    """
+    return KeywordAutomaton(get_exception_keywords())
+
+
+def tag_exception_clauses(nodes: list[TextNode]) -> int:
+    """
+    노드별 예외 조항 키워드 태깅
+
+    각 노드의 메타데이터에 다음 필드를 추가합니다.
+    - has_exception_clause: 예외 키워드 포함 여부 (메타데이터 필터용)
+    - exception_keywords: 발견된 예외 키워드 리스트
+
+    태깅 필드는 임베딩/LLM 입력 텍스트에서 제외됩니다.
+
+    Args:
+        nodes: 태깅할 TextNode 리스트
+
+    Returns:
+        예외 키워드를 포함한 노드 수
+    """
+    automaton = get_exception_automaton()
+    tagged_count = 0
+
+    for node in nodes:
+        found_keywords = automaton.find_keywords(node.get_content())
+        node.metadata["has_exception_clause"] = bool(found_keywords)
+        node.metadata["exception_keywords"] = found_keywords
+
+        for key in EXCEPTION_METADATA_KEYS:
+            if key not in node.excluded_embed_metadata_keys:
+                node.excluded_embed_metadata_keys.append(key)
+            if key not in node.excluded_llm_metadata_keys:
+                node.excluded_llm_metadata_keys.append(key)
+
+        if found_keywords:
+            tagged_count += 1
+
+    return tagged_count
+
+
+def build_exception_filters() -> MetadataFilters:
+    """
+    예외 키워드가 태깅된 노드만 검색하는 메타데이터 필터 생성
+
+    Returns:
+        has_exception_clause 필터 (as_query_engine의 filters 인자로 사용)
+    """
+    # MetadataFilter는 bool 값을 허용하지 않으므로 1로 비교 (True == 1)
+    return MetadataFilters(
+        filters=[ExactMatchFilter(key="has_exception_clause", value=1)]
+    )
+
+
 def highlight_exception_sources(
     source_references: list[dict], exception_keywords: list[str] | None = None
 ) -> list[dict]:
@@ -297,17 +394,17 @@ def highlight_exception_sources(
         ["다만"]
     """
     if exception_keywords is None:
-        exception_keywords = get_exception_keywords()
+        automaton = get_exception_automaton()
+    else:
+        automaton = KeywordAutomaton(exception_keywords)
 
     highlighted_sources = []
 
     for ref in source_references:
         full_text = ref.get("full_text", "")
 
-        # 텍스트에서 발견된 예외 키워드 추출
-        found_keywords = [
-            keyword for keyword in exception_keywords if keyword in full_text
-        ]
+        # 텍스트에서 발견된 예외 키워드 추출 (단일 순회)
+        found_keywords = automaton.find_keywords(full_text)
 
         if found_keywords:
             ref["found_exception_keywords"] = found_keywords
@@ -322,31 +419,40 @@ def highlight_exception_sources(
 async def generate_structured_query(
     index: VectorStoreIndex,
     query: str,
-    response_mode: str = "tree_summarize",
+    response_mode: str = "auto",
     top_k: int = 20,
-) -> tuple[str, list]:
+    retrieval_mode: str = "vector",
+    node_postprocessors: list | None = None,
+) -> tuple[str, list, dict | None]:
     """
     구조화된 쿼리 실행 (보고서, 체크리스트 등)
 
     Args:
         index: LlamaIndex VectorStoreIndex
         query: 쿼리 문자열
-        response_mode: 응답 모드 (tree_summarize, compact 등)
+        response_mode: 응답 모드 (auto, tree_summarize, compact 등)
         top_k: 검색할 청크 개수
+        retrieval_mode: 검색 모드 (vector, hybrid)
+        node_postprocessors: 검색 후 적용할 노드 후처리기 (재순위화 등)
 
     Returns:
-        tuple: (응답 텍스트, 소스 노드 리스트)
+        tuple: (응답 텍스트, 소스 노드 리스트, 응답 생성 통계)
+            응답 생성 통계는 auto 모드에서만 기록됩니다 (그 외 None).
 
     Examples:
-        >>> response_text, source_nodes = await generate_structured_query(
+        >>> response_text, source_nodes, synthesis = await generate_structured_query(
         ...     index=my_index,
         ...     query="문서의 주요 내용을 요약해주세요",
-        ...     response_mode="tree_summarize",
+        ...     response_mode="auto",
         ...     top_k=20
         ... )
     """
-    query_engine = index.as_query_engine(
-        similarity_top_k=top_k, response_mode=response_mode
+    query_engine = build_query_engine(
+        index,
+        similarity_top_k=top_k,
+        response_mode=response_mode,
+        retrieval_mode=retrieval_mode,
+        node_postprocessors=node_postprocessors,
     )
 
     response = query_engine.query(query)
@@ -354,4 +460,4 @@ async def generate_structured_query(
     response_text = str(response)
     source_nodes = getattr(response, "source_nodes", [])
 
-    return response_text, source_nodes
+    return response_text, source_nodes, get_synthesis_stats(query_engine)
@@ -0,0 +1,226 @@
+"""
+문서 전체 요약 (병렬 map-reduce + Redis 요약 캐시)
+
+검색된 top_k 청크가 아니라 문서의 모든 Parent 구간을 요약합니다.
+
+1. map: Parent 구간별 요약을 동시 실행 수를 제한하여 병렬 생성
+2. reduce: 구간 요약을 AdaptiveSynthesizer로 결합 (많으면 묶음 단위로 계층 결합)
+
+구간 요약은 질문과 무관하므로 Redis에 캐시하여, 같은 문서를 다시 요약할 때는
+reduce 단계만 실행합니다. 캐시 필드는 구간 텍스트 해시를 포함하므로 재업로드로
+내용이 바뀐 구간만 다시 요약됩니다.
+
+Redis 키:
+- summary:{doc_id} (hash) "{parent_index}:{텍스트 해시}" -> 구간 요약
+
+Usage:
+    from app.utils.document_summary import summarize_document
+
+    index, _ = await load_index_from_redis("policy_2025")
+    text, stats = await summarize_document("policy_2025", index, "이 문서를 요약해 주세요.")
+    print(stats)  # {"sections": 42, "cached_sections": 42, "mapped_sections": 0, ...}
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import warnings
+from typing import Any
+
+# LlamaIndex 내부의 Pydantic validate_default 경고 억제
+warnings.filterwarnings(
+    "ignore",
+    category=UserWarning,
+    message=".*validate_default.*",
+    module="pydantic._internal._generate_schema",
+)
+
+from llama_index.core import Settings, VectorStoreIndex  # noqa: E402
+from llama_index.core.llms import LLM  # noqa: E402
+from llama_index.core.prompts import PromptTemplate  # noqa: E402
+
+from app.utils.context_packer import merge_overlapping_text  # noqa: E402
+from app.utils.redis_client import get_redis_client  # noqa: E402
+from app.utils.synthesis import AdaptiveSynthesizer  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+# map 단계 동시 LLM 호출 수
+DOCUMENT_SUMMARY_CONCURRENCY = int(os.getenv("DOCUMENT_SUMMARY_CONCURRENCY", "8"))
+
+# 구간 요약 캐시 TTL (초, 0이면 만료 없음)
+DOCUMENT_SUMMARY_CACHE_TTL = int(os.getenv("DOCUMENT_SUMMARY_CACHE_TTL", "0"))
+
+SECTION_SUMMARY_PROMPT = PromptTemplate(
+    "다음은 문서의 한 구간입니다.\n"
+    "---------------------\n"
+    "{section}\n"
+    "---------------------\n"
+    "이 구간의 목적, 주요 규정과 절차, 대상, 수치·금액·일정, 예외 사항을 "
+    "빠짐없이 간결하게 요약해 주세요. 구간에 없는 내용은 추가하지 마세요.\n"
+    "요약: "
+)
+
+
+def get_summary_cache_key(doc_id: str) -> str:
+    return f"summary:{doc_id}"
+
+
+def _cache_field(parent_index: int, text: str) -> str:
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+    return f"{parent_index}:{digest}"
+
+
+def collect_parent_sections(index: VectorStoreIndex) -> list[tuple[int, str]]:
+    """
+    인덱스의 Child 노드로부터 Parent 구간 텍스트 복원
+
+    인덱스에는 Child 노드만 저장되므로 parent_index별로 chunk_index 순서대로
+    모아 겹치는 부분(child_chunk_overlap)을 한 번만 남기고 연결합니다.
+    계층 메타데이터가 없는 노드는 각각 하나의 구간으로 취급합니다.
+
+    Returns:
+        (parent_index, 구간 텍스트) 리스트 (문서 순서)
+    """
+    children: dict[int, list[tuple[int, str]]] = {}
+    orphans: list[str] = []
+
+    for node in index.docstore.docs.values():
+        metadata = node.metadata
+        if "parent_index" in metadata:
+            children.setdefault(int(metadata["parent_index"]), []).append(
+                (int(metadata.get("chunk_index", 0)), node.get_content())
+            )
+        else:
+            orphans.append(node.get_content())
+
+    sections: list[tuple[int, str]] = []
+    for parent_index in sorted(children):
+        texts = [text for _, text in sorted(children[parent_index])]
+        merged = texts[0]
+        for text in texts[1:]:
+            merged = merge_overlapping_text(merged, text)
+        sections.append((parent_index, merged))
+
+    # 계층 메타데이터가 없는 노드는 Parent 구간 뒤에 배치
+    next_index = (sections[-1][0] + 1) if sections else 0
+    sections.extend((next_index + offset, text) for offset, text in enumerate(orphans))
+    return sections
+
+
+async def summarize_sections(
+    doc_id: str,
+    sections: list[tuple[int, str]],
+    max_concurrency: int | None = None,
+    llm: LLM | None = None,
+) -> tuple[list[str], dict[str, Any]]:
+    """
+    구간별 요약 생성 (캐시에 있는 구간은 재사용)
+
+    Args:
+        doc_id: 문서 ID (캐시 키)
+        sections: collect_parent_sections() 결과
+        max_concurrency: 동시 LLM 호출 수 (None이면 DOCUMENT_SUMMARY_CONCURRENCY)
+        llm: 요약에 사용할 LLM (None이면 Settings.llm)
+
+    Returns:
+        tuple: (구간 순서대로의 요약 리스트, map 통계)
+    """
+    start = time.perf_counter()
+    client = await get_redis_client()
+    cache_key = get_summary_cache_key(doc_id)
+    fields = [_cache_field(parent_index, text) for parent_index, text in sections]
+
+    cached = await client.hmget(cache_key, fields) if fields else []  # type: ignore
+    summaries: list[str | None] = [
+        value.decode("utf-8") if value else None for value in cached
+    ]
+    missing = [position for position, value in enumerate(summaries) if value is None]
+
+    llm = llm or Settings.llm
+    semaphore = asyncio.Semaphore(max_concurrency or DOCUMENT_SUMMARY_CONCURRENCY)
+
+    async def summarize(position: int) -> None:
+        async with semaphore:
+            summaries[position] = await llm.apredict(
+                SECTION_SUMMARY_PROMPT, section=sections[position][1]
+            )
+
+    await asyncio.gather(*(summarize(position) for position in missing))
+
+    if missing:
+        await client.hset(  # type: ignore
+            cache_key,
+            mapping={fields[position]: summaries[position] for position in missing},
+        )
+        if DOCUMENT_SUMMARY_CACHE_TTL > 0:
+            await client.expire(cache_key, DOCUMENT_SUMMARY_CACHE_TTL)
+
+    logger.info(
+        f"구간 요약 완료: doc_id={doc_id}, 캐시 {len(sections) - len(missing)}개, "
+        f"신규 {len(missing)}개"
+    )
+
+    stats = {
+        "sections": len(sections),
+        "cached_sections": len(sections) - len(missing),
+        "mapped_sections": len(missing),
+        "map_time_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+    return [summary or "" for summary in summaries], stats
+
+
+async def summarize_document(
+    doc_id: str,
+    index: VectorStoreIndex,
+    query: str,
+    max_concurrency: int | None = None,
+    llm: LLM | None = None,
+) -> tuple[str, dict[str, Any]]:
+    """
+    문서 전체를 map-reduce로 요약
+
+    Args:
+        doc_id: 문서 ID
+        index: 로드된 VectorStoreIndex
+        query: 최종 결합 단계 지시문 (보고서 형식 등)
+        max_concurrency: map 단계 동시 LLM 호출 수
+        llm: 요약에 사용할 LLM (None이면 Settings.llm)
+
+    Returns:
+        tuple: (응답 텍스트, 통계)
+        - 통계: sections, cached_sections, mapped_sections, map_time_ms,
+          reduce_time_ms, reduce(AdaptiveSynthesizer 통계), llm_calls
+
+    Raises:
+        ValueError: 요약할 내용이 없는 경우
+    """
+    sections = collect_parent_sections(index)
+    if not sections:
+        raise ValueError(f"문서 ID '{doc_id}'에 요약할 내용이 없습니다.")
+
+    summaries, stats = await summarize_sections(doc_id, sections, max_concurrency, llm)
+
+    reduce_start = time.perf_counter()
+    synthesizer = AdaptiveSynthesizer(
+        llm=llm, map_concurrency=max_concurrency or DOCUMENT_SUMMARY_CONCURRENCY
+    )
+    response_text = await synthesizer.aget_response(query, summaries)
+    reduce_stats = synthesizer.stats or {}
+
+    stats.update(
+        {
+            "reduce_time_ms": round((time.perf_counter() - reduce_start) * 1000, 2),
+            "reduce": reduce_stats,
+            "llm_calls": stats["mapped_sections"] + reduce_stats.get("llm_calls", 0),
+        }
+    )
+    return str(response_text), stats
+
+
+async def delete_document_summaries(doc_id: str) -> None:
+    """문서의 구간 요약 캐시 삭제"""
+    client = await get_redis_client()
+    await client.delete(get_summary_cache_key(doc_id))
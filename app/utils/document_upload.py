@@ -21,7 +21,10 @@ from datetime import datetime
 from typing import Any
 
 from app.utils.document_analysis import create_hierarchical_index, load_pdf_from_path
+from app.utils.llm_governor import llm_priority
 from app.utils.redis_index import save_index_to_redis
+from app.utils.retrieval import get_index_component, get_index_type
+from app.utils.summary_tree import get_summary_tree_stats
 
 
 class DocumentUploadResult:
@@ -53,6 +56,8 @@ async def upload_and_index_document(
     child_chunk_size: int = 256,
     parent_chunk_overlap: int = 100,
     child_chunk_overlap: int = 50,
+    index_type: str = "auto",
+    summary_tree: bool = False,
     extra_metadata: dict[str, Any] | None = None,
 ) -> DocumentUploadResult:
     """
@@ -67,6 +72,8 @@ async def upload_and_index_document(
         child_chunk_size: 자식 청크 크기
         parent_chunk_overlap: 부모 청크 오버랩
         child_chunk_overlap: 자식 청크 오버랩
+        index_type: 벡터 인덱스 유형 (auto, flat, ivf, hnsw)
+        summary_tree: 개요 질문용 요약 트리 생성 여부
         extra_metadata: 추가 메타데이터
 
     Returns:
@@ -91,13 +98,24 @@ async def upload_and_index_document(
         # PDF 로드
         documents = await load_pdf_from_path(pdf_path)
 
-        # 계층적 인덱스 생성
-        index, total_nodes, child_nodes = await create_hierarchical_index(
-            documents=documents,
-            parent_chunk_size=parent_chunk_size,
-            child_chunk_size=child_chunk_size,
-            parent_chunk_overlap=parent_chunk_overlap,
-            child_chunk_overlap=child_chunk_overlap,
+        # 계층적 인덱스 생성 (임베딩/요약 트리 호출은 질의보다 낮은 우선순위)
+        with llm_priority("background"):
+            index, total_nodes, child_nodes = await create_hierarchical_index(
+                documents=documents,
+                parent_chunk_size=parent_chunk_size,
+                child_chunk_size=child_chunk_size,
+                parent_chunk_overlap=parent_chunk_overlap,
+                child_chunk_overlap=child_chunk_overlap,
+                index_type=index_type,
+                summary_tree=summary_tree,
+            )
+        tree_stats = get_summary_tree_stats(get_index_component(index, "summary_tree"))
+
+        # 예외 조항 키워드가 태깅된 노드 수 (find-exceptions 필터 사용 여부 판단)
+        exception_clause_nodes = sum(
+            1
+            for node in index.docstore.docs.values()
+            if node.metadata.get("has_exception_clause")
         )
 
         # 메타데이터 준비
@@ -109,6 +127,9 @@ async def upload_and_index_document(
             "child_nodes": child_nodes,
             "parent_nodes": total_nodes - child_nodes,
             "analysis_type": analysis_type,
+            "exception_clause_nodes": exception_clause_nodes,
+            "index_type": get_index_type(index),
+            **tree_stats,
             "created_at": datetime.now().isoformat(),
             "chunk_config": {
                 "parent_chunk_size": parent_chunk_size,
@@ -140,6 +161,8 @@ async def upload_and_index_document(
                 "child_nodes": child_nodes,
                 "parent_nodes": total_nodes - child_nodes,
                 "analysis_type": analysis_type,
+                "index_type": metadata["index_type"],
+                **tree_stats,
                 "storage": "Redis",
                 "execution_time_ms": round(execution_time_ms, 2),
             },
@@ -0,0 +1,269 @@
+"""
+구조화 추출 다중 항목 패킹
+
+짧은 입력 텍스트가 많을 때 텍스트마다 LLM을 호출하지 않고, 토큰 예산 안에서 여러 텍스트를
+번호를 붙여 한 프롬프트에 묶고 리스트 타입 Pydantic 스키마로 한 번에 추출합니다.
+- 그룹 크기는 입력 토큰 예산(PACK_TOKEN_BUDGET)과 항목 수 상한(PACK_MAX_ITEMS)으로 결정
+- 결과는 item_number로 원래 입력에 되돌려 배치
+- 그룹 호출 실패, 누락/중복 번호, 스키마 검증 실패 항목은 항목별 호출로 대체
+- 마지막 줄에 실제 LLM 호출 수와 절약한 호출 수 보고
+
+Usage:
+    from app.utils.extraction_packing import packed_output_model, stream_packed_extraction
+
+    packed_chain = prompt | llm.with_structured_output(packed_output_model(Person))
+    async for line in stream_packed_extraction(packed_chain, single_chain, texts):
+        print(line)
+"""
+
+import asyncio
+import os
+import time
+from collections import Counter
+from collections.abc import AsyncIterator
+from functools import lru_cache
+from typing import Any
+
+from langchain_core.runnables import Runnable
+from pydantic import BaseModel, Field, create_model
+
+from app.utils.chain_batch import (
+    CHAIN_BATCH_CONCURRENCY,
+    CHAIN_BATCH_RETRIES,
+    error_fields,
+    invoke_with_retry,
+)
+from app.utils.response_wrapper import ndjson_line
+from app.utils.tokens import count_tokens
+
+# 패킹 그룹 1개의 입력 텍스트 토큰 예산 / 그룹당 최대 항목 수 (출력 길이 상한)
+PACK_TOKEN_BUDGET = int(os.getenv("PACK_TOKEN_BUDGET", "2000"))
+PACK_MAX_ITEMS = int(os.getenv("PACK_MAX_ITEMS", "20"))
+
+# 번호 표시 등 항목당 프롬프트 오버헤드 (토큰)
+_ITEM_OVERHEAD_TOKENS = 8
+
+
+@lru_cache
+def packed_output_model(model: type[BaseModel]) -> type[BaseModel]:
+    """
+    여러 입력의 추출 결과를 한 번에 받는 리스트 스키마 생성
+
+    Person → PackedPersonList(items: list[NumberedPerson(Person 필드 + item_number)])
+    """
+    item_model = create_model(
+        f"Numbered{model.__name__}",
+        __base__=model,
+        item_number=(int, Field(description="결과에 해당하는 입력 텍스트 번호")),
+    )
+    return create_model(
+        f"Packed{model.__name__}List",
+        __doc__=f"번호가 붙은 입력 텍스트별 {model.__name__} 추출 결과 목록",
+        items=(
+            list[item_model],
+            Field(description="입력 텍스트마다 정확히 1개씩, item_number로 구분"),
+        ),
+    )
+
+
+def pack_texts(
+    texts: list[str],
+    token_budget: int | None = None,
+    max_items: int | None = None,
+) -> list[list[int]]:
+    """
+    입력 텍스트를 토큰 예산 단위 그룹으로 분할 (입력 순서 유지)
+
+    예산보다 긴 텍스트는 단독 그룹이 됩니다.
+
+    Returns:
+        그룹별 입력 index 리스트
+
+    Examples:
+        >>> pack_texts(["a", "b", "c"], token_budget=2000, max_items=2)
+        [[0, 1], [2]]
+    """
+    token_budget = token_budget or PACK_TOKEN_BUDGET
+    max_items = max_items or PACK_MAX_ITEMS
+
+    groups: list[list[int]] = []
+    current: list[int] = []
+    current_tokens = 0
+    for position, text in enumerate(texts):
+        tokens = count_tokens(text) + _ITEM_OVERHEAD_TOKENS
+        if current and (
+            current_tokens + tokens > token_budget or len(current) >= max_items
+        ):
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(position)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def render_packed_texts(texts: list[str], indices: list[int]) -> str:
+    """그룹 텍스트를 번호(1부터)를 붙여 프롬프트 본문으로 변환"""
+    return "\n".join(
+        f"[{number}] {texts[position]}"
+        for number, position in enumerate(indices, start=1)
+    )
+
+
+def split_packed_items(
+    packed: BaseModel, indices: list[int], model: type[BaseModel]
+) -> dict[int, BaseModel]:
+    """
+    패킹 결과를 원래 입력 index별로 분리
+
+    범위를 벗어나거나 중복된 item_number, 원래 스키마 검증에 실패한 항목은 제외합니다
+    (호출자가 항목별 호출로 대체).
+
+    Returns:
+        입력 index → 원래 모델 인스턴스
+    """
+    counts = Counter(item.item_number for item in packed.items)
+    results: dict[int, BaseModel] = {}
+    for item in packed.items:
+        number = item.item_number
+        if not 1 <= number <= len(indices) or counts[number] > 1:
+            continue
+        try:
+            results[indices[number - 1]] = model.model_validate(
+                item.model_dump(exclude={"item_number"})
+            )
+        except ValueError:
+            continue
+    return results
+
+
+async def stream_packed_extraction(
+    packed_chain: Runnable,
+    single_chain: Runnable,
+    texts: list[str],
+    model: type[BaseModel],
+    token_budget: int | None = None,
+    max_items: int | None = None,
+    max_concurrency: int | None = None,
+    timeout: float | None = None,
+    max_retries: int | None = None,
+) -> AsyncIterator[str]:
+    """
+    패킹 그룹 단위로 추출하고 결과를 그룹 완료 순서대로 NDJSON 스트리밍
+
+    Args:
+        packed_chain: {"texts", "count"} 입력 → packed_output_model(model) 출력 체인
+        single_chain: {"text"} 입력 → model 출력 체인 (대체 호출용)
+        texts: 입력 텍스트 리스트
+        model: 항목별 출력 Pydantic 모델
+        token_budget: 그룹당 입력 토큰 예산 (None이면 PACK_TOKEN_BUDGET)
+        max_items: 그룹당 최대 항목 수 (None이면 PACK_MAX_ITEMS)
+        max_concurrency: 동시 LLM 호출 수 (None이면 CHAIN_BATCH_CONCURRENCY)
+        timeout: 시도 1회당 타임아웃 초
+        max_retries: 재시도 횟수
+
+    Yields:
+        NDJSON 문자열
+        - 항목별: {"index", "input", "result", "group", "packed", "execution_time_ms"}
+          (packed=false면 항목별 대체 호출 결과)
+        - 실패 시: {"index", "input", "error", "error_type", "group", "packed": false, ...}
+        - 마지막 줄: {"done": true, "total", "succeeded", "failed", "failed_indices",
+          "groups", "packed_items", "fallback_items", "llm_calls", "calls_saved" (재시도 제외),
+          "time_to_first_result_ms", "execution_time_ms"}
+    """
+    start = time.perf_counter()
+    retries = CHAIN_BATCH_RETRIES if max_retries is None else max_retries
+    groups = pack_texts(texts, token_budget, max_items)
+    semaphore = asyncio.Semaphore(max_concurrency or CHAIN_BATCH_CONCURRENCY)
+
+    def line_for(position: int, group: int, packed: bool, started: float) -> dict:
+        return {
+            "index": position,
+            "input": texts[position],
+            "group": group,
+            "packed": packed,
+            "execution_time_ms": (time.perf_counter() - started) * 1000,
+        }
+
+    async def fallback(position: int, group: int) -> dict[str, Any]:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result, _ = await invoke_with_retry(
+                    single_chain, {"text": texts[position]}, timeout, retries
+                )
+                return {
+                    **line_for(position, group, False, started),
+                    "result": result.model_dump(),
+                }
+            except Exception as e:
+                return {**line_for(position, group, False, started), **error_fields(e)}
+
+    async def run_group(group: int, indices: list[int]) -> list[dict[str, Any]]:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                packed, _ = await invoke_with_retry(
+                    packed_chain,
+                    {
+                        "texts": render_packed_texts(texts, indices),
+                        "count": len(indices),
+                    },
+                    timeout,
+                    retries,
+                )
+                results = split_packed_items(packed, indices, model)
+            except Exception:
+                results = {}
+
+        lines = [
+            {**line_for(position, group, True, started), "result": result.model_dump()}
+            for position, result in results.items()
+        ]
+        # 패킹 결과에서 빠진 항목은 항목별 호출로 대체 (각 호출이 동시 실행 슬롯을 따로 사용)
+        missing = [position for position in indices if position not in results]
+        lines.extend(
+            await asyncio.gather(*(fallback(position, group) for position in missing))
+        )
+        return lines
+
+    tasks = [
+        asyncio.create_task(run_group(group, indices))
+        for group, indices in enumerate(groups)
+    ]
+
+    failed_indices: list[int] = []
+    fallback_items = 0
+    first_result_ms = None
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            for line in await next_done:
+                if first_result_ms is None:
+                    first_result_ms = (time.perf_counter() - start) * 1000
+                fallback_items += not line["packed"]
+                if "error" in line:
+                    failed_indices.append(line["index"])
+                yield ndjson_line(line)
+    finally:
+        # 클라이언트 연결이 끊긴 경우 남은 그룹 취소
+        for task in tasks:
+            task.cancel()
+
+    llm_calls = len(groups) + fallback_items
+    yield ndjson_line(
+        {
+            "done": True,
+            "total": len(texts),
+            "succeeded": len(texts) - len(failed_indices),
+            "failed": len(failed_indices),
+            "failed_indices": sorted(failed_indices),
+            "groups": len(groups),
+            "packed_items": len(texts) - fallback_items,
+            "fallback_items": fallback_items,
+            "llm_calls": llm_calls,
+            "calls_saved": len(texts) - llm_calls,
+            "time_to_first_result_ms": first_result_ms,
+            "execution_time_ms": (time.perf_counter() - start) * 1000,
+        }
+    )
@@ -0,0 +1,196 @@
+"""
+공유 HTTP 연결 풀
+
+OpenAI / LangChain / LlamaIndex 클라이언트가 함께 사용하는 httpx transport를 한 곳에서 생성합니다.
+- 프로세스당 동기/비동기 연결 풀 하나씩 (클라이언트마다 풀과 TLS 세션을 따로 만들지 않음)
+- keep-alive, 연결 수 상한, 타임아웃을 환경 변수로 일괄 설정
+- h2 패키지가 설치되어 있으면 HTTP/2 사용 (연결 하나에서 여러 요청을 다중화)
+- httpcore trace로 요청 수 대비 새 연결/TLS 핸드셰이크 수를 집계 (연결 재사용률)
+
+실제 클라이언트 객체는 LLMGovernor를 거치도록 app.utils.llm_governor에서 조립합니다.
+
+Usage:
+    from app.utils.http_clients import get_http_pool_stats, get_pooled_async_transport
+
+    client = httpx.AsyncClient(transport=get_pooled_async_transport())
+    get_http_pool_stats()["async"]["reuse_ratio"]  # 0.97
+"""
+
+import importlib.util
+import os
+import threading
+from typing import Any
+
+import httpx
+
+# 연결 풀 상한 / keep-alive 유지 연결 수 / 유휴 연결 유지 시간 (초)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+
+# 요청 타임아웃 / 연결 타임아웃 (초)
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "120"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+
+# HTTP/2 사용 여부 ("auto": h2 패키지가 설치되어 있으면 사용)
+HTTP2_MODE = os.getenv("HTTP2", "auto").lower()
+
+HTTP_LIMITS = httpx.Limits(
+    max_connections=HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+)
+HTTP_TIMEOUTS = httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+
+
+def http2_enabled() -> bool:
+    """HTTP/2 사용 여부 (HTTP2=auto이면 h2 설치 여부로 결정)"""
+    if HTTP2_MODE == "auto":
+        return importlib.util.find_spec("h2") is not None
+    return HTTP2_MODE == "true"
+
+
+# ============================================================================
+# 연결 재사용 통계
+# ============================================================================
+
+
+class PoolStats:
+    """httpcore trace 이벤트로 집계하는 연결 재사용 통계"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        self.http2_requests = 0
+
+    def record(self, event: str) -> None:
+        with self._lock:
+            if event == "connection.connect_tcp.complete":
+                self.new_connections += 1
+            elif event == "connection.start_tls.complete":
+                self.tls_handshakes += 1
+            elif event == "http2.send_request_headers.complete":
+                self.http2_requests += 1
+
+    def count_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def snapshot(self, pool: Any) -> dict[str, Any]:
+        # httpcore 연결 풀의 현재 연결 목록 (내부 속성이므로 없으면 0으로 집계)
+        connections = list(getattr(pool, "connections", []))
+        with self._lock:
+            reused = max(self.requests - self.new_connections, 0)
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "tls_handshakes": self.tls_handshakes,
+                "http2_requests": self.http2_requests,
+                "reused_connections": reused,
+                "reuse_ratio": round(reused / self.requests, 4)
+                if self.requests
+                else 0.0,
+                "open_connections": len(connections),
+                "idle_connections": sum(1 for conn in connections if conn.is_idle()),
+            }
+
+
+def _with_trace(request: httpx.Request, trace: Any) -> None:
+    # 호출자가 trace를 직접 지정한 요청은 그대로 둠 (통계에서 연결 이벤트 누락)
+    if "trace" not in request.extensions:
+        request.extensions = {**request.extensions, "trace": trace}
+
+
+class PooledTransport(httpx.BaseTransport):
+    """연결 재사용 통계를 기록하는 동기 연결 풀"""
+
+    def __init__(self):
+        self._transport = httpx.HTTPTransport(limits=HTTP_LIMITS, http2=http2_enabled())
+        self.stats = PoolStats()
+
+    def _trace(self, event_name: str, info: dict) -> None:
+        self.stats.record(event_name)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.count_request()
+        _with_trace(request, self._trace)
+        return self._transport.handle_request(request)
+
+    def snapshot(self) -> dict[str, Any]:
+        return self.stats.snapshot(self._transport._pool)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class PooledAsyncTransport(httpx.AsyncBaseTransport):
+    """연결 재사용 통계를 기록하는 비동기 연결 풀"""
+
+    def __init__(self):
+        self._transport = httpx.AsyncHTTPTransport(
+            limits=HTTP_LIMITS, http2=http2_enabled()
+        )
+        self.stats = PoolStats()
+
+    async def _trace(self, event_name: str, info: dict) -> None:
+        self.stats.record(event_name)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.count_request()
+        _with_trace(request, self._trace)
+        return await self._transport.handle_async_request(request)
+
+    def snapshot(self) -> dict[str, Any]:
+        return self.stats.snapshot(self._transport._pool)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+_pooled_transport: PooledTransport | None = None
+_pooled_async_transport: PooledAsyncTransport | None = None
+
+
+def get_pooled_transport() -> PooledTransport:
+    """프로세스 공유 동기 연결 풀 (싱글톤)"""
+    global _pooled_transport
+    if _pooled_transport is None:
+        _pooled_transport = PooledTransport()
+    return _pooled_transport
+
+
+def get_pooled_async_transport() -> PooledAsyncTransport:
+    """프로세스 공유 비동기 연결 풀 (싱글톤)"""
+    global _pooled_async_transport
+    if _pooled_async_transport is None:
+        _pooled_async_transport = PooledAsyncTransport()
+    return _pooled_async_transport
+
+
+def get_http_pool_stats() -> dict[str, Any]:
+    """
+    공유 연결 풀 상태
+
+    Returns:
+        - http2: HTTP/2 사용 여부
+        - limits: 연결 상한 / keep-alive / 타임아웃 설정
+        - sync, async: requests, new_connections, tls_handshakes, reused_connections,
+          reuse_ratio (새 연결 없이 처리한 요청 비율), open/idle_connections
+          (풀을 아직 만들지 않았으면 None)
+    """
+    return {
+        "http2": http2_enabled(),
+        "limits": {
+            "max_connections": HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            "keepalive_expiry": HTTP_KEEPALIVE_EXPIRY,
+            "timeout": HTTP_TIMEOUT,
+            "connect_timeout": HTTP_CONNECT_TIMEOUT,
+        },
+        "sync": _pooled_transport.snapshot() if _pooled_transport else None,
+        "async": _pooled_async_transport.snapshot()
+        if _pooled_async_transport
+        else None,
+    }
@@ -0,0 +1,305 @@
+"""
+로컬 임베딩 기반 의도 라우터 (Intent Router)
+
+입력 문장을 sentence-transformers로 임베딩하고, 레이블별 예시 문장(prototype)과의 코사인 유사도로
+분기를 결정합니다. CPU에서 수 밀리초 안에 끝나며, 확신도가 임계값보다 낮을 때만 LLM 분류로 대체합니다.
+로컬 모델을 불러올 수 없으면 LLM을 호출하지 않고 무비용 규칙(heuristic, 예: 입력 길이)으로 결정합니다.
+- 예시 임베딩은 라우터당 1회만 계산 (모델은 프로세스당 1회 로드)
+- 레이블 점수: 레이블 예시 중 상위 INTENT_TOP_K개 유사도 평균
+- 확신도: 레이블 점수의 softmax (INTENT_TEMPERATURE) 중 최댓값
+- 모델 로드 실패 후 INTENT_ENCODER_RETRY_SECONDS 동안은 로드를 다시 시도하지 않음
+- 결정 시간, LLM 대체 비율을 라우터별로 집계
+
+Usage:
+    from app.utils.intent_router import IntentRouter
+
+    router = IntentRouter(
+        "answer_depth",
+        {"brief": ["What is HTTP?"], "detailed": ["Explain how HTTP/2 works with examples"]},
+        fallback=classify_with_llm,  # async (text) -> label
+        heuristic=lambda text: "brief" if len(text) < 50 else "detailed",
+    )
+    decision = await router.aroute("What is REST?")
+    decision["label"], decision["source"]  # ("brief", "local")
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 다국어(한국어 포함) 경량 문장 임베딩 모델
+INTENT_ENCODER_MODEL = os.getenv(
+    "INTENT_ENCODER_MODEL",
+    "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+)
+
+# LLM 분류로 대체하는 확신도 임계값 / 레이블 점수에 쓰는 상위 예시 수 / softmax temperature
+INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.6"))
+INTENT_TOP_K = int(os.getenv("INTENT_TOP_K", "3"))
+INTENT_TEMPERATURE = float(os.getenv("INTENT_TEMPERATURE", "0.05"))
+
+# 앱 시작 시 모델 로드와 예시 임베딩 계산 여부 (Hugging Face 모델 다운로드가 필요할 수 있으므로 기본 꺼짐)
+INTENT_ROUTER_PREWARM = os.getenv("INTENT_ROUTER_PREWARM", "false").lower() == "true"
+
+# 모델 로드 실패 후 다시 시도하기까지의 시간 (초, 그동안 heuristic 사용)
+INTENT_ENCODER_RETRY_SECONDS = float(os.getenv("INTENT_ENCODER_RETRY_SECONDS", "300"))
+
+# 임베딩 추론 스레드 (이벤트 루프를 막지 않도록 분리, torch 내부 병렬화가 있으므로 1개)
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="intent")
+
+# 결정 시간 표본 수 (p95 계산용)
+_LATENCY_WINDOW = 500
+
+Encoder = Callable[[list[str]], np.ndarray]
+
+_routers: dict[str, "IntentRouter"] = {}
+
+
+@lru_cache(maxsize=2)
+def get_sentence_encoder(model_name: str = INTENT_ENCODER_MODEL) -> Encoder:
+    """문장 임베딩 함수 (모델별 1회 로드, 정규화된 벡터 반환)"""
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name, device="cpu")
+    return lambda texts: model.encode(
+        texts, normalize_embeddings=True, convert_to_numpy=True
+    )
+
+
+class IntentRouter:
+    """
+    레이블별 예시 문장으로 입력을 분류하는 로컬 라우터
+
+    Args:
+        name: 라우터 이름 (통계 키)
+        prototypes: 레이블 → 예시 문장 리스트
+        fallback: 확신도가 낮을 때 호출할 LLM 분류 함수 (async (text) -> label, None이면 로컬 결과 사용)
+        heuristic: 로컬 모델을 쓸 수 없을 때의 무비용 분류 함수 ((text) -> label, None이면 첫 레이블)
+        threshold: LLM 대체 확신도 임계값
+        encoder: 문장 리스트 → 정규화된 임베딩 행렬 함수 (None이면 INTENT_ENCODER_MODEL)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        prototypes: dict[str, list[str]],
+        fallback: Callable[[str], Awaitable[str]] | None = None,
+        heuristic: Callable[[str], str] | None = None,
+        threshold: float = INTENT_CONFIDENCE_THRESHOLD,
+        encoder: Encoder | None = None,
+    ):
+        if len(prototypes) < 2 or not all(prototypes.values()):
+            raise ValueError("IntentRouter needs at least two labels with examples")
+        self.name = name
+        self.labels = list(prototypes)
+        self.prototypes = prototypes
+        self.fallback = fallback
+        self.heuristic = heuristic
+        self.threshold = threshold
+        self._encoder = encoder
+        self._matrix: np.ndarray | None = None
+        self._owners: np.ndarray | None = None
+        self._unavailable_until = 0.0
+        self._lock = threading.Lock()
+        self._latencies: list[float] = []
+        self._stats: dict[str, Any] = {
+            "decisions": 0,
+            "local": 0,
+            "fallbacks": 0,
+            "fallback_errors": 0,
+            "heuristic": 0,
+            "by_label": dict.fromkeys(self.labels, 0),
+        }
+        _routers[name] = self
+
+    # ------------------------------------------------------------------
+    # 로컬 분류
+    # ------------------------------------------------------------------
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        if self._encoder is None:
+            self._encoder = get_sentence_encoder()
+        return np.asarray(self._encoder(texts), dtype=np.float32)
+
+    def prewarm(self) -> None:
+        """
+        모델 로드 + 예시 임베딩 계산 (첫 요청 지연 제거)
+
+        Raises:
+            RuntimeError: 최근 로드에 실패하여 재시도 대기 중
+            Exception: 모델 로드/임베딩 실패
+        """
+        if self._matrix is not None:
+            return
+        with self._lock:
+            if self._matrix is not None:
+                return
+            if time.monotonic() < self._unavailable_until:
+                raise RuntimeError("local encoder unavailable, retry pending")
+            texts = [text for label in self.labels for text in self.prototypes[label]]
+            owners = [
+                position
+                for position, label in enumerate(self.labels)
+                for _ in self.prototypes[label]
+            ]
+            try:
+                matrix = self._encode(texts)
+            except Exception:
+                # 요청마다 다운로드/로드를 다시 시도하지 않도록 일정 시간 대기
+                self._unavailable_until = (
+                    time.monotonic() + INTENT_ENCODER_RETRY_SECONDS
+                )
+                raise
+            self._owners = np.asarray(owners)
+            self._matrix = matrix
+
+    def classify(self, text: str) -> dict[str, Any]:
+        """
+        로컬 분류 (LLM 호출 없음)
+
+        Returns:
+            {"label", "confidence", "scores": 레이블별 점수}
+        """
+        self.prewarm()
+        similarities = self._matrix @ self._encode([text])[0]
+
+        scores = np.empty(len(self.labels), dtype=np.float32)
+        for position in range(len(self.labels)):
+            label_scores = np.sort(similarities[self._owners == position])[::-1]
+            scores[position] = label_scores[:INTENT_TOP_K].mean()
+
+        weights = np.exp((scores - scores.max()) / INTENT_TEMPERATURE)
+        probabilities = weights / weights.sum()
+        best = int(np.argmax(probabilities))
+        return {
+            "label": self.labels[best],
+            "confidence": round(float(probabilities[best]), 4),
+            "scores": {
+                label: round(float(score), 4)
+                for label, score in zip(self.labels, scores, strict=True)
+            },
+        }
+
+    # ------------------------------------------------------------------
+    # 라우팅
+    # ------------------------------------------------------------------
+
+    async def aroute(self, text: str) -> dict[str, Any]:
+        """
+        입력의 분기 결정
+
+        로컬 확신도가 임계값보다 낮을 때만 LLM 분류를 사용하고,
+        로컬 모델을 쓸 수 없으면 LLM 없이 heuristic으로 결정합니다.
+
+        Returns:
+            {"label", "confidence", "scores", "source": "local" | "llm" | "heuristic", "decision_ms"}
+            (LLM 분류 결과가 레이블이 아니거나 실패하면 로컬 결과 사용)
+        """
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            decision = await loop.run_in_executor(_executor, self.classify, text)
+            decision["source"] = "local"
+        except Exception as e:
+            logger.warning(f"Intent router '{self.name}' local model unavailable: {e}")
+            label = self.heuristic(text) if self.heuristic else self.labels[0]
+            decision = {
+                "label": label,
+                "confidence": None,
+                "scores": {},
+                "source": "heuristic",
+            }
+
+        if (
+            decision["source"] == "local"
+            and decision["confidence"] < self.threshold
+            and self.fallback is not None
+        ):
+            try:
+                label = (await self.fallback(text)).strip().lower()
+            except Exception as e:
+                label = None
+                self._record_fallback_error(e)
+            if label in self.labels:
+                decision.update(label=label, source="llm")
+
+        decision["decision_ms"] = (time.perf_counter() - start) * 1000
+        self._record(decision)
+        return decision
+
+    # ------------------------------------------------------------------
+    # 통계
+    # ------------------------------------------------------------------
+
+    def _record(self, decision: dict[str, Any]) -> None:
+        with self._lock:
+            self._stats["decisions"] += 1
+            source = decision["source"]
+            self._stats["fallbacks" if source == "llm" else source] += 1
+            self._stats["by_label"][decision["label"]] += 1
+            self._latencies.append(decision["decision_ms"])
+            del self._latencies[:-_LATENCY_WINDOW]
+
+    def _record_fallback_error(self, error: Exception) -> None:
+        with self._lock:
+            self._stats["fallback_errors"] += 1
+        logger.warning(f"Intent router '{self.name}' LLM fallback failed: {error}")
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """결정 수, 로컬/LLM/heuristic 결정 수, LLM 대체 비율, 결정 시간(평균/p95 ms), 레이블별 결정 수"""
+        with self._lock:
+            stats = {**self._stats, "by_label": dict(self._stats["by_label"])}
+            latencies = sorted(self._latencies)
+        decisions = stats["decisions"]
+        return {
+            **stats,
+            "threshold": self.threshold,
+            "fallback_rate": round(stats["fallbacks"] / decisions, 4)
+            if decisions
+            else 0.0,
+            "decision_ms_avg": round(sum(latencies) / len(latencies), 2)
+            if latencies
+            else None,
+            "decision_ms_p95": round(
+                latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 2
+            )
+            if latencies
+            else None,
+        }
+
+
+def prewarm_intent_routers() -> dict[str, float]:
+    """
+    등록된 모든 라우터의 모델 로드와 예시 임베딩 계산 (앱 시작 시)
+
+    실패한 라우터는 INTENT_ENCODER_RETRY_SECONDS 뒤 요청에서 다시 시도하고, 그 전까지는 heuristic을 사용합니다.
+
+    Returns:
+        라우터 이름 → 준비 시간 (ms)
+    """
+    elapsed: dict[str, float] = {}
+    for name, router in _routers.items():
+        start = time.perf_counter()
+        try:
+            router.prewarm()
+        except Exception as e:
+            logger.warning(f"Intent router '{name}' prewarm failed: {e}")
+            continue
+        elapsed[name] = (time.perf_counter() - start) * 1000
+    return elapsed
+
+
+def get_intent_router_stats() -> dict[str, Any]:
+    """라우터별 결정 통계 (프로세스별)"""
+    return {name: router.stats for name, router in _routers.items()}
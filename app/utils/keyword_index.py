@@ -0,0 +1,93 @@
+"""
+다중 패턴 키워드 인덱스 (Aho–Corasick)
+
+여러 키워드를 텍스트에서 한 번의 순회로 찾아내는 오토마톤
+- 예외 조항 키워드("다만", "단서", "특례" 등) 태깅에 사용
+- 키워드 수와 무관하게 텍스트 길이에 비례하는 시간으로 검색
+
+Usage:
+    from app.utils.keyword_index import KeywordAutomaton
+
+    automaton = KeywordAutomaton(["다만", "특례"])
+    automaton.find_keywords("다만, 특례 적용 시...")  # ["다만", "특례"]
+"""
+
+from collections import deque
+
+
+class KeywordAutomaton:
+    """Aho–Corasick 다중 패턴 매칭 오토마톤"""
+
+    def __init__(self, keywords: list[str]):
+        self.keywords = [keyword for keyword in dict.fromkeys(keywords) if keyword]
+
+        # 상태별 전이(goto), 실패 링크(fail), 출력(키워드 인덱스 목록)
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[list[int]] = [[]]
+
+        for keyword_idx, keyword in enumerate(self.keywords):
+            self._add_keyword(keyword, keyword_idx)
+        self._build_fail_links()
+
+    def _add_keyword(self, keyword: str, keyword_idx: int) -> None:
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(keyword_idx)
+
+    def _build_fail_links(self) -> None:
+        queue: deque[int] = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+
+                # 실패 링크 상태의 출력도 함께 보고
+                self._output[next_state] = (
+                    self._output[next_state] + self._output[self._fail[next_state]]
+                )
+
+    def iter_matches(self, text: str):
+        """
+        텍스트에서 키워드 매칭 위치 순회
+
+        Yields:
+            (시작 위치, 키워드) 튜플
+        """
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+
+            for keyword_idx in self._output[state]:
+                keyword = self.keywords[keyword_idx]
+                yield position - len(keyword) + 1, keyword
+
+    def find_keywords(self, text: str) -> list[str]:
+        """
+        텍스트에 포함된 키워드 목록 반환
+
+        Returns:
+            발견된 키워드 리스트 (중복 제거, 키워드 등록 순서 유지)
+        """
+        found = {keyword for _, keyword in self.iter_matches(text)}
+        return [keyword for keyword in self.keywords if keyword in found]
+
+    def contains_any(self, text: str) -> bool:
+        """텍스트에 키워드가 하나라도 포함되어 있는지 확인"""
+        return next(self.iter_matches(text), None) is not None
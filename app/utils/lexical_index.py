@@ -0,0 +1,181 @@
+"""
+문자 n-gram 기반 BM25 어휘 인덱스
+
+한국어는 공백 단위 형태소 분석 없이도 검색할 수 있도록 문자 bigram/trigram을 색인합니다.
+- 법령명, 금액, 조항 번호("제12조") 등 임베딩 검색이 놓치는 정확한 용어 매칭
+- 인덱싱 시점에 생성하여 Redis에 압축 저장 (zlib + JSON)
+
+Usage:
+    from app.utils.lexical_index import LexicalIndex
+
+    lexical_index = LexicalIndex.build(nodes, ngram_size=2)
+    hits = lexical_index.search("제12조 징계", top_k=10)  # [(node_id, score), ...]
+"""
+
+import heapq
+import json
+import math
+import os
+import re
+import zlib
+from collections import Counter
+from typing import Any
+
+# BM25 파라미터
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 기본 n-gram 크기 (환경 변수 LEXICAL_NGRAM_SIZE로 변경 가능)
+DEFAULT_NGRAM_SIZE = int(os.getenv("LEXICAL_NGRAM_SIZE", "2"))
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def char_ngrams(text: str, ngram_size: int = DEFAULT_NGRAM_SIZE) -> list[str]:
+    """
+    텍스트를 문자 n-gram 리스트로 변환
+
+    공백/구두점으로 토큰을 나눈 뒤 토큰 내부에서만 n-gram을 생성합니다.
+    n보다 짧은 토큰("3", "등")은 그대로 사용합니다.
+
+    Args:
+        text: 입력 텍스트
+        ngram_size: n-gram 크기 (2: bigram, 3: trigram)
+
+    Returns:
+        n-gram 리스트 (중복 포함)
+
+    Examples:
+        >>> char_ngrams("제12조 징계")
+        ['제1', '12', '2조', '징계']
+    """
+    grams: list[str] = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        if len(token) <= ngram_size:
+            grams.append(token)
+            continue
+        grams.extend(
+            token[i : i + ngram_size] for i in range(len(token) - ngram_size + 1)
+        )
+    return grams
+
+
+class LexicalIndex:
+    """문자 n-gram 역색인 + BM25 점수 계산"""
+
+    def __init__(
+        self,
+        ngram_size: int,
+        node_ids: list[str],
+        doc_lengths: list[int],
+        postings: dict[str, list[tuple[int, int]]],
+    ):
+        self.ngram_size = ngram_size
+        self.node_ids = node_ids
+        self.doc_lengths = doc_lengths
+        self.postings = postings
+        self.avg_doc_length = (
+            sum(doc_lengths) / len(doc_lengths) if doc_lengths else 0.0
+        )
+
+    @classmethod
+    def build(
+        cls, nodes: list[Any], ngram_size: int = DEFAULT_NGRAM_SIZE
+    ) -> "LexicalIndex":
+        """
+        노드 리스트로부터 역색인 생성
+
+        Args:
+            nodes: TextNode 리스트 (node_id, get_content() 사용)
+            ngram_size: n-gram 크기
+
+        Returns:
+            LexicalIndex 인스턴스
+        """
+        node_ids: list[str] = []
+        doc_lengths: list[int] = []
+        postings: dict[str, list[tuple[int, int]]] = {}
+
+        for doc_idx, node in enumerate(nodes):
+            grams = char_ngrams(node.get_content(), ngram_size)
+            node_ids.append(node.node_id)
+            doc_lengths.append(len(grams))
+
+            for gram, term_freq in Counter(grams).items():
+                postings.setdefault(gram, []).append((doc_idx, term_freq))
+
+        return cls(ngram_size, node_ids, doc_lengths, postings)
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    def search(self, query: str, top_k: int = 10) -> list[tuple[str, float]]:
+        """
+        BM25 검색
+
+        Args:
+            query: 검색 질의
+            top_k: 반환할 최대 노드 수
+
+        Returns:
+            (node_id, BM25 점수) 리스트 (점수 내림차순)
+        """
+        if not self.node_ids:
+            return []
+
+        total_docs = len(self.node_ids)
+        scores: dict[int, float] = {}
+
+        for gram, query_freq in Counter(char_ngrams(query, self.ngram_size)).items():
+            gram_postings = self.postings.get(gram)
+            if not gram_postings:
+                continue
+
+            doc_freq = len(gram_postings)
+            idf = math.log(1 + (total_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+            for doc_idx, term_freq in gram_postings:
+                length_norm = (
+                    1
+                    - BM25_B
+                    + BM25_B
+                    * (self.doc_lengths[doc_idx] / (self.avg_doc_length or 1.0))
+                )
+                tf_weight = (term_freq * (BM25_K1 + 1)) / (
+                    term_freq + BM25_K1 * length_norm
+                )
+                scores[doc_idx] = (
+                    scores.get(doc_idx, 0.0) + idf * tf_weight * query_freq
+                )
+
+        top_docs = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return [(self.node_ids[doc_idx], score) for doc_idx, score in top_docs]
+
+    def to_bytes(self) -> bytes:
+        """
+        Redis 저장용 압축 직렬화
+
+        posting 리스트를 [doc_idx, tf, doc_idx, tf, ...] 형태로 평탄화한 뒤
+        JSON + zlib으로 압축합니다.
+        """
+        payload = {
+            "n": self.ngram_size,
+            "ids": self.node_ids,
+            "len": self.doc_lengths,
+            "p": {
+                gram: [value for posting in gram_postings for value in posting]
+                for gram, gram_postings in self.postings.items()
+            },
+        }
+        raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        return zlib.compress(raw.encode("utf-8"), level=6)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "LexicalIndex":
+        """to_bytes()로 직렬화된 데이터로부터 인덱스 복원"""
+        payload = json.loads(zlib.decompress(data).decode("utf-8"))
+        postings = {
+            gram: list(zip(flat[::2], flat[1::2], strict=True))
+            for gram, flat in payload["p"].items()
+        }
+        return cls(payload["n"], payload["ids"], payload["len"], postings)
@@ -0,0 +1,546 @@
+"""
+LangChain LLM 응답 캐시 (Redis, exact / semantic)
+
+LangChain 전역 LLM 캐시(set_llm_cache)에 Redis 백엔드를 연결하여 같은 프롬프트의 반복 호출을
+LLM 호출 없이 응답합니다.
+- exact: (모델, 호출 파라미터, 메시지 전체)가 같은 요청만 적중
+- semantic: exact가 없으면 프롬프트 임베딩의 코사인 유사도가 LLM_CACHE_SIMILARITY 이상인
+  같은 모델/파라미터의 캐시 항목 사용
+- 기본 정책(auto)은 temperature=0인 결정적 호출만 캐시하고, 라우트별로 켜거나 끌 수 있음
+- 적중/미스/건너뜀 수를 라우트별로 집계하여 GET /llm/cache에서 확인
+
+캐시 적중 응답의 usage_metadata 토큰 수는 0으로 바꿔 사용량 집계가 실제 호출만 반영하도록 합니다.
+Redis에 연결할 수 없으면 캐시 없이 LLM을 호출합니다.
+
+Usage:
+    from app.utils.llm_cache import init_llm_cache, llm_cache_policy
+
+    init_llm_cache()  # 앱 시작 시 1회
+
+    with llm_cache_policy("on"):  # temperature와 무관하게 캐시
+        await chain.ainvoke(inputs)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections.abc import Awaitable, Callable, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+import numpy as np
+import redis
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.globals import set_llm_cache
+from langchain_core.messages import AIMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+from app.utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# 캐시 모드 (off / exact / semantic) / 캐시 항목 유지 시간 (초)
+LLM_CACHE = os.getenv("LLM_CACHE", "exact").lower()
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "86400"))
+
+# semantic 모드: 적중 판정 코사인 유사도 / 모델·파라미터별 최대 항목 수 / 프롬프트 임베딩 모델
+LLM_CACHE_SIMILARITY = float(os.getenv("LLM_CACHE_SIMILARITY", "0.95"))
+LLM_CACHE_SEMANTIC_MAX_ENTRIES = int(
+    os.getenv("LLM_CACHE_SEMANTIC_MAX_ENTRIES", "1000")
+)
+LLM_CACHE_EMBED_MODEL = os.getenv("LLM_CACHE_EMBED_MODEL", "text-embedding-3-small")
+
+# 캐시를 사용하지 않는 라우트 경로 접두사 (쉼표 구분, 예: "/lcel/streaming,/rag")
+LLM_CACHE_EXCLUDE_PATHS = [
+    path.strip()
+    for path in os.getenv("LLM_CACHE_EXCLUDE_PATHS", "").split(",")
+    if path.strip()
+]
+
+CACHE_MODES = ("off", "exact", "semantic")
+CACHE_POLICIES = ("auto", "on", "off")
+
+_KEY_PREFIX = "llm_cache"
+
+# bind(temperature=...) 등 호출 시 전달된 temperature (llm_string의 파라미터 부분)
+_BOUND_TEMPERATURE = re.compile(r"\('temperature', ([0-9.eE+-]+)\)")
+
+_policy: ContextVar[str] = ContextVar("llm_cache_policy", default="auto")
+# 요청의 ASGI scope (라우팅 후 scope["route"]에서 라우트 템플릿을 읽음)
+_route_scope: ContextVar[dict | None] = ContextVar("llm_cache_route", default=None)
+_route_excluded: ContextVar[bool] = ContextVar(
+    "llm_cache_route_excluded", default=False
+)
+
+
+# ============================================================================
+# 캐시 정책
+# ============================================================================
+
+
+@contextmanager
+def llm_cache_policy(policy: str) -> Iterator[None]:
+    """
+    블록 안의 LangChain LLM 호출에 적용할 캐시 정책 지정
+
+    Args:
+        policy: "auto" (temperature=0 호출만 캐시), "on" (항상 캐시), "off" (캐시 안 함)
+
+    Examples:
+        >>> with llm_cache_policy("off"):
+        ...     await chain.ainvoke({"query": "..."})
+    """
+    if policy not in CACHE_POLICIES:
+        raise ValueError(
+            f"Unknown cache policy: {policy} (available: {', '.join(CACHE_POLICIES)})"
+        )
+    token = _policy.set(policy)
+    try:
+        yield
+    finally:
+        _policy.reset(token)
+
+
+def is_deterministic(llm_string: str) -> bool:
+    """
+    llm_string(모델 직렬화 + 호출 파라미터)의 temperature가 0인지 확인
+
+    호출 시 bind한 temperature가 모델 설정보다 우선합니다. temperature를 알 수 없으면 False.
+    """
+    bound = _BOUND_TEMPERATURE.search(llm_string)
+    if bound:
+        return float(bound.group(1)) == 0
+    serialized, _, _ = llm_string.partition("---")
+    try:
+        temperature = json.loads(serialized).get("kwargs", {}).get("temperature")
+    except (ValueError, AttributeError):
+        return False
+    return temperature == 0
+
+
+def _current_route() -> str:
+    """
+    집계용 라우트 템플릿 (예: /document-analysis/{doc_id})
+
+    문서 ID 등이 들어간 실제 경로 대신 템플릿을 사용하여 집계 키 수가 라우트 수를 넘지 않습니다.
+    라우팅 전이거나 요청 밖의 호출이면 "-".
+    """
+    scope = _route_scope.get()
+    return getattr(scope.get("route") if scope else None, "path", "-")
+
+
+class LLMCacheMiddleware:
+    """
+    LLM 캐시 집계용 요청 scope 지정 + 제외 경로의 캐시 끄기 (ASGI 미들웨어)
+
+    제외 경로는 라우트 코드의 llm_cache_policy("on")보다 우선합니다.
+    """
+
+    def __init__(self, app: Any, exclude_paths: Sequence[str] = ()):
+        self.app = app
+        self.exclude_paths = tuple(exclude_paths or LLM_CACHE_EXCLUDE_PATHS)
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope.get("path", "-")
+        # 라우터가 같은 scope에 매칭된 route를 기록하므로 scope 자체를 보관
+        route_token = _route_scope.set(scope)
+        excluded_token = _route_excluded.set(
+            bool(self.exclude_paths) and path.startswith(self.exclude_paths)
+        )
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _route_excluded.reset(excluded_token)
+            _route_scope.reset(route_token)
+
+
+# ============================================================================
+# 직렬화
+# ============================================================================
+
+
+def _dump_generations(generations: RETURN_VAL_TYPE) -> bytes:
+    items = []
+    for generation in generations:
+        item: dict[str, Any] = {"generation_info": generation.generation_info}
+        if isinstance(generation, ChatGeneration):
+            item["message"] = message_to_dict(generation.message)
+        else:
+            item["text"] = generation.text
+        items.append(item)
+    return json.dumps(items, ensure_ascii=False).encode()
+
+
+def _load_generations(raw: bytes) -> RETURN_VAL_TYPE:
+    generations: list[Generation] = []
+    for item in json.loads(raw):
+        if "message" not in item:
+            generations.append(
+                Generation(text=item["text"], generation_info=item["generation_info"])
+            )
+            continue
+        (message,) = messages_from_dict([item["message"]])
+        # 캐시 적중은 토큰을 쓰지 않으므로 사용량 0으로 보고
+        if isinstance(message, AIMessage) and message.usage_metadata:
+            message = message.model_copy(
+                update={
+                    "usage_metadata": {
+                        **message.usage_metadata,
+                        "input_tokens": 0,
+                        "output_tokens": 0,
+                        "total_tokens": 0,
+                    }
+                }
+            )
+        generations.append(
+            ChatGeneration(message=message, generation_info=item["generation_info"])
+        )
+    return generations
+
+
+def _prompt_text(prompt: str) -> str:
+    """LangChain이 직렬화한 메시지 목록(dumps(messages))에서 임베딩할 텍스트 추출"""
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return prompt
+    if not isinstance(messages, list):
+        return prompt
+
+    parts = []
+    for message in messages:
+        content = message.get("kwargs", {}).get("content", "")
+        if isinstance(content, list):
+            content = " ".join(
+                part.get("text", "") if isinstance(part, dict) else str(part)
+                for part in content
+            )
+        parts.append(str(content))
+    return "\n".join(parts)
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+# ============================================================================
+# 캐시
+# ============================================================================
+
+
+class RedisLLMCache(BaseCache):
+    """
+    Redis 기반 LangChain LLM 캐시
+
+    키: llm_cache:{sha256(llm_string)}:{sha256(prompt)} (llm_string은 모델과 호출 파라미터 전체)
+    semantic 모드는 llm_cache:{sha256(llm_string)}:vectors 해시에 정규화한 프롬프트 임베딩을 저장합니다.
+
+    Args:
+        mode: "exact" 또는 "semantic"
+        ttl: 캐시 항목 유지 시간 (초)
+        similarity: semantic 적중 최소 코사인 유사도
+        embed: 텍스트 → 임베딩 비동기 함수 (semantic 모드, None이면 OpenAI 임베딩)
+    """
+
+    def __init__(
+        self,
+        mode: str = "exact",
+        ttl: int = LLM_CACHE_TTL,
+        similarity: float = LLM_CACHE_SIMILARITY,
+        embed: Callable[[str], Awaitable[list[float]]] | None = None,
+    ):
+        if mode not in ("exact", "semantic"):
+            raise ValueError(f"Unknown cache mode: {mode}")
+        self.mode = mode
+        self.ttl = ttl
+        self.similarity = similarity
+        self._embed = embed
+        self._sync_redis: redis.Redis | None = None
+        self._lock = threading.Lock()
+        self._stats: dict[str, Any] = {
+            "hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "skipped": 0,
+            "writes": 0,
+            "redis_errors": 0,
+            "by_route": {},
+        }
+        # semantic 모드: 미스 후 update에서 임베딩을 다시 계산하지 않도록 보관
+        self._pending_vector: ContextVar[tuple[str, np.ndarray] | None] = ContextVar(
+            "llm_cache_pending_vector", default=None
+        )
+
+    # ------------------------------------------------------------------
+    # 키 / 집계
+    # ------------------------------------------------------------------
+
+    def _key(self, prompt: str, llm_string: str) -> str:
+        return f"{_KEY_PREFIX}:{_digest(llm_string)}:{_digest(prompt)}"
+
+    def _vectors_key(self, llm_string: str) -> str:
+        return f"{_KEY_PREFIX}:{_digest(llm_string)}:vectors"
+
+    def _should_cache(self, llm_string: str) -> bool:
+        policy = _policy.get()
+        if _route_excluded.get():
+            return False
+        if policy == "auto":
+            return is_deterministic(llm_string)
+        return policy == "on"
+
+    def _record(self, outcome: str) -> None:
+        with self._lock:
+            self._stats[outcome] += 1
+            route = self._stats["by_route"].setdefault(
+                _current_route(), {"hits": 0, "misses": 0, "skipped": 0}
+            )
+            if outcome in route:
+                route[outcome] += 1
+            elif outcome == "semantic_hits":
+                route["hits"] += 1
+
+    def _record_redis_error(self, error: Exception) -> None:
+        with self._lock:
+            self._stats["redis_errors"] += 1
+            first = self._stats["redis_errors"] == 1
+        if first:
+            logger.warning(f"LLM cache unavailable: {error}")
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """캐시 적중/미스 통계 (적중률은 건너뛴 호출 제외)"""
+        with self._lock:
+            stats = {
+                **self._stats,
+                "by_route": {
+                    route: dict(counts)
+                    for route, counts in self._stats["by_route"].items()
+                },
+            }
+        hits = stats["hits"] + stats["semantic_hits"]
+        lookups = hits + stats["misses"]
+        return {
+            "mode": self.mode,
+            "ttl": self.ttl,
+            **stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # semantic
+    # ------------------------------------------------------------------
+
+    async def _prompt_vector(self, prompt: str) -> np.ndarray:
+        if self._embed is None:
+            self._embed = _default_embed()
+        vector = np.asarray(await self._embed(_prompt_text(prompt)), dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    async def _semantic_lookup(
+        self, client: Any, prompt: str, llm_string: str
+    ) -> bytes | None:
+        vector = await self._prompt_vector(prompt)
+        self._pending_vector.set((prompt, vector))
+
+        vectors_key = self._vectors_key(llm_string)
+        entries = await client.hgetall(vectors_key)
+        if not entries:
+            return None
+        fields = list(entries)
+        matrix = np.stack(
+            [np.frombuffer(entries[field], np.float32) for field in fields]
+        )
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity:
+            return None
+
+        prompt_digest = fields[best].decode()
+        raw = await client.get(f"{_KEY_PREFIX}:{_digest(llm_string)}:{prompt_digest}")
+        if raw is None:
+            # 응답이 만료된 벡터 정리
+            await client.hdel(vectors_key, fields[best])
+        return raw
+
+    async def _store_vector(self, client: Any, prompt: str, llm_string: str) -> None:
+        pending = self._pending_vector.get()
+        vector = (
+            pending[1]
+            if pending and pending[0] == prompt
+            else await self._prompt_vector(prompt)
+        )
+        vectors_key = self._vectors_key(llm_string)
+        if await client.hlen(vectors_key) >= LLM_CACHE_SEMANTIC_MAX_ENTRIES:
+            return
+        await client.hset(vectors_key, _digest(prompt), vector.tobytes())
+        await client.expire(vectors_key, self.ttl)
+
+    # ------------------------------------------------------------------
+    # BaseCache (비동기: ainvoke / abatch 경로)
+    # ------------------------------------------------------------------
+
+    async def alookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        if not self._should_cache(llm_string):
+            self._record("skipped")
+            return None
+        try:
+            client = await get_redis_client()
+            raw = await client.get(self._key(prompt, llm_string))
+            outcome = "hits"
+            if raw is None and self.mode == "semantic":
+                raw = await self._semantic_lookup(client, prompt, llm_string)
+                outcome = "semantic_hits"
+        except Exception as e:
+            self._record_redis_error(e)
+            return None
+
+        if raw is None:
+            self._record("misses")
+            return None
+        self._record(outcome)
+        return _load_generations(raw)
+
+    async def aupdate(
+        self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE
+    ) -> None:
+        if not self._should_cache(llm_string):
+            return
+        try:
+            client = await get_redis_client()
+            await client.set(
+                self._key(prompt, llm_string),
+                _dump_generations(return_val),
+                ex=self.ttl,
+            )
+            if self.mode == "semantic":
+                await self._store_vector(client, prompt, llm_string)
+        except Exception as e:
+            self._record_redis_error(e)
+            return
+        self._record("writes")
+
+    async def aclear(self, **kwargs: Any) -> None:
+        client = await get_redis_client()
+        keys = [key async for key in client.scan_iter(match=f"{_KEY_PREFIX}:*")]
+        if keys:
+            await client.delete(*keys)
+
+    # ------------------------------------------------------------------
+    # BaseCache (동기: invoke 경로, exact만 사용)
+    # ------------------------------------------------------------------
+
+    def _get_sync_redis(self) -> redis.Redis:
+        if self._sync_redis is None:
+            self._sync_redis = redis.Redis.from_url(
+                os.getenv("REDIS_URL", "redis://localhost:6379/0")
+            )
+        return self._sync_redis
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        if not self._should_cache(llm_string):
+            self._record("skipped")
+            return None
+        try:
+            raw = self._get_sync_redis().get(self._key(prompt, llm_string))
+        except Exception as e:
+            self._record_redis_error(e)
+            return None
+
+        if raw is None:
+            self._record("misses")
+            return None
+        self._record("hits")
+        return _load_generations(raw)
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if not self._should_cache(llm_string):
+            return
+        try:
+            self._get_sync_redis().set(
+                self._key(prompt, llm_string),
+                _dump_generations(return_val),
+                ex=self.ttl,
+            )
+        except Exception as e:
+            self._record_redis_error(e)
+            return
+        self._record("writes")
+
+    def clear(self, **kwargs: Any) -> None:
+        client = self._get_sync_redis()
+        keys = list(client.scan_iter(match=f"{_KEY_PREFIX}:*"))
+        if keys:
+            client.delete(*keys)
+
+
+def _default_embed() -> Callable[[str], Awaitable[list[float]]]:
+    # semantic 모드에서만 사용하므로 지연 import (임베딩 호출도 LLMGovernor를 거침)
+    from langchain_openai import OpenAIEmbeddings
+
+    from app.utils.llm_governor import (
+        get_governed_async_http_client,
+        get_governed_http_client,
+    )
+    from app.utils.llm_resilience import SDK_MAX_RETRIES
+
+    embeddings = OpenAIEmbeddings(
+        model=LLM_CACHE_EMBED_MODEL,
+        max_retries=SDK_MAX_RETRIES,
+        http_client=get_governed_http_client(),
+        http_async_client=get_governed_async_http_client(),
+    )
+    return embeddings.aembed_query
+
+
+# ============================================================================
+# 전역 캐시
+# ============================================================================
+
+_llm_cache: RedisLLMCache | None = None
+
+
+def init_llm_cache(mode: str = LLM_CACHE) -> RedisLLMCache | None:
+    """
+    LangChain 전역 LLM 캐시 설정 (앱 시작 시 1회)
+
+    개별 모델은 ChatOpenAI(cache=False)로 전역 캐시를 사용하지 않을 수 있습니다.
+
+    Args:
+        mode: "off", "exact", "semantic" (기본: LLM_CACHE 환경변수)
+
+    Returns:
+        설정한 캐시 (off이면 None)
+    """
+    global _llm_cache
+    if mode not in CACHE_MODES:
+        raise ValueError(
+            f"Unknown cache mode: {mode} (available: {', '.join(CACHE_MODES)})"
+        )
+    _llm_cache = None if mode == "off" else RedisLLMCache(mode=mode)
+    set_llm_cache(_llm_cache)
+    return _llm_cache
+
+
+def get_llm_cache_stats() -> dict[str, Any]:
+    """
+    LLM 캐시 통계 (프로세스별)
+
+    Returns:
+        - mode / ttl
+        - hits / semantic_hits / misses: 캐시 조회 결과 수
+        - skipped: 정책(temperature≠0, 라우트 opt-out)으로 캐시를 건너뛴 호출 수
+        - writes / redis_errors / hit_rate
+        - by_route: 라우트 템플릿별 hits/misses/skipped
+    """
+    if _llm_cache is None:
+        return {"mode": "off"}
+    return _llm_cache.stats
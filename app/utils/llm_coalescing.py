@@ -0,0 +1,418 @@
+"""
+동일 LLM 요청 병합 (Request Coalescing)
+
+같은 시점에 진행 중인 동일 OpenAI 요청(모델, temperature, 전체 프롬프트 등 요청 본문 전체가 같음)을
+업스트림 호출 하나로 합칩니다.
+- 프로세스 내부: 먼저 도착한 요청(leader)의 응답을 뒤따른 요청들이 처음부터 재생
+- 워커 간: Redis 잠금으로 leader를 정하고, leader가 응답 청크를 Redis Stream에 기록하면
+  다른 워커의 요청이 이를 읽어 응답을 구성 (Stream 키에 잠금 토큰을 포함하므로
+  이전 호출의 Stream이 남아 있어도 현재 leader의 응답만 읽음)
+- 스트리밍 응답(stream=true)도 청크 단위로 모든 구독자에게 전달
+
+완료된 요청은 바로 등록이 해제되므로 캐시가 아니라 "진행 중" 요청만 공유합니다.
+governed transport 바깥에 위치하여 병합된 요청은 LLMGovernor 슬롯도 사용하지 않습니다.
+
+Usage:
+    from app.utils.llm_coalescing import CoalescingAsyncTransport
+
+    transport = CoalescingAsyncTransport(GovernedAsyncTransport())
+    client = httpx.AsyncClient(transport=transport)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import uuid
+from collections.abc import AsyncIterator
+from typing import Any
+
+import httpx
+
+from app.utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# 동일 요청 병합 사용 여부 / 워커 간(Redis) 병합 사용 여부
+LLM_COALESCE = os.getenv("LLM_COALESCE", "true").lower() == "true"
+LLM_COALESCE_CROSS_WORKER = (
+    os.getenv("LLM_COALESCE_CROSS_WORKER", "true").lower() == "true"
+)
+
+# 다른 워커의 leader 응답 시작을 기다리는 최대 시간 (초, 초과 시 직접 호출)
+LLM_COALESCE_WAIT = float(os.getenv("LLM_COALESCE_WAIT", "30"))
+
+# leader 잠금 만료 (밀리초) / 완료 후 Redis Stream 유지 시간 (초)
+_LOCK_TTL_MS = 10 * 60 * 1000
+_STREAM_GRACE_SECONDS = 10
+
+# 자신이 잡은 잠금일 때만 삭제 (만료 후 다른 leader가 잡은 잠금을 지우지 않음)
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# 병합 대상 OpenAI API 경로
+_COALESCED_PATHS = ("/chat/completions", "/completions", "/embeddings", "/responses")
+
+# 응답에서 재사용하지 않는 헤더
+_HOP_HEADERS = {"connection", "keep-alive", "transfer-encoding"}
+
+_stats: dict[str, int] = {
+    "leaders": 0,
+    "coalesced": 0,
+    "coalesced_remote": 0,
+    "remote_fallbacks": 0,
+    "redis_errors": 0,
+}
+
+
+def get_coalescing_stats() -> dict[str, int]:
+    """
+    요청 병합 통계
+
+    Returns:
+        - leaders: 실제 업스트림으로 보낸 병합 대상 요청 수
+        - coalesced: 같은 프로세스의 진행 중 요청에 합쳐진 요청 수
+        - coalesced_remote: 다른 워커의 진행 중 요청에 합쳐진 요청 수
+        - remote_fallbacks: 다른 워커 응답을 기다리다 직접 호출한 수
+        - redis_errors: Redis 병합 단계 실패 수 (실패 시 프로세스 내부 병합만 사용)
+    """
+    return dict(_stats)
+
+
+def coalescing_key(request: httpx.Request) -> str | None:
+    """
+    요청 병합 키 (경로 + 정규화한 요청 본문의 SHA-256)
+
+    본문에 model, temperature, messages/prompt, stream 여부가 모두 포함되므로
+    이 값이 하나라도 다르면 병합되지 않습니다.
+
+    Returns:
+        병합 키 또는 병합 대상이 아니면 None
+    """
+    if request.method != "POST" or not request.url.path.endswith(_COALESCED_PATHS):
+        return None
+    try:
+        body = json.loads(request.content or b"{}")
+    except (ValueError, httpx.RequestNotRead):
+        return None
+
+    canonical = json.dumps(body, sort_keys=True, ensure_ascii=False)
+    digest = hashlib.sha256(f"{request.url.path}\n{canonical}".encode()).hexdigest()
+    return digest
+
+
+# ============================================================================
+# 프로세스 내부 브로드캐스트
+# ============================================================================
+
+
+class _Broadcast:
+    """leader 응답 하나를 여러 구독자에게 처음부터 재생"""
+
+    def __init__(self):
+        self.head: asyncio.Future[tuple[int, list[tuple[bytes, bytes]]]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self.chunks: list[bytes] = []
+        self.done = False
+        self.error: BaseException | None = None
+        self.subscribers = 0
+        self.pump: asyncio.Task | None = None
+        self._changed = asyncio.Condition()
+
+    async def append(self, chunk: bytes) -> None:
+        async with self._changed:
+            self.chunks.append(chunk)
+            self._changed.notify_all()
+
+    async def finish(self, error: BaseException | None = None) -> None:
+        async with self._changed:
+            self.done = True
+            self.error = error
+            self._changed.notify_all()
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        position = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(
+                    lambda start=position: start < len(self.chunks) or self.done
+                )
+                pending = self.chunks[position:]
+                finished = self.done
+            for chunk in pending:
+                yield chunk
+            position += len(pending)
+            if finished and position >= len(self.chunks):
+                if self.error is not None:
+                    raise httpx.ReadError(f"coalesced upstream failed: {self.error}")
+                return
+
+
+class _SubscriberStream(httpx.AsyncByteStream):
+    def __init__(self, broadcast: _Broadcast):
+        self._broadcast = broadcast
+        self._closed = False
+        broadcast.subscribers += 1
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._broadcast.iter_chunks():
+            yield chunk
+
+    async def aclose(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._broadcast.subscribers -= 1
+        # 모든 구독자가 떠나면 업스트림 읽기 중단 (LLMGovernor 슬롯 반환)
+        pump = self._broadcast.pump
+        if self._broadcast.subscribers == 0 and pump and not pump.done():
+            pump.cancel()
+
+
+# ============================================================================
+# 워커 간 병합 (Redis)
+# ============================================================================
+
+
+def _lock_key(key: str) -> str:
+    return f"llm_coalesce:{key}:lock"
+
+
+def _stream_key(key: str, token: str) -> str:
+    return f"llm_coalesce:{key}:stream:{token}"
+
+
+class _RedisStreamReader(httpx.AsyncByteStream):
+    """다른 워커 leader가 Redis Stream에 기록하는 응답 청크 읽기"""
+
+    def __init__(self, client: Any, stream_key: str, last_id: bytes):
+        self._client = client
+        self._stream_key = stream_key
+        self._last_id = last_id
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        while True:
+            entries = await _xread(self._client, self._stream_key, self._last_id)
+            if entries is None:
+                raise httpx.ReadTimeout("coalesced upstream stopped responding")
+            for entry_id, fields in entries:
+                self._last_id = entry_id
+                if b"c" in fields:
+                    yield fields[b"c"]
+                elif b"x" in fields:
+                    raise httpx.ReadError(
+                        f"coalesced upstream failed: {fields[b'x'].decode()}"
+                    )
+                elif b"e" in fields:
+                    return
+
+
+async def _xread(
+    client: Any, stream_key: str, last_id: bytes
+) -> list[tuple[bytes, dict[bytes, bytes]]] | None:
+    result = await client.xread(
+        {stream_key: last_id}, block=int(LLM_COALESCE_WAIT * 1000), count=100
+    )
+    if not result:
+        return None
+    return result[0][1]
+
+
+# ============================================================================
+# Transport
+# ============================================================================
+
+
+class CoalescingAsyncTransport(httpx.AsyncBaseTransport):
+    """동일한 진행 중 OpenAI 요청을 하나의 업스트림 호출로 병합하는 비동기 transport"""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        cross_worker: bool = LLM_COALESCE_CROSS_WORKER,
+    ):
+        self._transport = transport
+        self._cross_worker = cross_worker
+        self._inflight: dict[str, _Broadcast] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = coalescing_key(request) if LLM_COALESCE else None
+        if key is None:
+            return await self._transport.handle_async_request(request)
+
+        broadcast = self._inflight.get(key)
+        if broadcast is not None:
+            _stats["coalesced"] += 1
+            return await self._subscribe(broadcast)
+
+        # await 전에 등록하여 이후 같은 요청은 모두 이 응답을 구독
+        broadcast = _Broadcast()
+        self._inflight[key] = broadcast
+        return await self._lead(request, key, broadcast)
+
+    async def _subscribe(self, broadcast: _Broadcast) -> httpx.Response:
+        stream = _SubscriberStream(broadcast)
+        try:
+            status_code, headers = await asyncio.shield(broadcast.head)
+        except BaseException:
+            await stream.aclose()
+            raise
+        return httpx.Response(status_code, headers=headers, stream=stream)
+
+    async def _lead(
+        self, request: httpx.Request, key: str, broadcast: _Broadcast
+    ) -> httpx.Response:
+        redis_client = None
+        token = None
+        response = None
+
+        try:
+            # 다른 워커에 같은 요청이 진행 중이면 그 응답을 업스트림으로 사용
+            if self._cross_worker:
+                redis_client, token, response = await self._join_remote(key)
+            if response is None:
+                _stats["leaders"] += 1
+                response = await self._transport.handle_async_request(request)
+        except BaseException as e:
+            self._inflight.pop(key, None)
+            # leader 요청 취소가 구독자에게 취소로 전파되지 않도록 전송 오류로 변환
+            error = e if isinstance(e, Exception) else httpx.ReadError(repr(e))
+            broadcast.head.set_exception(error)
+            broadcast.head.exception()  # 구독자가 없어도 경고를 남기지 않음
+            await broadcast.finish(error)
+            await self._publish_remote(redis_client, key, token, {"x": str(e)})
+            await self._release_lock(redis_client, key, token)
+            raise
+
+        headers = [
+            (name, value)
+            for name, value in response.headers.raw
+            if name.decode().lower() not in _HOP_HEADERS
+        ]
+        broadcast.head.set_result((response.status_code, headers))
+        await self._publish_remote(
+            redis_client,
+            key,
+            token,
+            {
+                "h": json.dumps(
+                    {
+                        "status": response.status_code,
+                        "headers": [[n.decode(), v.decode()] for n, v in headers],
+                    }
+                )
+            },
+        )
+
+        async def pump() -> None:
+            error: BaseException | None = None
+            try:
+                async for chunk in response.stream:
+                    await broadcast.append(chunk)
+                    await self._publish_remote(redis_client, key, token, {"c": chunk})
+            except BaseException as e:
+                error = e
+            finally:
+                self._inflight.pop(key, None)
+                await broadcast.finish(error)
+                await self._publish_remote(
+                    redis_client,
+                    key,
+                    token,
+                    {"x": str(error)} if error else {"e": "1"},
+                )
+                await self._release_lock(redis_client, key, token)
+                await response.aclose()
+
+        subscriber = _SubscriberStream(broadcast)
+        broadcast.pump = asyncio.create_task(pump())
+        return httpx.Response(response.status_code, headers=headers, stream=subscriber)
+
+    # ------------------------------------------------------------------
+    # Redis helpers
+    # ------------------------------------------------------------------
+
+    async def _join_remote(
+        self, key: str
+    ) -> tuple[Any | None, str | None, httpx.Response | None]:
+        """
+        다른 워커에 진행 중인 같은 요청이 있으면 그 응답을 구독
+
+        Returns:
+            (Redis 클라이언트 또는 None, 잠금 토큰 또는 None, 구독 응답 또는 None)
+            구독 응답이 None이고 토큰이 있으면 이 요청이 leader 잠금을 얻은 상태
+        """
+        try:
+            client = await get_redis_client()
+            token = uuid.uuid4().hex
+            acquired = await client.set(_lock_key(key), token, nx=True, px=_LOCK_TTL_MS)
+            if acquired:
+                return client, token, None
+
+            # 현재 leader의 토큰으로 그 leader의 Stream만 읽음
+            leader_token = await client.get(_lock_key(key))
+            if isinstance(leader_token, bytes):
+                leader_token = leader_token.decode()
+            stream_key = _stream_key(key, leader_token) if leader_token else None
+            entries = await _xread(client, stream_key, b"0") if stream_key else None
+        except Exception as e:
+            _record_redis_error(e)
+            return None, None, None
+
+        if not entries or b"h" not in entries[0][1]:
+            # leader가 방금 끝났거나, 응답이 시작되지 않았거나 실패하면 직접 호출 (잠금 없이)
+            _stats["remote_fallbacks"] += 1
+            return None, None, None
+
+        entry_id, fields = entries[0]
+        head = json.loads(fields[b"h"])
+        _stats["coalesced_remote"] += 1
+        return (
+            None,
+            None,
+            httpx.Response(
+                head["status"],
+                headers=[(name, value) for name, value in head["headers"]],
+                stream=_RedisStreamReader(client, stream_key, entry_id),
+            ),
+        )
+
+    async def _publish_remote(
+        self, client: Any | None, key: str, token: str | None, fields: dict[str, Any]
+    ) -> None:
+        if client is None or token is None:
+            return
+        stream_key = _stream_key(key, token)
+        try:
+            await client.xadd(stream_key, fields)
+            if "e" in fields or "x" in fields:
+                await client.expire(stream_key, _STREAM_GRACE_SECONDS)
+            else:
+                await client.pexpire(stream_key, _LOCK_TTL_MS)
+        except Exception as e:
+            _record_redis_error(e)
+
+    async def _release_lock(
+        self, client: Any | None, key: str, token: str | None
+    ) -> None:
+        if client is None or token is None:
+            return
+        try:
+            await client.eval(_RELEASE_LOCK_SCRIPT, 1, _lock_key(key), token)
+        except Exception as e:
+            _record_redis_error(e)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _record_redis_error(error: Exception) -> None:
+    _stats["redis_errors"] += 1
+    if _stats["redis_errors"] == 1:
+        logger.warning(f"LLM request coalescing across workers unavailable: {error}")
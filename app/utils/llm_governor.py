@@ -0,0 +1,626 @@
+"""
+LLM 호출 동시성/처리율 관리 (LLM Governor)
+
+모든 OpenAI 호출(LangChain, LlamaIndex, openai SDK의 LLM/임베딩)을 하나의 관문으로 제한합니다.
+- 프로세스별 동시 호출 상한 (우선순위 세마포어: interactive 요청이 background보다 먼저 실행)
+- Redis 토큰 버킷으로 모델별 분당 요청 수(RPM) / 분당 토큰 수(TPM)를 워커 간 공유
+- background 요청은 버킷의 일부(LLM_BACKGROUND_RESERVE)를 interactive용으로 남겨 둠
+- 대기 시간(queue wait)을 우선순위별로 집계하여 /llm/governor에서 확인
+
+각 라이브러리의 OpenAI 클라이언트에 governed httpx 클라이언트를 주입하는 방식이라
+호출 코드(chain.ainvoke, query_engine.aquery 등)는 바꿀 필요가 없습니다.
+Redis에 연결할 수 없으면 버킷 검사는 건너뛰고 프로세스별 상한만 적용합니다.
+
+Usage:
+    from app.utils.llm_governor import get_governed_async_http_client, llm_priority
+
+    llm = ChatOpenAI(http_async_client=get_governed_async_http_client())
+
+    with llm_priority("background"):
+        await build_summary_tree(index)
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+import httpx
+import redis
+
+from app.utils.http_clients import (
+    HTTP_TIMEOUTS,
+    get_pooled_async_transport,
+    get_pooled_transport,
+)
+from app.utils.llm_coalescing import CoalescingAsyncTransport
+from app.utils.llm_resilience import (
+    ResilientAsyncTransport,
+    ResilientTransport,
+    mark_upstream_start,
+)
+from app.utils.redis_client import get_redis_client
+from app.utils.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# 프로세스별 동시 LLM/임베딩 호출 상한
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+
+# 모델별 분당 요청 수 / 분당 토큰 수 기본 상한 (0이면 해당 버킷 미사용)
+LLM_RPM_LIMIT = int(os.getenv("LLM_RPM_LIMIT", "500"))
+LLM_TPM_LIMIT = int(os.getenv("LLM_TPM_LIMIT", "200000"))
+
+# 모델별 상한 재정의 (JSON, 예: '{"gpt-4o": {"rpm": 500, "tpm": 30000}}')
+LLM_RATE_LIMITS: dict[str, dict[str, int]] = json.loads(
+    os.getenv("LLM_RATE_LIMITS", "{}")
+)
+
+# background 요청이 남겨 두어야 하는 버킷 비율 (interactive 전용 여유분)
+LLM_BACKGROUND_RESERVE = float(os.getenv("LLM_BACKGROUND_RESERVE", "0.2"))
+
+# 요청 본문에 max_tokens가 없을 때 가정하는 응답 토큰 수
+LLM_COMPLETION_TOKEN_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKEN_ESTIMATE", "512"))
+
+# 우선순위 클래스 (값이 작을수록 먼저 실행)
+PRIORITY_CLASSES = {"interactive": 0, "background": 1}
+
+# 제한 대상 OpenAI API 경로
+_GOVERNED_PATHS = ("/chat/completions", "/completions", "/embeddings", "/responses")
+
+_priority: ContextVar[str] = ContextVar("llm_priority", default="interactive")
+
+# RPM/TPM 버킷을 한 번에 확인/차감 (둘 다 여유가 있을 때만 차감)
+# 반환값: 0이면 통과, 양수면 다시 시도하기까지 기다릴 밀리초
+_TOKEN_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = now_parts[1] * 1000 + math.floor(now_parts[2] / 1000)
+local wait = 0
+local levels = {}
+local costs = {}
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 3 - 2])
+    local floor = tonumber(ARGV[i * 3])
+    local rate = capacity / 60000
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    levels[i] = math.min(capacity, tokens + (now - ts) * rate)
+    costs[i] = math.min(tonumber(ARGV[i * 3 - 1]), capacity - floor)
+    local shortage = costs[i] + floor - levels[i]
+    if shortage > 0 then
+        wait = math.max(wait, math.ceil(shortage / rate))
+    end
+end
+for i, key in ipairs(KEYS) do
+    if wait == 0 then
+        levels[i] = levels[i] - costs[i]
+    end
+    redis.call('HSET', key, 'tokens', tostring(levels[i]), 'ts', now)
+    redis.call('PEXPIRE', key, 120000)
+end
+return wait
+"""
+
+
+# ============================================================================
+# 우선순위
+# ============================================================================
+
+
+@contextmanager
+def llm_priority(priority: str) -> Iterator[None]:
+    """
+    블록 안에서 시작한 LLM/임베딩 호출의 우선순위 지정
+
+    asyncio 태스크는 생성 시점의 컨텍스트를 복사하므로 블록 안에서 만든 태스크에도 적용됩니다.
+
+    Args:
+        priority: "interactive" (사용자 요청) 또는 "background" (업로드 시 사전 계산 등)
+
+    Examples:
+        >>> with llm_priority("background"):
+        ...     await build_summary_tree(index)
+    """
+    if priority not in PRIORITY_CLASSES:
+        raise ValueError(f"지원하지 않는 우선순위입니다: {priority}")
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    """현재 컨텍스트의 LLM 호출 우선순위"""
+    return _priority.get()
+
+
+class PrioritySemaphore:
+    """우선순위 순서로 대기자를 깨우는 asyncio 세마포어 (같은 우선순위는 도착 순)"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    async def acquire(self, priority: int = 0) -> None:
+        if self.in_use < self.limit and not self.waiting:
+            self.in_use += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # 슬롯을 넘겨받은 직후 취소되면 다음 대기자에게 반환
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # 슬롯을 그대로 다음 대기자에게 넘김 (in_use 유지)
+                future.set_result(None)
+                return
+        self.in_use -= 1
+
+
+# ============================================================================
+# Governor
+# ============================================================================
+
+
+class LLMGovernor:
+    """
+    LLM/임베딩 호출 관문
+
+    acquire()로 Redis 토큰 버킷과 프로세스 슬롯을 차례로 얻고, 호출이 끝나면 release()합니다.
+
+    Examples:
+        >>> governor = get_llm_governor()
+        >>> await governor.acquire("gpt-4o-mini", tokens=1200)
+        >>> try:
+        ...     ...  # OpenAI 호출
+        ... finally:
+        ...     governor.release()
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        rpm_limit: int = LLM_RPM_LIMIT,
+        tpm_limit: int = LLM_TPM_LIMIT,
+        rate_limits: dict[str, dict[str, int]] | None = None,
+        background_reserve: float = LLM_BACKGROUND_RESERVE,
+    ):
+        self.max_concurrency = max_concurrency
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+        self.rate_limits = LLM_RATE_LIMITS if rate_limits is None else rate_limits
+        self.background_reserve = background_reserve
+
+        self._semaphore = PrioritySemaphore(max_concurrency)
+        self._sync_semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._sync_redis: redis.Redis | None = None
+        self._lock = threading.Lock()
+        self._stats: dict[str, Any] = {
+            "requests": 0,
+            "in_flight": 0,
+            "rate_limited": 0,
+            "redis_errors": 0,
+            "tokens_reserved": 0,
+            "by_priority": {
+                name: {"requests": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+                for name in PRIORITY_CLASSES
+            },
+        }
+
+    # ------------------------------------------------------------------
+    # 토큰 버킷
+    # ------------------------------------------------------------------
+
+    def _bucket_args(
+        self, model: str, tokens: int, priority: str
+    ) -> tuple[list[str], list[float]]:
+        limits = self.rate_limits.get(model, {})
+        buckets = [
+            ("rpm", limits.get("rpm", self.rpm_limit), 1),
+            ("tpm", limits.get("tpm", self.tpm_limit), tokens),
+        ]
+        reserve = self.background_reserve if priority == "background" else 0.0
+
+        keys: list[str] = []
+        args: list[float] = []
+        for name, capacity, cost in buckets:
+            if capacity <= 0:
+                continue
+            keys.append(f"llm_governor:{model}:{name}")
+            args.extend([capacity, cost, capacity * reserve])
+        return keys, args
+
+    async def _reserve(self, model: str, tokens: int, priority: str) -> int:
+        keys, args = self._bucket_args(model, tokens, priority)
+        if not keys:
+            return 0
+        try:
+            client = await get_redis_client()
+            return int(await client.eval(_TOKEN_BUCKET_SCRIPT, len(keys), *keys, *args))
+        except Exception as e:
+            # Redis 장애 시 버킷 검사 없이 통과 (프로세스 상한은 계속 적용)
+            self._record_redis_error(e)
+            return 0
+
+    def _reserve_sync(self, model: str, tokens: int, priority: str) -> int:
+        keys, args = self._bucket_args(model, tokens, priority)
+        if not keys:
+            return 0
+        try:
+            if self._sync_redis is None:
+                self._sync_redis = redis.Redis.from_url(
+                    os.getenv("REDIS_URL", "redis://localhost:6379/0")
+                )
+            return int(
+                self._sync_redis.eval(_TOKEN_BUCKET_SCRIPT, len(keys), *keys, *args)
+            )
+        except Exception as e:
+            self._record_redis_error(e)
+            return 0
+
+    def _record_redis_error(self, error: Exception) -> None:
+        with self._lock:
+            self._stats["redis_errors"] += 1
+            first = self._stats["redis_errors"] == 1
+        if first:
+            logger.warning(f"LLM governor rate bucket unavailable: {error}")
+
+    # ------------------------------------------------------------------
+    # 획득 / 반환
+    # ------------------------------------------------------------------
+
+    async def acquire(
+        self, model: str, tokens: int, priority: str | None = None
+    ) -> float:
+        """
+        호출 권한 획득 (버킷 여유와 프로세스 슬롯이 생길 때까지 대기)
+
+        Args:
+            model: 모델명 (버킷 키)
+            tokens: 요청 예상 토큰 수 (입력 + 응답)
+            priority: 우선순위 (None이면 현재 컨텍스트의 llm_priority)
+
+        Returns:
+            대기 시간 (밀리초)
+        """
+        priority = priority or current_priority()
+        start = time.perf_counter()
+
+        while (wait_ms := await self._reserve(model, tokens, priority)) > 0:
+            with self._lock:
+                self._stats["rate_limited"] += 1
+            await asyncio.sleep(wait_ms / 1000)
+
+        await self._semaphore.acquire(PRIORITY_CLASSES[priority])
+        return self._record_acquire(priority, tokens, start)
+
+    def acquire_sync(
+        self, model: str, tokens: int, priority: str | None = None
+    ) -> float:
+        """
+        동기 클라이언트용 acquire
+
+        버킷은 비동기 호출과 공유하지만, 프로세스 슬롯은 스레드용 세마포어를 따로 사용하며
+        우선순위 없이 도착 순서로 배정합니다.
+        """
+        priority = priority or current_priority()
+        start = time.perf_counter()
+
+        while (wait_ms := self._reserve_sync(model, tokens, priority)) > 0:
+            with self._lock:
+                self._stats["rate_limited"] += 1
+            time.sleep(wait_ms / 1000)
+
+        self._sync_semaphore.acquire()
+        return self._record_acquire(priority, tokens, start)
+
+    def release(self) -> None:
+        """비동기 호출 완료 후 슬롯 반환"""
+        with self._lock:
+            self._stats["in_flight"] -= 1
+        self._semaphore.release()
+
+    def release_sync(self) -> None:
+        """동기 호출 완료 후 슬롯 반환"""
+        with self._lock:
+            self._stats["in_flight"] -= 1
+        self._sync_semaphore.release()
+
+    def _record_acquire(self, priority: str, tokens: int, start: float) -> float:
+        wait_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["in_flight"] += 1
+            self._stats["tokens_reserved"] += tokens
+            by_priority = self._stats["by_priority"][priority]
+            by_priority["requests"] += 1
+            by_priority["wait_ms_total"] += wait_ms
+            by_priority["wait_ms_max"] = max(by_priority["wait_ms_max"], wait_ms)
+        return wait_ms
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """
+        호출/대기 통계
+
+        Returns:
+            - requests, in_flight, waiting: 누적 요청 수, 실행 중 / 슬롯 대기 중 호출 수
+            - rate_limited: RPM/TPM 버킷 때문에 대기한 횟수
+            - redis_errors: 버킷 확인 실패 횟수 (실패 시 버킷 검사 생략)
+            - by_priority: 우선순위별 요청 수, 평균/최대 대기 시간 (밀리초)
+        """
+        with self._lock:
+            by_priority = {
+                name: {
+                    "requests": values["requests"],
+                    "wait_ms_avg": round(
+                        values["wait_ms_total"] / values["requests"], 2
+                    )
+                    if values["requests"]
+                    else 0.0,
+                    "wait_ms_max": round(values["wait_ms_max"], 2),
+                }
+                for name, values in self._stats["by_priority"].items()
+            }
+            return {
+                "max_concurrency": self.max_concurrency,
+                "requests": self._stats["requests"],
+                "in_flight": self._stats["in_flight"],
+                "waiting": self._semaphore.waiting,
+                "rate_limited": self._stats["rate_limited"],
+                "redis_errors": self._stats["redis_errors"],
+                "tokens_reserved": self._stats["tokens_reserved"],
+                "by_priority": by_priority,
+            }
+
+
+_governor: LLMGovernor | None = None
+
+
+def get_llm_governor() -> LLMGovernor:
+    """프로세스 전역 LLMGovernor (싱글톤)"""
+    global _governor
+    if _governor is None:
+        _governor = LLMGovernor()
+    return _governor
+
+
+# ============================================================================
+# 요청 비용 추정
+# ============================================================================
+
+
+def _content_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for part in content
+        )
+    return ""
+
+
+def estimate_request_cost(request: httpx.Request) -> tuple[str, int] | None:
+    """
+    OpenAI 요청의 모델명과 예상 토큰 수 추정
+
+    Args:
+        request: httpx 요청
+
+    Returns:
+        (모델명, 입력 토큰 + 최대 응답 토큰) 또는 제한 대상이 아니면 None
+    """
+    if request.method != "POST" or not request.url.path.endswith(_GOVERNED_PATHS):
+        return None
+    try:
+        body = json.loads(request.content or b"{}")
+    except (ValueError, httpx.RequestNotRead):
+        return None
+
+    model = str(body.get("model", "unknown"))
+
+    if request.url.path.endswith("/embeddings"):
+        inputs = body.get("input", [])
+        inputs = inputs if isinstance(inputs, list) else [inputs]
+        tokens = sum(
+            count_tokens(item) if isinstance(item, str) else len(item)
+            for item in inputs
+        )
+        return model, tokens
+
+    if "messages" in body:
+        prompt = " ".join(
+            _content_text(message.get("content")) for message in body["messages"]
+        )
+    else:
+        prompt = _content_text(body.get("prompt") or body.get("input"))
+
+    completion = (
+        body.get("max_tokens")
+        or body.get("max_completion_tokens")
+        or body.get("max_output_tokens")
+        or LLM_COMPLETION_TOKEN_ESTIMATE
+    )
+    return model, count_tokens(prompt) + int(completion)
+
+
+# ============================================================================
+# httpx Transport
+# ============================================================================
+
+
+class _ReleasingAsyncStream(httpx.AsyncByteStream):
+    """응답 본문을 다 읽거나 닫을 때 슬롯을 반환하는 스트림 (스트리밍 응답 포함)"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release: Callable[[], None] | None = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class _ReleasingSyncStream(httpx.SyncByteStream):
+    def __init__(self, stream: httpx.SyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release: Callable[[], None] | None = release
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class GovernedAsyncTransport(httpx.AsyncBaseTransport):
+    """OpenAI 요청마다 LLMGovernor 권한을 얻은 뒤 전송하는 비동기 transport"""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport | None = None,
+        governor: LLMGovernor | None = None,
+    ):
+        self._transport = transport or get_pooled_async_transport()
+        self._governor = governor
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        cost = estimate_request_cost(request)
+        if cost is None:
+            mark_upstream_start()
+            return await self._transport.handle_async_request(request)
+
+        governor = self._governor or get_llm_governor()
+        await governor.acquire(*cost)
+        mark_upstream_start()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            governor.release()
+            raise
+
+        response.stream = _ReleasingAsyncStream(response.stream, governor.release)
+        return response
+
+    def queued(self) -> bool:
+        """governor 슬롯을 기다리는 요청이 있는지 (있으면 헤지하지 않음)"""
+        governor = self._governor or get_llm_governor()
+        return governor.stats["waiting"] > 0
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class GovernedTransport(httpx.BaseTransport):
+    """동기 OpenAI 클라이언트용 governed transport"""
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport | None = None,
+        governor: LLMGovernor | None = None,
+    ):
+        self._transport = transport or get_pooled_transport()
+        self._governor = governor
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        cost = estimate_request_cost(request)
+        if cost is None:
+            mark_upstream_start()
+            return self._transport.handle_request(request)
+
+        governor = self._governor or get_llm_governor()
+        governor.acquire_sync(*cost)
+        mark_upstream_start()
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException:
+            governor.release_sync()
+            raise
+
+        response.stream = _ReleasingSyncStream(response.stream, governor.release_sync)
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+_http_client: httpx.Client | None = None
+_async_http_client: httpx.AsyncClient | None = None
+
+
+def get_governed_http_client() -> httpx.Client:
+    """
+    LLMGovernor를 거치는 동기 httpx 클라이언트 (싱글톤, OpenAI 클라이언트 주입용)
+
+    재시도/데드라인은 ResilientTransport가 처리합니다 (재시도마다 governor 권한을 다시 얻음).
+    """
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(
+            transport=ResilientTransport(GovernedTransport()),
+            timeout=HTTP_TIMEOUTS,
+            follow_redirects=True,
+        )
+    return _http_client
+
+
+def get_governed_async_http_client() -> httpx.AsyncClient:
+    """
+    LLMGovernor를 거치는 비동기 httpx 클라이언트 (싱글톤, OpenAI 클라이언트 주입용)
+
+    진행 중인 동일 요청은 CoalescingAsyncTransport가 하나의 업스트림 호출로 병합하고,
+    재시도/헤지 요청/데드라인은 ResilientAsyncTransport가 처리합니다.
+    """
+    global _async_http_client
+    if _async_http_client is None:
+        # 동일 요청 병합이 바깥에 있어 병합된 요청은 governor 슬롯을 쓰지 않음
+        # 헤지 요청은 병합 안쪽에서 만들어지므로 병합되지 않고 각자 governor 슬롯을 사용
+        # 헤지 시계는 governor 슬롯을 얻은 뒤 시작하고, 슬롯 대기자가 있으면 헤지하지 않음
+        governed = GovernedAsyncTransport()
+        _async_http_client = httpx.AsyncClient(
+            transport=CoalescingAsyncTransport(
+                ResilientAsyncTransport(governed, queued=governed.queued)
+            ),
+            timeout=HTTP_TIMEOUTS,
+            follow_redirects=True,
+        )
+    return _async_http_client
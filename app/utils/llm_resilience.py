@@ -0,0 +1,615 @@
+"""
+LLM 호출 복원력 (데드라인 / 지터 백오프 재시도 / 헤지 요청)
+
+모든 OpenAI 호출(OpenAI SDK, LangChain, LlamaIndex)이 거치는 httpx transport 계층에서
+- 요청 데드라인: HTTP 요청의 X-Request-Timeout 헤더(또는 LLM_REQUEST_DEADLINE)로 정한 마감 시각을
+  ContextVar로 전파하여 재시도/대기/읽기 타임아웃이 마감 시각을 넘지 않도록 제한
+- 재시도: 429/5xx/연결 오류/타임아웃만 지수 백오프 + full jitter로 재시도 (Retry-After 존중)
+- 헤지 요청: 응답 헤더가 경로별 p95 지연 안에 오지 않으면 같은 요청을 한 번 더 보내
+  먼저 도착한 응답을 사용하고 나머지는 취소
+  (헤지 시계와 지연 표본은 governor 대기가 끝나 업스트림 전송이 시작된 시점부터 재며,
+  governor 대기열에 요청이 있는 동안에는 헤지하지 않음)
+를 수행합니다. 업스트림이 가끔 수십 초 멈추는 경우의 꼬리 지연(p99)을 줄이는 것이 목적입니다.
+
+SDK 자체 재시도와 중복되지 않도록 클라이언트는 max_retries=SDK_MAX_RETRIES(0)로 생성합니다.
+동일 요청 병합(CoalescingAsyncTransport) 안쪽에 위치하므로 헤지 요청은 병합되지 않습니다.
+
+Usage:
+    from app.utils.llm_resilience import request_deadline, retry_with_backoff
+
+    with request_deadline(30):
+        result, attempts = await retry_with_backoff(lambda: chain.ainvoke(inputs))
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 요청 데드라인 기본값 (초, 0이면 X-Request-Timeout 헤더가 있을 때만 적용)
+LLM_REQUEST_DEADLINE = float(os.getenv("LLM_REQUEST_DEADLINE", "0"))
+
+# 재시도 횟수 / 백오프 기준 및 상한 (초)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "8"))
+
+# 헤지 요청 사용 여부 / 지연 표본이 부족할 때의 헤지 대기 시간 (초) / p95 사용에 필요한 표본 수
+LLM_HEDGE = os.getenv("LLM_HEDGE", "true").lower() == "true"
+LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "10"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+# SDK 클라이언트 자체 재시도 (transport 계층에서 재시도하므로 0)
+SDK_MAX_RETRIES = 0
+
+# 재시도/헤지 대상 OpenAI API 경로
+_RESILIENT_PATHS = ("/chat/completions", "/completions", "/embeddings", "/responses")
+
+# 재시도할 HTTP 상태 코드
+_RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+# 헤지 최소 대기 시간 (초) / 경로별 지연 표본 수
+_HEDGE_FLOOR = 0.2
+_LATENCY_WINDOW = 500
+
+_deadline: ContextVar[float | None] = ContextVar("llm_request_deadline", default=None)
+
+# 안쪽 transport가 업스트림 전송을 시작할 때 호출할 콜백 (시도별)
+_upstream_start: ContextVar[Callable[[], None] | None] = ContextVar(
+    "llm_upstream_start", default=None
+)
+
+
+class DeadlineExceeded(httpx.TimeoutException):
+    """요청 데드라인 초과 (SDK에서는 타임아웃 오류로 처리됨)"""
+
+
+# ============================================================================
+# 요청 데드라인
+# ============================================================================
+
+
+@contextmanager
+def request_deadline(seconds: float | None) -> Iterator[None]:
+    """
+    블록 안에서 시작한 LLM 호출의 마감 시각 지정
+
+    바깥 데드라인이 더 이르면 바깥 데드라인을 유지합니다 (중첩 시 짧은 쪽 적용).
+    asyncio 태스크는 생성 시점의 컨텍스트를 복사하므로 블록 안에서 만든 태스크에도 적용됩니다.
+
+    Args:
+        seconds: 지금부터 남은 시간 (초, None 또는 0 이하이면 변경 없음)
+
+    Examples:
+        >>> with request_deadline(30):
+        ...     await chain.ainvoke({"query": "..."})
+    """
+    if not seconds or seconds <= 0:
+        yield
+        return
+
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> float | None:
+    """현재 컨텍스트 데드라인까지 남은 시간 (초, 데드라인이 없으면 None)"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+class RequestDeadlineMiddleware:
+    """
+    HTTP 요청 데드라인을 LLM 호출에 전파하는 ASGI 미들웨어
+
+    X-Request-Timeout 헤더(초)가 있으면 그 값을, 없으면 LLM_REQUEST_DEADLINE을 사용합니다.
+    스트리밍 응답 생성도 같은 컨텍스트에서 실행되므로 데드라인이 적용됩니다.
+    """
+
+    def __init__(self, app: Any, default_seconds: float = LLM_REQUEST_DEADLINE):
+        self.app = app
+        self.default_seconds = default_seconds
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        seconds = self.default_seconds
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-timeout":
+                try:
+                    seconds = float(value)
+                except ValueError:
+                    pass
+                break
+
+        with request_deadline(seconds):
+            await self.app(scope, receive, send)
+
+
+def mark_upstream_start() -> None:
+    """
+    업스트림 전송 시작 알림 (안쪽 transport가 governor 슬롯을 얻은 직후 호출)
+
+    Resilient transport는 이 시점부터 헤지 대기 시간과 응답 지연을 잽니다.
+    """
+    callback = _upstream_start.get()
+    if callback is not None:
+        callback()
+
+
+# ============================================================================
+# 지연 통계
+# ============================================================================
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _RouteStats:
+    """경로별 응답 헤더 지연 표본 (업스트림 전송 시작부터)과 재시도/헤지 횟수"""
+
+    def __init__(self):
+        self.latencies: deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.deadline_exceeded = 0
+
+    def hedge_delay(self) -> float:
+        if len(self.latencies) < LLM_HEDGE_MIN_SAMPLES:
+            return LLM_HEDGE_DELAY
+        return max(_HEDGE_FLOOR, _percentile(list(self.latencies), 0.95))
+
+    def snapshot(self) -> dict[str, Any]:
+        samples = list(self.latencies)
+        latency = (
+            {
+                f"{name}_ms": round(_percentile(samples, q) * 1000, 1)
+                for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+            }
+            if samples
+            else {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+        )
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_win_rate": round(self.hedge_wins / self.hedges, 4)
+            if self.hedges
+            else 0.0,
+            "deadline_exceeded": self.deadline_exceeded,
+            "samples": len(samples),
+            **latency,
+            "hedge_delay_ms": round(self.hedge_delay() * 1000, 1),
+        }
+
+
+_stats_lock = threading.Lock()
+_route_stats: dict[str, _RouteStats] = {}
+
+
+def _stats_for(route: str) -> _RouteStats:
+    with _stats_lock:
+        stats = _route_stats.get(route)
+        if stats is None:
+            stats = _route_stats[route] = _RouteStats()
+        return stats
+
+
+def get_resilience_stats() -> dict[str, Any]:
+    """
+    경로별 LLM 호출 복원력 통계 (프로세스별)
+
+    Returns:
+        "chat/completions", "chat/completions:stream", "embeddings" 등 경로별
+        - requests / errors / retries / deadline_exceeded
+        - hedges / hedge_wins / hedge_win_rate: 헤지 요청 수, 헤지가 먼저 응답한 수와 비율
+        - p50_ms / p95_ms / p99_ms: 업스트림 전송 시작부터 응답 헤더까지 지연 (최근 표본 기준)
+        - hedge_delay_ms: 현재 헤지 대기 시간 (p95, 표본 부족 시 LLM_HEDGE_DELAY)
+    """
+    with _stats_lock:
+        routes = dict(_route_stats)
+    return {
+        "hedging": LLM_HEDGE,
+        "max_retries": LLM_MAX_RETRIES,
+        "routes": {route: stats.snapshot() for route, stats in routes.items()},
+    }
+
+
+def _route_key(request: httpx.Request) -> str | None:
+    if request.method != "POST" or not request.url.path.endswith(_RESILIENT_PATHS):
+        return None
+    route = next(
+        path.lstrip("/") for path in _RESILIENT_PATHS if request.url.path.endswith(path)
+    )
+    try:
+        stream = bool(json.loads(request.content or b"{}").get("stream"))
+    except (ValueError, AttributeError, httpx.RequestNotRead):
+        stream = False
+    return f"{route}:stream" if stream else route
+
+
+# ============================================================================
+# 재시도 정책
+# ============================================================================
+
+
+def backoff_delay(attempt: int, base_delay: float | None = None) -> float:
+    """attempt번째 실패 후 대기 시간 (지수 백오프 + full jitter, 0 ~ min(상한, 기준 × 2^(attempt-1)))"""
+    base = LLM_RETRY_BASE_DELAY if base_delay is None else base_delay
+    return random.uniform(0, min(LLM_RETRY_MAX_DELAY, base * 2 ** (attempt - 1)))
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _is_retryable_error(error: BaseException) -> bool:
+    if isinstance(error, DeadlineExceeded):
+        return False
+    return isinstance(
+        error, httpx.TimeoutException | httpx.NetworkError | httpx.RemoteProtocolError
+    )
+
+
+def _bounded_sleep_time(delay: float) -> float | None:
+    """데드라인 안에서 잘 수 있는 시간 (대기 후 시도할 시간이 없으면 None)"""
+    remaining = remaining_time()
+    if remaining is not None and delay >= remaining:
+        return None
+    return delay
+
+
+def _limit_timeouts(request: httpx.Request, remaining: float | None) -> None:
+    # 연결/읽기 타임아웃이 데드라인을 넘지 않도록 제한
+    if remaining is None:
+        return
+    timeouts = dict(request.extensions.get("timeout", {}))
+    for key in ("connect", "read", "write", "pool"):
+        current = timeouts.get(key)
+        timeouts[key] = remaining if current is None else min(current, remaining)
+    request.extensions = {**request.extensions, "timeout": timeouts}
+
+
+async def retry_with_backoff(
+    call: Callable[[], Awaitable[T]],
+    max_retries: int | None = None,
+    timeout: float | None = None,
+    retry_on: tuple[type[BaseException], ...] = (Exception,),
+    base_delay: float | None = None,
+) -> tuple[T, int]:
+    """
+    비동기 호출을 지연 백오프(full jitter)로 재시도 (요청 데드라인 준수)
+
+    HTTP 수준 재시도는 transport가 수행하므로, 출력 파싱 실패 등 호출 단위 재시도가 필요한 곳에 사용합니다.
+
+    Args:
+        call: 매 시도마다 새 awaitable을 만드는 함수
+        max_retries: 재시도 횟수 (None이면 LLM_MAX_RETRIES)
+        timeout: 시도 1회당 타임아웃 (초, 데드라인이 더 짧으면 데드라인 적용)
+        retry_on: 재시도할 예외 타입
+        base_delay: 첫 재시도 백오프 기준 (초, None이면 LLM_RETRY_BASE_DELAY)
+
+    Returns:
+        (결과, 시도 횟수)
+
+    Raises:
+        DeadlineExceeded: 데드라인이 지남
+        Exception: 재시도하지 않는 예외, 또는 재시도를 모두 소진하면 마지막 시도의 예외
+        (실패 시에도 실제 시도 횟수를 예외의 attempts 속성으로 전달)
+    """
+    retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+    attempt = 0
+    while True:
+        remaining = remaining_time()
+        if remaining is not None and remaining <= 0:
+            error = DeadlineExceeded("LLM request deadline exceeded")
+            error.attempts = attempt
+            raise error
+        attempt += 1
+        limits = [value for value in (timeout, remaining) if value is not None]
+        try:
+            result = await asyncio.wait_for(call(), min(limits) if limits else None)
+            return result, attempt
+        except Exception as e:
+            e.attempts = attempt
+            if not isinstance(e, retry_on) or attempt > retries:
+                raise
+            delay = _bounded_sleep_time(backoff_delay(attempt, base_delay))
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+
+
+# ============================================================================
+# Transport
+# ============================================================================
+
+
+async def _close_response(task: asyncio.Task) -> None:
+    # 취소되지 못하고 완료된 패자 응답은 연결 반환을 위해 닫음
+    if task.cancelled() or task.exception() is not None:
+        return
+    await task.result().aclose()
+
+
+class ResilientAsyncTransport(httpx.AsyncBaseTransport):
+    """
+    데드라인, 지터 백오프 재시도, 헤지 요청을 적용하는 비동기 transport
+
+    Args:
+        transport: 안쪽 transport
+        hedge: 헤지 요청 사용 여부
+        queued: 안쪽 transport의 대기열에 요청이 있는지 반환하는 함수
+            (지정하면 안쪽 transport가 mark_upstream_start()로 알린 시점부터 헤지 시계와 지연을 재고,
+            대기열에 요청이 있는 동안에는 헤지하지 않음)
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        hedge: bool = LLM_HEDGE,
+        queued: Callable[[], bool] | None = None,
+    ):
+        self._transport = transport
+        self._hedge = hedge
+        self._queued = queued
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        route = _route_key(request)
+        if route is None:
+            return await self._transport.handle_async_request(request)
+
+        stats = _stats_for(route)
+        stats.requests += 1
+        attempt = 0
+        while True:
+            attempt += 1
+            remaining = remaining_time()
+            if remaining is not None and remaining <= 0:
+                stats.deadline_exceeded += 1
+                raise DeadlineExceeded("LLM request deadline exceeded", request=request)
+            _limit_timeouts(request, remaining)
+
+            try:
+                response, started = await self._send(request, stats, remaining)
+            except Exception as e:
+                delay = _bounded_sleep_time(backoff_delay(attempt))
+                if (
+                    attempt > LLM_MAX_RETRIES
+                    or not _is_retryable_error(e)
+                    or delay is None
+                ):
+                    stats.errors += 1
+                    if isinstance(e, DeadlineExceeded):
+                        stats.deadline_exceeded += 1
+                    raise
+            else:
+                if response.status_code not in _RETRY_STATUSES:
+                    stats.latencies.append(time.monotonic() - started)
+                    return response
+                delay = _bounded_sleep_time(
+                    _retry_after(response) or backoff_delay(attempt)
+                )
+                if attempt > LLM_MAX_RETRIES or delay is None:
+                    stats.errors += 1
+                    return response
+                await response.aclose()
+
+            stats.retries += 1
+            await asyncio.sleep(delay)
+
+    async def _upstream(
+        self, request: httpx.Request, started: asyncio.Future
+    ) -> httpx.Response:
+        """안쪽 transport 호출 (업스트림 전송 시작 시각을 started에 기록)"""
+
+        def mark() -> None:
+            if not started.done():
+                started.set_result(time.monotonic())
+
+        # 태스크마다 복사된 컨텍스트에 설정되므로 헤지 요청과 섞이지 않음
+        _upstream_start.set(mark)
+        if self._queued is None:
+            mark()
+        return await self._transport.handle_async_request(request)
+
+    def _is_queued(self) -> bool:
+        return self._queued is not None and self._queued()
+
+    async def _send(
+        self, request: httpx.Request, stats: _RouteStats, remaining: float | None
+    ) -> tuple[httpx.Response, float]:
+        """
+        요청 1회 전송 (필요하면 헤지)
+
+        Returns:
+            (응답, 응답한 요청의 업스트림 전송 시작 시각)
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.create_future()
+        primary = asyncio.create_task(self._upstream(request, started))
+        if not self._hedge:
+            response = await self._wait_one(primary, remaining, request)
+            return response, _started_at(started)
+
+        # governor 대기 중에는 헤지 시계를 시작하지 않음 (포화는 업스트림 지연이 아님)
+        done, _ = await asyncio.wait(
+            {primary, started},
+            timeout=None if remaining is None else max(remaining, 0),
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        if not done:
+            primary.cancel()
+            raise DeadlineExceeded("LLM request deadline exceeded", request=request)
+
+        hedge_delay = stats.hedge_delay()
+        budget = remaining_time()
+        if (
+            primary.done()
+            or (budget is not None and hedge_delay >= budget)
+            or self._is_queued()
+        ):
+            response = await self._wait_one(primary, budget, request)
+            return response, _started_at(started)
+
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+        if done or self._is_queued():
+            response = await self._wait_one(primary, remaining_time(), request)
+            return response, _started_at(started)
+
+        # 응답이 p95보다 늦으면 같은 요청을 한 번 더 보내고 먼저 온 응답 사용
+        stats.hedges += 1
+        hedge_started = loop.create_future()
+        hedge = asyncio.create_task(self._upstream(request, hedge_started))
+        tasks = {primary, hedge}
+        pending = set(tasks)
+        winner = None
+        error: BaseException | None = None
+        try:
+            while pending and winner is None:
+                budget = remaining_time()
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=None if budget is None else max(budget, 0),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    raise DeadlineExceeded(
+                        "LLM request deadline exceeded", request=request
+                    )
+                for task in done:
+                    if task.exception() is None and winner is None:
+                        winner = task
+                    elif task.exception() is not None:
+                        error = task.exception()
+        finally:
+            # 패자 요청 취소 (이미 완료된 패자 응답은 닫음)
+            for task in tasks:
+                if task is winner:
+                    continue
+                if not task.done():
+                    task.cancel()
+                else:
+                    await _close_response(task)
+
+        if winner is None:
+            raise error or DeadlineExceeded(
+                "LLM request deadline exceeded", request=request
+            )
+        if winner is hedge:
+            stats.hedge_wins += 1
+            return winner.result(), _started_at(hedge_started)
+        return winner.result(), _started_at(started)
+
+    async def _wait_one(
+        self, task: asyncio.Task, remaining: float | None, request: httpx.Request
+    ) -> httpx.Response:
+        try:
+            return await asyncio.wait_for(task, remaining)
+        except TimeoutError as e:
+            raise DeadlineExceeded(
+                "LLM request deadline exceeded", request=request
+            ) from e
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _started_at(started: asyncio.Future) -> float:
+    # 안쪽 transport가 시작을 알리지 않고 끝났으면 지금 시각 (지연 0으로 기록)
+    return started.result() if started.done() else time.monotonic()
+
+
+class ResilientTransport(httpx.BaseTransport):
+    """동기 클라이언트용 transport (데드라인 + 지터 백오프 재시도, 헤지 요청 없음)"""
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        route = _route_key(request)
+        if route is None:
+            return self._transport.handle_request(request)
+
+        stats = _stats_for(route)
+        stats.requests += 1
+        attempt = 0
+        while True:
+            attempt += 1
+            remaining = remaining_time()
+            if remaining is not None and remaining <= 0:
+                stats.deadline_exceeded += 1
+                raise DeadlineExceeded("LLM request deadline exceeded", request=request)
+            _limit_timeouts(request, remaining)
+
+            started = time.monotonic()
+            marks: list[float] = []
+            token = _upstream_start.set(
+                lambda marks=marks: marks.append(time.monotonic())
+            )
+            try:
+                response = self._transport.handle_request(request)
+            except Exception as e:
+                delay = _bounded_sleep_time(backoff_delay(attempt))
+                if (
+                    attempt > LLM_MAX_RETRIES
+                    or not _is_retryable_error(e)
+                    or delay is None
+                ):
+                    stats.errors += 1
+                    raise
+            else:
+                if response.status_code not in _RETRY_STATUSES:
+                    stats.latencies.append(
+                        time.monotonic() - (marks[-1] if marks else started)
+                    )
+                    return response
+                delay = _bounded_sleep_time(
+                    _retry_after(response) or backoff_delay(attempt)
+                )
+                if attempt > LLM_MAX_RETRIES or delay is None:
+                    stats.errors += 1
+                    return response
+                response.close()
+            finally:
+                _upstream_start.reset(token)
+
+            stats.retries += 1
+            time.sleep(delay)
+
+    def close(self) -> None:
+        self._transport.close()
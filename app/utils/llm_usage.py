@@ -0,0 +1,204 @@
+"""
+LLM 호출 사용량 집계
+
+/llm 라우터의 호출별 토큰 사용량(prompt/completion)과 지연 시간을 기록합니다.
+- 호출 1건의 사용량은 응답 metadata.usage로 반환
+- 엔드포인트별/모델별 누적 호출 수, 토큰 수, 평균/최대 지연 시간, 실패 수를 프로세스 단위로 집계
+- OpenAI 응답의 usage 객체와 LangChain usage_metadata를 같은 형식으로 변환
+
+Usage:
+    from app.utils.llm_usage import track_llm_call, usage_from_openai
+
+    call = track_llm_call("generate-text")
+    response = await async_client.chat.completions.create(...)
+    usage = call.finish(response.model, *usage_from_openai(response.usage))
+    # {"model": "gpt-4o-mini", "prompt_tokens": 12, "completion_tokens": 80, ...}
+"""
+
+import threading
+import time
+from typing import Any
+
+
+def usage_from_openai(usage: Any) -> tuple[int, int]:
+    """OpenAI usage 객체 → (prompt_tokens, completion_tokens) (없으면 0)"""
+    if usage is None:
+        return 0, 0
+    return int(usage.prompt_tokens or 0), int(usage.completion_tokens or 0)
+
+
+def usage_from_langchain(usage_metadata: dict[str, Any] | None) -> tuple[int, int]:
+    """
+    LangChain usage_metadata → (prompt_tokens, completion_tokens)
+
+    AIMessage.usage_metadata (단일 호출) 또는 UsageMetadataCallbackHandler.usage_metadata
+    (모델명별 딕셔너리) 모두 지원합니다.
+    """
+    if not usage_metadata:
+        return 0, 0
+    if "input_tokens" in usage_metadata:
+        usage_metadata = {"": usage_metadata}
+    prompt_tokens = sum(
+        int(usage.get("input_tokens", 0)) for usage in usage_metadata.values()
+    )
+    completion_tokens = sum(
+        int(usage.get("output_tokens", 0)) for usage in usage_metadata.values()
+    )
+    return prompt_tokens, completion_tokens
+
+
+# ============================================================================
+# 누적 집계
+# ============================================================================
+
+
+def _empty_bucket() -> dict[str, Any]:
+    return {
+        "calls": 0,
+        "errors": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "total_tokens": 0,
+        "latency_ms_total": 0.0,
+        "latency_ms_max": 0.0,
+    }
+
+
+def _bucket_view(bucket: dict[str, Any]) -> dict[str, Any]:
+    completed = bucket["calls"] - bucket["errors"]
+    view = {key: value for key, value in bucket.items() if key != "latency_ms_total"}
+    view["latency_ms_avg"] = (
+        round(bucket["latency_ms_total"] / completed, 2) if completed else 0.0
+    )
+    view["latency_ms_max"] = round(bucket["latency_ms_max"], 2)
+    return view
+
+
+class LLMUsageMetrics:
+    """엔드포인트별/모델별 LLM 사용량 누적 집계 (스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_endpoint: dict[str, dict[str, Any]] = {}
+        self._by_model: dict[str, dict[str, Any]] = {}
+
+    def record(
+        self,
+        endpoint: str,
+        model: str | None,
+        prompt_tokens: int,
+        completion_tokens: int,
+        latency_ms: float,
+        error: bool = False,
+    ) -> None:
+        with self._lock:
+            buckets = [self._by_endpoint.setdefault(endpoint, _empty_bucket())]
+            if model:
+                buckets.append(self._by_model.setdefault(model, _empty_bucket()))
+            for bucket in buckets:
+                bucket["calls"] += 1
+                if error:
+                    bucket["errors"] += 1
+                    continue
+                bucket["prompt_tokens"] += prompt_tokens
+                bucket["completion_tokens"] += completion_tokens
+                bucket["total_tokens"] += prompt_tokens + completion_tokens
+                bucket["latency_ms_total"] += latency_ms
+                bucket["latency_ms_max"] = max(bucket["latency_ms_max"], latency_ms)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            total = _empty_bucket()
+            for bucket in self._by_endpoint.values():
+                for key in total:
+                    if key == "latency_ms_max":
+                        total[key] = max(total[key], bucket[key])
+                    else:
+                        total[key] += bucket[key]
+            return {
+                "total": _bucket_view(total),
+                "by_endpoint": {
+                    name: _bucket_view(bucket)
+                    for name, bucket in self._by_endpoint.items()
+                },
+                "by_model": {
+                    name: _bucket_view(bucket)
+                    for name, bucket in self._by_model.items()
+                },
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._by_endpoint.clear()
+            self._by_model.clear()
+
+
+_metrics = LLMUsageMetrics()
+
+
+class LLMCall:
+    """LLM 호출 1건의 지연 시간 측정 및 사용량 기록"""
+
+    def __init__(self, endpoint: str, metrics: LLMUsageMetrics):
+        self.endpoint = endpoint
+        self._metrics = metrics
+        self._started = time.perf_counter()
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+    def finish(
+        self,
+        model: str | None,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+    ) -> dict[str, Any]:
+        """
+        성공한 호출 기록
+
+        Returns:
+            응답 metadata.usage로 반환할 호출별 사용량
+            (model, prompt_tokens, completion_tokens, total_tokens, latency_ms)
+        """
+        latency_ms = self.elapsed_ms
+        self._metrics.record(
+            self.endpoint, model, prompt_tokens, completion_tokens, latency_ms
+        )
+        return {
+            "model": model,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "latency_ms": round(latency_ms, 2),
+        }
+
+    def fail(self, model: str | None = None) -> None:
+        """실패한 호출 기록 (토큰/지연 시간은 집계하지 않음)"""
+        self._metrics.record(self.endpoint, model, 0, 0, self.elapsed_ms, error=True)
+
+
+def track_llm_call(endpoint: str) -> LLMCall:
+    """
+    LLM 호출 측정 시작
+
+    Args:
+        endpoint: 집계 키 (예: "chat", "generate-text")
+
+    Returns:
+        LLMCall: 호출 완료 시 finish(), 실패 시 fail() 호출
+    """
+    return LLMCall(endpoint, _metrics)
+
+
+def get_llm_usage_stats() -> dict[str, Any]:
+    """
+    프로세스 누적 LLM 사용량
+
+    Returns:
+        - total: 전체 호출 수, 실패 수, 토큰 수, 평균/최대 지연 시간
+        - by_endpoint: 엔드포인트별 집계
+        - by_model: 모델별 집계
+    """
+    return _metrics.stats
@@ -0,0 +1,166 @@
+"""
+다중 검색 전략 라우터 (LLM 호출 없음)
+
+질문에 포함된 키워드로 표/본문/JSON 검색 중 필요한 전략만 선택합니다.
+- 키워드 매칭은 Aho–Corasick 오토마톤으로 질문 길이에 비례하는 시간에 수행
+- 요청에서 활성화한 전략이 상한이며, 라우터는 그중 일부만 고를 수 있음
+- 선택된 전략이 하나면 통합 LLM 호출을 생략
+
+Usage:
+    from app.utils.query_router import route_search_strategies
+
+    decision = route_search_strategies(
+        "감봉 기준 금액은 얼마인가요?",
+        use_table_search=True,
+        use_text_search=True,
+        use_json_extraction=False,
+    )
+    decision["strategies"]  # ["table"]
+"""
+
+import re
+from typing import Any
+
+from app.utils.keyword_index import KeywordAutomaton
+
+# 검색 전략 (multi_retrieval 실행 순서)
+SEARCH_STRATEGIES = ("table", "text", "json")
+
+# 표 검색 신호: 수치, 비교, 기준표형 질문
+TABLE_KEYWORDS = [
+    "표",
+    "기준표",
+    "비교",
+    "금액",
+    "얼마",
+    "몇",
+    "수치",
+    "비율",
+    "퍼센트",
+    "%",
+    "등급",
+    "단계별",
+    "종류별",
+    "항목별",
+    "상한",
+    "하한",
+    "한도",
+    "기간",
+    "순위",
+    "목록",
+    "일람",
+]
+
+# 본문 검색 신호: 설명, 절차, 조항 해석형 질문
+TEXT_KEYWORDS = [
+    "왜",
+    "이유",
+    "설명",
+    "의미",
+    "해석",
+    "절차",
+    "방법",
+    "어떻게",
+    "조항",
+    "규정",
+    "요건",
+    "예외",
+    "다만",
+    "단서",
+    "경우",
+    "목적",
+    "취지",
+    "정의",
+]
+
+# JSON 추출 신호: 구조화 출력 요청
+JSON_KEYWORDS = [
+    "json",
+    "JSON",
+    "필드",
+    "구조화",
+    "추출",
+    "키-값",
+]
+
+# "제5조" 같은 조항 번호는 본문 검색 신호
+_ARTICLE_PATTERN = re.compile(r"제\s*\d+\s*조")
+
+_AUTOMATONS = {
+    "table": KeywordAutomaton(TABLE_KEYWORDS),
+    "text": KeywordAutomaton(TEXT_KEYWORDS),
+    "json": KeywordAutomaton(JSON_KEYWORDS),
+}
+
+
+def _llm_calls(strategies: list[str]) -> int:
+    # 전략별 답변 생성 1회 + 전략이 둘 이상이면 통합 1회
+    return len(strategies) + (1 if len(strategies) > 1 else 0)
+
+
+def route_search_strategies(
+    query: str,
+    use_table_search: bool = True,
+    use_text_search: bool = True,
+    use_json_extraction: bool = False,
+) -> dict[str, Any]:
+    """
+    질문에 필요한 검색 전략 선택
+
+    요청에서 활성화한 전략 중 키워드가 매칭된 전략만 선택합니다.
+    매칭된 전략이 없으면 본문 검색(비활성화된 경우 첫 번째 활성 전략)을 사용합니다.
+
+    Args:
+        query: 검색 질문
+        use_table_search: 표 검색 허용 여부
+        use_text_search: 본문 검색 허용 여부
+        use_json_extraction: JSON 추출 허용 여부
+
+    Returns:
+        라우팅 결정 딕셔너리
+        - strategies: 실행할 전략 리스트 ("table", "text", "json")
+        - requested: 요청에서 활성화한 전략 리스트
+        - matched_keywords: 전략별 매칭 키워드
+        - integrate: 통합 LLM 호출 여부
+        - llm_calls / saved_llm_calls: 예상 LLM 호출 수 / 라우팅으로 절약한 호출 수
+
+    Examples:
+        >>> route_search_strategies("감봉 기준 금액은 얼마인가요?")["strategies"]
+        ['table']
+        >>> route_search_strategies("제5조 예외 조항의 의미는?")["strategies"]
+        ['text']
+    """
+    allowed = {
+        "table": use_table_search,
+        "text": use_text_search,
+        "json": use_json_extraction,
+    }
+    requested = [strategy for strategy in SEARCH_STRATEGIES if allowed[strategy]]
+
+    matched_keywords = {
+        strategy: automaton.find_keywords(query)
+        for strategy, automaton in _AUTOMATONS.items()
+    }
+    if _ARTICLE_PATTERN.search(query):
+        matched_keywords["text"].append("제N조")
+
+    strategies = [strategy for strategy in requested if matched_keywords[strategy]]
+    if not strategies and requested:
+        strategies = ["text"] if allowed["text"] else requested[:1]
+
+    # 라우팅 없이 실행하면 요청 전략마다 답변 생성 + 통합 1회
+    legacy_calls = len(requested) + 1
+    llm_calls = _llm_calls(strategies)
+
+    return {
+        "strategies": strategies,
+        "requested": requested,
+        "matched_keywords": {
+            strategy: keywords
+            for strategy, keywords in matched_keywords.items()
+            if keywords
+        },
+        "integrate": len(strategies) > 1,
+        "llm_calls": llm_calls,
+        "saved_llm_calls": legacy_calls - llm_calls,
+    }
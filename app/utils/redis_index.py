@@ -29,7 +29,26 @@ warnings.filterwarnings(
 from llama_index.core import VectorStoreIndex  # noqa: E402
 from llama_index.core.schema import TextNode  # noqa: E402
 
+from app.utils.ann_index import (  # noqa: E402
+    ANN_STORAGE,
+    ANNIndex,
+    get_ann_index_path,
+    load_ann_index_file,
+    save_ann_index_file,
+)
+from app.utils.corpus_index import (  # noqa: E402
+    remove_corpus_document,
+    upsert_corpus_document,
+)
+from app.utils.document_summary import delete_document_summaries  # noqa: E402
+from app.utils.lexical_index import LexicalIndex  # noqa: E402
 from app.utils.redis_client import get_redis_client  # noqa: E402
+from app.utils.retrieval import (  # noqa: E402
+    attach_ann_index,
+    get_index_component,
+    get_index_type,
+    set_index_component,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +86,8 @@ def _serialize_nodes(index: VectorStoreIndex) -> list[dict[str, Any]]:
             "id_": node.node_id,
             "text": node.get_content(),
             "metadata": node.metadata,
+            "excluded_embed_metadata_keys": node.excluded_embed_metadata_keys,
+            "excluded_llm_metadata_keys": node.excluded_llm_metadata_keys,
         }
 
         # 임베딩 추가
@@ -98,6 +119,10 @@ def _deserialize_nodes(nodes_data: list[dict[str, Any]]) -> list[TextNode]:
             text=node_dict.get("text", ""),
             metadata=node_dict.get("metadata", {}),
             embedding=node_dict.get("embedding"),
+            excluded_embed_metadata_keys=node_dict.get(
+                "excluded_embed_metadata_keys", []
+            ),
+            excluded_llm_metadata_keys=node_dict.get("excluded_llm_metadata_keys", []),
         )
         nodes.append(node)
 
@@ -151,10 +176,40 @@ async def save_index_to_redis(
         **metadata,
         "updated_at": datetime.now().isoformat(),
         "node_count": len(nodes_data),
+        "index_type": get_index_type(index),
     }
     metadata_json = json.dumps(metadata_with_timestamp, ensure_ascii=False)
     logger.info("메타데이터 직렬화 완료")
 
+    mapping: dict[str, str | bytes] = {
+        "nodes": nodes_json,
+        "metadata": metadata_json,
+    }
+
+    # 어휘 인덱스 (hybrid 검색용, 압축 바이너리)
+    lexical_index: LexicalIndex | None = get_index_component(index, "lexical")
+    if lexical_index is not None:
+        mapping["lexical"] = lexical_index.to_bytes()
+        logger.info(f"어휘 인덱스 직렬화 완료: {len(mapping['lexical'])} bytes")
+
+    # FAISS ANN 인덱스 (대용량 문서, ANN_STORAGE에 따라 Redis 또는 디스크)
+    ann_index: ANNIndex | None = get_index_component(index, "ann")
+    if ann_index is not None:
+        if ANN_STORAGE == "disk":
+            mapping["ann_path"] = save_ann_index_file(doc_id, ann_index)
+            logger.info(f"ANN 인덱스 디스크 저장 완료: {mapping['ann_path']}")
+        else:
+            mapping["ann"] = ann_index.to_bytes()
+            logger.info(f"ANN 인덱스 직렬화 완료: {len(mapping['ann'])} bytes")
+
+    # 요약 트리 (개요 질문용 요약 노드 + 임베딩)
+    tree_index: VectorStoreIndex | None = get_index_component(index, "summary_tree")
+    if tree_index is not None:
+        mapping["summary_tree"] = json.dumps(
+            _serialize_nodes(tree_index), ensure_ascii=False
+        )
+        logger.info(f"요약 트리 직렬화 완료: {len(mapping['summary_tree'])} bytes")
+
     # Redis에 저장
     logger.info(
         f"Redis 저장 시작... (nodes: {len(nodes_json)} bytes, metadata: {len(metadata_json)} bytes)"
@@ -165,14 +220,20 @@ async def save_index_to_redis(
         result = await asyncio.wait_for(
             client.hset(  # type: ignore
                 f"doc:{doc_id}",
-                mapping={
-                    "nodes": nodes_json,
-                    "metadata": metadata_json,
-                },
+                mapping=mapping,  # type: ignore[arg-type]
             ),
             timeout=30.0,
         )
         logger.info(f"Redis hset 결과: {result}")
+
+        # 재업로드 시 이전 인덱스 유형의 부가 구성요소가 남지 않도록 정리
+        stale_fields = [
+            field
+            for field in ("lexical", "ann", "ann_path", "summary_tree")
+            if field not in mapping
+        ]
+        if stale_fields:
+            await client.hdel(f"doc:{doc_id}", *stale_fields)  # type: ignore
     except asyncio.TimeoutError:
         logger.error("Redis hset 타임아웃 (30초)")
         raise
@@ -186,6 +247,15 @@ async def save_index_to_redis(
     if ttl_seconds is not None:
         await client.expire(f"doc:{doc_id}", ttl_seconds)
 
+    # 재업로드 시 이전 내용의 구간 요약 캐시 정리
+    await delete_document_summaries(doc_id)
+
+    # 코퍼스(전체 문서) 검색 인덱스 갱신 - 실패해도 문서 저장은 유지
+    try:
+        await upsert_corpus_document(doc_id, nodes_data)
+    except Exception as e:
+        logger.warning(f"코퍼스 인덱스 갱신 실패 (doc_id={doc_id}): {e}")
+
 
 async def load_index_from_redis(
     doc_id: str,
@@ -232,11 +302,36 @@ async def load_index_from_redis(
     # VectorStoreIndex 재구성 (임베딩이 이미 있으므로 API 호출 없음)
     index = VectorStoreIndex(nodes=nodes)
 
+    # 어휘 인덱스 복원 (없으면 hybrid 검색 시 노드로부터 생성)
+    lexical_bytes = data.get(b"lexical")
+    if lexical_bytes:
+        set_index_component(index, "lexical", LexicalIndex.from_bytes(lexical_bytes))
+
     # 메타데이터 파싱
     metadata: dict[str, Any] = {}
     if metadata_bytes:
         metadata = json.loads(metadata_bytes.decode("utf-8"))
 
+    # FAISS ANN 인덱스 복원 (재학습 없이 직렬화된 인덱스 사용)
+    ann_bytes = data.get(b"ann")
+    ann_path = data.get(b"ann_path")
+    if ann_bytes:
+        set_index_component(index, "ann", ANNIndex.from_bytes(ann_bytes))
+    elif ann_path:
+        ann_index = load_ann_index_file(ann_path.decode("utf-8"))
+        if ann_index is not None:
+            set_index_component(index, "ann", ann_index)
+        else:
+            # 다른 서버에서 저장되어 파일이 없는 경우 임베딩으로 재구성
+            logger.warning(f"ANN 인덱스 파일 없음, 재구성: {ann_path.decode('utf-8')}")
+            attach_ann_index(index, metadata.get("index_type", "auto"))
+
+    # 요약 트리 복원 (임베딩이 저장되어 있으므로 API 호출 없음)
+    tree_bytes = data.get(b"summary_tree")
+    if tree_bytes:
+        tree_nodes = _deserialize_nodes(json.loads(tree_bytes.decode("utf-8")))
+        set_index_component(index, "summary_tree", VectorStoreIndex(nodes=tree_nodes))
+
     return index, metadata
 
 
@@ -267,6 +362,17 @@ async def delete_document_from_redis(doc_id: str) -> bool:
     """
     client = await get_redis_client()
     result = await client.delete(f"doc:{doc_id}")
+
+    # 디스크에 저장된 ANN 인덱스 및 구간 요약 캐시 정리
+    get_ann_index_path(doc_id).unlink(missing_ok=True)
+    await delete_document_summaries(doc_id)
+
+    # 코퍼스(전체 문서) 검색 인덱스에서 제거
+    try:
+        await remove_corpus_document(doc_id)
+    except Exception as e:
+        logger.warning(f"코퍼스 인덱스 제거 실패 (doc_id={doc_id}): {e}")
+
     return result > 0  # type: ignore
 
 
@@ -0,0 +1,164 @@
+"""
+로컬 Cross-Encoder 재순위화(Reranking)
+
+벡터/하이브리드 검색으로 top_k개 후보를 넓게 가져온 뒤, CPU에서 동작하는 Cross-Encoder로
+(질문, 청크) 쌍의 관련도를 다시 매겨 상위 노드만 LLM에 전달합니다.
+tree_summarize 등에서 LLM 호출 횟수와 입력 토큰을 줄이는 용도입니다.
+
+- 모델은 프로세스당 한 번만 로드 (sentence-transformers CrossEncoder)
+- 추론은 전용 스레드 풀에서 배치 단위로 실행 (동시 요청 간 CPU 과점유 방지)
+- top_n개 또는 누적 토큰 예산(token_budget) 중 먼저 도달하는 기준까지 유지
+
+Usage:
+    from app.utils.reranker import CrossEncoderReranker
+
+    reranker = CrossEncoderReranker(top_n=5, token_budget=3000)
+    query_engine = build_query_engine(index, similarity_top_k=20, node_postprocessors=[reranker])
+    response = query_engine.query("징계 감경 기준은?")
+    print(reranker.stats)  # {"candidates": 20, "kept": 5, "tokens_saved": ..., ...}
+"""
+
+import os
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any
+
+# LlamaIndex 내부의 Pydantic validate_default 경고 억제
+warnings.filterwarnings(
+    "ignore",
+    category=UserWarning,
+    message=".*validate_default.*",
+    module="pydantic._internal._generate_schema",
+)
+
+from llama_index.core.bridge.pydantic import Field, PrivateAttr  # noqa: E402
+from llama_index.core.postprocessor.types import BaseNodePostprocessor  # noqa: E402
+from llama_index.core.schema import MetadataMode, NodeWithScore, QueryBundle  # noqa: E402
+
+from app.utils.tokens import count_tokens  # noqa: E402
+
+# 다국어(한국어 포함) 경량 Cross-Encoder
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1")
+RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "32"))
+
+# 재순위화 추론 스레드 수 (torch가 스레드 내부에서 다시 병렬화하므로 작게 유지)
+RERANK_WORKERS = int(os.getenv("RERANK_WORKERS", "1"))
+
+_executor = ThreadPoolExecutor(max_workers=RERANK_WORKERS, thread_name_prefix="rerank")
+
+
+@lru_cache(maxsize=2)
+def get_cross_encoder(model_name: str = RERANK_MODEL):
+    """Cross-Encoder 모델 로드 (모델별 1회)"""
+    from sentence_transformers import CrossEncoder
+
+    return CrossEncoder(model_name, device="cpu")
+
+
+def select_nodes(
+    nodes: list[NodeWithScore],
+    rerank_scores: list[float],
+    top_n: int,
+    token_budget: int | None = None,
+) -> list[NodeWithScore]:
+    """
+    재순위화 점수 내림차순으로 top_n개 또는 누적 토큰 예산까지 노드 선택
+
+    예산을 넘더라도 최상위 노드 1개는 항상 유지합니다.
+    노드의 score(검색 유사도)는 그대로 두어 confidence 계산에 영향을 주지 않습니다.
+
+    Args:
+        nodes: 검색된 노드 리스트
+        rerank_scores: 노드별 재순위화 점수 (nodes와 같은 순서)
+        top_n: 최대 유지 노드 수
+        token_budget: 누적 토큰 상한 (None이면 top_n만 적용)
+
+    Returns:
+        선택된 노드 리스트 (재순위화 점수 내림차순)
+    """
+    order = sorted(range(len(nodes)), key=rerank_scores.__getitem__, reverse=True)
+
+    selected: list[NodeWithScore] = []
+    used_tokens = 0
+    for node in (nodes[position] for position in order[:top_n]):
+        node_tokens = count_tokens(node.node.get_content())
+        if (
+            selected
+            and token_budget is not None
+            and used_tokens + node_tokens > token_budget
+        ):
+            break
+        selected.append(node)
+        used_tokens += node_tokens
+
+    return selected
+
+
+class CrossEncoderReranker(BaseNodePostprocessor):
+    """
+    Cross-Encoder 재순위화 노드 후처리기
+
+    쿼리 엔진마다 새로 생성하여 사용하며, 마지막 실행 통계는 stats로 확인합니다.
+    """
+
+    model_name: str = Field(default=RERANK_MODEL, description="Cross-Encoder 모델")
+    top_n: int = Field(default=5, description="유지할 최대 노드 수")
+    token_budget: int | None = Field(
+        default=None, description="유지할 노드의 누적 토큰 상한"
+    )
+    rerank_query: str | None = Field(
+        default=None,
+        description="재순위화에 사용할 질문 (지정하지 않으면 쿼리 엔진 질의 사용)",
+    )
+    batch_size: int = Field(default=RERANK_BATCH_SIZE, description="추론 배치 크기")
+
+    _stats: dict[str, Any] | None = PrivateAttr(default=None)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CrossEncoderReranker"
+
+    @property
+    def stats(self) -> dict[str, Any] | None:
+        """마지막 재순위화 통계 (실행 전이면 None)"""
+        return self._stats
+
+    def _score(self, query: str, texts: list[str]) -> list[float]:
+        model = get_cross_encoder(self.model_name)
+        pairs = [(query, text) for text in texts]
+        scores = _executor.submit(
+            model.predict, pairs, batch_size=self.batch_size, show_progress_bar=False
+        ).result()
+        return [float(score) for score in scores]
+
+    def _postprocess_nodes(
+        self,
+        nodes: list[NodeWithScore],
+        query_bundle: QueryBundle | None = None,
+    ) -> list[NodeWithScore]:
+        query = self.rerank_query or (query_bundle.query_str if query_bundle else None)
+        if not nodes or not query:
+            return nodes
+
+        start = time.perf_counter()
+        texts = [
+            node.node.get_content(metadata_mode=MetadataMode.NONE) for node in nodes
+        ]
+        scores = self._score(query, texts)
+        selected = select_nodes(nodes, scores, self.top_n, self.token_budget)
+        rerank_time_ms = (time.perf_counter() - start) * 1000
+
+        tokens_before = sum(count_tokens(node.node.get_content()) for node in nodes)
+        tokens_after = sum(count_tokens(node.node.get_content()) for node in selected)
+        self._stats = {
+            "model": self.model_name,
+            "candidates": len(nodes),
+            "kept": len(selected),
+            "rerank_time_ms": round(rerank_time_ms, 2),
+            "tokens_before": tokens_before,
+            "tokens_after": tokens_after,
+            "tokens_saved": tokens_before - tokens_after,
+        }
+        return selected
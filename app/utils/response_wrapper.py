@@ -4,6 +4,7 @@ API Response Wrapper
 모든 API 응답을 일관된 형식으로 래핑하는 유틸리티
 """
 
+import json
 from typing import Any, Generic, TypeVar
 
 from fastapi.responses import JSONResponse
@@ -121,3 +122,13 @@ def error_response(
         status_code=status_code,
         error=error,
     )
+
+
+def ndjson_line(payload: dict[str, Any]) -> str:
+    """스트리밍 응답용 NDJSON 한 줄 (application/x-ndjson)"""
+    return json.dumps(payload, ensure_ascii=False) + "\n"
+
+
+def sse_event(event: str, payload: dict[str, Any]) -> str:
+    """Server-Sent Events 이벤트 1개 (text/event-stream)"""
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
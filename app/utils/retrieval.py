@@ -0,0 +1,650 @@
+"""
+검색(Retrieval) 공통 유틸리티
+
+모든 문서 분석 라우터의 쿼리 엔진 생성을 한 곳에서 관리합니다.
+- vector: 임베딩 유사도 검색 (기존 as_query_engine과 동일)
+- hybrid: 임베딩 검색 + 문자 n-gram BM25 검색을 RRF(Reciprocal Rank Fusion)로 결합
+
+인덱스에 부가 구성요소(어휘 인덱스, FAISS ANN 인덱스 등)를 연결하는 레지스트리도 제공합니다.
+ANN 인덱스가 연결된 문서는 vector/hybrid 모드의 벡터 검색에 FAISS를 사용합니다.
+인덱스 객체가 해제되면 연결된 구성요소도 함께 해제됩니다.
+
+Usage:
+    from app.utils.retrieval import build_query_engine
+
+    query_engine = build_query_engine(
+        index,
+        similarity_top_k=10,
+        response_mode="tree_summarize",
+        retrieval_mode="hybrid",
+    )
+    response = query_engine.query("제12조의 징계 기준은?")
+"""
+
+import asyncio
+import warnings
+from typing import Any
+from weakref import WeakKeyDictionary
+
+import numpy as np
+
+# LlamaIndex 내부의 Pydantic validate_default 경고 억제
+warnings.filterwarnings(
+    "ignore",
+    category=UserWarning,
+    message=".*validate_default.*",
+    module="pydantic._internal._generate_schema",
+)
+
+from llama_index.core import VectorStoreIndex  # noqa: E402
+from llama_index.core.postprocessor.types import BaseNodePostprocessor  # noqa: E402
+from llama_index.core.query_engine import RetrieverQueryEngine  # noqa: E402
+from llama_index.core.retrievers import BaseRetriever  # noqa: E402
+from llama_index.core.schema import NodeWithScore, QueryBundle  # noqa: E402
+from llama_index.core.vector_stores import (  # noqa: E402
+    FilterCondition,
+    FilterOperator,
+    MetadataFilters,
+)
+
+from app.utils.ann_index import ANNIndex, resolve_index_type  # noqa: E402
+from app.utils.context_packer import ContextPacker  # noqa: E402
+from app.utils.lexical_index import LexicalIndex  # noqa: E402
+from app.utils.synthesis import AdaptiveSynthesizer  # noqa: E402
+
+# 지원하는 검색 모드
+RETRIEVAL_MODES = ("vector", "hybrid")
+
+# RRF 상수 (일반적으로 60 사용)
+RRF_K = 60
+
+# 결합 전 각 검색기에서 가져올 후보 배수
+HYBRID_CANDIDATE_MULTIPLIER = 2
+
+# ANN 검색에 메타데이터 필터가 있을 때 가져올 후보 배수
+ANN_FILTER_CANDIDATE_MULTIPLIER = 10
+
+# 인덱스별 부가 구성요소 레지스트리 (예: "lexical" -> LexicalIndex)
+_index_components: "WeakKeyDictionary[VectorStoreIndex, dict[str, Any]]" = (
+    WeakKeyDictionary()
+)
+
+
+# ============================================================================
+# 인덱스 구성요소 레지스트리
+# ============================================================================
+
+
+def set_index_component(index: VectorStoreIndex, name: str, component: Any) -> None:
+    """
+    인덱스에 부가 구성요소 연결
+
+    Args:
+        index: LlamaIndex VectorStoreIndex
+        name: 구성요소 이름 (예: "lexical")
+        component: 연결할 객체
+    """
+    _index_components.setdefault(index, {})[name] = component
+
+
+def get_index_component(index: VectorStoreIndex, name: str, default: Any = None) -> Any:
+    """
+    인덱스에 연결된 부가 구성요소 조회
+
+    Args:
+        index: LlamaIndex VectorStoreIndex
+        name: 구성요소 이름
+        default: 구성요소가 없을 때 반환할 값
+
+    Returns:
+        연결된 구성요소 또는 default
+    """
+    return _index_components.get(index, {}).get(name, default)
+
+
+def get_or_build_lexical_index(index: VectorStoreIndex) -> LexicalIndex:
+    """
+    인덱스에 연결된 어휘 인덱스 반환 (없으면 docstore 노드로 생성 후 연결)
+
+    어휘 인덱스 도입 이전에 업로드된 문서도 hybrid 모드를 사용할 수 있도록 합니다.
+    """
+    lexical_index = get_index_component(index, "lexical")
+    if lexical_index is None:
+        nodes = list(index.docstore.docs.values())
+        lexical_index = LexicalIndex.build(nodes)
+        set_index_component(index, "lexical", lexical_index)
+    return lexical_index
+
+
+def get_node_embeddings(index: VectorStoreIndex) -> dict[str, list[float]]:
+    """
+    인덱스의 벡터 스토어에서 노드별 임베딩 딕셔너리 반환
+
+    Returns:
+        {node_id: embedding} 딕셔너리 (접근 불가 시 빈 딕셔너리)
+    """
+    vector_store = index.storage_context.vector_store
+    data = getattr(vector_store, "_data", None)
+    return getattr(data, "embedding_dict", None) or {}
+
+
+def attach_ann_index(index: VectorStoreIndex, index_type: str = "auto") -> str:
+    """
+    인덱스 임베딩으로 FAISS ANN 인덱스를 생성하여 연결
+
+    Args:
+        index: LlamaIndex VectorStoreIndex
+        index_type: 요청 인덱스 유형 ("auto", "flat", "ivf", "hnsw")
+
+    Returns:
+        실제 적용된 인덱스 유형 ("flat"이면 ANN 인덱스를 연결하지 않음)
+    """
+    embeddings = get_node_embeddings(index)
+    resolved_type = resolve_index_type(index_type, len(embeddings))
+
+    if resolved_type != "flat":
+        node_ids = list(embeddings.keys())
+        ann_index = ANNIndex.build(
+            node_ids, [embeddings[node_id] for node_id in node_ids], resolved_type
+        )
+        set_index_component(index, "ann", ann_index)
+
+    return resolved_type
+
+
+def get_index_type(index: VectorStoreIndex) -> str:
+    """인덱스에 적용된 벡터 검색 유형 ("flat", "ivf", "hnsw")"""
+    ann_index: ANNIndex | None = get_index_component(index, "ann")
+    return ann_index.index_type if ann_index is not None else "flat"
+
+
+# ============================================================================
+# Retrievers
+# ============================================================================
+
+
+def _matches_filters(metadata: dict[str, Any], filters: MetadataFilters | None) -> bool:
+    """
+    노드 메타데이터가 필터 조건을 만족하는지 확인
+
+    EQ/NE/IN/NIN 연산자와 AND/OR 조건을 지원합니다.
+    """
+    if filters is None or not filters.filters:
+        return True
+
+    results = []
+    for metadata_filter in filters.filters:
+        if isinstance(metadata_filter, MetadataFilters):
+            results.append(_matches_filters(metadata, metadata_filter))
+            continue
+
+        value = metadata.get(metadata_filter.key)
+        operator = metadata_filter.operator
+        if operator == FilterOperator.EQ:
+            results.append(value is not None and value == metadata_filter.value)
+        elif operator == FilterOperator.NE:
+            results.append(value != metadata_filter.value)
+        elif operator == FilterOperator.IN:
+            results.append(value in metadata_filter.value)  # type: ignore[operator]
+        elif operator == FilterOperator.NIN:
+            results.append(value not in metadata_filter.value)  # type: ignore[operator]
+        else:
+            raise ValueError(f"지원하지 않는 필터 연산자입니다: {operator}")
+
+    if filters.condition == FilterCondition.OR:
+        return any(results)
+    return all(results)
+
+
+class ANNRetriever(BaseRetriever):
+    """
+    FAISS ANN 인덱스 검색기
+
+    메타데이터 필터가 있으면 후보를 넉넉히 가져와 필터링하고,
+    그래도 top_k를 채우지 못하면 기존 전수 비교 검색으로 대체합니다.
+    """
+
+    def __init__(
+        self,
+        index: VectorStoreIndex,
+        ann_index: ANNIndex,
+        similarity_top_k: int = 10,
+        filters: MetadataFilters | None = None,
+    ):
+        super().__init__()
+        self._index = index
+        self._ann_index = ann_index
+        self._similarity_top_k = similarity_top_k
+        self._filters = filters
+
+    def _search(self, query_bundle: QueryBundle) -> list[NodeWithScore] | None:
+        docstore = self._index.docstore
+        candidate_k = self._similarity_top_k
+        if self._filters:
+            candidate_k *= ANN_FILTER_CANDIDATE_MULTIPLIER
+
+        hits = self._ann_index.search(query_bundle.embedding, top_k=candidate_k)  # type: ignore[arg-type]
+
+        results: list[NodeWithScore] = []
+        for node_id, score in hits:
+            node = docstore.get_node(node_id, raise_error=False)
+            if node is None or not _matches_filters(node.metadata, self._filters):
+                continue
+            results.append(NodeWithScore(node=node, score=score))
+            if len(results) >= self._similarity_top_k:
+                return results
+
+        # 필터 조건이 까다로워 후보가 부족한 경우
+        if self._filters and len(hits) < len(self._ann_index):
+            return None
+        return results
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        if query_bundle.embedding is None:
+            query_bundle.embedding = (
+                self._index._embed_model.get_agg_embedding_from_queries(
+                    query_bundle.embedding_strs
+                )
+            )
+
+        results = self._search(query_bundle)
+        if results is None:
+            return self._index.as_retriever(
+                similarity_top_k=self._similarity_top_k, filters=self._filters
+            ).retrieve(query_bundle)
+        return results
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        if query_bundle.embedding is None:
+            query_bundle.embedding = (
+                await self._index._embed_model.aget_agg_embedding_from_queries(
+                    query_bundle.embedding_strs
+                )
+            )
+
+        results = self._search(query_bundle)
+        if results is None:
+            return await self._index.as_retriever(
+                similarity_top_k=self._similarity_top_k, filters=self._filters
+            ).aretrieve(query_bundle)
+        return results
+
+
+def _build_vector_retriever(
+    index: VectorStoreIndex,
+    similarity_top_k: int,
+    filters: MetadataFilters | None = None,
+) -> BaseRetriever:
+    """ANN 인덱스가 연결되어 있으면 FAISS 검색기, 아니면 기본 벡터 검색기"""
+    ann_index: ANNIndex | None = get_index_component(index, "ann")
+    if ann_index is not None:
+        return ANNRetriever(
+            index, ann_index, similarity_top_k=similarity_top_k, filters=filters
+        )
+    return index.as_retriever(similarity_top_k=similarity_top_k, filters=filters)
+
+
+class LexicalRetriever(BaseRetriever):
+    """문자 n-gram BM25 검색기"""
+
+    def __init__(
+        self,
+        index: VectorStoreIndex,
+        similarity_top_k: int = 10,
+        filters: MetadataFilters | None = None,
+    ):
+        super().__init__()
+        self._index = index
+        self._lexical_index = get_or_build_lexical_index(index)
+        self._similarity_top_k = similarity_top_k
+        self._filters = filters
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        docstore = self._index.docstore
+        # 필터로 제외될 노드를 고려하여 후보를 넉넉히 조회
+        candidate_k = (
+            len(self._lexical_index) if self._filters else self._similarity_top_k
+        )
+
+        results: list[NodeWithScore] = []
+        for node_id, score in self._lexical_index.search(
+            query_bundle.query_str, top_k=candidate_k
+        ):
+            node = docstore.get_node(node_id, raise_error=False)
+            if node is None or not _matches_filters(node.metadata, self._filters):
+                continue
+            results.append(NodeWithScore(node=node, score=score))
+            if len(results) >= self._similarity_top_k:
+                break
+
+        return results
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    벡터 검색 + BM25 검색 RRF 결합 검색기
+
+    순위는 RRF 점수로 결정하고, 각 노드의 score에는 질의 임베딩과의
+    코사인 유사도를 기록하여 기존 confidence_score 계산과 호환되도록 합니다.
+    """
+
+    def __init__(
+        self,
+        index: VectorStoreIndex,
+        similarity_top_k: int = 10,
+        filters: MetadataFilters | None = None,
+    ):
+        super().__init__()
+        candidate_k = similarity_top_k * HYBRID_CANDIDATE_MULTIPLIER
+        self._index = index
+        self._similarity_top_k = similarity_top_k
+        self._vector_retriever = _build_vector_retriever(
+            index, similarity_top_k=candidate_k, filters=filters
+        )
+        self._lexical_retriever = LexicalRetriever(
+            index, similarity_top_k=candidate_k, filters=filters
+        )
+
+    def _fuse(
+        self,
+        query_bundle: QueryBundle,
+        vector_results: list[NodeWithScore],
+        lexical_results: list[NodeWithScore],
+    ) -> list[NodeWithScore]:
+        return fuse_ranked_results(
+            self._index,
+            query_bundle.embedding,
+            vector_results,
+            lexical_results,
+            self._similarity_top_k,
+        )
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        # 질의 임베딩을 한 번만 계산하여 벡터 검색과 점수 보정에 공유
+        if query_bundle.embedding is None:
+            query_bundle.embedding = (
+                self._index._embed_model.get_agg_embedding_from_queries(
+                    query_bundle.embedding_strs
+                )
+            )
+
+        vector_results = self._vector_retriever.retrieve(query_bundle)
+        lexical_results = self._lexical_retriever.retrieve(query_bundle)
+        return self._fuse(query_bundle, vector_results, lexical_results)
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        if query_bundle.embedding is None:
+            query_bundle.embedding = (
+                await self._index._embed_model.aget_agg_embedding_from_queries(
+                    query_bundle.embedding_strs
+                )
+            )
+
+        vector_results, lexical_results = await asyncio.gather(
+            self._vector_retriever.aretrieve(query_bundle),
+            asyncio.to_thread(self._lexical_retriever.retrieve, query_bundle),
+        )
+        return self._fuse(query_bundle, vector_results, lexical_results)
+
+
+def fuse_ranked_results(
+    index: VectorStoreIndex,
+    query_embedding: list[float] | None,
+    vector_results: list[NodeWithScore],
+    lexical_results: list[NodeWithScore],
+    similarity_top_k: int,
+) -> list[NodeWithScore]:
+    """
+    벡터/BM25 검색 결과를 RRF로 결합
+
+    score에는 RRF 점수 대신 질의 임베딩과의 코사인 유사도를 기록합니다.
+    """
+    fused_scores: dict[str, float] = {}
+    nodes_by_id: dict[str, NodeWithScore] = {}
+
+    for results in (vector_results, lexical_results):
+        for rank, result in enumerate(results, 1):
+            node_id = result.node.node_id
+            fused_scores[node_id] = fused_scores.get(node_id, 0.0) + 1.0 / (
+                RRF_K + rank
+            )
+            nodes_by_id.setdefault(node_id, result)
+
+    vector_scores = {result.node.node_id: result.score for result in vector_results}
+    embeddings = get_node_embeddings(index)
+
+    ranked_ids = sorted(fused_scores, key=fused_scores.__getitem__, reverse=True)
+    fused: list[NodeWithScore] = []
+    for node_id in ranked_ids[:similarity_top_k]:
+        score = vector_scores.get(node_id)
+        if score is None and query_embedding is not None and node_id in embeddings:
+            score = _cosine_similarity(query_embedding, embeddings[node_id])
+        fused.append(NodeWithScore(node=nodes_by_id[node_id].node, score=score))
+
+    return fused
+
+
+def _cosine_similarity(a: list[float], b: list[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b, strict=False))
+    norm_a = sum(x * x for x in a) ** 0.5
+    norm_b = sum(y * y for y in b) ** 0.5
+    if not norm_a or not norm_b:
+        return 0.0
+    return dot / (norm_a * norm_b)
+
+
+# ============================================================================
+# Batch Retrieval
+# ============================================================================
+
+
+def get_embedding_matrix(index: VectorStoreIndex) -> tuple[list[str], np.ndarray]:
+    """
+    인덱스 임베딩을 정규화된 행렬로 변환 (인덱스에 캐시)
+
+    Returns:
+        tuple: (node_id 리스트, N x D 정규화 행렬)
+    """
+    cached = get_index_component(index, "embedding_matrix")
+    if cached is None:
+        embeddings = get_node_embeddings(index)
+        node_ids = list(embeddings.keys())
+        matrix = np.asarray([embeddings[node_id] for node_id in node_ids], "float32")
+        if len(node_ids):
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix /= np.where(norms == 0, 1.0, norms)
+        cached = (node_ids, matrix)
+        set_index_component(index, "embedding_matrix", cached)
+    return cached
+
+
+def _batch_vector_search(
+    index: VectorStoreIndex,
+    query_embeddings: list[list[float]],
+    top_k: int,
+) -> list[list[tuple[str, float]]]:
+    """여러 질의의 벡터 검색을 한 번의 행렬 곱(또는 FAISS 배치 검색)으로 수행"""
+    ann_index: ANNIndex | None = get_index_component(index, "ann")
+    if ann_index is not None:
+        return ann_index.search_batch(query_embeddings, top_k)
+
+    node_ids, matrix = get_embedding_matrix(index)
+    if not node_ids:
+        return [[] for _ in query_embeddings]
+
+    queries = np.asarray(query_embeddings, dtype="float32")
+    norms = np.linalg.norm(queries, axis=1, keepdims=True)
+    queries /= np.where(norms == 0, 1.0, norms)
+
+    # (질의 수 x 노드 수) 유사도 행렬
+    scores = queries @ matrix.T
+    k = min(top_k, len(node_ids))
+    top_positions = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+    results = []
+    for row, positions in enumerate(top_positions):
+        ordered = positions[np.argsort(-scores[row, positions])]
+        results.append([(node_ids[i], float(scores[row, i])) for i in ordered])
+    return results
+
+
+def batch_retrieve(
+    index: VectorStoreIndex,
+    queries: list[str],
+    query_embeddings: list[list[float]],
+    similarity_top_k: int,
+    retrieval_mode: str = "vector",
+) -> list[list[NodeWithScore]]:
+    """
+    여러 질의를 한 번에 검색
+
+    질의 임베딩은 호출 측에서 배치로 계산하여 전달합니다.
+    vector 모드는 질의 x 노드 유사도 행렬 한 번으로 모든 질의를 검색하고,
+    hybrid 모드는 그 결과를 질의별 BM25 결과와 RRF로 결합합니다.
+
+    Args:
+        index: LlamaIndex VectorStoreIndex
+        queries: 질의 리스트
+        query_embeddings: 질의 임베딩 리스트 (queries와 같은 순서)
+        similarity_top_k: 질의별 검색할 청크 개수
+        retrieval_mode: 검색 모드 ("vector" 또는 "hybrid")
+
+    Returns:
+        질의별 NodeWithScore 리스트
+    """
+    if retrieval_mode not in RETRIEVAL_MODES:
+        raise ValueError(f"지원하지 않는 검색 모드입니다: {retrieval_mode}")
+
+    candidate_k = similarity_top_k
+    if retrieval_mode == "hybrid":
+        candidate_k *= HYBRID_CANDIDATE_MULTIPLIER
+
+    docstore = index.docstore
+    vector_hits = _batch_vector_search(index, query_embeddings, candidate_k)
+    vector_results = [
+        [
+            NodeWithScore(node=docstore.get_node(node_id), score=score)
+            for node_id, score in hits
+        ]
+        for hits in vector_hits
+    ]
+
+    if retrieval_mode == "vector":
+        return vector_results
+
+    lexical_retriever = LexicalRetriever(index, similarity_top_k=candidate_k)
+    return [
+        fuse_ranked_results(
+            index,
+            query_embedding,
+            results,
+            lexical_retriever.retrieve(QueryBundle(query)),
+            similarity_top_k,
+        )
+        for query, query_embedding, results in zip(
+            queries, query_embeddings, vector_results, strict=True
+        )
+    ]
+
+
+# ============================================================================
+# Query Engine Factory
+# ============================================================================
+
+
+def build_retriever(
+    index: VectorStoreIndex,
+    similarity_top_k: int,
+    retrieval_mode: str = "vector",
+    filters: MetadataFilters | None = None,
+) -> BaseRetriever:
+    """
+    검색 모드에 맞는 검색기 생성
+
+    Args:
+        index: LlamaIndex VectorStoreIndex
+        similarity_top_k: 검색할 청크 개수
+        retrieval_mode: 검색 모드 ("vector" 또는 "hybrid")
+        filters: 메타데이터 필터
+
+    Returns:
+        BaseRetriever
+    """
+    if retrieval_mode not in RETRIEVAL_MODES:
+        raise ValueError(f"지원하지 않는 검색 모드입니다: {retrieval_mode}")
+
+    if retrieval_mode == "hybrid":
+        return HybridRetriever(
+            index, similarity_top_k=similarity_top_k, filters=filters
+        )
+
+    return _build_vector_retriever(
+        index, similarity_top_k=similarity_top_k, filters=filters
+    )
+
+
+def build_query_engine(
+    index: VectorStoreIndex,
+    similarity_top_k: int = 2,
+    response_mode: str = "compact",
+    streaming: bool = False,
+    retrieval_mode: str = "vector",
+    filters: MetadataFilters | None = None,
+    node_postprocessors: list[BaseNodePostprocessor] | None = None,
+    context_budget: int | None = None,
+) -> RetrieverQueryEngine:
+    """
+    검색 모드를 선택할 수 있는 쿼리 엔진 생성
+
+    index.as_query_engine()과 동일한 인자에 retrieval_mode, context_budget이 추가됩니다.
+
+    Args:
+        index: LlamaIndex VectorStoreIndex
+        similarity_top_k: 검색할 청크 개수
+        response_mode: 응답 모드 (compact, tree_summarize 등, auto: 컨텍스트 크기로 자동 선택)
+        streaming: 스트리밍 응답 여부
+        retrieval_mode: 검색 모드 ("vector" 또는 "hybrid")
+        filters: 메타데이터 필터
+        node_postprocessors: 검색 후처리기 리스트
+        context_budget: 컨텍스트 토큰 예산 (지정 시 마지막 단계에 ContextPacker 적용)
+
+    Returns:
+        RetrieverQueryEngine
+    """
+    retriever = build_retriever(
+        index,
+        similarity_top_k=similarity_top_k,
+        retrieval_mode=retrieval_mode,
+        filters=filters,
+    )
+
+    postprocessors = list(node_postprocessors or [])
+    if context_budget is not None:
+        postprocessors.append(ContextPacker(token_budget=context_budget))
+
+    if response_mode == "auto":
+        return RetrieverQueryEngine.from_args(
+            retriever=retriever,
+            response_synthesizer=AdaptiveSynthesizer(streaming=streaming),
+            node_postprocessors=postprocessors,
+        )
+
+    return RetrieverQueryEngine.from_args(
+        retriever=retriever,
+        response_mode=response_mode,  # type: ignore[arg-type]
+        streaming=streaming,
+        node_postprocessors=postprocessors,
+    )
+
+
+def get_context_stats(query_engine: RetrieverQueryEngine) -> dict[str, Any] | None:
+    """
+    쿼리 엔진의 마지막 컨텍스트 패킹 통계
+
+    Returns:
+        토큰/노드 수 변화 (ContextPacker가 없거나 실행 전이면 None)
+    """
+    for postprocessor in query_engine._node_postprocessors:
+        if isinstance(postprocessor, ContextPacker):
+            return postprocessor.stats
+    return None
@@ -0,0 +1,199 @@
+"""
+구조화 출력 부분 스트리밍 (Partial JSON → SSE)
+
+LLM이 JSON 객체를 토큰 단위로 생성하는 동안 최상위 필드의 값이 끝나는 즉시 Pydantic 필드 검증을 거쳐
+SSE 이벤트로 보냅니다. 전체 응답을 기다린 뒤 파싱하는 방식보다 첫 필드가 훨씬 빨리 도착합니다.
+- 누적 텍스트를 매번 다시 파싱하지 않고 새로 받은 문자만 스캔 (전체 O(n))
+- 필드 값이 끝나면(최상위 ',' 또는 '}') 해당 필드만 json.loads 후 모델 필드 제약으로 검증
+- 스트림이 끝나면 전체 객체를 모델로 최종 검증 (필드 누락/타입 오류는 error 이벤트)
+
+Usage:
+    from app.utils.structured_stream import stream_structured_output
+
+    tokens = json_chain.astream({"text": text})  # JSON 문자열을 생성하는 체인
+    return StreamingResponse(
+        stream_structured_output(tokens, Person), media_type="text/event-stream"
+    )
+"""
+
+import json
+import time
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+
+from app.utils.chain_batch import error_fields
+from app.utils.response_wrapper import sse_event
+
+
+class PartialJSONObjectParser:
+    """
+    청크로 도착하는 JSON 객체에서 값이 끝난 최상위 필드를 즉시 반환하는 증분 파서
+
+    첫 '{' 이전의 텍스트(코드 펜스 등)는 무시합니다.
+
+    Examples:
+        >>> parser = PartialJSONObjectParser()
+        >>> parser.feed('{"name": "Kim", "ag')
+        [('name', 'Kim')]
+        >>> parser.feed('e": 30}')
+        [('age', 30)]
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.complete = False
+        self._scanned = 0
+        self._start: int | None = None
+        self._end: int | None = None
+        self._field_start = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def json_text(self) -> str:
+        """객체 부분의 텍스트 (완료 전이면 지금까지의 전체 텍스트)"""
+        if self._start is None or self._end is None:
+            return self.text
+        return self.text[self._start : self._end]
+
+    def _close_field(self, end: int) -> tuple[str, Any] | None:
+        segment = self.text[self._field_start : end].strip()
+        if not segment:
+            return None
+        try:
+            parsed = json.loads("{" + segment + "}")
+        except ValueError:
+            # 형식 오류는 최종 검증에서 보고
+            return None
+        return next(iter(parsed.items()), None)
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        """
+        청크 추가 후 새로 완료된 최상위 필드 반환
+
+        Returns:
+            [(필드명, 값), ...] (완료 순서)
+        """
+        self.text += chunk
+        fields: list[tuple[str, Any]] = []
+        position = self._scanned
+        while position < len(self.text) and not self.complete:
+            char = self.text[position]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif self._start is None:
+                if char == "{":
+                    self._start = position
+                    self._field_start = position + 1
+                    self._depth = 1
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    field = self._close_field(position)
+                    if field is not None:
+                        fields.append(field)
+                    self.complete = True
+                    self._end = position + 1
+            elif char == "," and self._depth == 1:
+                field = self._close_field(position)
+                if field is not None:
+                    fields.append(field)
+                self._field_start = position + 1
+            position += 1
+        self._scanned = position
+        return fields
+
+
+def validate_field(model: type[BaseModel], name: str, value: Any) -> Any:
+    """
+    모델의 필드 하나만 검증 (Field 제약 포함)
+
+    Returns:
+        검증 후 JSON 직렬화 가능한 값
+
+    Raises:
+        ValidationError: 값이 필드 타입/제약을 만족하지 않거나 모델에 없는 필드
+    """
+    instance = model.model_construct()
+    model.__pydantic_validator__.validate_assignment(instance, name, value)
+    return instance.model_dump(mode="json", include={name})[name]
+
+
+async def stream_structured_output(
+    tokens: AsyncIterator[str],
+    model: type[BaseModel],
+    finalize: Callable[[BaseModel], Any] | None = None,
+) -> AsyncIterator[str]:
+    """
+    JSON 토큰 스트림을 필드 단위 SSE 이벤트로 변환
+
+    Args:
+        tokens: JSON 객체 텍스트 청크 스트림 (예: prompt | llm | StrOutputParser()의 astream)
+        model: 출력 Pydantic 모델
+        finalize: 최종 검증된 모델 → 응답 데이터 변환 (기본: model_dump)
+
+    Yields:
+        SSE 문자열
+        - partial: {"field", "value", "partial": 지금까지 검증된 필드, "completed", "total_fields", "elapsed_ms"}
+        - field_error: {"field", "error"} (필드 검증 실패, 최종 검증에서 다시 확인)
+        - result: {"result", "time_to_first_field_ms", "fields_streamed", "execution_time_ms"}
+        - error: {"error", "error_type", "partial", "execution_time_ms"} (LLM 오류 또는 최종 검증 실패)
+    """
+    start = time.perf_counter()
+    parser = PartialJSONObjectParser()
+    partial: dict[str, Any] = {}
+    first_field_ms = None
+
+    def elapsed_ms() -> float:
+        return (time.perf_counter() - start) * 1000
+
+    try:
+        async for chunk in tokens:
+            for name, value in parser.feed(chunk):
+                try:
+                    partial[name] = validate_field(model, name, value)
+                except ValidationError as e:
+                    yield sse_event("field_error", {"field": name, "error": str(e)})
+                    continue
+                if first_field_ms is None:
+                    first_field_ms = elapsed_ms()
+                yield sse_event(
+                    "partial",
+                    {
+                        "field": name,
+                        "value": partial[name],
+                        "partial": partial,
+                        "completed": len(partial),
+                        "total_fields": len(model.model_fields),
+                        "elapsed_ms": elapsed_ms(),
+                    },
+                )
+        result = model.model_validate_json(parser.json_text)
+    except Exception as e:
+        yield sse_event(
+            "error",
+            {**error_fields(e), "partial": partial, "execution_time_ms": elapsed_ms()},
+        )
+        return
+
+    yield sse_event(
+        "result",
+        {
+            "result": finalize(result) if finalize else result.model_dump(mode="json"),
+            "time_to_first_field_ms": first_field_ms,
+            "fields_streamed": len(partial),
+            "execution_time_ms": elapsed_ms(),
+        },
+    )
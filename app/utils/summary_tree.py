@@ -0,0 +1,301 @@
+"""
+문서 요약 트리 (RAPTOR 방식)
+
+업로드 시 선택적으로 Child 노드 임베딩을 군집화하고, 군집별 요약을 만든 뒤
+요약 노드를 다시 군집화/요약하여 작은 요약 트리를 구성합니다.
+요약 노드는 별도 VectorStoreIndex로 Child 인덱스 옆에 연결(index component "summary_tree")되며,
+Redis에는 문서 해시의 summary_tree 필드에 저장됩니다.
+
+질의 시 "이 문서의 목적은?" 같은 개요 질문은 트리 상위 레벨 요약 노드에서 검색하여
+작은 LLM 호출 한 번으로 답하고, 구체적인 질문은 기존처럼 Child 노드에서 검색합니다.
+
+Usage:
+    from app.utils.summary_tree import build_summary_query_engine, route_tree_level
+
+    if route_tree_level(index, query) == "summary":
+        query_engine = build_summary_query_engine(index)
+    else:
+        query_engine = build_query_engine(index, similarity_top_k=5)
+"""
+
+import asyncio
+import math
+import os
+import re
+import warnings
+from typing import Any
+
+import faiss
+import numpy as np
+
+# LlamaIndex 내부의 Pydantic validate_default 경고 억제
+warnings.filterwarnings(
+    "ignore",
+    category=UserWarning,
+    message=".*validate_default.*",
+    module="pydantic._internal._generate_schema",
+)
+
+from llama_index.core import Settings, VectorStoreIndex  # noqa: E402
+from llama_index.core.base.embeddings.base import BaseEmbedding  # noqa: E402
+from llama_index.core.llms import LLM  # noqa: E402
+from llama_index.core.prompts import PromptTemplate  # noqa: E402
+from llama_index.core.query_engine import RetrieverQueryEngine  # noqa: E402
+from llama_index.core.schema import BaseNode, TextNode  # noqa: E402
+from llama_index.core.vector_stores import (  # noqa: E402
+    FilterOperator,
+    MetadataFilter,
+    MetadataFilters,
+)
+
+from app.utils.retrieval import (  # noqa: E402
+    get_index_component,
+    get_node_embeddings,
+)
+from app.utils.tokens import truncate_to_tokens  # noqa: E402
+
+# 요약 노드 하나가 묶는 평균 하위 노드 수
+SUMMARY_TREE_BRANCHING = int(os.getenv("SUMMARY_TREE_BRANCHING", "8"))
+
+# 최대 트리 레벨 (1: Child 군집 요약만)
+SUMMARY_TREE_MAX_LEVELS = int(os.getenv("SUMMARY_TREE_MAX_LEVELS", "3"))
+
+# 군집 요약 동시 LLM 호출 수
+SUMMARY_TREE_CONCURRENCY = int(os.getenv("SUMMARY_TREE_CONCURRENCY", "8"))
+
+# 군집 요약 1회에 넣을 최대 입력 토큰
+SUMMARY_TREE_INPUT_TOKENS = int(os.getenv("SUMMARY_TREE_INPUT_TOKENS", "6000"))
+
+# 트리 레벨 선택 옵션 (auto: 질문 유형으로 자동 선택)
+TREE_LEVELS = ("auto", "summary", "leaf")
+
+CLUSTER_SUMMARY_PROMPT = PromptTemplate(
+    "다음은 같은 주제로 묶인 문서 발췌문입니다.\n"
+    "---------------------\n"
+    "{context_str}\n"
+    "---------------------\n"
+    "발췌문 전체의 주제, 목적, 핵심 규정과 수치를 한 문단으로 요약해 주세요. "
+    "발췌문에 없는 내용은 추가하지 마세요.\n"
+    "요약: "
+)
+
+# 개요(broad) 질문 판별 패턴
+_OVERVIEW_PATTERN = re.compile(
+    r"목적|취지|개요|요약|전반|전체적|핵심\s*내용|주요\s*내용|무엇에\s*관한|어떤\s*문서|배경"
+)
+
+# 구체적 질문 신호 (조항 번호, 수치, 따옴표 인용)
+_SPECIFIC_PATTERN = re.compile(r"제\s*\d+\s*조|\d|[\"'“”‘’「」]")
+
+
+def cluster_embeddings(embeddings: np.ndarray, n_clusters: int) -> list[list[int]]:
+    """
+    임베딩을 코사인 유사도 기준으로 군집화 (spherical k-means)
+
+    Args:
+        embeddings: (노드 수, 차원) 행렬
+        n_clusters: 군집 수
+
+    Returns:
+        군집별 행 번호 리스트 (빈 군집 제외, 각 군집 내부는 입력 순서)
+    """
+    count = len(embeddings)
+    if n_clusters <= 1 or count <= n_clusters:
+        return [list(range(count))] if n_clusters <= 1 else [[i] for i in range(count)]
+
+    matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+    faiss.normalize_L2(matrix)
+    # 문서 하나의 노드 수는 적으므로 군집당 최소 학습 점 수 경고를 끔
+    kmeans = faiss.Kmeans(
+        matrix.shape[1],
+        n_clusters,
+        niter=20,
+        seed=1234,
+        spherical=True,
+        min_points_per_centroid=1,
+    )
+    kmeans.train(matrix)
+    _, assignments = kmeans.index.search(matrix, 1)
+
+    clusters: dict[int, list[int]] = {}
+    for row, label in enumerate(assignments[:, 0]):
+        clusters.setdefault(int(label), []).append(row)
+
+    # 문서 앞쪽 내용부터 오도록 첫 행 순서로 정렬
+    return sorted(clusters.values(), key=lambda rows: rows[0])
+
+
+def _leaf_position(node: BaseNode) -> tuple[int, int]:
+    metadata = node.metadata
+    return int(metadata.get("parent_index", 0)), int(metadata.get("chunk_index", 0))
+
+
+async def build_summary_tree(
+    index: VectorStoreIndex,
+    llm: LLM | None = None,
+    embed_model: BaseEmbedding | None = None,
+    branching: int = SUMMARY_TREE_BRANCHING,
+    max_levels: int = SUMMARY_TREE_MAX_LEVELS,
+) -> VectorStoreIndex | None:
+    """
+    Child 인덱스로부터 요약 트리 인덱스 생성
+
+    레벨마다 노드 임베딩을 ceil(노드 수 / branching)개 군집으로 묶고, 군집별 요약을
+    병렬 생성하여 다음 레벨 노드로 사용합니다. 노드가 1개가 되거나 max_levels에
+    도달하면 멈춥니다.
+
+    Args:
+        index: Child 노드 VectorStoreIndex
+        llm: 요약 LLM (None이면 Settings.llm)
+        embed_model: 요약 임베딩 모델 (None이면 Settings.embed_model)
+        branching: 요약 노드 하나가 묶는 평균 하위 노드 수
+        max_levels: 최대 트리 레벨
+
+    Returns:
+        요약 노드 VectorStoreIndex (노드가 2개 미만이면 None)
+        - 요약 노드 metadata: node_type="summary", tree_level(1부터), child_count
+    """
+    llm = llm or Settings.llm
+    embed_model = embed_model or Settings.embed_model
+    embeddings = get_node_embeddings(index)
+
+    leaves = sorted(
+        (node for node in index.docstore.docs.values() if node.node_id in embeddings),
+        key=_leaf_position,
+    )
+    if len(leaves) < 2:
+        return None
+
+    texts = [node.get_content() for node in leaves]
+    vectors = np.array([embeddings[node.node_id] for node in leaves], dtype=np.float32)
+    semaphore = asyncio.Semaphore(SUMMARY_TREE_CONCURRENCY)
+
+    async def summarize(rows: list[int]) -> str:
+        context_str = truncate_to_tokens(
+            "\n\n".join(texts[row] for row in rows), SUMMARY_TREE_INPUT_TOKENS
+        )
+        async with semaphore:
+            return await llm.apredict(CLUSTER_SUMMARY_PROMPT, context_str=context_str)
+
+    tree_nodes: list[TextNode] = []
+    level = 0
+    while len(texts) > 1 and level < max_levels:
+        level += 1
+        clusters = cluster_embeddings(vectors, math.ceil(len(texts) / branching))
+        summaries = await asyncio.gather(*(summarize(rows) for rows in clusters))
+        summary_embeddings = await embed_model.aget_text_embedding_batch(
+            list(summaries)
+        )
+
+        for rows, summary, embedding in zip(
+            clusters, summaries, summary_embeddings, strict=True
+        ):
+            metadata = {
+                "node_type": "summary",
+                "tree_level": level,
+                "child_count": len(rows),
+            }
+            tree_nodes.append(
+                TextNode(
+                    text=summary,
+                    metadata=metadata,
+                    embedding=embedding,
+                    excluded_embed_metadata_keys=list(metadata),
+                    excluded_llm_metadata_keys=list(metadata),
+                )
+            )
+
+        texts = list(summaries)
+        vectors = np.array(summary_embeddings, dtype=np.float32)
+
+    return VectorStoreIndex(tree_nodes, embed_model=embed_model)
+
+
+def get_summary_tree_stats(tree_index: VectorStoreIndex | None) -> dict[str, Any]:
+    """요약 트리 노드 수와 레벨 수 (업로드 메타데이터용)"""
+    if tree_index is None:
+        return {"summary_tree_nodes": 0, "summary_tree_levels": 0}
+    levels = [
+        node.metadata.get("tree_level", 0) for node in tree_index.docstore.docs.values()
+    ]
+    return {
+        "summary_tree_nodes": len(levels),
+        "summary_tree_levels": max(levels, default=0),
+    }
+
+
+def is_overview_query(query: str) -> bool:
+    """
+    문서 전반을 묻는 개요 질문 여부
+
+    Examples:
+        >>> is_overview_query("이 문서의 목적은?")
+        True
+        >>> is_overview_query("제5조의 감경 기준 금액은?")
+        False
+    """
+    return bool(_OVERVIEW_PATTERN.search(query)) and not _SPECIFIC_PATTERN.search(query)
+
+
+def route_tree_level(
+    index: VectorStoreIndex, query: str, tree_level: str = "auto"
+) -> str:
+    """
+    질문을 처리할 트리 레벨 선택
+
+    Args:
+        index: Child 노드 VectorStoreIndex
+        query: 질문
+        tree_level: 요청 옵션 ("auto", "summary", "leaf")
+
+    Returns:
+        "summary" (요약 트리 검색) 또는 "leaf" (Child 노드 검색)
+        요약 트리가 없는 문서는 항상 "leaf"
+    """
+    if tree_level not in TREE_LEVELS:
+        raise ValueError(f"지원하지 않는 트리 레벨입니다: {tree_level}")
+    if get_index_component(index, "summary_tree") is None or tree_level == "leaf":
+        return "leaf"
+    if tree_level == "summary" or is_overview_query(query):
+        return "summary"
+    return "leaf"
+
+
+def build_summary_query_engine(
+    index: VectorStoreIndex,
+    similarity_top_k: int = 3,
+    streaming: bool = False,
+) -> RetrieverQueryEngine:
+    """
+    요약 트리 상위 두 레벨에서 검색하는 쿼리 엔진 생성
+
+    요약 노드는 짧으므로 compact 모드 LLM 호출 한 번으로 답변합니다.
+
+    Args:
+        index: 요약 트리가 연결된 Child 노드 VectorStoreIndex
+        similarity_top_k: 검색할 요약 노드 개수
+        streaming: 스트리밍 응답 여부
+
+    Raises:
+        ValueError: 요약 트리가 없는 문서인 경우
+    """
+    tree_index: VectorStoreIndex | None = get_index_component(index, "summary_tree")
+    if tree_index is None:
+        raise ValueError("요약 트리가 생성되지 않은 문서입니다.")
+
+    top_level = get_summary_tree_stats(tree_index)["summary_tree_levels"]
+    filters = MetadataFilters(
+        filters=[
+            MetadataFilter(
+                key="tree_level",
+                value=max(top_level - 1, 1),
+                operator=FilterOperator.GTE,
+            )
+        ]
+    )
+    return tree_index.as_query_engine(
+        similarity_top_k=similarity_top_k,
+        response_mode="compact",
+        streaming=streaming,
+        filters=filters,
+    )
@@ -0,0 +1,240 @@
+"""
+검색 컨텍스트 크기에 따른 응답 생성 전략 선택 (response_mode="auto")
+
+tree_summarize는 컨텍스트가 창에 맞지 않으면 청크 요약을 순차 호출하고,
+compact는 refine 단계를 순차 호출하므로 청크가 많을수록 LLM 왕복이 늘어납니다.
+AdaptiveSynthesizer는 검색된 청크의 토큰 수를 세어
+
+- 단일 호출 상한(SYNTHESIS_SINGLE_SHOT_TOKENS) 이하: 한 번의 LLM 호출로 답변 (single)
+- 초과: 청크를 SYNTHESIS_MAP_CHUNK_TOKENS 단위로 묶어 병렬 요약(map) 후 한 번에 답변(reduce)
+
+을 선택하고, 실제 LLM 호출 수를 stats로 기록합니다.
+
+Usage:
+    from app.utils.retrieval import build_query_engine
+    from app.utils.synthesis import get_synthesis_stats
+
+    query_engine = build_query_engine(index, similarity_top_k=20, response_mode="auto")
+    response = query_engine.query("주요 변경사항은?")
+    print(get_synthesis_stats(query_engine))  # {"strategy": "single", "llm_calls": 1, ...}
+"""
+
+import asyncio
+import os
+import warnings
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+# LlamaIndex 내부의 Pydantic validate_default 경고 억제
+warnings.filterwarnings(
+    "ignore",
+    category=UserWarning,
+    message=".*validate_default.*",
+    module="pydantic._internal._generate_schema",
+)
+
+from llama_index.core.llms import LLM  # noqa: E402
+from llama_index.core.prompts import BasePromptTemplate  # noqa: E402
+from llama_index.core.prompts.default_prompt_selectors import (  # noqa: E402
+    DEFAULT_TEXT_QA_PROMPT_SEL,
+    DEFAULT_TREE_SUMMARIZE_PROMPT_SEL,
+)
+from llama_index.core.query_engine import RetrieverQueryEngine  # noqa: E402
+from llama_index.core.response_synthesizers.base import BaseSynthesizer  # noqa: E402
+from llama_index.core.types import RESPONSE_TEXT_TYPE  # noqa: E402
+
+from app.utils.tokens import count_tokens  # noqa: E402
+
+# 단일 호출로 처리할 최대 컨텍스트 토큰 (LLM 컨텍스트 창보다 작으면 이 값 적용)
+SYNTHESIS_SINGLE_SHOT_TOKENS = int(os.getenv("SYNTHESIS_SINGLE_SHOT_TOKENS", "12000"))
+
+# map 단계에서 한 번의 요약 호출에 넣을 컨텍스트 토큰
+SYNTHESIS_MAP_CHUNK_TOKENS = int(os.getenv("SYNTHESIS_MAP_CHUNK_TOKENS", "4000"))
+
+# map 단계 동시 LLM 호출 수
+SYNTHESIS_MAP_CONCURRENCY = int(os.getenv("SYNTHESIS_MAP_CONCURRENCY", "8"))
+
+# 요약의 요약을 반복하는 최대 단계 (요약이 줄어들지 않는 경우 대비)
+_MAX_MAP_LEVELS = 3
+
+_CHUNK_SEPARATOR = "\n\n"
+
+
+def group_chunks(text_chunks: Sequence[str], max_tokens: int) -> list[str]:
+    """
+    순서를 유지하며 청크를 max_tokens 이하 묶음으로 결합
+
+    max_tokens보다 큰 청크는 단독 묶음이 됩니다.
+    """
+    groups: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+
+    for chunk in text_chunks:
+        chunk_tokens = count_tokens(chunk)
+        if current and current_tokens + chunk_tokens > max_tokens:
+            groups.append(_CHUNK_SEPARATOR.join(current))
+            current, current_tokens = [], 0
+        current.append(chunk)
+        current_tokens += chunk_tokens
+
+    if current:
+        groups.append(_CHUNK_SEPARATOR.join(current))
+    return groups
+
+
+class AdaptiveSynthesizer(BaseSynthesizer):
+    """컨텍스트 토큰 수에 따라 single / map_reduce를 선택하는 응답 생성기"""
+
+    def __init__(
+        self,
+        llm: LLM | None = None,
+        streaming: bool = False,
+        text_qa_template: BasePromptTemplate | None = None,
+        summary_template: BasePromptTemplate | None = None,
+        single_shot_tokens: int = SYNTHESIS_SINGLE_SHOT_TOKENS,
+        map_chunk_tokens: int = SYNTHESIS_MAP_CHUNK_TOKENS,
+        map_concurrency: int = SYNTHESIS_MAP_CONCURRENCY,
+    ) -> None:
+        super().__init__(llm=llm, streaming=streaming)
+        self._text_qa_template = text_qa_template or DEFAULT_TEXT_QA_PROMPT_SEL
+        self._summary_template = summary_template or DEFAULT_TREE_SUMMARIZE_PROMPT_SEL
+        self._single_shot_tokens = single_shot_tokens
+        self._map_chunk_tokens = map_chunk_tokens
+        self._map_concurrency = map_concurrency
+        self._stats: dict[str, Any] | None = None
+
+    @property
+    def stats(self) -> dict[str, Any] | None:
+        """마지막 응답 생성 통계 (실행 전이면 None)"""
+        return self._stats
+
+    def _get_prompts(self) -> dict[str, Any]:
+        return {
+            "text_qa_template": self._text_qa_template,
+            "summary_template": self._summary_template,
+        }
+
+    def _update_prompts(self, prompts: dict[str, Any]) -> None:
+        if "text_qa_template" in prompts:
+            self._text_qa_template = prompts["text_qa_template"]
+        if "summary_template" in prompts:
+            self._summary_template = prompts["summary_template"]
+
+    def _context_limit(self, query_str: str) -> int:
+        """단일 호출에 넣을 수 있는 컨텍스트 토큰 (프롬프트/출력 여유분 제외)"""
+        metadata = self._llm.metadata
+        template_tokens = count_tokens(
+            self._text_qa_template.format(
+                llm=self._llm, context_str="", query_str=query_str
+            )
+        )
+        window = metadata.context_window - max(metadata.num_output, 0)
+        return min(self._single_shot_tokens, window - template_tokens)
+
+    def _needs_map(self, chunks: list[str], limit: int, levels: int) -> bool:
+        if len(chunks) <= 1 or levels >= _MAX_MAP_LEVELS:
+            return False
+        return sum(count_tokens(chunk) for chunk in chunks) > limit
+
+    def _record(
+        self, context_tokens: int, limit: int, levels: int, map_calls: int
+    ) -> None:
+        self._stats = {
+            "strategy": "map_reduce" if levels else "single",
+            "context_tokens": context_tokens,
+            "single_shot_limit": limit,
+            "map_levels": levels,
+            "llm_calls": map_calls + 1,
+        }
+
+    def _final_prompt(self, levels: int, query_str: str) -> BasePromptTemplate:
+        # map 단계를 거쳤으면 요약 결합용 프롬프트, 아니면 일반 QA 프롬프트
+        template = self._summary_template if levels else self._text_qa_template
+        return template.partial_format(query_str=query_str)
+
+    def get_response(
+        self,
+        query_str: str,
+        text_chunks: Sequence[str],
+        **response_kwargs: Any,
+    ) -> RESPONSE_TEXT_TYPE:
+        chunks = list(text_chunks)
+        context_tokens = sum(count_tokens(chunk) for chunk in chunks)
+        limit = self._context_limit(query_str)
+        summary_prompt = self._summary_template.partial_format(query_str=query_str)
+
+        levels = map_calls = 0
+        while self._needs_map(chunks, limit, levels):
+            groups = group_chunks(chunks, self._map_chunk_tokens)
+            workers = min(len(groups), self._map_concurrency)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                chunks = list(
+                    executor.map(
+                        lambda group: self._llm.predict(
+                            summary_prompt, context_str=group, **response_kwargs
+                        ),
+                        groups,
+                    )
+                )
+            levels += 1
+            map_calls += len(groups)
+
+        self._record(context_tokens, limit, levels, map_calls)
+
+        prompt = self._final_prompt(levels, query_str)
+        context_str = _CHUNK_SEPARATOR.join(chunks)
+        if self._streaming:
+            return self._llm.stream(prompt, context_str=context_str, **response_kwargs)
+        return self._llm.predict(prompt, context_str=context_str, **response_kwargs)
+
+    async def aget_response(
+        self,
+        query_str: str,
+        text_chunks: Sequence[str],
+        **response_kwargs: Any,
+    ) -> RESPONSE_TEXT_TYPE:
+        chunks = list(text_chunks)
+        context_tokens = sum(count_tokens(chunk) for chunk in chunks)
+        limit = self._context_limit(query_str)
+        summary_prompt = self._summary_template.partial_format(query_str=query_str)
+        semaphore = asyncio.Semaphore(self._map_concurrency)
+
+        async def summarize(group: str) -> str:
+            async with semaphore:
+                return await self._llm.apredict(
+                    summary_prompt, context_str=group, **response_kwargs
+                )
+
+        levels = map_calls = 0
+        while self._needs_map(chunks, limit, levels):
+            groups = group_chunks(chunks, self._map_chunk_tokens)
+            chunks = list(await asyncio.gather(*(summarize(g) for g in groups)))
+            levels += 1
+            map_calls += len(groups)
+
+        self._record(context_tokens, limit, levels, map_calls)
+
+        prompt = self._final_prompt(levels, query_str)
+        context_str = _CHUNK_SEPARATOR.join(chunks)
+        if self._streaming:
+            return await self._llm.astream(
+                prompt, context_str=context_str, **response_kwargs
+            )
+        return await self._llm.apredict(
+            prompt, context_str=context_str, **response_kwargs
+        )
+
+
+def get_synthesis_stats(query_engine: RetrieverQueryEngine) -> dict[str, Any] | None:
+    """
+    쿼리 엔진의 마지막 응답 생성 통계
+
+    Returns:
+        전략(single/map_reduce), 컨텍스트 토큰, LLM 호출 수 (auto 모드가 아니면 None)
+    """
+    synthesizer = query_engine._response_synthesizer
+    if isinstance(synthesizer, AdaptiveSynthesizer):
+        return synthesizer.stats
+    return None
@@ -0,0 +1,41 @@
+"""
+LLM 토큰 수 계산
+
+LlamaIndex 전역 토크나이저(tiktoken)를 사용하여 프롬프트에 들어갈 텍스트의 토큰 수를 계산합니다.
+
+Usage:
+    from app.utils.tokens import count_tokens
+
+    count_tokens("징계 감경 기준")  # 9
+"""
+
+from llama_index.core.utils import get_tokenizer
+
+
+def count_tokens(text: str) -> int:
+    """LLM 토크나이저 기준 토큰 수"""
+    return len(get_tokenizer()(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    토큰 상한에 맞게 텍스트 뒷부분 절단
+
+    Args:
+        text: 원본 텍스트
+        max_tokens: 최대 토큰 수
+
+    Returns:
+        max_tokens 이하로 줄인 텍스트 (이미 이하이면 원본)
+    """
+    tokens = count_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+
+    # 토큰/문자 비율로 먼저 자른 뒤 상한 이하가 될 때까지 줄임
+    length = len(text) * max_tokens // tokens
+    while length > 0 and count_tokens(text[:length]) > max_tokens:
+        length = length * 9 // 10
+    return text[:length]
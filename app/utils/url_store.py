@@ -0,0 +1,354 @@
+"""
+URL별 영구 FAISS 벡터 스토어 (/rag/load)
+
+URL에서 만든 벡터 스토어를 로컬 디스크(URL_STORE_DIR)에 저장하고, 같은 URL을 다시 요청하면
+조건부 요청(If-None-Match / If-Modified-Since)으로 변경 여부만 확인한 뒤 기존 인덱스를 그대로 사용합니다.
+CPU 임베딩(수십 초)은 페이지 내용이 실제로 바뀌었을 때만 다시 수행합니다.
+- 저장 키: URL의 SHA-256, 디렉터리마다 FAISS 파일(index.faiss, index.pkl) + manifest.json
+- manifest: URL, ETag, Last-Modified, 본문 SHA-256, 분할/임베딩 설정, 문서 수, 수집 시각
+- 304 응답 또는 본문 해시가 같으면 재임베딩 없음 (ETag를 주지 않는 서버도 해시로 판별)
+- 분할/임베딩 설정이 바뀌면 저장된 인덱스를 쓰지 않고 다시 생성
+- 최근 사용한 스토어는 메모리에 유지 (URL_STORE_MEMORY_SIZE개, LRU)
+
+Usage:
+    from app.utils.url_store import load_url_store
+
+    result = await load_url_store(url, embeddings, split_html, config={"chunk_size": 500})
+    result.status  # "built" | "not_modified" | "unchanged"
+    result.vectorstore.similarity_search("질문")
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from app.utils.http_clients import get_pooled_async_transport
+
+logger = logging.getLogger(__name__)
+
+# 스토어 저장 디렉터리 / 메모리에 유지할 스토어 수
+URL_STORE_DIR = os.getenv("URL_STORE_DIR", "data/url_stores")
+URL_STORE_MEMORY_SIZE = int(os.getenv("URL_STORE_MEMORY_SIZE", "16"))
+
+# 페이지 요청 타임아웃 (초) / User-Agent
+URL_STORE_FETCH_TIMEOUT = float(os.getenv("URL_STORE_FETCH_TIMEOUT", "30"))
+URL_STORE_USER_AGENT = os.getenv("USER_AGENT", "Mozilla/5.0 (compatible; rag-loader)")
+
+_MANIFEST = "manifest.json"
+
+_http_client: httpx.AsyncClient | None = None
+_memory: "OrderedDict[str, tuple[str, FAISS]]" = OrderedDict()
+_locks: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+_stats_lock = threading.Lock()
+_stats: dict[str, Any] = {
+    "requests": 0,
+    "builds": 0,
+    "not_modified": 0,
+    "unchanged": 0,
+    "memory_hits": 0,
+    "disk_loads": 0,
+    "embedding_ms_total": 0.0,
+}
+
+
+@dataclass
+class URLStoreResult:
+    """URL 스토어 조회/생성 결과"""
+
+    url: str
+    key: str
+    status: str  # built | not_modified | unchanged
+    vectorstore: FAISS | None
+    manifest: dict[str, Any]
+    fetch_ms: float = 0.0
+    embedding_ms: float = 0.0
+
+    @property
+    def document_count(self) -> int:
+        return self.manifest.get("document_count", 0)
+
+
+def url_store_key(url: str) -> str:
+    """URL → 저장 키 (SHA-256 앞 32자)"""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+
+def get_url_store_path(key: str) -> Path:
+    """스토어 디렉터리 경로"""
+    return Path(URL_STORE_DIR) / key
+
+
+def _count(name: str, amount: float = 1) -> None:
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """페이지 요청용 클라이언트 (공유 연결 풀 사용)"""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            transport=get_pooled_async_transport(),
+            timeout=URL_STORE_FETCH_TIMEOUT,
+            follow_redirects=True,
+            headers={"User-Agent": URL_STORE_USER_AGENT},
+        )
+    return _http_client
+
+
+# ============================================================================
+# 디스크 저장
+# ============================================================================
+
+
+def read_manifest(key: str) -> dict[str, Any] | None:
+    """저장된 manifest (없거나 손상되었으면 None)"""
+    path = get_url_store_path(key) / _MANIFEST
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(directory: Path, manifest: dict[str, Any]) -> None:
+    tmp_path = directory / f"{_MANIFEST}.tmp"
+    tmp_path.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    tmp_path.replace(directory / _MANIFEST)
+
+
+def _save_store(key: str, store: FAISS, manifest: dict[str, Any]) -> None:
+    """임시 디렉터리에 저장한 뒤 교체 (쓰기 도중 읽히지 않도록)"""
+    path = get_url_store_path(key)
+    tmp_path = path.with_name(f"{key}.tmp")
+    old_path = path.with_name(f"{key}.old")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    store.save_local(str(tmp_path))
+    _write_manifest(tmp_path, manifest)
+
+    if path.exists():
+        shutil.rmtree(old_path, ignore_errors=True)
+        path.rename(old_path)
+    tmp_path.rename(path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def _load_store(key: str, embeddings: Embeddings) -> FAISS:
+    # 이 모듈이 직접 저장한 파일만 읽으므로 pickle 역직렬화 허용
+    return FAISS.load_local(
+        str(get_url_store_path(key)), embeddings, allow_dangerous_deserialization=True
+    )
+
+
+def _remember(key: str, content_hash: str, store: FAISS) -> None:
+    _memory[key] = (content_hash, store)
+    _memory.move_to_end(key)
+    while len(_memory) > URL_STORE_MEMORY_SIZE:
+        _memory.popitem(last=False)
+
+
+async def _open_store(
+    key: str, content_hash: str, embeddings: Embeddings
+) -> FAISS | None:
+    """메모리 → 디스크 순으로 저장된 스토어 조회 (손상되었으면 None)"""
+    cached = _memory.get(key)
+    if cached is not None and cached[0] == content_hash:
+        _memory.move_to_end(key)
+        _count("memory_hits")
+        return cached[1]
+    try:
+        store = await asyncio.to_thread(_load_store, key, embeddings)
+    except Exception as e:
+        logger.warning(f"URL store '{key}' could not be loaded, rebuilding: {e}")
+        return None
+    _count("disk_loads")
+    _remember(key, content_hash, store)
+    return store
+
+
+# ============================================================================
+# 조회 / 생성
+# ============================================================================
+
+
+async def _fetch(url: str, manifest: dict[str, Any] | None) -> httpx.Response:
+    """페이지 요청 (저장된 검증자가 있으면 조건부 요청)"""
+    headers = {}
+    if manifest:
+        if manifest.get("etag"):
+            headers["If-None-Match"] = manifest["etag"]
+        if manifest.get("last_modified"):
+            headers["If-Modified-Since"] = manifest["last_modified"]
+    return await _get_http_client().get(url, headers=headers)
+
+
+async def load_url_store(
+    url: str,
+    embeddings: Embeddings,
+    splitter: Callable[[str], list[Document]],
+    config: dict[str, Any] | None = None,
+    refresh: bool = False,
+) -> URLStoreResult:
+    """
+    URL의 벡터 스토어 조회 (변경되지 않았으면 저장된 인덱스, 바뀌었으면 다시 생성 후 저장)
+
+    Args:
+        url: 문서 URL
+        embeddings: 임베딩 모델
+        splitter: HTML 문자열 → 분할 문서 리스트 함수
+        config: 분할/임베딩 설정 (저장된 설정과 다르면 다시 생성)
+        refresh: True이면 조건부 요청 없이 항상 다시 생성
+
+    Returns:
+        URLStoreResult (분할 결과가 없으면 vectorstore=None, 저장하지 않음)
+
+    Raises:
+        httpx.HTTPError: 페이지 요청 실패 또는 오류 상태 코드
+    """
+    # manifest(JSON)에 저장된 값과 비교할 수 있도록 튜플 등을 JSON 형태로 정규화
+    config = json.loads(json.dumps(config or {}))
+    key = url_store_key(url)
+    _count("requests")
+
+    async with _locks[key]:
+        manifest = None if refresh else read_manifest(key)
+        if manifest is not None and manifest.get("config") != config:
+            manifest = None
+
+        store = None
+        if manifest is not None:
+            store = await _open_store(key, manifest["content_hash"], embeddings)
+            if store is None:
+                manifest = None
+
+        start = time.perf_counter()
+        response = await _fetch(url, manifest)
+        fetch_ms = (time.perf_counter() - start) * 1000
+
+        if manifest is not None and response.status_code == 304:
+            status = "not_modified"
+        else:
+            response.raise_for_status()
+            content_hash = hashlib.sha256(response.content).hexdigest()
+            if manifest is not None and content_hash == manifest["content_hash"]:
+                status = "unchanged"
+            else:
+                result = await _build(
+                    url, key, response, content_hash, embeddings, splitter, config
+                )
+                result.fetch_ms = fetch_ms
+                return result
+
+        # 변경 없음: 서버가 새 검증자를 보냈으면 갱신
+        _count(status)
+        manifest = {
+            **manifest,
+            "etag": response.headers.get("etag", manifest.get("etag")),
+            "last_modified": response.headers.get(
+                "last-modified", manifest.get("last_modified")
+            ),
+            "checked_at": datetime.now().isoformat(),
+        }
+        await asyncio.to_thread(_write_manifest, get_url_store_path(key), manifest)
+        return URLStoreResult(url, key, status, store, manifest, fetch_ms=fetch_ms)
+
+
+async def _build(
+    url: str,
+    key: str,
+    response: httpx.Response,
+    content_hash: str,
+    embeddings: Embeddings,
+    splitter: Callable[[str], list[Document]],
+    config: dict[str, Any],
+) -> URLStoreResult:
+    """본문 분할 → 임베딩 → 디스크 저장"""
+    splits = await asyncio.to_thread(splitter, response.text)
+    for split in splits:
+        split.metadata.setdefault("source", url)
+
+    manifest = {
+        "url": url,
+        "etag": response.headers.get("etag"),
+        "last_modified": response.headers.get("last-modified"),
+        "content_hash": content_hash,
+        "config": config,
+        "document_count": len(splits),
+        "fetched_at": datetime.now().isoformat(),
+        "checked_at": datetime.now().isoformat(),
+    }
+    if not splits:
+        return URLStoreResult(url, key, "built", None, manifest)
+
+    start = time.perf_counter()
+    store = await asyncio.to_thread(FAISS.from_documents, splits, embeddings)
+    embedding_ms = (time.perf_counter() - start) * 1000
+    manifest["vectorstore_size"] = store.index.ntotal
+    manifest["embedding_ms"] = round(embedding_ms, 2)
+
+    await asyncio.to_thread(_save_store, key, store, manifest)
+    _remember(key, content_hash, store)
+    _count("builds")
+    _count("embedding_ms_total", embedding_ms)
+    return URLStoreResult(url, key, "built", store, manifest, embedding_ms=embedding_ms)
+
+
+def get_url_store_stats() -> dict[str, Any]:
+    """
+    URL 스토어 통계 (프로세스별 집계 + 디스크에 저장된 스토어 목록)
+
+    Returns:
+        - requests, builds, not_modified, unchanged: 요청 수 / 재생성 수 / 재사용 수
+        - reuse_rate: 임베딩 없이 처리한 요청 비율
+        - memory_hits, disk_loads, embedding_ms_total
+        - stores: [{"url", "document_count", "vectorstore_size", "content_hash", "fetched_at", "checked_at"}, ...]
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    reused = stats["not_modified"] + stats["unchanged"]
+    stats["reuse_rate"] = (
+        round(reused / stats["requests"], 4) if stats["requests"] else 0.0
+    )
+    stats["embedding_ms_total"] = round(stats["embedding_ms_total"], 2)
+    stats["memory_size"] = len(_memory)
+
+    stores = []
+    root = Path(URL_STORE_DIR)
+    if root.exists():
+        for path in sorted(root.iterdir()):
+            # 저장 중인 임시 디렉터리({key}.tmp, {key}.old) 제외
+            if not path.is_dir() or "." in path.name:
+                continue
+            manifest = read_manifest(path.name)
+            if manifest is None:
+                continue
+            stores.append(
+                {
+                    name: manifest.get(name)
+                    for name in (
+                        "url",
+                        "document_count",
+                        "vectorstore_size",
+                        "content_hash",
+                        "fetched_at",
+                        "checked_at",
+                    )
+                }
+            )
+    stats["stores"] = stores
+    return stats
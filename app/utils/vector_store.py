@@ -0,0 +1,309 @@
+"""
+용량 제한 / 중복 제거 벡터 스토어 (/rag/web-retrieve)
+
+프로세스 전역 FAISS 스토어에 같은 URL을 반복해서 넣으면 벡터가 계속 중복 추가되어 메모리와 검색 시간이
+한없이 늘어납니다. 이 스토어는 삭제를 지원하는 ID 매핑 인덱스(IndexIDMap2)를 사용해 다음을 보장합니다.
+- 내용 해시(SHA-256) 기준 중복 제거: 이미 있는 청크는 임베딩/추가하지 않음
+- 출처(URL)별 교체: 같은 출처를 다시 넣으면 새 내용에 없는 이전 청크를 삭제
+- 용량 제한: VECTOR_STORE_TTL이 지난 청크를 먼저, 그래도 넘으면 가장 오래 사용되지 않은 청크(LRU)를 삭제
+- 청크 수, 출처 수, 추가/중복/삭제 수, 검색 지연(p50/p95)을 집계
+
+임베딩 차원은 첫 임베딩 결과로 정하므로 스토어 생성 시 API 호출이 없습니다.
+
+Usage:
+    from app.utils.vector_store import BoundedVectorStore
+
+    store = BoundedVectorStore(OpenAIEmbeddings())
+    await store.aadd_documents(splits, source=url)  # {"added", "duplicates", "removed", ...}
+    docs = await store.asimilarity_search("질문", k=4)
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+# 최대 청크 수 / 청크 유지 시간 (초, 0이면 만료 없음)
+VECTOR_STORE_MAX_DOCS = int(os.getenv("VECTOR_STORE_MAX_DOCS", "10000"))
+VECTOR_STORE_TTL = float(os.getenv("VECTOR_STORE_TTL", "0"))
+
+# 검색 지연 표본 수 (p50/p95 계산용)
+_LATENCY_WINDOW = 500
+
+
+def content_hash(text: str) -> str:
+    """청크 내용 해시 (앞뒤 공백 무시)"""
+    return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+
+
+@dataclass
+class _Entry:
+    document: Document
+    digest: str
+    sources: set[str] = field(default_factory=set)
+    added_at: float = 0.0
+
+
+class BoundedVectorStore:
+    """
+    중복 제거, 출처별 교체, LRU/TTL 삭제를 지원하는 FAISS 벡터 스토어
+
+    Args:
+        embedding: 임베딩 모델
+        max_docs: 최대 청크 수
+        ttl: 청크 유지 시간 (초, 0이면 만료 없음, 다시 추가되면 갱신)
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        max_docs: int = VECTOR_STORE_MAX_DOCS,
+        ttl: float = VECTOR_STORE_TTL,
+    ):
+        self.embedding = embedding
+        self.max_docs = max_docs
+        self.ttl = ttl
+        self.index: faiss.IndexIDMap2 | None = None
+        self._lock = threading.Lock()
+        self._next_id = 0
+        # id → 청크 (순서: 최근 사용 순, 마지막이 가장 최근)
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        # id 추가 순서 (TTL 만료 검사용, 마지막이 가장 최근)
+        self._added: OrderedDict[int, None] = OrderedDict()
+        self._by_hash: dict[str, int] = {}
+        self._by_source: dict[str, set[int]] = {}
+        self._latencies: list[float] = []
+        self._stats = {
+            "added": 0,
+            "duplicates": 0,
+            "replaced": 0,
+            "evicted_lru": 0,
+            "evicted_ttl": 0,
+            "searches": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # 삭제
+    # ------------------------------------------------------------------
+
+    def _remove(self, ids: list[int]) -> None:
+        """청크 삭제 (잠금 안에서 호출)"""
+        if not ids:
+            return
+        for doc_id in ids:
+            entry = self._entries.pop(doc_id)
+            self._added.pop(doc_id, None)
+            del self._by_hash[entry.digest]
+            for source in entry.sources:
+                source_ids = self._by_source.get(source)
+                if source_ids is not None:
+                    source_ids.discard(doc_id)
+                    if not source_ids:
+                        del self._by_source[source]
+        self.index.remove_ids(np.asarray(ids, dtype=np.int64))
+
+    def _expire(self) -> None:
+        """TTL이 지난 청크 삭제 (잠금 안에서 호출)"""
+        if self.ttl <= 0:
+            return
+        deadline = time.monotonic() - self.ttl
+        expired = []
+        for doc_id in self._added:
+            if self._entries[doc_id].added_at > deadline:
+                break
+            expired.append(doc_id)
+        self._remove(expired)
+        self._stats["evicted_ttl"] += len(expired)
+
+    def _evict(self, incoming: int) -> None:
+        """새 청크가 들어갈 자리를 LRU 순으로 확보 (잠금 안에서 호출)"""
+        overflow = len(self._entries) + incoming - self.max_docs
+        if overflow <= 0:
+            return
+        victims = list(self._entries)[:overflow]
+        self._remove(victims)
+        self._stats["evicted_lru"] += len(victims)
+
+    def delete_source(self, source: str) -> int:
+        """
+        출처의 청크 삭제 (다른 출처와 공유하는 청크는 해당 출처에서만 제거)
+
+        Returns:
+            인덱스에서 삭제된 청크 수
+        """
+        with self._lock:
+            return self._detach_source(source, keep=set())
+
+    def _detach_source(self, source: str, keep: set[str]) -> int:
+        """출처에서 keep에 없는 해시의 청크를 떼어내고, 출처가 남지 않은 청크 삭제 (잠금 안에서 호출)"""
+        orphaned = []
+        for doc_id in list(self._by_source.get(source, ())):
+            entry = self._entries[doc_id]
+            if entry.digest in keep:
+                continue
+            entry.sources.discard(source)
+            self._by_source[source].discard(doc_id)
+            if not entry.sources:
+                orphaned.append(doc_id)
+        if not self._by_source.get(source, True):
+            del self._by_source[source]
+        self._remove(orphaned)
+        return len(orphaned)
+
+    # ------------------------------------------------------------------
+    # 추가 / 검색
+    # ------------------------------------------------------------------
+
+    async def aadd_documents(
+        self, documents: list[Document], source: str | None = None
+    ) -> dict[str, int]:
+        """
+        청크 추가 (이미 있는 내용은 임베딩하지 않음)
+
+        Args:
+            documents: 추가할 청크
+            source: 출처 (지정하면 이 출처의 이전 청크 중 새 내용에 없는 것을 삭제)
+
+        Returns:
+            {"added", "duplicates", "removed": 출처 교체로 삭제된 수, "evicted": 용량 초과로 삭제된 수, "size"}
+        """
+        unique: dict[str, Document] = {}
+        for document in documents:
+            unique.setdefault(content_hash(document.page_content), document)
+
+        with self._lock:
+            evicted_before = self._stats["evicted_lru"] + self._stats["evicted_ttl"]
+            removed = self._detach_source(source, keep=set(unique)) if source else 0
+            now = time.monotonic()
+            new_hashes = []
+            for digest in unique:
+                doc_id = self._by_hash.get(digest)
+                if doc_id is None:
+                    new_hashes.append(digest)
+                    continue
+                # 기존 청크: 출처 연결, LRU/TTL 갱신
+                entry = self._entries[doc_id]
+                entry.added_at = now
+                self._entries.move_to_end(doc_id)
+                self._added.move_to_end(doc_id)
+                if source:
+                    entry.sources.add(source)
+                    self._by_source.setdefault(source, set()).add(doc_id)
+            self._stats["replaced"] += removed
+            self._stats["duplicates"] += len(documents) - len(new_hashes)
+
+        vectors = (
+            await self.embedding.aembed_documents(
+                [unique[digest].page_content for digest in new_hashes]
+            )
+            if new_hashes
+            else []
+        )
+
+        with self._lock:
+            # 임베딩 중 다른 요청이 같은 내용을 추가했으면 출처만 연결
+            pending = []
+            for digest, vector in zip(new_hashes, vectors, strict=True):
+                doc_id = self._by_hash.get(digest)
+                if doc_id is None:
+                    pending.append((digest, vector))
+                elif source:
+                    self._entries[doc_id].sources.add(source)
+                    self._by_source.setdefault(source, set()).add(doc_id)
+            self._expire()
+            self._evict(min(len(pending), self.max_docs))
+            pending = pending[len(pending) - min(len(pending), self.max_docs) :]
+            if pending:
+                matrix = np.asarray([vector for _, vector in pending], dtype="float32")
+                if self.index is None:
+                    self.index = faiss.IndexIDMap2(faiss.IndexFlatL2(matrix.shape[1]))
+                ids = np.arange(self._next_id, self._next_id + len(pending))
+                self._next_id += len(pending)
+                self.index.add_with_ids(matrix, ids.astype(np.int64))
+
+                now = time.monotonic()
+                for doc_id, (digest, _) in zip(ids.tolist(), pending, strict=True):
+                    entry = _Entry(unique[digest], digest, added_at=now)
+                    if source:
+                        entry.sources.add(source)
+                        self._by_source.setdefault(source, set()).add(doc_id)
+                    self._entries[doc_id] = entry
+                    self._added[doc_id] = None
+                    self._by_hash[digest] = doc_id
+            self._stats["added"] += len(pending)
+            evicted = (
+                self._stats["evicted_lru"] + self._stats["evicted_ttl"] - evicted_before
+            )
+            return {
+                "added": len(pending),
+                "duplicates": len(documents) - len(new_hashes),
+                "removed": removed,
+                "evicted": evicted,
+                "size": len(self._entries),
+            }
+
+    async def asimilarity_search(self, query: str, k: int = 4) -> list[Document]:
+        """유사도 검색 (반환된 청크는 최근 사용으로 갱신)"""
+        vector = await self.embedding.aembed_query(query)
+
+        start = time.perf_counter()
+        with self._lock:
+            self._expire()
+            if not self._entries:
+                return []
+            _, ids = self.index.search(
+                np.asarray([vector], dtype="float32"), min(k, len(self._entries))
+            )
+            documents = []
+            for doc_id in ids[0].tolist():
+                if doc_id in self._entries:
+                    self._entries.move_to_end(doc_id)
+                    documents.append(self._entries[doc_id].document)
+            self._stats["searches"] += 1
+            self._latencies.append((time.perf_counter() - start) * 1000)
+            del self._latencies[:-_LATENCY_WINDOW]
+        return documents
+
+    # ------------------------------------------------------------------
+    # 통계
+    # ------------------------------------------------------------------
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """청크/출처 수, 인덱스 크기, 추가/중복/교체/삭제 수, 검색 지연(p50/p95 ms, 질의 임베딩 제외)"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            index_size = self.index.ntotal if self.index is not None else 0
+            dimension = self.index.d if self.index is not None else None
+            stats = {
+                **self._stats,
+                "size": len(self._entries),
+                "sources": len(self._by_source),
+                "index_size": index_size,
+                "dimension": dimension,
+                "vector_bytes": index_size * (dimension or 0) * 4,
+                "max_docs": self.max_docs,
+                "ttl": self.ttl,
+            }
+
+        def percentile(q: float) -> float | None:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 3)
+
+        return {
+            **stats,
+            "search_ms_p50": percentile(0.5),
+            "search_ms_p95": percentile(0.95),
+        }
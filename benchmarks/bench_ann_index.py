@@ -0,0 +1,159 @@
+"""
+ANN 인덱스 벤치마크 (recall vs latency)
+
+통합 규정집 규모(5만 개 이상 Child 노드)를 가정한 합성 임베딩으로
+flat(기존 인메모리 전수 비교), IVF, HNSW 인덱스의 검색 지연과 recall@k를 비교합니다.
+정답은 정규화된 임베딩의 정확한 내적(코사인) top-k입니다.
+
+측정 항목:
+- build: 인덱스 생성 시간
+- size: 직렬화 크기 (Redis ann 필드 / 디스크 파일)
+- load: 직렬화 데이터로부터 복원 시간 (재학습 없음)
+- recall@k, 질의당 p50/p99 지연
+
+Usage:
+    uv run python benchmarks/bench_ann_index.py
+    uv run python benchmarks/bench_ann_index.py --nodes 50000 --dim 1536 --queries 200
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app.utils.ann_index as ann_module  # noqa: E402
+from app.utils.ann_index import ANNIndex  # noqa: E402
+
+
+def make_embeddings(num_nodes: int, dim: int, num_clusters: int, seed: int):
+    """주제별로 뭉친 임베딩 분포를 흉내낸 합성 벡터 생성"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((num_clusters, dim)).astype("float32")
+    labels = rng.integers(0, num_clusters, size=num_nodes)
+    noise = rng.standard_normal((num_nodes, dim)).astype("float32")
+    vectors = centers[labels] + noise
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def measure(search, queries, ground_truth, top_k: int) -> dict:
+    latencies = []
+    recalls = []
+    for query, expected in zip(queries, ground_truth, strict=True):
+        started = time.perf_counter()
+        found = search(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+        recalls.append(len(set(found[:top_k]) & expected) / top_k)
+
+    latencies.sort()
+    return {
+        "recall": statistics.mean(recalls),
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+def print_row(name: str, metrics: dict, top_k: int, extra: str = "") -> None:
+    print(
+        f"  {name:<22} recall@{top_k}={metrics['recall']:.3f} "
+        f"p50={metrics['p50_ms']:.2f}ms p99={metrics['p99_ms']:.2f}ms {extra}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--nodes", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    vectors = make_embeddings(args.nodes, args.dim, args.clusters, args.seed)
+    node_ids = [f"node-{i}" for i in range(args.nodes)]
+
+    rng = np.random.default_rng(args.seed + 1)
+    query_rows = rng.choice(args.nodes, size=args.queries, replace=False)
+    queries = (
+        vectors[query_rows]
+        + rng.standard_normal((args.queries, args.dim)).astype("float32") * 0.05
+    )
+
+    # 정답: 정확한 코사인 top-k
+    ground_truth = []
+    for query in queries:
+        scores = vectors @ (query / np.linalg.norm(query))
+        top = np.argpartition(-scores, args.top_k)[: args.top_k]
+        ground_truth.append({node_ids[i] for i in top})
+
+    print(f"nodes={args.nodes} dim={args.dim} queries={args.queries}\n")
+
+    # flat: llama-index SimpleVectorStore와 같은 전수 비교 (리스트 임베딩 → 행렬 변환 포함)
+    embedding_dict = {
+        node_id: vector.tolist()
+        for node_id, vector in zip(node_ids, vectors, strict=True)
+    }
+
+    def flat_search(query):
+        matrix = np.array(list(embedding_dict.values()), dtype="float32")
+        scores = matrix @ query
+        top = np.argpartition(-scores, args.top_k)[: args.top_k]
+        keys = list(embedding_dict.keys())
+        return [keys[i] for i in top[np.argsort(-scores[top])]]
+
+    flat_queries = max(5, args.queries // 20)
+    print("flat (기존 방식)")
+    print_row(
+        "brute-force",
+        measure(
+            flat_search,
+            queries[:flat_queries],
+            ground_truth[:flat_queries],
+            args.top_k,
+        ),
+        args.top_k,
+        f"(질의 {flat_queries}개)",
+    )
+
+    for index_type, param_name, param_values in (
+        ("ivf", "IVF_NPROBE", (4, 8, 16, 32, 64)),
+        ("hnsw", "HNSW_EF_SEARCH", (32, 64, 128, 256)),
+    ):
+        started = time.perf_counter()
+        ann_index = ANNIndex.build(node_ids, vectors, index_type=index_type)
+        build_s = time.perf_counter() - started
+
+        payload = ann_index.to_bytes()
+        started = time.perf_counter()
+        ANNIndex.from_bytes(payload)
+        load_ms = (time.perf_counter() - started) * 1000
+
+        print(
+            f"\n{index_type} build={build_s:.1f}s "
+            f"size={len(payload) / 1024 / 1024:.1f}MiB load={load_ms:.0f}ms"
+        )
+
+        for value in param_values:
+            setattr(ann_module, param_name, value)
+            tuned = ANNIndex(index_type, ann_index.faiss_index, ann_index.node_ids)
+            print_row(
+                f"{param_name.lower()}={value}",
+                measure(
+                    lambda q, idx=tuned: [
+                        node_id for node_id, _ in idx.search(q.tolist(), args.top_k)
+                    ],
+                    queries,
+                    ground_truth,
+                    args.top_k,
+                ),
+                args.top_k,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+LCEL 체인 레지스트리 벤치마크 (요청당 체인 생성 vs 캐시 재사용)
+
+lcel_examples 라우터에 등록된 체인별로 요청 1건당 오버헤드를 비교합니다.
+- before: 요청마다 팩토리 호출 (프롬프트/파서/파이프라인 생성, 포맷 지시사항 생성)
+- after: ChainRegistry.get()으로 캐시된 체인 조회
+
+LLM은 호출하지 않으므로 API 키가 없어도 실행됩니다 (생성 비용만 측정).
+
+Usage:
+    uv run python benchmarks/bench_chain_registry.py
+    uv run python benchmarks/bench_chain_registry.py --runs 500
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# ChatOpenAI 생성에 필요한 키 (요청은 보내지 않음)
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from app.routers.lcel_examples import chains  # noqa: E402
+
+
+def measure_us(fn, runs: int) -> float:
+    """fn 1회 실행 시간의 중앙값 (마이크로초)"""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    prewarm_ms = sum(chains.prewarm().values())
+    print(f"chains={len(chains.names)} prewarm={prewarm_ms:.1f}ms runs={args.runs}\n")
+    print(f"  {'chain':<32} {'before(us)':>11} {'after(us)':>10} {'speedup':>8}")
+
+    total_before = total_after = 0.0
+    for name in chains.names:
+        before = measure_us(lambda name=name: chains.create(name), args.runs)
+        after = measure_us(lambda name=name: chains.get(name), args.runs)
+        total_before += before
+        total_after += after
+        print(f"  {name:<32} {before:>11.1f} {after:>10.2f} {before / after:>7.0f}x")
+
+    print(
+        f"\n  {'total (one request per chain)':<32} "
+        f"{total_before:>11.1f} {total_after:>10.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Hybrid 검색 벤치마크 (vector vs BM25 vs hybrid)
+
+샘플 PDF(docs/Reprimand-sample-*.pdf)로 계층적 인덱스를 만든 뒤,
+각 Child 노드 본문에서 잘라낸 구절(조항 번호, 금액, 법령명 등 정확한 용어 포함)을
+질의로 사용하여 원본 노드가 top-k 안에 검색되는 비율(hit@k)과 검색 지연을 측정합니다.
+
+- bm25: 문자 n-gram 어휘 인덱스만 사용 (LLM/임베딩 호출 없음)
+- vector: 임베딩 검색 (OPENAI_API_KEY 필요)
+- hybrid: 임베딩 + BM25 RRF 결합 (OPENAI_API_KEY 필요)
+
+Usage:
+    uv run python benchmarks/bench_hybrid_retrieval.py
+    uv run python benchmarks/bench_hybrid_retrieval.py --top-k 5 --queries 50 --ngram 3
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llama_index.core.schema import QueryBundle  # noqa: E402
+
+from app.utils.document_analysis import (  # noqa: E402
+    create_hierarchical_index,
+    load_pdf_from_path,
+)
+from app.utils.lexical_index import LexicalIndex  # noqa: E402
+from app.utils.retrieval import build_retriever, set_index_component  # noqa: E402
+
+SAMPLE_PDFS = sorted(
+    str(path)
+    for path in (Path(__file__).resolve().parent.parent / "docs").glob(
+        "Reprimand-sample-*.pdf"
+    )
+)
+
+
+def make_queries(nodes, num_queries: int, span: int, seed: int):
+    """노드 본문에서 무작위 구절을 잘라 (질의, 정답 node_id) 쌍 생성"""
+    rng = random.Random(seed)
+    candidates = [node for node in nodes if len(node.get_content().strip()) > span]
+    rng.shuffle(candidates)
+
+    queries = []
+    for node in candidates[:num_queries]:
+        text = " ".join(node.get_content().split())
+        start = rng.randrange(0, max(1, len(text) - span))
+        queries.append((text[start : start + span], node.node_id))
+    return queries
+
+
+def evaluate(retrieve, queries, top_k: int) -> dict:
+    """hit@k, MRR, 질의당 지연(ms) 측정"""
+    hits = 0
+    reciprocal_ranks = []
+    latencies = []
+
+    for query, expected_id in queries:
+        started = time.perf_counter()
+        node_ids = retrieve(query)[:top_k]
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        if expected_id in node_ids:
+            hits += 1
+            reciprocal_ranks.append(1 / (node_ids.index(expected_id) + 1))
+        else:
+            reciprocal_ranks.append(0.0)
+
+    return {
+        "hit_rate": hits / len(queries) if queries else 0.0,
+        "mrr": statistics.mean(reciprocal_ranks) if reciprocal_ranks else 0.0,
+        "p50_ms": statistics.median(latencies) if latencies else 0.0,
+        "max_ms": max(latencies) if latencies else 0.0,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--span", type=int, default=20, help="질의 구절 길이(문자)")
+    parser.add_argument("--ngram", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    use_embeddings = bool(os.getenv("OPENAI_API_KEY"))
+    if not use_embeddings:
+        print("OPENAI_API_KEY가 없어 bm25 모드만 측정합니다.\n")
+
+    for pdf_path in SAMPLE_PDFS:
+        documents = await load_pdf_from_path(pdf_path)
+
+        if use_embeddings:
+            index, _, _ = await create_hierarchical_index(documents)
+            nodes = list(index.docstore.docs.values())
+        else:
+            from llama_index.core.node_parser import SentenceSplitter
+
+            nodes = SentenceSplitter(
+                chunk_size=512, chunk_overlap=50
+            ).get_nodes_from_documents(documents)
+            index = None
+
+        started = time.perf_counter()
+        lexical_index = LexicalIndex.build(nodes, ngram_size=args.ngram)
+        build_ms = (time.perf_counter() - started) * 1000
+        payload_size = len(lexical_index.to_bytes())
+        if index is not None:
+            set_index_component(index, "lexical", lexical_index)
+
+        queries = make_queries(nodes, args.queries, args.span, args.seed)
+
+        print(f"== {Path(pdf_path).name}")
+        print(
+            f"   nodes={len(nodes)} queries={len(queries)} "
+            f"lexical build={build_ms:.1f}ms redis payload={payload_size / 1024:.1f}KiB"
+        )
+
+        results = {
+            "bm25": evaluate(
+                lambda q, li=lexical_index: [
+                    node_id for node_id, _ in li.search(q, top_k=args.top_k)
+                ],
+                queries,
+                args.top_k,
+            )
+        }
+
+        if index is not None:
+            for mode in ("vector", "hybrid"):
+                retriever = build_retriever(
+                    index, similarity_top_k=args.top_k, retrieval_mode=mode
+                )
+                results[mode] = evaluate(
+                    lambda q, r=retriever: [
+                        hit.node.node_id for hit in r.retrieve(QueryBundle(q))
+                    ],
+                    queries,
+                    args.top_k,
+                )
+
+        for mode, metrics in results.items():
+            print(
+                f"   {mode:<7} hit@{args.top_k}={metrics['hit_rate']:.2f} "
+                f"mrr={metrics['mrr']:.2f} "
+                f"p50={metrics['p50_ms']:.1f}ms max={metrics['max_ms']:.1f}ms"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+"""
+응답 생성 모드 벤치마크 (tree_summarize / compact / auto)
+
+보고서 엔드포인트와 같은 top_k=20 검색 결과를 가정하고, 지연을 흉내낸 LLM으로
+응답 생성 모드별 LLM 호출 수와 지연(p50)을 비교합니다.
+실제 API를 호출하지 않으므로 절대값이 아니라 호출 구조(순차/병렬, 호출 수)의 차이를 봅니다.
+
+LLM 지연 모델: base_ms + 입력 1천 토큰당 prefill_ms + 출력 토큰당 decode_ms
+
+Usage:
+    uv run python benchmarks/bench_response_mode.py
+    uv run python benchmarks/bench_response_mode.py --chunks 40 --context-window 16384
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llama_index.core.llms import (  # noqa: E402
+    CompletionResponse,
+    CompletionResponseGen,
+    CustomLLM,
+    LLMMetadata,
+)
+from llama_index.core.response_synthesizers import get_response_synthesizer  # noqa: E402
+from llama_index.core.schema import NodeWithScore, TextNode  # noqa: E402
+
+from app.utils.synthesis import AdaptiveSynthesizer  # noqa: E402
+from app.utils.tokens import count_tokens  # noqa: E402
+
+
+class SimulatedLLM(CustomLLM):
+    """입력/출력 토큰 수에 비례해 대기하는 가짜 LLM (호출 수 집계)"""
+
+    context_window: int = 128_000
+    num_output: int = 256
+    base_ms: float = 400.0
+    prefill_ms: float = 40.0
+    decode_ms: float = 15.0
+    calls: int = 0
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return LLMMetadata(
+            context_window=self.context_window, num_output=self.num_output
+        )
+
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any):
+        self.calls += 1
+        time.sleep(
+            (
+                self.base_ms
+                + self.prefill_ms * count_tokens(prompt) / 1000
+                + self.decode_ms * self.num_output
+            )
+            / 1000
+        )
+        return CompletionResponse(text="요약 " * (self.num_output // 2))
+
+    def stream_complete(
+        self, prompt: str, formatted: bool = False, **kwargs: Any
+    ) -> CompletionResponseGen:
+        yield self.complete(prompt)
+
+
+def make_nodes(num_chunks: int, chunk_chars: int) -> list[NodeWithScore]:
+    sentence = (
+        "제3조(지원 대상) 소상공인 경영 안정을 위한 지원금은 예산 범위에서 지급한다. "
+    )
+    text = (sentence * (chunk_chars // len(sentence) + 1))[:chunk_chars]
+    return [
+        NodeWithScore(node=TextNode(text=f"[{i}] {text}"), score=1.0 - i * 0.01)
+        for i in range(num_chunks)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--chunks", type=int, default=20)
+    parser.add_argument("--chunk-chars", type=int, default=1200)
+    parser.add_argument("--context-window", type=int, default=128_000)
+    parser.add_argument("--single-shot-tokens", type=int, default=12_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    nodes = make_nodes(args.chunks, args.chunk_chars)
+    context_tokens = sum(count_tokens(n.node.get_content()) for n in nodes)
+    print(
+        f"chunks={args.chunks} context_tokens={context_tokens} "
+        f"context_window={args.context_window}\n"
+    )
+
+    for mode in ("tree_summarize", "compact", "auto"):
+        llm = SimulatedLLM(context_window=args.context_window)
+        if mode == "auto":
+            synthesizer = AdaptiveSynthesizer(
+                llm=llm, single_shot_tokens=args.single_shot_tokens
+            )
+        else:
+            synthesizer = get_response_synthesizer(llm=llm, response_mode=mode)
+
+        latencies = []
+        for _ in range(args.runs):
+            llm.calls = 0
+            started = time.perf_counter()
+            synthesizer.synthesize("지원 대상과 지급 기준은?", nodes=nodes)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        print(
+            f"  {mode:<15} llm_calls={llm.calls:<3} "
+            f"p50={statistics.median(latencies):.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+from llama_index.core import VectorStoreIndex
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.schema import QueryBundle, TextNode
+from llama_index.core.vector_stores import ExactMatchFilter, MetadataFilters
+
+from app.utils.ann_index import ANNIndex, resolve_index_type
+from app.utils.retrieval import (
+    ANNRetriever,
+    attach_ann_index,
+    build_retriever,
+    get_index_type,
+)
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(0)
+    return rng.standard_normal((2000, 16)).astype("float32")
+
+
+class TestANNIndex:
+    """Unit tests for the FAISS ANN index wrapper."""
+
+    def test_resolve_index_type(self):
+        """auto picks flat for small documents and ANN above the threshold."""
+        assert resolve_index_type("auto", 10) == "flat"
+        assert resolve_index_type("auto", 10_000_000) in ("ivf", "hnsw")
+        assert resolve_index_type("ivf", 10) == "flat"
+        assert resolve_index_type("hnsw", 10) == "hnsw"
+
+        with pytest.raises(ValueError):
+            resolve_index_type("lsh", 10)
+
+    @pytest.mark.parametrize("index_type", ["ivf", "hnsw"])
+    def test_recall_against_exact_search(self, vectors, index_type):
+        """ANN results mostly agree with exact cosine search."""
+        node_ids = [f"node-{i}" for i in range(len(vectors))]
+        ann_index = ANNIndex.build(node_ids, vectors, index_type=index_type)
+
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        recalls = []
+        for query in vectors[:20]:
+            exact = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:10]
+            found = {node_id for node_id, _ in ann_index.search(query.tolist(), 10)}
+            recalls.append(len(found & {node_ids[i] for i in exact}) / 10)
+
+        assert np.mean(recalls) >= 0.8
+
+    def test_serialization_roundtrip(self, vectors):
+        """Serialized indexes reload without retraining and return the same hits."""
+        node_ids = [f"node-{i}" for i in range(len(vectors))]
+        ann_index = ANNIndex.build(node_ids, vectors, index_type="ivf")
+
+        restored = ANNIndex.from_bytes(ann_index.to_bytes())
+
+        assert restored.index_type == "ivf"
+        assert restored.search(vectors[0].tolist(), 5) == ann_index.search(
+            vectors[0].tolist(), 5
+        )
+
+
+class TestANNRetriever:
+    """Unit tests for retrieval through an attached ANN index."""
+
+    def _build_index(self, vectors):
+        nodes = [
+            TextNode(
+                text=f"조항 {i}",
+                embedding=vector.tolist(),
+                metadata={"has_exception_clause": int(i % 50 == 0)},
+            )
+            for i, vector in enumerate(vectors)
+        ]
+        index = VectorStoreIndex(nodes, embed_model=MockEmbedding(embed_dim=16))
+        return index, nodes
+
+    def test_attach_and_retrieve(self, vectors):
+        """Vector retrieval uses the attached HNSW index."""
+        index, nodes = self._build_index(vectors)
+
+        assert attach_ann_index(index, "hnsw") == "hnsw"
+        assert get_index_type(index) == "hnsw"
+
+        retriever = build_retriever(index, similarity_top_k=3)
+        results = retriever.retrieve(QueryBundle("질의", embedding=vectors[7].tolist()))
+
+        assert isinstance(retriever, ANNRetriever)
+        assert results[0].node.node_id == nodes[7].node_id
+        assert results[0].score == pytest.approx(1.0, abs=1e-4)
+
+    def test_filters_are_applied(self, vectors):
+        """Metadata filters only return matching nodes."""
+        index, _ = self._build_index(vectors)
+        attach_ann_index(index, "ivf")
+
+        retriever = build_retriever(
+            index,
+            similarity_top_k=5,
+            filters=MetadataFilters(
+                filters=[ExactMatchFilter(key="has_exception_clause", value=1)]
+            ),
+        )
+        results = retriever.retrieve(QueryBundle("질의", embedding=vectors[3].tolist()))
+
+        assert len(results) == 5
+        assert all(r.node.metadata["has_exception_clause"] == 1 for r in results)
+
+    def test_flat_keeps_default_retriever(self, vectors):
+        """Small documents keep the in-memory brute-force retriever."""
+        index, _ = self._build_index(vectors[:100])
+
+        assert attach_ann_index(index, "auto") == "flat"
+        assert not isinstance(build_retriever(index, similarity_top_k=3), ANNRetriever)
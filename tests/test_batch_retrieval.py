@@ -0,0 +1,84 @@
+import json
+
+import numpy as np
+import pytest
+from llama_index.core import VectorStoreIndex
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.schema import QueryBundle, TextNode
+
+from app.utils.batch_query import stream_batch_query
+from app.utils.retrieval import attach_ann_index, batch_retrieve, build_retriever
+
+
+@pytest.fixture
+def index_and_vectors():
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((300, 16)).astype("float32")
+    nodes = [
+        TextNode(text=f"제{i}조 휴가 규정 {i % 7}", embedding=vector.tolist())
+        for i, vector in enumerate(vectors)
+    ]
+    index = VectorStoreIndex(nodes, embed_model=MockEmbedding(embed_dim=16))
+    return index, vectors
+
+
+class TestBatchRetrieve:
+    """Unit tests for multi-query retrieval with a single similarity matrix."""
+
+    def _single(self, index, query, embedding, top_k, mode):
+        retriever = build_retriever(index, similarity_top_k=top_k, retrieval_mode=mode)
+        return retriever.retrieve(QueryBundle(query, embedding=embedding))
+
+    @pytest.mark.parametrize("mode", ["vector", "hybrid"])
+    def test_matches_per_query_retrieval(self, index_and_vectors, mode):
+        """Batch results equal running each query through the retriever."""
+        index, vectors = index_and_vectors
+        queries = ["휴가 규정 1", "휴가 규정 3", "제10조"]
+        embeddings = [vectors[i].tolist() for i in (5, 42, 180)]
+
+        batch = batch_retrieve(index, queries, embeddings, 4, retrieval_mode=mode)
+
+        for query, embedding, results in zip(queries, embeddings, batch, strict=True):
+            expected = self._single(index, query, embedding, 4, mode)
+            assert [r.node.node_id for r in results] == [
+                r.node.node_id for r in expected
+            ]
+            assert [r.score for r in results] == pytest.approx(
+                [r.score for r in expected], abs=1e-4
+            )
+
+    def test_uses_attached_ann_index(self, index_and_vectors):
+        """Vector batch search goes through the ANN index when one is attached."""
+        index, vectors = index_and_vectors
+        attach_ann_index(index, "hnsw")
+
+        batch = batch_retrieve(index, ["a", "b"], [vectors[3], vectors[9]], 1)
+
+        assert [results[0].score for results in batch] == pytest.approx(
+            [1.0, 1.0], abs=1e-4
+        )
+
+    def test_unknown_mode(self, index_and_vectors):
+        """Unknown retrieval modes are rejected."""
+        index, vectors = index_and_vectors
+        with pytest.raises(ValueError):
+            batch_retrieve(index, ["a"], [vectors[0]], 3, retrieval_mode="sparse")
+
+    async def test_stream_reports_retrieval_failure(
+        self, index_and_vectors, monkeypatch
+    ):
+        """A failing batched embedding call ends the stream with an error line."""
+        index, _ = index_and_vectors
+
+        async def broken(self, texts):
+            raise RuntimeError("embedding down")
+
+        monkeypatch.setattr(MockEmbedding, "aget_text_embedding_batch", broken)
+        lines = [
+            json.loads(line) async for line in stream_batch_query(index, ["a", "b"])
+        ]
+
+        assert len(lines) == 1
+        assert lines[0]["done"] is True
+        assert lines[0]["error"] == "embedding down"
+        assert lines[0]["failed"] == 2
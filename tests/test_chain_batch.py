@@ -0,0 +1,103 @@
+import asyncio
+import json
+
+from langchain_core.runnables import RunnableLambda
+from pydantic import BaseModel
+
+from app.utils import chain_batch
+from app.utils.chain_batch import stream_chain_batch
+
+
+class Answer(BaseModel):
+    text: str
+
+
+async def collect(stream) -> list[dict]:
+    return [json.loads(line) async for line in stream]
+
+
+class TestChainBatch:
+    """Unit tests for bounded-concurrency NDJSON chain batches."""
+
+    async def test_concurrency_cap_and_completion_order(self):
+        """At most max_concurrency items run at once; fast items stream first."""
+        running = 0
+        peak = 0
+
+        async def answer(item: dict) -> str:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(item["delay"])
+            running -= 1
+            return f"a{item['id']}"
+
+        inputs = [{"id": i, "delay": 0.05 if i == 0 else 0.01} for i in range(6)]
+        lines = await collect(
+            stream_chain_batch(RunnableLambda(answer), inputs, max_concurrency=2)
+        )
+
+        items, done = lines[:-1], lines[-1]
+        assert peak == 2
+        assert done["peak_concurrency"] == 2
+        assert items[0]["index"] != 0
+        assert sorted(item["result"] for item in items) == [f"a{i}" for i in range(6)]
+        assert done["succeeded"] == 6
+        assert done["time_to_first_result_ms"] < done["execution_time_ms"]
+
+    async def test_timeout_retry_and_partial_failure(self, monkeypatch):
+        """Timed-out items are retried; permanent failures do not stop the batch."""
+        monkeypatch.setattr(chain_batch, "CHAIN_BATCH_RETRY_BACKOFF", 0)
+        attempts: dict[int, int] = {}
+
+        async def answer(item: dict) -> Answer:
+            attempts[item["id"]] = attempts.get(item["id"], 0) + 1
+            if item["id"] == 1 and attempts[1] == 1:
+                await asyncio.sleep(1)
+            if item["id"] == 2:
+                raise ValueError("bad output")
+            return Answer(text=f"a{item['id']}")
+
+        inputs = [{"id": i} for i in range(3)]
+        lines = await collect(
+            stream_chain_batch(
+                RunnableLambda(answer), inputs, timeout=0.05, max_retries=1
+            )
+        )
+
+        by_index = {line["index"]: line for line in lines[:-1]}
+        done = lines[-1]
+        assert by_index[0] == {**by_index[0], "result": {"text": "a0"}, "attempts": 1}
+        assert by_index[1]["result"] == {"text": "a1"}
+        assert by_index[1]["attempts"] == 2
+        assert by_index[2]["error"] == "bad output"
+        assert by_index[2]["attempts"] == 2
+
+        # 재시도 없이 실패해도 실제 시도 횟수 보고
+        lines = await collect(
+            stream_chain_batch(RunnableLambda(answer), [{"id": 2}], max_retries=0)
+        )
+        assert lines[0]["attempts"] == 1
+        assert done["failed_indices"] == [2]
+        assert done["succeeded"] == 2
+
+    async def test_closing_stream_cancels_pending_items(self):
+        """Stopping the consumer cancels items that have not finished yet."""
+        started: list[int] = []
+
+        async def answer(item: dict) -> str:
+            started.append(item["id"])
+            await asyncio.sleep(0 if item["id"] == 0 else 10)
+            return "ok"
+
+        stream = stream_chain_batch(
+            RunnableLambda(answer), [{"id": i} for i in range(4)], max_concurrency=2
+        )
+        first = json.loads(await stream.__anext__())
+        await stream.aclose()
+        started_at_close = len(started)
+        await asyncio.sleep(0.05)
+
+        assert first["index"] == 0
+        assert started_at_close < 4
+        assert len(started) == started_at_close
@@ -0,0 +1,71 @@
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+
+from app.routers.lcel_examples import chains as lcel_chains
+from app.utils.chain_registry import ChainRegistry
+
+
+def make_registry(calls: list[str]) -> ChainRegistry:
+    registry = ChainRegistry()
+    llm = FakeListChatModel(responses=["pong"] * 10)
+
+    @registry.register("echo")
+    def _echo_chain():
+        calls.append("echo")
+        return (
+            ChatPromptTemplate.from_template("ping {query}") | llm | StrOutputParser()
+        )
+
+    return registry
+
+
+class TestChainRegistry:
+    """Unit tests for the compiled LCEL chain cache."""
+
+    async def test_chain_is_built_once_and_reused(self):
+        """Repeated lookups return the same chain without calling the factory."""
+        calls: list[str] = []
+        registry = make_registry(calls)
+
+        first = registry.get("echo")
+        second = registry.get("echo")
+
+        assert first is second
+        assert calls == ["echo"]
+        assert await first.ainvoke({"query": "x"}) == "pong"
+        assert registry.stats["chains"]["echo"]["hits"] == 2
+
+    def test_prewarm_builds_all_chains(self):
+        """Prewarm builds every registered chain up front."""
+        calls: list[str] = []
+        registry = make_registry(calls)
+
+        build_ms = registry.prewarm()
+        registry.get("echo")
+
+        assert list(build_ms) == ["echo"]
+        assert calls == ["echo"]
+        assert registry.stats["built"] == 1
+
+    def test_invalid_factory_and_duplicates_rejected(self):
+        """Factories must return a Runnable and names must be unique."""
+        registry = make_registry([])
+
+        @registry.register("broken")
+        def _broken_chain():
+            return "not a chain"
+
+        with pytest.raises(TypeError):
+            registry.get("broken")
+        with pytest.raises(ValueError):
+            registry.register("echo")(lambda: None)
+
+    def test_lcel_example_chains_validate(self):
+        """Every chain registered by the LCEL router builds and validates."""
+        lcel_chains.clear()
+        build_ms = lcel_chains.prewarm()
+
+        assert set(build_ms) == set(lcel_chains.names)
+        assert lcel_chains.stats["built"] == lcel_chains.stats["registered"]
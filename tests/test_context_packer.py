@@ -0,0 +1,88 @@
+from llama_index.core.schema import NodeWithScore, TextNode
+
+from app.utils.context_packer import ContextPacker, merge_overlapping_text
+from app.utils.tokens import count_tokens, truncate_to_tokens
+
+
+def _child(text, parent_index, chunk_index, score=0.5):
+    node = TextNode(
+        text=text,
+        metadata={
+            "node_type": "child",
+            "parent_index": parent_index,
+            "chunk_index": chunk_index,
+        },
+    )
+    return NodeWithScore(node=node, score=score)
+
+
+class TestContextPacker:
+    """Unit tests for merging, de-duplicating and budgeting retrieved chunks."""
+
+    def test_merge_overlapping_text(self):
+        """The overlapping suffix/prefix appears only once after merging."""
+        first = "제1조(목적) 이 규정은 공무원의 징계 절차를 정한다."
+        second = "공무원의 징계 절차를 정한다. 제2조(정의) 이 규정에서"
+
+        merged = merge_overlapping_text(first, second)
+
+        assert merged.count("징계 절차를 정한다") == 1
+        assert merged.endswith("제2조(정의) 이 규정에서")
+
+    def test_merges_adjacent_chunks_of_same_parent(self):
+        """Consecutive chunks from one parent become one node in position order."""
+        overlap = "징계의 감경은 다음 각 호의 경우에 한한다."
+        nodes = [
+            _child(f"제5조 {overlap}", 0, 1, score=0.7),
+            _child(f"{overlap} 1. 공적이 있는 경우", 0, 2, score=0.9),
+            _child("별표 1 징계 기준표", 3, 0, score=0.8),
+        ]
+        packer = ContextPacker(token_budget=10_000)
+
+        packed = packer.postprocess_nodes(nodes)
+
+        assert len(packed) == 2
+        assert packed[0].node.get_content().count(overlap) == 1
+        assert packed[0].score == 0.9
+        assert packed[1].node.get_content() == "별표 1 징계 기준표"
+        assert packer.stats["merged_chunks"] == 1
+        # The shared docstore nodes are not modified
+        assert nodes[0].node.get_content() == f"제5조 {overlap}"
+
+    def test_removes_near_duplicates(self):
+        """Near-identical chunks from different parents are kept once."""
+        text = "공무원이 징계 사유에 해당하는 경우 징계위원회의 의결을 거쳐야 한다."
+        nodes = [
+            _child(text, 0, 0, score=0.9),
+            _child(text + ".", 5, 0, score=0.8),
+            _child("휴가는 연 21일로 한다.", 9, 0, score=0.7),
+        ]
+        packer = ContextPacker(token_budget=10_000)
+
+        packed = packer.postprocess_nodes(nodes)
+
+        assert len(packed) == 2
+        assert packer.stats["duplicates_removed"] == 1
+
+    def test_truncates_to_token_budget(self):
+        """Packed context never exceeds the token budget."""
+        nodes = [
+            _child("징계 기준 설명 " * 100, i * 2, 0, score=1.0 - i * 0.1)
+            for i in range(5)
+        ]
+        packer = ContextPacker(token_budget=300, near_duplicate_threshold=1.1)
+
+        packed = packer.postprocess_nodes(nodes)
+
+        assert packer.stats["tokens_after"] <= 300
+        assert packer.stats["tokens_before"] > 300
+        assert packer.stats["truncated"] is True
+        # The highest scoring chunk is kept first
+        assert packed[0].node.metadata["parent_index"] == 0
+
+    def test_truncate_to_tokens(self):
+        """Text is shortened until it fits the token limit."""
+        text = "예산 총액은 5.9조원이다. " * 50
+
+        assert count_tokens(truncate_to_tokens(text, 40)) <= 40
+        assert truncate_to_tokens("짧은 문장", 100) == "짧은 문장"
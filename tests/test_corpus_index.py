@@ -0,0 +1,58 @@
+import numpy as np
+
+from app.utils.corpus_index import (
+    CORPUS_SHARD_COUNT,
+    _search_documents,
+    get_shard_id,
+    pack_document_vectors,
+    unpack_document_vectors,
+)
+
+
+def _document(seed: int, num_nodes: int = 8, dim: int = 16):
+    rng = np.random.default_rng(seed)
+    center = rng.standard_normal(dim)
+    embeddings = center + 0.3 * rng.standard_normal((num_nodes, dim))
+    node_ids = [f"{seed}-{i}" for i in range(num_nodes)]
+    texts = [f"문서 {seed} 청크 {i}" for i in range(num_nodes)]
+    return node_ids, texts, embeddings
+
+
+class TestCorpusIndex:
+    """Unit tests for the corpus-level sharded vector index."""
+
+    def test_shard_id_is_stable(self):
+        """Shard assignment depends only on doc_id."""
+        assert get_shard_id("policy_2024") == get_shard_id("policy_2024")
+        assert 0 <= get_shard_id("policy_2024") < CORPUS_SHARD_COUNT
+
+    def test_pack_roundtrip(self):
+        """Packed document vectors restore ids, texts and normalized rows."""
+        node_ids, texts, embeddings = _document(1)
+
+        payload, centroid = pack_document_vectors(node_ids, texts, embeddings.tolist())
+        restored_ids, restored_texts, matrix = unpack_document_vectors(payload)
+
+        assert restored_ids == node_ids
+        assert restored_texts == texts
+        assert matrix.shape == embeddings.shape
+        np.testing.assert_allclose(np.linalg.norm(matrix, axis=1), 1.0, atol=1e-2)
+        # 체크섬(4바이트) + float32 중심 벡터
+        assert len(centroid) == 4 + embeddings.shape[1] * 4
+
+    def test_search_documents_ranks_across_documents(self):
+        """Fine search merges node hits from several documents."""
+        documents = {}
+        for seed in range(3):
+            node_ids, texts, embeddings = _document(seed)
+            payload, _ = pack_document_vectors(node_ids, texts, embeddings.tolist())
+            documents[f"doc{seed}"] = unpack_document_vectors(payload)
+
+        query = documents["doc2"][2][5]
+        hits = _search_documents(query, documents, top_k=4)
+
+        assert len(hits) == 4
+        assert (hits[0].doc_id, hits[0].node_id) == ("doc2", "2-5")
+        assert [hit.score for hit in hits] == sorted(
+            (hit.score for hit in hits), reverse=True
+        )
@@ -0,0 +1,150 @@
+import asyncio
+import json
+
+from llama_index.core import VectorStoreIndex
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.llms import MockLLM
+from llama_index.core.schema import TextNode
+
+from app.utils import advanced_query
+from app.utils.advanced_query import stream_decompose_and_answer
+from app.utils.synthesis import AdaptiveSynthesizer
+
+
+def _index():
+    nodes = [TextNode(text=f"제{i}조 지원 내용") for i in range(5)]
+    return VectorStoreIndex(nodes, embed_model=MockEmbedding(embed_dim=8))
+
+
+def _patch_decompose(monkeypatch, sub_queries):
+    async def fake_decompose(doc_id, query):
+        return {"sub_queries": sub_queries, "reasoning": "test"}
+
+    monkeypatch.setattr(advanced_query, "decompose_query_internal", fake_decompose)
+
+
+async def _collect(stream):
+    return [json.loads(line) async for line in stream]
+
+
+class TestDecomposePipeline:
+    """Unit tests for the streaming decompose-and-answer pipeline."""
+
+    async def test_sub_answers_stream_before_final(self, monkeypatch):
+        """Sub-answers arrive in completion order, then final and done."""
+        _patch_decompose(monkeypatch, ["느린 질문", "빠른 질문", "실패 질문"])
+        calls = []
+
+        async def fake_retrieval(doc_id, query, index=None, **kwargs):
+            calls.append(index)
+            if query == "실패 질문":
+                raise RuntimeError("boom")
+            await asyncio.sleep(0.05 if query == "느린 질문" else 0)
+            return {
+                "integrated_answer": f"{query} 답변",
+                "table_results": None,
+                "text_results": None,
+                "json_results": None,
+            }
+
+        integrated = {}
+
+        async def fake_integrate(
+            original_query, sub_queries, sub_query_results, evidence=None
+        ):
+            integrated.update(results=sub_query_results, evidence=evidence)
+            return "최종 답변"
+
+        monkeypatch.setattr(advanced_query, "multi_retrieval_internal", fake_retrieval)
+        monkeypatch.setattr(advanced_query, "integrate_all_results", fake_integrate)
+
+        index = _index()
+        events = await _collect(
+            stream_decompose_and_answer(index, {}, "doc", "복합 질문", top_k=3)
+        )
+
+        assert [e["event"] for e in events] == [
+            "decomposition",
+            "sub_answer",
+            "sub_answer",
+            "sub_answer",
+            "final",
+            "done",
+        ]
+        sub_answers = events[1:4]
+        assert sub_answers[-1]["sub_query"] == "느린 질문"
+        assert any("error" in e for e in sub_answers)
+        assert events[-2]["strategy"] == "decomposed"
+        assert events[-1]["failed"] == 1
+
+        # 인덱스는 공유되고, 통합 결과는 원래 서브 질문 순서를 유지
+        assert all(shared is index for shared in calls)
+        assert [r["index"] for r in integrated["results"]] == [0, 1, 2]
+        assert len(integrated["evidence"]) == 3
+
+    async def test_single_sub_query_answers_directly(self, monkeypatch):
+        """An undecomposed question skips sub-queries and uses the prefetched nodes."""
+        _patch_decompose(monkeypatch, ["단일 질문"])
+
+        async def unexpected(*args, **kwargs):
+            raise AssertionError("sub-query path should not run")
+
+        monkeypatch.setattr(advanced_query, "multi_retrieval_internal", unexpected)
+        monkeypatch.setattr(
+            advanced_query,
+            "AdaptiveSynthesizer",
+            lambda: AdaptiveSynthesizer(llm=MockLLM(max_tokens=8)),
+        )
+
+        events = await _collect(
+            stream_decompose_and_answer(_index(), {}, "doc", "단일 질문", top_k=3)
+        )
+
+        assert [e["event"] for e in events] == ["decomposition", "final", "done"]
+        assert events[1]["strategy"] == "direct"
+
+    async def test_failures_end_stream_with_error_line(self, monkeypatch):
+        """A failed prefetch keeps sub-answers; pipeline failures emit error then done."""
+        _patch_decompose(monkeypatch, ["질문 1", "질문 2"])
+
+        async def fake_retrieval(doc_id, query, index=None, **kwargs):
+            return {
+                "integrated_answer": f"{query} 답변",
+                "table_results": None,
+                "text_results": None,
+                "json_results": None,
+            }
+
+        async def broken_aretrieve(self, query):
+            raise RuntimeError("retriever down")
+
+        integrated = {}
+
+        async def fake_integrate(
+            original_query, sub_queries, sub_query_results, evidence=None
+        ):
+            integrated.update(evidence=evidence)
+            return "최종 답변"
+
+        index = _index()
+        retriever_type = type(advanced_query.build_retriever(index, 3))
+        monkeypatch.setattr(retriever_type, "aretrieve", broken_aretrieve)
+        monkeypatch.setattr(advanced_query, "multi_retrieval_internal", fake_retrieval)
+        monkeypatch.setattr(advanced_query, "integrate_all_results", fake_integrate)
+
+        events = await _collect(
+            stream_decompose_and_answer(index, {}, "doc", "복합 질문", top_k=3)
+        )
+        assert [e["event"] for e in events][-2:] == ["final", "done"]
+        assert integrated["evidence"] == []
+
+        async def broken_integrate(**kwargs):
+            raise ValueError("integration failed")
+
+        monkeypatch.setattr(advanced_query, "integrate_all_results", broken_integrate)
+        events = await _collect(
+            stream_decompose_and_answer(index, {}, "doc", "복합 질문", top_k=3)
+        )
+        assert [e["event"] for e in events][-2:] == ["error", "done"]
+        assert events[-2]["error_type"] == "ValueError"
+        assert events[-1]["num_sub_queries"] == 2
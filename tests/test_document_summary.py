@@ -0,0 +1,96 @@
+from llama_index.core import VectorStoreIndex
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.llms import MockLLM
+from llama_index.core.schema import TextNode
+
+from app.utils import document_summary
+from app.utils.document_summary import (
+    collect_parent_sections,
+    summarize_document,
+)
+
+
+class CountingLLM(MockLLM):
+    """MockLLM that counts completion calls."""
+
+    calls: int = 0
+
+    def complete(self, prompt, formatted=False, **kwargs):
+        self.calls += 1
+        return super().complete(prompt, formatted=formatted, **kwargs)
+
+
+class FakeRedis:
+    """In-memory stand-in for the hash commands used by the summary cache."""
+
+    def __init__(self):
+        self.hashes = {}
+
+    async def hmget(self, key, fields):
+        stored = self.hashes.get(key, {})
+        return [stored.get(field) for field in fields]
+
+    async def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(
+            {field: value.encode("utf-8") for field, value in mapping.items()}
+        )
+
+    async def expire(self, key, seconds):
+        return True
+
+    async def delete(self, key):
+        return int(self.hashes.pop(key, None) is not None)
+
+
+def _index(children):
+    nodes = [
+        TextNode(
+            text=text,
+            metadata={"parent_index": parent, "chunk_index": chunk},
+        )
+        for parent, chunk, text in children
+    ]
+    return VectorStoreIndex(nodes, embed_model=MockEmbedding(embed_dim=8))
+
+
+class TestDocumentSummary:
+    """Unit tests for whole-document map-reduce summarization."""
+
+    def test_collect_parent_sections_in_document_order(self):
+        """Children are regrouped per parent with the overlap kept once."""
+        overlap = "지원금은 예산 범위에서 지급한다."
+        index = _index(
+            [
+                (1, 0, "제2조 신청 절차를 정한다."),
+                (0, 1, f"{overlap} 제1조의2 예외"),
+                (0, 0, f"제1조 목적. {overlap}"),
+            ]
+        )
+
+        sections = collect_parent_sections(index)
+
+        assert [parent for parent, _ in sections] == [0, 1]
+        assert sections[0][1].startswith("제1조 목적.")
+        assert sections[0][1].count(overlap) == 1
+
+    async def test_second_summary_reuses_cached_sections(self, monkeypatch):
+        """A repeated summary only runs the reduce step."""
+        redis = FakeRedis()
+
+        async def get_fake_redis():
+            return redis
+
+        monkeypatch.setattr(document_summary, "get_redis_client", get_fake_redis)
+        index = _index([(parent, 0, f"제{parent}조 내용") for parent in range(3)])
+
+        first_llm = CountingLLM(max_tokens=8)
+        _, first = await summarize_document("doc", index, "요약", llm=first_llm)
+        second_llm = CountingLLM(max_tokens=8)
+        _, second = await summarize_document("doc", index, "요약", llm=second_llm)
+
+        assert first["mapped_sections"] == 3
+        assert first["llm_calls"] == 4
+        assert second["cached_sections"] == 3
+        assert second["mapped_sections"] == 0
+        assert second["llm_calls"] == 1
+        assert second_llm.calls == 1
@@ -0,0 +1,97 @@
+import json
+
+from langchain_core.runnables import RunnableLambda
+from pydantic import BaseModel
+
+from app.utils import chain_batch
+from app.utils.extraction_packing import (
+    pack_texts,
+    packed_output_model,
+    split_packed_items,
+    stream_packed_extraction,
+)
+
+
+class Person(BaseModel):
+    name: str
+    age: int | None = None
+
+
+Packed = packed_output_model(Person)
+Item = Packed.model_fields["items"].annotation.__args__[0]
+
+
+class TestExtractionPacking:
+    """Unit tests for packing short extraction inputs into one LLM call."""
+
+    def test_pack_texts_respects_budget_and_max_items(self):
+        """Groups stay in order and split on item count or token budget."""
+        assert pack_texts(["a", "b", "c", "d", "e"], max_items=2) == [
+            [0, 1],
+            [2, 3],
+            [4],
+        ]
+        long_text = "word " * 300
+        assert pack_texts(["a", long_text, "b"], token_budget=100) == [
+            [0],
+            [1],
+            [2],
+        ]
+
+    def test_split_drops_duplicate_and_out_of_range_numbers(self):
+        """Only uniquely numbered, in-range items map back to inputs."""
+        packed = Packed(
+            items=[
+                Item(name="A", item_number=1),
+                Item(name="B", item_number=2),
+                Item(name="B2", item_number=2),
+                Item(name="X", item_number=9),
+            ]
+        )
+
+        results = split_packed_items(packed, [10, 11, 12], Person)
+
+        assert results == {10: Person(name="A")}
+
+    async def test_stream_falls_back_for_missing_items(self, monkeypatch):
+        """Missing packed items are fetched individually; calls saved are reported."""
+        monkeypatch.setattr(chain_batch, "CHAIN_BATCH_RETRY_BACKOFF", 0)
+        texts = [f"Person {i} is {20 + i}" for i in range(5)]
+        single_calls: list[str] = []
+
+        def packed_answer(payload: dict):
+            lines = payload["texts"].splitlines()
+            # The model skips the third text in every group
+            return Packed(
+                items=[
+                    Item(name=f"P{line}", item_number=number)
+                    for number, line in enumerate(lines, start=1)
+                    if number != 3
+                ]
+            )
+
+        def single_answer(payload: dict) -> Person:
+            single_calls.append(payload["text"])
+            return Person(name="single")
+
+        lines = [
+            json.loads(line)
+            async for line in stream_packed_extraction(
+                RunnableLambda(packed_answer),
+                RunnableLambda(single_answer),
+                texts,
+                Person,
+                max_items=5,
+            )
+        ]
+
+        items = {line["index"]: line for line in lines[:-1]}
+        done = lines[-1]
+        assert single_calls == [texts[2]]
+        assert items[2]["packed"] is False
+        assert items[2]["result"]["name"] == "single"
+        assert items[4]["result"]["name"] == f"P[5] {texts[4]}"
+        assert done["groups"] == 1
+        assert done["llm_calls"] == 2
+        assert done["calls_saved"] == 3
+        assert done["failed"] == 0
@@ -0,0 +1,68 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from app.utils.http_clients import PooledAsyncTransport, PooledTransport
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestPooledTransport:
+    """Unit tests for the shared pooled HTTP transports and reuse stats."""
+
+    def test_sync_requests_reuse_one_connection(self, server_url):
+        """Sequential requests on the shared pool open a single TCP connection."""
+        transport = PooledTransport()
+        with httpx.Client(transport=transport, base_url=server_url) as client:
+            for _ in range(5):
+                assert client.post("/v1/chat/completions", json={}).json() == {
+                    "ok": True
+                }
+
+            stats = transport.snapshot()
+
+        assert stats["requests"] == 5
+        assert stats["new_connections"] == 1
+        assert stats["reused_connections"] == 4
+        assert stats["reuse_ratio"] == 0.8
+        assert stats["idle_connections"] == 1
+
+    async def test_async_requests_reuse_one_connection(self, server_url):
+        """The async pool records trace events the same way."""
+        transport = PooledAsyncTransport()
+        async with httpx.AsyncClient(
+            transport=transport, base_url=server_url
+        ) as client:
+            for _ in range(3):
+                await client.post("/v1/embeddings", json={})
+
+            stats = transport.snapshot()
+
+        assert stats["requests"] == 3
+        assert stats["new_connections"] == 1
+        assert stats["tls_handshakes"] == 0
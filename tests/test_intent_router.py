@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from app.utils.intent_router import IntentRouter
+
+PROTOTYPES = {
+    "brief": ["what is http", "who wrote hamlet"],
+    "detailed": ["explain transformers", "explain caching"],
+}
+
+
+def keyword_encoder(texts: list[str]) -> np.ndarray:
+    """Tiny deterministic encoder: [brief cue, detailed cue, shared bias]."""
+    rows = []
+    for text in texts:
+        brief = sum(word in text for word in ("what", "who"))
+        detailed = sum(word in text for word in ("explain", "step", "examples"))
+        rows.append([brief, detailed, 0.5])
+    matrix = np.asarray(rows, dtype=np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def make_router(name: str, fallback=None) -> IntentRouter:
+    return IntentRouter(
+        name, PROTOTYPES, fallback=fallback, threshold=0.6, encoder=keyword_encoder
+    )
+
+
+class TestIntentRouter:
+    """Unit tests for the local embedding-based intent router."""
+
+    async def test_confident_inputs_route_locally(self):
+        """Clear inputs are decided locally without calling the LLM fallback."""
+        calls: list[str] = []
+
+        async def fallback(text: str) -> str:
+            calls.append(text)
+            return "brief"
+
+        router = make_router("test_local", fallback)
+        brief = await router.aroute("what is rest")
+        detailed = await router.aroute("explain caching step by step")
+
+        assert (brief["label"], brief["source"]) == ("brief", "local")
+        assert (detailed["label"], detailed["source"]) == ("detailed", "local")
+        assert detailed["confidence"] >= 0.6
+        assert calls == []
+        assert router.stats["fallback_rate"] == 0.0
+        assert router.stats["decision_ms_p95"] is not None
+
+    async def test_low_confidence_falls_back_to_llm(self):
+        """Ambiguous inputs use the LLM label; invalid or failed answers keep the local one."""
+        answers = iter(["Detailed\n", "maybe", RuntimeError("llm down")])
+
+        async def fallback(text: str) -> str:
+            answer = next(answers)
+            if isinstance(answer, Exception):
+                raise answer
+            return answer
+
+        router = make_router("test_fallback", fallback)
+        first = await router.aroute("tell me about databases")
+        second = await router.aroute("tell me about queues")
+        third = await router.aroute("tell me about caches")
+
+        assert first["confidence"] < 0.6
+        assert (first["label"], first["source"]) == ("detailed", "llm")
+        assert second["source"] == "local"
+        assert third["source"] == "local"
+        stats = router.stats
+        assert stats["fallbacks"] == 1
+        assert stats["fallback_errors"] == 1
+        assert stats["fallback_rate"] == pytest.approx(1 / 3, abs=1e-3)
+
+    async def test_unavailable_model_uses_heuristic(self):
+        """If the local encoder cannot load, the free heuristic decides without the LLM."""
+        loads: list[int] = []
+        calls: list[str] = []
+
+        def broken_encoder(texts: list[str]) -> np.ndarray:
+            loads.append(len(texts))
+            raise OSError("model not downloaded")
+
+        async def fallback(text: str) -> str:
+            calls.append(text)
+            return "brief"
+
+        router = IntentRouter(
+            "test_broken",
+            PROTOTYPES,
+            fallback=fallback,
+            heuristic=lambda text: "brief" if len(text) < 20 else "detailed",
+            encoder=broken_encoder,
+        )
+        short = await router.aroute("what is http")
+        long = await router.aroute("tell me everything about the http protocol")
+
+        assert (short["label"], short["source"]) == ("brief", "heuristic")
+        assert (long["label"], long["source"]) == ("detailed", "heuristic")
+        assert calls == []
+        assert len(loads) == 1  # no reload attempt while the retry delay is pending
+        stats = router.stats
+        assert (stats["heuristic"], stats["fallbacks"]) == (2, 0)
+
+    def test_requires_two_labels(self):
+        """A router needs at least two labelled prototype groups."""
+        with pytest.raises(ValueError):
+            IntentRouter("test_invalid", {"only": ["x"]}, encoder=keyword_encoder)
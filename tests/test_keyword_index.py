@@ -0,0 +1,117 @@
+from llama_index.core import VectorStoreIndex
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.schema import MetadataMode, TextNode
+
+from app.utils.document_analysis import (
+    build_exception_filters,
+    get_exception_keywords,
+    highlight_exception_sources,
+    tag_exception_clauses,
+)
+from app.utils.keyword_index import KeywordAutomaton
+
+
+class TestKeywordAutomaton:
+    """Unit tests for the Aho–Corasick keyword automaton."""
+
+    def test_find_keywords_in_registration_order(self):
+        """Found keywords are unique and follow the registration order."""
+        automaton = KeywordAutomaton(get_exception_keywords())
+
+        text = "특례 규정에도 불구하고, 다만 다음의 경우에는 특례를 적용하지 않는다."
+
+        assert automaton.find_keywords(text) == ["다만", "특례", "불구하고"]
+
+    def test_overlapping_keywords(self):
+        """Keywords that share suffixes or overlap are all reported."""
+        automaton = KeywordAutomaton(["he", "she", "his", "hers"])
+
+        matches = list(automaton.iter_matches("ushers"))
+
+        assert (1, "she") in matches
+        assert (2, "he") in matches
+        assert (2, "hers") in matches
+
+    def test_no_match(self):
+        """Text without keywords returns an empty list."""
+        automaton = KeywordAutomaton(get_exception_keywords())
+
+        assert automaton.find_keywords("일반적인 지원 내용입니다.") == []
+        assert automaton.contains_any("일반적인 지원 내용입니다.") is False
+
+    def test_matches_naive_substring_search(self):
+        """Results are identical to a naive substring loop."""
+        keywords = get_exception_keywords()
+        automaton = KeywordAutomaton(keywords)
+
+        texts = [
+            "다만, 허위 신고의 경우 제외한다.",
+            "이 경우 예외적으로 인정한다.",
+            "단서 조항 없음",
+            "",
+        ]
+
+        for text in texts:
+            expected = [keyword for keyword in keywords if keyword in text]
+            assert automaton.find_keywords(text) == expected
+
+
+class TestExceptionTagging:
+    """Unit tests for exception clause tagging and highlighting."""
+
+    def test_tag_exception_clauses(self):
+        """Nodes are tagged and tags are hidden from embedding/LLM text."""
+        nodes = [
+            TextNode(text="다만, 허위 신고의 경우 지급하지 않는다."),
+            TextNode(text="지원금은 3개월 이내에 신청한다."),
+        ]
+
+        tagged_count = tag_exception_clauses(nodes)
+
+        assert tagged_count == 1
+        assert nodes[0].metadata["has_exception_clause"] is True
+        assert nodes[0].metadata["exception_keywords"] == ["다만"]
+        assert nodes[1].metadata["has_exception_clause"] is False
+        assert "has_exception_clause" not in nodes[0].get_content(
+            metadata_mode=MetadataMode.EMBED
+        )
+        assert "exception_keywords" not in nodes[0].get_content(
+            metadata_mode=MetadataMode.LLM
+        )
+
+    def test_exception_filter_restricts_retrieval(self):
+        """The metadata filter only retrieves tagged nodes."""
+        nodes = [TextNode(text=f"일반 조항 {i}") for i in range(10)]
+        nodes.append(TextNode(text="다만, 폐업의 경우 예외로 한다."))
+        tag_exception_clauses(nodes)
+
+        index = VectorStoreIndex(nodes, embed_model=MockEmbedding(embed_dim=8))
+        retriever = index.as_retriever(
+            similarity_top_k=3, filters=build_exception_filters()
+        )
+
+        results = retriever.retrieve("폐업 예외")
+
+        assert [result.node.get_content() for result in results] == [
+            "다만, 폐업의 경우 예외로 한다."
+        ]
+
+    def test_highlight_exception_sources(self):
+        """Only references containing exception keywords are highlighted."""
+        refs = [
+            {"reference_number": 1, "full_text": "다만, 허위 신고의 경우..."},
+            {"reference_number": 2, "full_text": "일반적인 경우..."},
+        ]
+
+        highlighted = highlight_exception_sources(refs)
+
+        assert len(highlighted) == 1
+        assert highlighted[0]["found_exception_keywords"] == ["다만"]
+
+    def test_highlight_with_custom_keywords(self):
+        """Custom keyword lists build their own automaton."""
+        refs = [{"reference_number": 1, "full_text": "별도로 정하는 바에 따른다."}]
+
+        highlighted = highlight_exception_sources(refs, ["별도로 정하는"])
+
+        assert highlighted[0]["found_exception_keywords"] == ["별도로 정하는"]
@@ -0,0 +1,86 @@
+import pytest
+from llama_index.core import VectorStoreIndex
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.schema import QueryBundle, TextNode
+
+from app.utils.lexical_index import LexicalIndex, char_ngrams
+from app.utils.retrieval import (
+    build_retriever,
+    get_index_component,
+    set_index_component,
+)
+
+
+@pytest.fixture
+def nodes():
+    return [
+        TextNode(text="제12조 징계의 종류는 파면, 해임, 정직, 감봉, 견책으로 한다."),
+        TextNode(text="지원금은 월 300만원 이내에서 지급한다."),
+        TextNode(text="국가공무원법 제78조에 따라 징계위원회를 구성한다."),
+        TextNode(text="신청서는 사업 종료 후 3개월 이내에 제출한다."),
+    ]
+
+
+class TestLexicalIndex:
+    """Unit tests for the character n-gram BM25 index."""
+
+    def test_char_ngrams(self):
+        """Bigrams are built per token; short tokens are kept whole."""
+        assert char_ngrams("제12조 징계") == ["제1", "12", "2조", "징계"]
+        assert char_ngrams("3 등", ngram_size=3) == ["3", "등"]
+
+    def test_exact_term_ranks_first(self, nodes):
+        """Clause numbers and amounts retrieve the node containing them."""
+        lexical_index = LexicalIndex.build(nodes)
+
+        assert lexical_index.search("제78조", top_k=1)[0][0] == nodes[2].node_id
+        assert lexical_index.search("300만원", top_k=1)[0][0] == nodes[1].node_id
+
+    def test_unknown_terms_return_nothing(self, nodes):
+        """Queries sharing no n-gram with the corpus return no hits."""
+        lexical_index = LexicalIndex.build(nodes)
+
+        assert lexical_index.search("xyz", top_k=5) == []
+
+    def test_serialization_roundtrip(self, nodes):
+        """Compressed bytes restore an index with identical scores."""
+        lexical_index = LexicalIndex.build(nodes, ngram_size=3)
+
+        restored = LexicalIndex.from_bytes(lexical_index.to_bytes())
+
+        assert restored.ngram_size == 3
+        assert restored.search("징계위원회", top_k=3) == lexical_index.search(
+            "징계위원회", top_k=3
+        )
+
+
+class TestHybridRetrieval:
+    """Unit tests for the hybrid (vector + BM25) retriever."""
+
+    def test_hybrid_includes_lexical_match(self, nodes):
+        """The hybrid retriever surfaces the exact-term match."""
+        index = VectorStoreIndex(nodes, embed_model=MockEmbedding(embed_dim=8))
+        set_index_component(index, "lexical", LexicalIndex.build(nodes))
+
+        retriever = build_retriever(index, similarity_top_k=2, retrieval_mode="hybrid")
+        results = retriever.retrieve(QueryBundle("국가공무원법 제78조"))
+
+        assert len(results) == 2
+        assert nodes[2].node_id in [result.node.node_id for result in results]
+
+    def test_lexical_index_built_on_demand(self, nodes):
+        """Indexes without an attached lexical index build one lazily."""
+        index = VectorStoreIndex(nodes, embed_model=MockEmbedding(embed_dim=8))
+
+        build_retriever(index, similarity_top_k=2, retrieval_mode="hybrid").retrieve(
+            QueryBundle("징계")
+        )
+
+        assert isinstance(get_index_component(index, "lexical"), LexicalIndex)
+
+    def test_unknown_mode_raises(self, nodes):
+        """Unsupported retrieval modes raise ValueError."""
+        index = VectorStoreIndex(nodes, embed_model=MockEmbedding(embed_dim=8))
+
+        with pytest.raises(ValueError):
+            build_retriever(index, similarity_top_k=2, retrieval_mode="sparse")
@@ -0,0 +1,166 @@
+import httpx
+from fastapi import FastAPI
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+from langchain_openai import ChatOpenAI
+
+from app.utils import llm_cache
+from app.utils.llm_cache import (
+    LLMCacheMiddleware,
+    RedisLLMCache,
+    is_deterministic,
+    llm_cache_policy,
+)
+
+
+class FakeRedis:
+    """In-memory stand-in for the async Redis commands used by the cache."""
+
+    def __init__(self):
+        self.values: dict[str, bytes] = {}
+        self.hashes: dict[str, dict[bytes, bytes]] = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def hlen(self, key):
+        return len(self.hashes.get(key, {}))
+
+    async def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field.encode()] = value
+
+    async def hdel(self, key, field):
+        self.hashes.get(key, {}).pop(field, None)
+
+    async def expire(self, key, seconds):
+        return True
+
+
+def use_redis(monkeypatch, redis) -> None:
+    async def get_client():
+        return redis
+
+    monkeypatch.setattr(llm_cache, "get_redis_client", get_client)
+
+
+class TestLLMCache:
+    """Unit tests for the Redis-backed LangChain LLM cache."""
+
+    async def test_exact_hit_skips_model_and_zeroes_usage(self, monkeypatch):
+        """A repeated prompt is answered from the cache with zero token usage."""
+        use_redis(monkeypatch, FakeRedis())
+        cache = RedisLLMCache()
+        model = FakeListChatModel(responses=["first", "second"], cache=cache)
+
+        with llm_cache_policy("on"):
+            first = await model.ainvoke("번역해 주세요")
+            second = await model.ainvoke("번역해 주세요")
+            other = await model.ainvoke("다른 질문")
+
+        assert (first.content, second.content, other.content) == (
+            "first",
+            "first",
+            "second",
+        )
+        assert cache.stats["hits"] == 1
+        assert cache.stats["misses"] == 2
+        assert cache.stats["writes"] == 2
+
+        generation = ChatGeneration(
+            message=AIMessage(
+                content="ok",
+                usage_metadata={
+                    "input_tokens": 5,
+                    "output_tokens": 2,
+                    "total_tokens": 7,
+                },
+            )
+        )
+        with llm_cache_policy("on"):
+            await cache.aupdate("prompt", "llm", [generation])
+            (cached,) = await cache.alookup("prompt", "llm")
+        assert cached.message.content == "ok"
+        assert cached.message.usage_metadata["total_tokens"] == 0
+
+    async def test_auto_policy_caches_only_temperature_zero(self, monkeypatch):
+        """Only deterministic calls are cached unless a route opts in."""
+        deterministic = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+        creative = ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
+
+        assert is_deterministic(deterministic._get_llm_string())
+        assert not is_deterministic(creative._get_llm_string())
+        assert is_deterministic(creative._get_llm_string(temperature=0))
+
+        use_redis(monkeypatch, FakeRedis())
+        cache = RedisLLMCache()
+        model = FakeListChatModel(responses=["a", "b"], cache=cache)
+        await model.ainvoke("같은 질문")
+        assert (await model.ainvoke("같은 질문")).content == "b"
+        assert cache.stats["skipped"] == 2
+
+    async def test_semantic_hit_for_similar_prompt(self, monkeypatch):
+        """Semantic mode reuses an entry whose prompt embedding is close enough."""
+        use_redis(monkeypatch, FakeRedis())
+        vectors = {"휴가 규정": [1.0, 0.0], "휴가 규정?": [0.99, 0.05], "급여": [0, 1]}
+
+        async def embed(text: str) -> list[float]:
+            return vectors[text.strip()]
+
+        cache = RedisLLMCache(mode="semantic", similarity=0.95, embed=embed)
+        model = FakeListChatModel(responses=["r1", "r2"], cache=cache)
+
+        with llm_cache_policy("on"):
+            assert (await model.ainvoke("휴가 규정")).content == "r1"
+            assert (await model.ainvoke("휴가 규정?")).content == "r1"
+            assert (await model.ainvoke("급여")).content == "r2"
+
+        assert cache.stats["semantic_hits"] == 1
+        assert cache.stats["misses"] == 2
+
+    async def test_route_opt_out_and_redis_failure(self, monkeypatch):
+        """Excluded routes bypass the cache even when code opts in; Redis errors degrade to misses."""
+        use_redis(monkeypatch, FakeRedis())
+        cache = RedisLLMCache()
+        model = FakeListChatModel(responses=["a", "b", "c", "d"], cache=cache)
+        app = FastAPI()
+
+        @app.get("/documents/{doc_id}")
+        async def document(doc_id: str):
+            with llm_cache_policy("on"):
+                return (await model.ainvoke(f"summarize {doc_id}")).content
+
+        @app.get("/lcel/stream")
+        async def stream():
+            with llm_cache_policy("on"):
+                return (await model.ainvoke("q")).content
+
+        app.add_middleware(LLMCacheMiddleware, exclude_paths=["/lcel/stream"])
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://t"
+        ) as client:
+            contents = [
+                (await client.get(path)).json()
+                for path in ("/documents/1", "/documents/2", "/lcel/stream")
+            ]
+
+        assert contents == ["a", "b", "c"]
+        # 문서 ID별 경로가 아니라 라우트 템플릿 하나로 집계
+        assert set(cache.stats["by_route"]) == {"/documents/{doc_id}", "/lcel/stream"}
+        assert cache.stats["by_route"]["/documents/{doc_id}"]["misses"] == 2
+        assert cache.stats["by_route"]["/lcel/stream"]["skipped"] == 1
+
+        async def broken_client():
+            raise ConnectionError("redis down")
+
+        monkeypatch.setattr(llm_cache, "get_redis_client", broken_client)
+        with llm_cache_policy("on"):
+            assert await cache.alookup("p", "llm") is None
+        assert cache.stats["redis_errors"] == 1
@@ -0,0 +1,217 @@
+import asyncio
+import json
+
+import httpx
+
+from app.utils import llm_coalescing
+from app.utils.llm_coalescing import CoalescingAsyncTransport, get_coalescing_stats
+
+
+class FakeRedis:
+    """In-memory stand-in for the lock and stream commands used across workers."""
+
+    def __init__(self):
+        self.values = {}
+        self.streams = {}
+        self._changed = asyncio.Condition()
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    async def get(self, key):
+        value = self.values.get(key)
+        return value.encode() if value is not None else None
+
+    async def eval(self, script, numkeys, key, token):
+        # compare-and-delete lock release
+        assert script == llm_coalescing._RELEASE_LOCK_SCRIPT
+        if self.values.get(key) != token:
+            return 0
+        return int(self.values.pop(key) is not None)
+
+    async def xadd(self, key, fields):
+        async with self._changed:
+            entries = self.streams.setdefault(key, [])
+            entry_id = f"{len(entries) + 1}-0".encode()
+            encoded = {
+                name.encode(): value if isinstance(value, bytes) else value.encode()
+                for name, value in fields.items()
+            }
+            entries.append((entry_id, encoded))
+            self._changed.notify_all()
+        return entry_id
+
+    async def xread(self, streams, block=None, count=None):
+        [(key, last_id)] = streams.items()
+
+        def newer():
+            entries = self.streams.get(key, [])
+            if last_id == b"0":
+                return entries
+            position = int(last_id.split(b"-")[0])
+            return entries[position:]
+
+        async with self._changed:
+            try:
+                await asyncio.wait_for(
+                    self._changed.wait_for(lambda: newer()), block / 1000
+                )
+            except TimeoutError:
+                return []
+            return [[key.encode(), newer()]]
+
+    async def expire(self, key, seconds):
+        return True
+
+    async def pexpire(self, key, millis):
+        return True
+
+
+class _SlowStream(httpx.AsyncByteStream):
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            await asyncio.sleep(0.01)
+            yield chunk
+
+
+def _upstream(calls, chunks=(b'{"answer": ', b'"ok"}')):
+    async def handler(request):
+        calls.append(json.loads(request.content))
+        await asyncio.sleep(0.02)
+        return httpx.Response(200, stream=_SlowStream(list(chunks)))
+
+    return httpx.MockTransport(handler)
+
+
+def _client(transport):
+    return httpx.AsyncClient(transport=transport, base_url="https://api.openai.com/v1")
+
+
+def _body(temperature=0.0, stream=False):
+    return {
+        "model": "gpt-4o-mini",
+        "temperature": temperature,
+        "stream": stream,
+        "messages": [{"role": "user", "content": "체크리스트를 만들어 주세요"}],
+    }
+
+
+class TestLLMCoalescing:
+    """Unit tests for coalescing identical in-flight LLM requests."""
+
+    async def test_identical_requests_share_one_upstream_call(self):
+        """Concurrent identical prompts coalesce; a different temperature does not."""
+        calls = []
+        transport = CoalescingAsyncTransport(_upstream(calls), cross_worker=False)
+        before = get_coalescing_stats()["coalesced"]
+
+        async with _client(transport) as client:
+            responses = await asyncio.gather(
+                *(client.post("/chat/completions", json=_body()) for _ in range(5)),
+                client.post("/chat/completions", json=_body(temperature=0.7)),
+            )
+
+        assert len(calls) == 2
+        assert all(response.json() == {"answer": "ok"} for response in responses)
+        assert get_coalescing_stats()["coalesced"] - before == 4
+
+        # 완료된 요청은 공유하지 않음 (캐시 아님)
+        async with _client(transport) as client:
+            await client.post("/chat/completions", json=_body())
+        assert len(calls) == 3
+
+    async def test_streaming_subscribers_fan_out(self):
+        """A late streaming subscriber replays the chunks it missed."""
+        calls = []
+        chunks = [b"data: 1\n\n", b"data: 2\n\n", b"data: [DONE]\n\n"]
+        transport = CoalescingAsyncTransport(
+            _upstream(calls, chunks), cross_worker=False
+        )
+
+        async def consume(client, delay):
+            await asyncio.sleep(delay)
+            async with client.stream(
+                "POST", "/chat/completions", json=_body(stream=True)
+            ) as response:
+                return [chunk async for chunk in response.aiter_raw()]
+
+        async with _client(transport) as client:
+            first, late = await asyncio.gather(
+                consume(client, 0), consume(client, 0.035)
+            )
+
+        assert len(calls) == 1
+        assert b"".join(first) == b"".join(late) == b"".join(chunks)
+
+    async def test_cross_worker_follower_reads_redis_stream(self, monkeypatch):
+        """A second worker subscribes to the leader's response through Redis."""
+        redis = FakeRedis()
+
+        async def get_client():
+            return redis
+
+        monkeypatch.setattr(llm_coalescing, "get_redis_client", get_client)
+        calls = []
+        worker_a = CoalescingAsyncTransport(_upstream(calls), cross_worker=True)
+        worker_b = CoalescingAsyncTransport(_upstream(calls), cross_worker=True)
+        before = get_coalescing_stats()["coalesced_remote"]
+
+        async with _client(worker_a) as client_a, _client(worker_b) as client_b:
+            leader = asyncio.create_task(
+                client_a.post("/chat/completions", json=_body())
+            )
+            await asyncio.sleep(0.005)
+            follower = await client_b.post("/chat/completions", json=_body())
+            leader = await leader
+
+        assert len(calls) == 1
+        assert follower.json() == leader.json() == {"answer": "ok"}
+        assert get_coalescing_stats()["coalesced_remote"] - before == 1
+        assert redis.values == {}
+
+    async def test_follower_never_replays_a_finished_call(self, monkeypatch):
+        """A follower reads the current leader's stream, not a previous call's leftovers."""
+        redis = FakeRedis()
+
+        async def get_client():
+            return redis
+
+        monkeypatch.setattr(llm_coalescing, "get_redis_client", get_client)
+        calls = []
+
+        async def handler(request):
+            calls.append(request)
+            await asyncio.sleep(0.02)
+            body = json.dumps({"answer": f"call{len(calls)}"}).encode()
+            return httpx.Response(200, stream=_SlowStream([body]))
+
+        worker_a = CoalescingAsyncTransport(
+            httpx.MockTransport(handler), cross_worker=True
+        )
+        worker_b = CoalescingAsyncTransport(
+            httpx.MockTransport(handler), cross_worker=True
+        )
+
+        async with _client(worker_a) as client_a, _client(worker_b) as client_b:
+            first = await client_a.post("/chat/completions", json=_body())
+            leader = asyncio.create_task(
+                client_a.post("/chat/completions", json=_body())
+            )
+            await asyncio.sleep(0.005)
+            follower = await client_b.post("/chat/completions", json=_body())
+            leader = await leader
+
+        assert first.json() == {"answer": "call1"}
+        assert follower.json() == leader.json() == {"answer": "call2"}
+        assert len(calls) == 2
+
+        # 만료 후 다른 leader가 잡은 잠금은 지우지 않음
+        redis.values[llm_coalescing._lock_key("k")] = "other-leader"
+        await worker_a._release_lock(redis, "k", "expired-leader")
+        assert redis.values[llm_coalescing._lock_key("k")] == "other-leader"
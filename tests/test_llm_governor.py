@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+import httpx
+
+from app.utils import llm_governor
+from app.utils.llm_governor import (
+    GovernedAsyncTransport,
+    LLMGovernor,
+    PrioritySemaphore,
+    estimate_request_cost,
+    llm_priority,
+)
+
+
+def _chat_request(content="징계 감경 기준", **extra):
+    body = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": content}]}
+    return httpx.Request(
+        "POST",
+        "https://api.openai.com/v1/chat/completions",
+        content=json.dumps({**body, **extra}).encode(),
+    )
+
+
+class _NetworkStream(httpx.AsyncByteStream):
+    """Unread body, like a real transport response."""
+
+    async def __aiter__(self):
+        yield b'{"ok": true}'
+
+
+def _client(governor):
+    def handler(request):
+        return httpx.Response(200, stream=_NetworkStream())
+
+    transport = GovernedAsyncTransport(httpx.MockTransport(handler), governor)
+    return httpx.AsyncClient(transport=transport, base_url="https://api.openai.com/v1")
+
+
+class TestLLMGovernor:
+    """Unit tests for the shared LLM concurrency and rate governor."""
+
+    async def test_priority_semaphore_wakes_interactive_first(self):
+        """Queued interactive waiters get the slot before earlier background ones."""
+        semaphore = PrioritySemaphore(1)
+        await semaphore.acquire()
+        order = []
+
+        async def waiter(name, priority):
+            await semaphore.acquire(priority)
+            order.append(name)
+            semaphore.release()
+
+        tasks = [asyncio.create_task(waiter("background", 1))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(waiter("interactive", 0)))
+        await asyncio.sleep(0)
+        assert semaphore.waiting == 2
+
+        semaphore.release()
+        await asyncio.gather(*tasks)
+
+        assert order == ["interactive", "background"]
+        assert semaphore.in_use == 0
+
+    def test_estimate_request_cost(self):
+        """Chat cost adds max_tokens; embeddings count inputs; other paths are ignored."""
+        model, tokens = estimate_request_cost(_chat_request(max_tokens=100))
+        assert model == "gpt-4o-mini"
+        assert tokens > 100
+
+        embeddings = httpx.Request(
+            "POST",
+            "https://api.openai.com/v1/embeddings",
+            content=json.dumps(
+                {"model": "emb", "input": ["가나다", [1, 2, 3]]}
+            ).encode(),
+        )
+        assert estimate_request_cost(embeddings)[1] >= 4
+        assert (
+            estimate_request_cost(httpx.Request("GET", "https://x/v1/models")) is None
+        )
+
+    def test_background_requests_keep_reserve(self):
+        """Background calls must leave a share of each bucket for interactive ones."""
+        governor = LLMGovernor(rpm_limit=100, tpm_limit=1000, background_reserve=0.2)
+
+        keys, interactive = governor._bucket_args("m", 50, "interactive")
+        _, background = governor._bucket_args("m", 50, "background")
+
+        assert keys == ["llm_governor:m:rpm", "llm_governor:m:tpm"]
+        assert interactive == [100, 1, 0.0, 1000, 50, 0.0]
+        assert background == [100, 1, 20.0, 1000, 50, 200.0]
+
+    async def test_transport_tracks_slots_and_wait(self, monkeypatch):
+        """Requests pass through the governor and release their slot when closed."""
+
+        async def unavailable():
+            raise ConnectionError("redis down")
+
+        monkeypatch.setattr(llm_governor, "get_redis_client", unavailable)
+        governor = LLMGovernor(max_concurrency=2)
+
+        async with _client(governor) as client:
+            with llm_priority("background"):
+                response = await client.post(
+                    "/chat/completions", content=_chat_request().content
+                )
+            assert response.json() == {"ok": True}
+
+            async with client.stream(
+                "POST", "/embeddings", json={"model": "emb", "input": "x"}
+            ):
+                assert governor.stats["in_flight"] == 1
+
+        stats = governor.stats
+        assert stats["requests"] == 2
+        assert stats["in_flight"] == 0
+        assert stats["redis_errors"] == 2
+        assert stats["by_priority"]["background"]["requests"] == 1
+        assert stats["by_priority"]["interactive"]["requests"] == 1
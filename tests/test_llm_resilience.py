@@ -0,0 +1,175 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.utils import llm_governor, llm_resilience
+from app.utils.llm_governor import GovernedAsyncTransport, LLMGovernor
+from app.utils.llm_resilience import (
+    SDK_MAX_RETRIES,
+    DeadlineExceeded,
+    RequestDeadlineMiddleware,
+    ResilientAsyncTransport,
+    backoff_delay,
+    remaining_time,
+    request_deadline,
+    retry_with_backoff,
+)
+
+CHAT_URL = "https://api.openai.com/v1/chat/completions"
+
+
+class ScriptedTransport(httpx.AsyncBaseTransport):
+    """Serves each call from a list of (delay, status) steps and records cancellations."""
+
+    def __init__(self, steps: list[tuple[float, int]]):
+        self.steps = steps
+        self.calls = 0
+        self.cancelled = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        delay, status = self.steps[min(self.calls, len(self.steps) - 1)]
+        self.calls += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return httpx.Response(status, json={"call": self.calls})
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    monkeypatch.setattr(llm_resilience, "_route_stats", {})
+    monkeypatch.setattr(llm_resilience, "LLM_RETRY_BASE_DELAY", 0.01)
+
+
+async def post(transport: httpx.AsyncBaseTransport) -> httpx.Response:
+    async with httpx.AsyncClient(transport=transport) as client:
+        return await client.post(CHAT_URL, json={"model": "gpt-4o-mini"})
+
+
+class TestLLMResilience:
+    """Unit tests for deadlines, jittered retries and hedged LLM requests."""
+
+    async def test_hedge_wins_over_stalled_primary(self, monkeypatch):
+        """A stalled primary is hedged after the delay and the loser is cancelled."""
+        monkeypatch.setattr(llm_resilience, "LLM_HEDGE_DELAY", 0.05)
+        upstream = ScriptedTransport([(5, 200), (0, 200)])
+
+        started = time.monotonic()
+        response = await post(ResilientAsyncTransport(upstream, hedge=True))
+        await asyncio.sleep(0)
+
+        assert response.json() == {"call": 2}
+        assert time.monotonic() - started < 1
+        assert upstream.cancelled == 1
+        stats = llm_resilience.get_resilience_stats()["routes"]["chat/completions"]
+        assert stats["hedges"] == 1
+        assert stats["hedge_wins"] == 1
+        assert stats["hedge_win_rate"] == 1.0
+
+    async def test_governor_queue_does_not_trigger_hedges(self, monkeypatch):
+        """Time spent waiting for a governor slot neither starts the hedge clock nor skews p95."""
+
+        async def unavailable():
+            raise ConnectionError("redis down")
+
+        monkeypatch.setattr(llm_governor, "get_redis_client", unavailable)
+        monkeypatch.setattr(llm_resilience, "LLM_HEDGE_DELAY", 0.2)
+        upstream = ScriptedTransport([(0.15, 200)])
+        governed = GovernedAsyncTransport(upstream, LLMGovernor(max_concurrency=2))
+        transport = ResilientAsyncTransport(
+            governed, hedge=True, queued=governed.queued
+        )
+
+        async with httpx.AsyncClient(transport=transport) as client:
+            responses = await asyncio.gather(
+                *(client.post(CHAT_URL, json={"model": "m"}) for _ in range(10))
+            )
+
+        assert all(response.status_code == 200 for response in responses)
+        assert upstream.calls == 10
+        stats = llm_resilience.get_resilience_stats()["routes"]["chat/completions"]
+        assert stats["hedges"] == 0
+        assert stats["p99_ms"] < 200
+
+    async def test_retries_retryable_status_with_jitter(self):
+        """503 responses are retried; jittered backoff stays within its cap."""
+        upstream = ScriptedTransport([(0, 503), (0, 200)])
+
+        response = await post(ResilientAsyncTransport(upstream, hedge=False))
+
+        assert response.status_code == 200
+        assert upstream.calls == 2
+        stats = llm_resilience.get_resilience_stats()["routes"]["chat/completions"]
+        assert stats["retries"] == 1
+        assert stats["p99_ms"] is not None
+        assert all(0 <= backoff_delay(3, 0.5) <= 2.0 for _ in range(100))
+
+    async def test_deadline_bounds_stalled_call(self):
+        """A call without a hedge is abandoned once the request deadline passes."""
+        upstream = ScriptedTransport([(5, 200)])
+
+        started = time.monotonic()
+        with request_deadline(0.1), pytest.raises(DeadlineExceeded):
+            await post(ResilientAsyncTransport(upstream, hedge=False))
+
+        assert time.monotonic() - started < 1
+        assert remaining_time() is None
+        stats = llm_resilience.get_resilience_stats()["routes"]["chat/completions"]
+        assert stats["deadline_exceeded"] == 1
+
+    async def test_retry_with_backoff_respects_deadline(self):
+        """Call-level retries stop instead of sleeping past the deadline."""
+        calls = 0
+
+        async def flaky() -> str:
+            nonlocal calls
+            calls += 1
+            if calls < 3:
+                raise ValueError("bad output")
+            return "ok"
+
+        assert await retry_with_backoff(flaky, max_retries=2) == ("ok", 3)
+
+        async def broken() -> str:
+            raise ValueError("bad output")
+
+        started = time.monotonic()
+        with request_deadline(0.2), pytest.raises(ValueError) as failure:
+            await retry_with_backoff(broken, max_retries=1000, base_delay=0.05)
+
+        assert time.monotonic() - started < 0.2
+        assert 1 <= failure.value.attempts < 1000
+
+        # 재시도 대상이 아닌 예외는 시도 1회로 보고
+        with pytest.raises(ValueError) as failure:
+            await retry_with_backoff(broken, max_retries=3, retry_on=(KeyError,))
+        assert failure.value.attempts == 1
+
+    def test_sdk_clients_do_not_retry(self):
+        """Eagerly created SDK clients leave retries to the resilient transport."""
+        from app import main
+
+        assert main.get_client() is main.client
+        assert main.get_async_client() is main.async_client
+        assert main.client.max_retries == SDK_MAX_RETRIES
+        assert main.async_client.max_retries == SDK_MAX_RETRIES
+
+    async def test_middleware_sets_deadline_from_header(self):
+        """X-Request-Timeout becomes the deadline seen by downstream LLM calls."""
+        seen: list[float | None] = []
+
+        async def app(scope, receive, send):
+            seen.append(remaining_time())
+
+        middleware = RequestDeadlineMiddleware(app, default_seconds=0)
+        await middleware(
+            {"type": "http", "headers": [(b"x-request-timeout", b"2.5")]}, None, None
+        )
+        await middleware({"type": "http", "headers": []}, None, None)
+
+        assert 2 < seen[0] <= 2.5
+        assert seen[1] is None
@@ -1,8 +1,25 @@
 import pytest
 from httpx import AsyncClient
+from langchain_core.messages import AIMessage
 from unittest.mock import patch, MagicMock, AsyncMock
 
 
+class MockStream:
+    """Async iterator standing in for an AsyncOpenAI chat completion stream."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+
 class TestLLMRoutes:
     """Test cases for LLM API routes."""
 
@@ -10,7 +27,7 @@ class TestLLMRoutes:
     async def test_sync_chat(self, client: AsyncClient):
         """Test synchronous chat endpoint."""
         with patch("app.routers.llm.chain") as mock_chain:
-            mock_chain.invoke.return_value = "Mocked response"
+            mock_chain.ainvoke = AsyncMock(return_value="Mocked response")
 
             response = await client.get(
                 "/llm/sync/chat",
@@ -19,7 +36,8 @@ class TestLLMRoutes:
 
             assert response.status_code == 200
             assert response.json()["data"]["response"] == "Mocked response"
-            mock_chain.invoke.assert_called_once_with({"query": "Hello, world!"})
+            assert "latency_ms" in response.json()["metadata"]["usage"]
+            mock_chain.ainvoke.assert_called_once_with({"query": "Hello, world!"})
 
     @pytest.mark.asyncio
     async def test_async_chat(self, client: AsyncClient):
@@ -45,18 +63,17 @@ class TestLLMRoutes:
     @pytest.mark.asyncio
     async def test_async_chat_stream(self, client: AsyncClient):
         """Test asynchronous streaming chat endpoint."""
-        with patch("app.routers.llm.client") as mock_client:
-            # Mock streaming response
-            mock_stream = MagicMock()
-            mock_event = MagicMock()
-            mock_event.type = "content.delta"
-            mock_event.delta = "test"
+        with patch("app.routers.llm.async_client") as mock_client:
+            # Mock streaming response (content deltas, then a usage-only chunk)
+            delta_chunk = MagicMock(model="gpt-4o-mini", usage=None)
+            delta_chunk.choices[0].delta.content = "test"
+            usage_chunk = MagicMock(model="gpt-4o-mini", choices=[])
+            usage_chunk.usage.prompt_tokens = 5
+            usage_chunk.usage.completion_tokens = 1
 
-            mock_stream.__enter__ = MagicMock(return_value=mock_stream)
-            mock_stream.__exit__ = MagicMock(return_value=False)
-            mock_stream.__iter__ = MagicMock(return_value=iter([mock_event]))
-
-            mock_client.chat.completions.stream.return_value = mock_stream
+            mock_client.chat.completions.create = AsyncMock(
+                return_value=MockStream([delta_chunk, usage_chunk])
+            )
 
             response = await client.get(
                 "/llm/async/chat-stream",
@@ -65,16 +82,23 @@ class TestLLMRoutes:
 
             assert response.status_code == 200
             assert response.headers["content-type"] == "text/event-stream; charset=utf-8"
+            assert response.text == "test[END]"
+            call_kwargs = mock_client.chat.completions.create.call_args.kwargs
+            assert call_kwargs["stream"] is True
+            assert call_kwargs["stream_options"] == {"include_usage": True}
 
     @pytest.mark.asyncio
     async def test_async_generate_text(self, client: AsyncClient):
         """Test asynchronous text generation endpoint."""
-        with patch("app.routers.llm.client") as mock_client:
+        with patch("app.routers.llm.async_client") as mock_client:
             # Mock OpenAI response
             mock_response = MagicMock()
             mock_choice = MagicMock()
             mock_choice.message.content = "Generated text content"
             mock_response.choices = [mock_choice]
+            mock_response.model = "gpt-4o-mini"
+            mock_response.usage.prompt_tokens = 10
+            mock_response.usage.completion_tokens = 20
 
             mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
 
@@ -86,6 +110,8 @@ class TestLLMRoutes:
             assert response.status_code == 200
             data = response.json()
             assert data["data"]["text"] == "Generated text content"
+            assert data["data"]["usage"]["total_tokens"] == 30
+            assert data["metadata"]["usage"]["prompt_tokens"] == 10
 
             mock_client.chat.completions.create.assert_called_once()
             call_kwargs = mock_client.chat.completions.create.call_args.kwargs
@@ -95,7 +121,7 @@ class TestLLMRoutes:
     @pytest.mark.asyncio
     async def test_async_generate_text_error(self, client: AsyncClient):
         """Test text generation endpoint with error."""
-        with patch("app.routers.llm.client") as mock_client:
+        with patch("app.routers.llm.async_client") as mock_client:
             mock_client.chat.completions.create = AsyncMock(
                 side_effect=Exception("API Error")
             )
@@ -112,7 +138,17 @@ class TestLLMRoutes:
     async def test_complete_text(self, client: AsyncClient):
         """Test text completion endpoint."""
         with patch("app.routers.llm.llm") as mock_llm:
-            mock_llm.return_value = "Completion result"
+            mock_llm.ainvoke = AsyncMock(
+                return_value=AIMessage(
+                    content="Completion result",
+                    response_metadata={"model_name": "gpt-4o-mini"},
+                    usage_metadata={
+                        "input_tokens": 3,
+                        "output_tokens": 2,
+                        "total_tokens": 5,
+                    },
+                )
+            )
 
             response = await client.get(
                 "/llm/complete",
@@ -121,7 +157,8 @@ class TestLLMRoutes:
 
             assert response.status_code == 200
             assert response.json()["data"]["completion"] == "Completion result"
-            mock_llm.assert_called_once_with("Complete this")
+            assert response.json()["metadata"]["usage"]["total_tokens"] == 5
+            mock_llm.ainvoke.assert_called_once_with("Complete this")
 
     @pytest.mark.asyncio
     async def test_async_chat_validation(self, client: AsyncClient):
@@ -135,7 +172,9 @@ class TestLLMRoutes:
     async def test_multiple_llm_calls(self, client: AsyncClient):
         """Test making multiple LLM calls in sequence."""
         with patch("app.routers.llm.chain") as mock_chain:
-            mock_chain.invoke.side_effect = ["Response 1", "Response 2", "Response 3"]
+            mock_chain.ainvoke = AsyncMock(
+                side_effect=["Response 1", "Response 2", "Response 3"]
+            )
 
             queries = ["Query 1", "Query 2", "Query 3"]
             responses = []
@@ -151,4 +190,24 @@ class TestLLMRoutes:
             assert responses[0]["data"]["response"] == "Response 1"
             assert responses[1]["data"]["response"] == "Response 2"
             assert responses[2]["data"]["response"] == "Response 3"
-            assert mock_chain.invoke.call_count == 3
+            assert mock_chain.ainvoke.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_usage_stats(self, client: AsyncClient):
+        """Test aggregated usage is recorded per endpoint."""
+        before = (await client.get("/llm/usage")).json()["data"]["by_endpoint"]
+        calls_before = before.get("generate-text", {}).get("calls", 0)
+        errors_before = before.get("generate-text", {}).get("errors", 0)
+
+        with patch("app.routers.llm.async_client") as mock_client:
+            mock_client.chat.completions.create = AsyncMock(
+                side_effect=Exception("API Error")
+            )
+            await client.get("/llm/async/generate-text", params={"query": "q"})
+
+        response = await client.get("/llm/usage")
+
+        assert response.status_code == 200
+        stats = response.json()["data"]["by_endpoint"]["generate-text"]
+        assert stats["calls"] == calls_before + 1
+        assert stats["errors"] == errors_before + 1
@@ -0,0 +1,63 @@
+from app.utils import advanced_query
+from app.utils.advanced_query import multi_retrieval_internal
+from app.utils.query_router import route_search_strategies
+
+
+class TestQueryRouter:
+    """Unit tests for the keyword-based multi-retrieval strategy router."""
+
+    def test_numeric_question_routes_to_table(self):
+        """Amount questions only need the table strategy and skip integration."""
+        decision = route_search_strategies("감봉 기준 금액은 얼마인가요?")
+
+        assert decision["strategies"] == ["table"]
+        assert decision["integrate"] is False
+        assert decision["llm_calls"] == 1
+        assert decision["saved_llm_calls"] == 2
+
+    def test_mixed_question_keeps_both(self):
+        """Comparison plus explanation keeps both strategies and integrates."""
+        decision = route_search_strategies("징계 종류를 비교하고 감경 이유를 설명해줘")
+
+        assert decision["strategies"] == ["table", "text"]
+        assert decision["integrate"] is True
+
+    def test_request_flags_are_upper_bound(self):
+        """Disabled strategies are never selected; no match falls back to text."""
+        decision = route_search_strategies(
+            "JSON으로 금액 필드를 추출해줘", use_json_extraction=False
+        )
+        assert "json" not in decision["strategies"]
+
+        fallback = route_search_strategies("징계위원회 구성원")
+        assert fallback["strategies"] == ["text"]
+
+        only_table = route_search_strategies("징계위원회 구성원", use_text_search=False)
+        assert only_table["strategies"] == ["table"]
+
+    async def test_single_strategy_skips_integration(self, monkeypatch):
+        """multi_retrieval runs only the routed strategy and no integration call."""
+        calls = []
+
+        def fake_search(search_type):
+            async def search(index, query, top_k, retrieval_mode, reranker):
+                calls.append(search_type)
+                return {"search_type": search_type, "answer": f"{search_type} 답변"}
+
+            return search
+
+        async def unexpected(**kwargs):
+            raise AssertionError("integration should be skipped")
+
+        monkeypatch.setattr(advanced_query, "search_tables", fake_search("table"))
+        monkeypatch.setattr(advanced_query, "search_text", fake_search("text"))
+        monkeypatch.setattr(advanced_query, "integrate_results", unexpected)
+
+        result = await multi_retrieval_internal(
+            "doc", "제5조 예외 조항의 의미는?", index=object(), metadata={}
+        )
+
+        assert calls == ["text"]
+        assert result["integrated_answer"] == "text 답변"
+        assert result["table_results"] is None
+        assert result["strategy_routing"]["saved_llm_calls"] == 2
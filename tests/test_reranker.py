@@ -0,0 +1,67 @@
+from llama_index.core.schema import NodeWithScore, QueryBundle, TextNode
+
+from app.utils.reranker import CrossEncoderReranker, select_nodes
+from app.utils.tokens import count_tokens
+
+
+class KeywordReranker(CrossEncoderReranker):
+    """Reranker that scores by keyword overlap instead of loading a model."""
+
+    def _score(self, query, texts):
+        return [float(sum(word in text for word in query.split())) for text in texts]
+
+
+def _nodes(texts, scores=None):
+    scores = scores or [0.5] * len(texts)
+    return [
+        NodeWithScore(node=TextNode(text=text), score=score)
+        for text, score in zip(texts, scores, strict=True)
+    ]
+
+
+class TestSelectNodes:
+    """Unit tests for top-n / token-budget node selection."""
+
+    def test_orders_by_rerank_score(self):
+        """Nodes are kept in rerank order and retain their retrieval score."""
+        nodes = _nodes(["a", "b", "c"], [0.9, 0.8, 0.7])
+
+        selected = select_nodes(nodes, [0.1, 3.0, 2.0], top_n=2)
+
+        assert [n.node.text for n in selected] == ["b", "c"]
+        assert [n.score for n in selected] == [0.8, 0.7]
+
+    def test_token_budget(self):
+        """Selection stops before the cumulative token budget is exceeded."""
+        text = "징계 감경 기준 " * 20
+        nodes = _nodes([text, text, text])
+        budget = count_tokens(text) * 2
+
+        assert len(select_nodes(nodes, [3.0, 2.0, 1.0], 3, budget)) == 2
+        # The best node is always kept even if it alone exceeds the budget
+        assert len(select_nodes(nodes, [3.0, 2.0, 1.0], 3, 1)) == 1
+
+
+class TestCrossEncoderReranker:
+    """Unit tests for the reranking node postprocessor."""
+
+    def test_postprocess_records_stats(self):
+        """Reranking shrinks the candidate list and reports tokens saved."""
+        nodes = _nodes(["휴가 규정", "징계 감경 기준", "예산 총액", "징계 절차"])
+        reranker = KeywordReranker(top_n=2)
+
+        selected = reranker.postprocess_nodes(nodes, QueryBundle("징계 감경"))
+
+        assert [n.node.text for n in selected] == ["징계 감경 기준", "징계 절차"]
+        assert reranker.stats["candidates"] == 4
+        assert reranker.stats["kept"] == 2
+        assert reranker.stats["tokens_saved"] > 0
+
+    def test_rerank_query_overrides_prompt(self):
+        """An explicit rerank query is used instead of the engine prompt."""
+        nodes = _nodes(["휴가 규정", "예산 총액"])
+        reranker = KeywordReranker(top_n=1, rerank_query="예산")
+
+        selected = reranker.postprocess_nodes(nodes, QueryBundle("긴 지시문 휴가"))
+
+        assert selected[0].node.text == "예산 총액"
@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+from pydantic import BaseModel, Field
+
+from app.utils.structured_stream import (
+    PartialJSONObjectParser,
+    stream_structured_output,
+)
+
+
+class Review(BaseModel):
+    title: str
+    rating: int = Field(ge=1, le=10)
+    pros: list[str]
+
+
+async def token_stream(chunks: list[str], delay: float = 0.0):
+    for chunk in chunks:
+        await asyncio.sleep(delay)
+        yield chunk
+
+
+async def collect_events(stream) -> list[tuple[str, dict]]:
+    events = []
+    async for message in stream:
+        event_line, data_line = message.strip().split("\n")
+        events.append((event_line.removeprefix("event: "), json.loads(data_line[6:])))
+    return events
+
+
+class TestStructuredStream:
+    """Unit tests for incremental partial-JSON streaming of structured output."""
+
+    def test_parser_emits_fields_as_values_close(self):
+        """Fields are returned once their value ends, across arbitrary chunk splits."""
+        text = (
+            '```json\n{"title": "A, \\"B\\" {C}", "rating": 8, '
+            '"pros": ["fast", "[x]"], "meta": {"k": [1, 2]}}\n```'
+        )
+        parser = PartialJSONObjectParser()
+        fields = []
+        for position in range(0, len(text), 3):
+            fields.extend(parser.feed(text[position : position + 3]))
+
+        assert fields == [
+            ("title", 'A, "B" {C}'),
+            ("rating", 8),
+            ("pros", ["fast", "[x]"]),
+            ("meta", {"k": [1, 2]}),
+        ]
+        assert parser.complete
+        assert json.loads(parser.json_text)["rating"] == 8
+
+    async def test_partial_events_arrive_before_result(self):
+        """Validated partial objects stream before the final full validation."""
+        chunks = ['{"title": "Dune",', ' "rating": "9",', ' "pros": ["visuals"', "]}"]
+        events = await collect_events(
+            stream_structured_output(token_stream(chunks, delay=0.02), Review)
+        )
+
+        names = [name for name, _ in events]
+        assert names == ["partial", "partial", "partial", "result"]
+        assert events[0][1]["partial"] == {"title": "Dune"}
+        assert events[1][1]["value"] == 9
+        result = events[-1][1]
+        assert result["result"] == {"title": "Dune", "rating": 9, "pros": ["visuals"]}
+        assert result["time_to_first_field_ms"] < result["execution_time_ms"] / 2
+
+    async def test_invalid_field_and_llm_error(self):
+        """Constraint violations surface per field and fail final validation."""
+        chunks = ['{"title": "X", "rating": 42, "pros": []}']
+        events = await collect_events(
+            stream_structured_output(token_stream(chunks), Review)
+        )
+        assert [name for name, _ in events] == [
+            "partial",
+            "field_error",
+            "partial",
+            "error",
+        ]
+        assert events[1][1]["field"] == "rating"
+
+        async def failing_stream():
+            yield '{"title": "Y", '
+            raise RuntimeError("upstream reset")
+
+        events = await collect_events(
+            stream_structured_output(failing_stream(), Review)
+        )
+        assert events[-1][0] == "error"
+        assert events[-1][1]["error"] == "upstream reset"
+        assert events[-1][1]["partial"] == {"title": "Y"}
@@ -0,0 +1,67 @@
+import numpy as np
+from llama_index.core import VectorStoreIndex
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.llms import MockLLM
+from llama_index.core.schema import TextNode
+
+from app.utils.retrieval import set_index_component
+from app.utils.summary_tree import (
+    build_summary_tree,
+    cluster_embeddings,
+    get_summary_tree_stats,
+    is_overview_query,
+    route_tree_level,
+)
+
+
+def _leaf_index(count, dim=8):
+    rng = np.random.default_rng(0)
+    nodes = [
+        TextNode(
+            text=f"제{i}조 지원 내용 {i}",
+            metadata={"parent_index": i // 4, "chunk_index": i % 4},
+            embedding=rng.normal(size=dim).tolist(),
+        )
+        for i in range(count)
+    ]
+    return VectorStoreIndex(nodes, embed_model=MockEmbedding(embed_dim=dim))
+
+
+class TestSummaryTree:
+    """Unit tests for the RAPTOR-style summary tree and query routing."""
+
+    def test_cluster_embeddings_partitions_rows(self):
+        """Every row is assigned to exactly one non-empty cluster."""
+        embeddings = np.random.default_rng(1).normal(size=(30, 8))
+
+        clusters = cluster_embeddings(embeddings, 4)
+
+        assert 1 <= len(clusters) <= 4
+        assert sorted(row for rows in clusters for row in rows) == list(range(30))
+
+    def test_overview_query_detection(self):
+        """Broad questions route to summaries, specific ones to leaves."""
+        assert is_overview_query("이 문서의 목적은 무엇인가요?")
+        assert is_overview_query("주요 내용을 알려줘")
+        assert not is_overview_query("제5조의 감경 기준은?")
+        assert not is_overview_query("지원 금액 상한은 얼마인가요?")
+
+    async def test_build_tree_and_route(self):
+        """Summary levels shrink toward a root and overview queries use them."""
+        index = _leaf_index(40)
+        tree = await build_summary_tree(
+            index,
+            llm=MockLLM(max_tokens=8),
+            embed_model=MockEmbedding(embed_dim=8),
+            branching=8,
+        )
+
+        stats = get_summary_tree_stats(tree)
+        assert stats["summary_tree_levels"] == 2
+        assert 2 <= stats["summary_tree_nodes"] <= 6
+
+        assert route_tree_level(index, "이 문서의 목적은?") == "leaf"
+        set_index_component(index, "summary_tree", tree)
+        assert route_tree_level(index, "이 문서의 목적은?") == "summary"
+        assert route_tree_level(index, "제5조 지원 금액은?") == "leaf"
+        assert route_tree_level(index, "제5조 지원 금액은?", "summary") == "summary"
@@ -0,0 +1,82 @@
+import asyncio
+
+from llama_index.core.llms import MockLLM
+
+from app.utils.synthesis import AdaptiveSynthesizer, group_chunks
+from app.utils.tokens import count_tokens
+
+
+class CountingLLM(MockLLM):
+    """MockLLM that counts completion calls."""
+
+    calls: int = 0
+
+    def complete(self, prompt, formatted=False, **kwargs):
+        self.calls += 1
+        return super().complete(prompt, formatted=formatted, **kwargs)
+
+
+def _chunks(count, sentence="제3조 지원금은 예산 범위에서 지급한다. "):
+    return [f"[{i}] " + sentence * 20 for i in range(count)]
+
+
+class TestAdaptiveSynthesizer:
+    """Unit tests for choosing single-shot vs map-reduce synthesis."""
+
+    def test_group_chunks_respects_token_limit(self):
+        """Chunks are grouped in order without exceeding the limit."""
+        chunks = _chunks(6)
+        limit = count_tokens(chunks[0]) * 2 + 10
+
+        groups = group_chunks(chunks, limit)
+
+        assert len(groups) == 3
+        assert groups[0].startswith("[0]")
+        assert "[1]" in groups[0]
+        assert all(count_tokens(group) <= limit for group in groups)
+
+    def test_small_context_uses_single_call(self):
+        """Context under the single-shot limit is answered with one LLM call."""
+        llm = CountingLLM(max_tokens=16)
+        synthesizer = AdaptiveSynthesizer(llm=llm, single_shot_tokens=100_000)
+
+        synthesizer.get_response("지원 대상은?", _chunks(3))
+
+        assert llm.calls == 1
+        assert synthesizer.stats["strategy"] == "single"
+        assert synthesizer.stats["llm_calls"] == 1
+
+    def test_large_context_uses_map_reduce(self):
+        """Context over the limit is summarized in groups, then reduced once."""
+        llm = CountingLLM(max_tokens=16)
+        chunks = _chunks(6)
+        chunk_tokens = count_tokens(chunks[0])
+        synthesizer = AdaptiveSynthesizer(
+            llm=llm,
+            single_shot_tokens=chunk_tokens * 3,
+            map_chunk_tokens=chunk_tokens * 2 + 10,
+        )
+
+        synthesizer.get_response("지원 대상은?", chunks)
+
+        stats = synthesizer.stats
+        assert stats["strategy"] == "map_reduce"
+        assert stats["map_levels"] == 1
+        assert stats["llm_calls"] == 4
+        assert llm.calls == 4
+
+    def test_async_map_reduce_matches_sync(self):
+        """The async path makes the same number of LLM calls."""
+        llm = CountingLLM(max_tokens=16)
+        chunks = _chunks(6)
+        chunk_tokens = count_tokens(chunks[0])
+        synthesizer = AdaptiveSynthesizer(
+            llm=llm,
+            single_shot_tokens=chunk_tokens * 3,
+            map_chunk_tokens=chunk_tokens * 2 + 10,
+        )
+
+        asyncio.run(synthesizer.aget_response("지원 대상은?", chunks))
+
+        assert synthesizer.stats["strategy"] == "map_reduce"
+        assert synthesizer.stats["llm_calls"] == 4
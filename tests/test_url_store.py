@@ -0,0 +1,95 @@
+import httpx
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from app.routers.rag import split_html
+from app.utils import url_store
+from app.utils.url_store import get_url_store_stats, load_url_store
+
+URL = "https://example.com/post"
+PAGE_V1 = "<html><body><h1>Title</h1><p>first version of the post</p></body></html>"
+PAGE_V2 = "<html><body><h1>Title</h1><p>second version of the post</p></body></html>"
+
+
+class CountingEmbedding(DeterministicFakeEmbedding):
+    """Fake embedding model that counts how many texts were embedded."""
+
+    calls: int = 0
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls += len(texts)
+        return super().embed_documents(texts)
+
+
+class FakeSite:
+    """Serves one page and honours If-None-Match like a real server."""
+
+    def __init__(self, body: str, etag: str | None = '"v1"'):
+        self.body = body
+        self.etag = etag
+        self.statuses: list[int] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        headers = {"ETag": self.etag} if self.etag else {}
+        if self.etag and request.headers.get("if-none-match") == self.etag:
+            status = 304
+            response = httpx.Response(304, headers=headers)
+        else:
+            status = 200
+            response = httpx.Response(200, headers=headers, text=self.body)
+        self.statuses.append(status)
+        return response
+
+
+def use_site(monkeypatch, tmp_path, site: FakeSite) -> None:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(site.handler))
+    monkeypatch.setattr(url_store, "_get_http_client", lambda: client)
+    monkeypatch.setattr(url_store, "URL_STORE_DIR", str(tmp_path))
+    url_store._memory.clear()
+
+
+class TestURLStore:
+    """Unit tests for persistent URL-keyed FAISS stores behind /rag/load."""
+
+    async def test_not_modified_reuses_store_without_embedding(
+        self, monkeypatch, tmp_path
+    ):
+        """A 304 reply returns the saved index, even after the process cache is cleared."""
+        site = FakeSite(PAGE_V1)
+        use_site(monkeypatch, tmp_path, site)
+        embeddings = CountingEmbedding(size=8)
+
+        first = await load_url_store(URL, embeddings, split_html)
+        embedded = embeddings.calls
+        url_store._memory.clear()
+        second = await load_url_store(URL, embeddings, split_html)
+
+        assert (first.status, second.status) == ("built", "not_modified")
+        assert site.statuses == [200, 304]
+        assert embedded > 0 and embeddings.calls == embedded
+        assert second.embedding_ms == 0.0
+        assert second.vectorstore.index.ntotal == first.vectorstore.index.ntotal
+        assert second.vectorstore.similarity_search("first version", k=1)
+        assert get_url_store_stats()["stores"][0]["url"] == URL
+
+    async def test_content_hash_detects_unchanged_and_changed_pages(
+        self, monkeypatch, tmp_path
+    ):
+        """Without validators the body hash decides; changed pages and configs rebuild."""
+        site = FakeSite(PAGE_V1, etag=None)
+        use_site(monkeypatch, tmp_path, site)
+        embeddings = CountingEmbedding(size=8)
+        config = {"chunk_size": 500}
+
+        await load_url_store(URL, embeddings, split_html, config=config)
+        unchanged = await load_url_store(URL, embeddings, split_html, config=config)
+        site.body = PAGE_V2
+        changed = await load_url_store(URL, embeddings, split_html, config=config)
+        reconfigured = await load_url_store(
+            URL, embeddings, split_html, config={"chunk_size": 200}
+        )
+
+        assert unchanged.status == "unchanged"
+        assert changed.status == "built"
+        assert changed.manifest["content_hash"] != unchanged.manifest["content_hash"]
+        assert reconfigured.status == "built"
+        assert site.statuses == [200, 200, 200, 200]
@@ -0,0 +1,71 @@
+import asyncio
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from app.utils.vector_store import BoundedVectorStore
+
+
+class CountingEmbedding(DeterministicFakeEmbedding):
+    """Fake embedding model that counts how many texts were embedded."""
+
+    calls: int = 0
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls += len(texts)
+        return self.embed_documents(texts)
+
+
+def docs(*texts: str) -> list[Document]:
+    return [Document(page_content=text) for text in texts]
+
+
+class TestBoundedVectorStore:
+    """Unit tests for the de-duplicated, capacity-bounded global vector store."""
+
+    async def test_repost_deduplicates_and_replaces_source(self):
+        """Re-posting a URL embeds only new chunks and drops the ones it no longer has."""
+        embeddings = CountingEmbedding(size=8)
+        store = BoundedVectorStore(embeddings, max_docs=100)
+
+        first = await store.aadd_documents(docs("a", "b", "c", "a"), source="u1")
+        again = await store.aadd_documents(docs("a", "b", "c"), source="u1")
+        changed = await store.aadd_documents(docs("a", "b", "d"), source="u1")
+        shared = await store.aadd_documents(docs("a", "x"), source="u2")
+
+        assert (first["added"], first["duplicates"]) == (3, 1)
+        assert (again["added"], again["duplicates"], again["removed"]) == (0, 3, 0)
+        assert (changed["added"], changed["removed"]) == (1, 1)
+        assert shared["added"] == 1
+        assert embeddings.calls == 5
+        assert store.index.ntotal == len(store) == 4
+
+        # "a" is still referenced by u2, so only u1's own chunks are removed
+        assert store.delete_source("u1") == 2
+        remaining = await store.asimilarity_search("a", k=10)
+        assert sorted(doc.page_content for doc in remaining) == ["a", "x"]
+        assert store.stats["sources"] == 1
+
+    async def test_lru_and_ttl_eviction(self):
+        """Capacity evicts least recently used chunks; expired chunks go first."""
+        store = BoundedVectorStore(CountingEmbedding(size=8), max_docs=3)
+        await store.aadd_documents(docs("a", "b", "c"))
+        await store.asimilarity_search("a", k=1)  # "a" becomes most recently used
+        result = await store.aadd_documents(docs("d"))
+
+        contents = {entry.document.page_content for entry in store._entries.values()}
+        assert result["evicted"] == 1
+        assert "a" in contents and len(contents) == 3
+        assert store.index.ntotal == 3
+
+        store = BoundedVectorStore(CountingEmbedding(size=8), max_docs=10, ttl=0.05)
+        await store.aadd_documents(docs("old"))
+        await asyncio.sleep(0.06)
+        await store.aadd_documents(docs("new"))
+
+        assert [doc.page_content for doc in await store.asimilarity_search("q")] == [
+            "new"
+        ]
+        stats = store.stats
+        assert stats["evicted_ttl"] == 1
+        assert stats["search_ms_p95"] is not None